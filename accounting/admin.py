@@ -1,7 +1,8 @@
 from django.contrib import admin
 from .models import (
     AccountingCategory, Supplier, PurchaseVoucher, PurchaseVoucherItem,
-    SalesVoucher, SalesVoucherItem, JournalEntry, JournalEntryLine
+    SalesVoucher, SalesVoucherItem, JournalEntry, JournalEntryLine,
+    AccountBalance, AccountingPeriod, AccountBalanceSnapshot
 )
 
 @admin.register(AccountingCategory)
@@ -46,12 +47,46 @@ class SalesVoucherAdmin(admin.ModelAdmin):
 
 class JournalEntryLineInline(admin.TabularInline):
     model = JournalEntryLine
-    extra = 2
+    extra = 0
+    readonly_fields = ['account', 'debit_amount', 'credit_amount', 'description', 'entry_date', 'balance_after']
+    can_delete = False
 
 @admin.register(JournalEntry)
 class JournalEntryAdmin(admin.ModelAdmin):
-    list_display = ['entry_number', 'entry_date', 'description', 'created_by']
-    list_filter = ['entry_date']
+    """분개장은 추가 전용 - 전표 저장 시 자동 전기되며 관리자 화면에서는 조회만 가능"""
+    list_display = ['entry_number', 'entry_date', 'entry_type', 'description', 'reversal_of', 'created_by']
+    list_filter = ['entry_type', 'entry_date']
     search_fields = ['entry_number', 'description']
+    readonly_fields = ['entry_number', 'entry_date', 'entry_type', 'description',
+                       'sales_voucher', 'purchase_voucher', 'reversal_of', 'created_by']
     inlines = [JournalEntryLineInline]
     ordering = ['-entry_date']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+@admin.register(AccountBalance)
+class AccountBalanceAdmin(admin.ModelAdmin):
+    list_display = ['account', 'debit_total', 'credit_total', 'balance', 'line_count', 'updated_at']
+    readonly_fields = ['account', 'debit_total', 'credit_total', 'balance', 'line_count', 'last_line', 'updated_at']
+    
+    def has_add_permission(self, request):
+        return False
+
+
+class AccountBalanceSnapshotInline(admin.TabularInline):
+    model = AccountBalanceSnapshot
+    extra = 0
+    readonly_fields = ['account', 'as_of_date', 'period_debit', 'period_credit', 'balance']
+    can_delete = False
+
+@admin.register(AccountingPeriod)
+class AccountingPeriodAdmin(admin.ModelAdmin):
+    list_display = ['year', 'month', 'start_date', 'end_date', 'is_closed', 'closed_at', 'closed_by']
+    list_filter = ['is_closed', 'year']
+    readonly_fields = ['closed_at', 'closed_by']
+    inlines = [AccountBalanceSnapshotInline]
+    ordering = ['-end_date']
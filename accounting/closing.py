@@ -0,0 +1,270 @@
+"""
+회계 기간 마감 및 계정 잔액 스냅샷
+
+월 마감 시 계정과목별 기말잔액을 AccountBalanceSnapshot 으로 저장해 두고,
+임의 기준일의 잔액은 "직전 마감 스냅샷 + 그 이후 발생분" 으로 계산한다.
+전표 전체를 매번 다시 합산하지 않으므로 이력이 길어져도 조회 비용이 일정하다.
+"""
+import calendar
+import logging
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .models import (
+    AccountingCategory, AccountingPeriod, AccountBalanceSnapshot,
+    PurchaseVoucher, SalesVoucher,
+)
+
+logger = logging.getLogger(__name__)
+
+# 전표에서 잔액을 집계하는 계정 (키: (계정코드, 계정명, 계정구분))
+LEDGER_ACCOUNTS = {
+    'receivable': ('108', '외상매출금', 'asset'),
+    'payable': ('251', '외상매입금', 'liability'),
+    'sales': ('401', '상품매출', 'revenue'),
+    'purchases': ('451', '상품매입', 'expense'),
+}
+
+# 차변 잔액 계정 (나머지는 대변 잔액 계정)
+DEBIT_NORMAL_TYPES = ('asset', 'expense')
+
+
+def get_ledger_accounts():
+    """집계 대상 계정과목 반환 (없으면 생성)"""
+    accounts = {}
+    for key, (code, name, category_type) in LEDGER_ACCOUNTS.items():
+        account, created = AccountingCategory.objects.get_or_create(
+            code=code,
+            defaults={'name': name, 'category_type': category_type}
+        )
+        accounts[key] = account
+    return accounts
+
+
+def month_range(year, month):
+    """해당 월의 시작일과 종료일 반환"""
+    last_day = calendar.monthrange(year, month)[1]
+    return date(year, month, 1), date(year, month, last_day)
+
+
+def _date_window(field, date_from, date_to):
+    """(date_from, date_to] 구간 조건 생성 (date_from 이 없으면 처음부터)"""
+    condition = Q(**{f'{field}__lte': date_to})
+    if date_from:
+        condition &= Q(**{f'{field}__gt': date_from})
+    return condition
+
+
+def _voucher_movements(queryset, date_field, flag_field, date_from, date_to):
+    """
+    전표 발생액과 결제(입금) 완료액 합계
+
+    전표일자 구간과 결제일 구간을 각각 인덱스 범위 조회로 집계한다.
+    결제일이 없는 결제 완료 전표는 전표일자에 결제된 것으로 간주한다.
+    """
+    booked = queryset.filter(_date_window(date_field, date_from, date_to)).aggregate(
+        total=Sum('total_amount'),
+        settled=Sum('total_amount', filter=Q(**{flag_field: True, 'payment_date__isnull': True})),
+    )
+    paid = queryset.filter(
+        _date_window('payment_date', date_from, date_to), **{flag_field: True}
+    ).aggregate(total=Sum('total_amount'))
+
+    booked_total = booked['total'] or Decimal('0')
+    settled_total = (booked['settled'] or Decimal('0')) + (paid['total'] or Decimal('0'))
+    return booked_total, settled_total
+
+
+def calculate_movements(date_from, date_to):
+    """(date_from, date_to] 기간의 계정별 차변/대변 발생액 계산"""
+    sales_booked, sales_settled = _voucher_movements(
+        SalesVoucher.objects.all(), 'sales_date', 'is_received', date_from, date_to
+    )
+    purchase_booked, purchase_settled = _voucher_movements(
+        PurchaseVoucher.objects.all(), 'purchase_date', 'is_paid', date_from, date_to
+    )
+
+    # 키: (차변, 대변)
+    return {
+        'receivable': (sales_booked, sales_settled),
+        'payable': (purchase_settled, purchase_booked),
+        'sales': (Decimal('0'), sales_booked),
+        'purchases': (purchase_booked, Decimal('0')),
+    }
+
+
+def _apply_movement(balance, category_type, debit, credit):
+    if category_type in DEBIT_NORMAL_TYPES:
+        return balance + debit - credit
+    return balance + credit - debit
+
+
+def get_last_closed_period(before_date=None):
+    """기준일 이전(포함)에 마감된 가장 최근 기간 반환"""
+    periods = AccountingPeriod.objects.filter(is_closed=True)
+    if before_date:
+        periods = periods.filter(end_date__lte=before_date)
+    return periods.order_by('-end_date').first()
+
+
+def get_balances_as_of(as_of_date):
+    """
+    기준일 현재 계정별 잔액 반환
+
+    직전 마감 스냅샷을 시작 잔액으로 사용하고 이후 발생분만 합산한다.
+    반환값: {'balances': {키: 잔액}, 'base_period': AccountingPeriod 또는 None}
+    """
+    base_period = get_last_closed_period(as_of_date)
+    balances = {key: Decimal('0') for key in LEDGER_ACCOUNTS}
+    base_date = None
+
+    if base_period:
+        base_date = base_period.end_date
+        snapshot_balances = dict(
+            base_period.snapshots.values_list('account__code', 'balance')
+        )
+        for key, (code, name, category_type) in LEDGER_ACCOUNTS.items():
+            balances[key] = snapshot_balances.get(code, Decimal('0'))
+
+    if base_date is None or base_date < as_of_date:
+        movements = calculate_movements(base_date, as_of_date)
+        for key, (code, name, category_type) in LEDGER_ACCOUNTS.items():
+            debit, credit = movements[key]
+            balances[key] = _apply_movement(balances[key], category_type, debit, credit)
+
+    return {'balances': balances, 'base_period': base_period}
+
+
+@transaction.atomic
+def close_period(year, month, user=None):
+    """월 마감 처리 - 계정별 기말잔액 스냅샷 저장"""
+    start_date, end_date = month_range(year, month)
+    accounts = get_ledger_accounts()
+
+    period, created = AccountingPeriod.objects.select_for_update().get_or_create(
+        year=year,
+        month=month,
+        defaults={'start_date': start_date, 'end_date': end_date}
+    )
+
+    # 직전 마감 스냅샷을 시작 잔액으로 사용
+    previous = AccountingPeriod.objects.filter(
+        is_closed=True, end_date__lt=start_date
+    ).order_by('-end_date').first()
+
+    opening = {key: Decimal('0') for key in LEDGER_ACCOUNTS}
+    previous_end = None
+    if previous:
+        previous_end = previous.end_date
+        snapshot_balances = dict(previous.snapshots.values_list('account__code', 'balance'))
+        for key, (code, name, category_type) in LEDGER_ACCOUNTS.items():
+            opening[key] = snapshot_balances.get(code, Decimal('0'))
+
+    movements = calculate_movements(previous_end, end_date)
+
+    period.snapshots.all().delete()
+    snapshots = []
+    for key, (code, name, category_type) in LEDGER_ACCOUNTS.items():
+        debit, credit = movements[key]
+        snapshots.append(AccountBalanceSnapshot(
+            period=period,
+            account=accounts[key],
+            as_of_date=end_date,
+            period_debit=debit,
+            period_credit=credit,
+            balance=_apply_movement(opening[key], category_type, debit, credit),
+        ))
+    AccountBalanceSnapshot.objects.bulk_create(snapshots)
+
+    period.is_closed = True
+    period.closed_at = timezone.now()
+    period.closed_by = user
+    period.save()
+
+    return period
+
+
+def iter_months(start_date, end_date):
+    """시작일~종료일 사이의 (연, 월) 목록"""
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        yield year, month
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+
+
+def get_first_voucher_date():
+    """가장 오래된 전표일자 반환"""
+    dates = [
+        SalesVoucher.objects.order_by('sales_date').values_list('sales_date', flat=True).first(),
+        PurchaseVoucher.objects.order_by('purchase_date').values_list('purchase_date', flat=True).first(),
+    ]
+    dates = [d for d in dates if d]
+    return min(dates) if dates else None
+
+
+def rebuild_snapshots(through_date=None, user=None):
+    """
+    스냅샷 전체 재생성
+
+    기존 스냅샷을 모두 삭제하고 첫 전표 월부터 through_date 가 속한 월의
+    직전 월까지 순서대로 다시 마감한다. 재생성한 기간 목록을 반환한다.
+    """
+    if through_date is None:
+        through_date = timezone.now().date()
+
+    first_date = get_first_voucher_date()
+
+    with transaction.atomic():
+        AccountBalanceSnapshot.objects.all().delete()
+        AccountingPeriod.objects.filter(is_closed=True).update(is_closed=False, closed_at=None)
+
+    if not first_date:
+        return []
+
+    # 진행 중인 월은 마감하지 않음
+    last_complete_end = through_date.replace(day=1)
+    periods = []
+    for year, month in iter_months(first_date, last_complete_end):
+        start_date, end_date = month_range(year, month)
+        if end_date >= last_complete_end:
+            break
+        periods.append(close_period(year, month, user=user))
+    return periods
+
+
+def reopen_periods_from(changed_date):
+    """
+    마감된 기간에 속한 전표가 변경되면 해당 월 이후 스냅샷을 무효화
+
+    무효화된 기간은 미마감 상태로 돌아가며 close_accounting_period 로 다시 마감한다.
+    """
+    if not changed_date:
+        return 0
+    periods = AccountingPeriod.objects.filter(is_closed=True, end_date__gte=changed_date)
+    period_ids = list(periods.values_list('id', flat=True))
+    if not period_ids:
+        return 0
+
+    with transaction.atomic():
+        AccountBalanceSnapshot.objects.filter(period_id__in=period_ids).delete()
+        AccountingPeriod.objects.filter(id__in=period_ids).update(is_closed=False, closed_at=None)
+
+    logger.warning(f"마감 기간 전표 변경으로 {len(period_ids)}개 기간 마감 해제 (기준일: {changed_date})")
+    return len(period_ids)
+
+
+def invalidate_for_dates(*dates):
+    """변경된 전표 일자 중 마감 기간에 속하는 것이 있으면 스냅샷 무효화"""
+    dates = [d for d in dates if d]
+    if not dates:
+        return 0
+    earliest = min(d if isinstance(d, date) else date.fromisoformat(str(d)) for d in dates)
+    if not AccountingPeriod.objects.filter(is_closed=True, end_date__gte=earliest).exists():
+        return 0
+    return reopen_periods_from(earliest)
@@ -0,0 +1,62 @@
+from django import forms
+from django.core.exceptions import ValidationError
+import pandas as pd
+
+
+class VoucherImportForm(forms.Form):
+    """전표 일괄 등록 폼 (한 행이 전표 항목 하나)"""
+
+    VOUCHER_TYPE_CHOICES = [
+        ('purchase', '매입전표'),
+        ('sales', '매출전표'),
+    ]
+
+    voucher_type = forms.ChoiceField(
+        choices=VOUCHER_TYPE_CHOICES,
+        label='전표 구분',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+
+    file = forms.FileField(
+        label='파일',
+        help_text='Excel (.xlsx) 또는 CSV (.csv) 파일을 업로드해주세요.',
+        widget=forms.FileInput(attrs={
+            'class': 'form-control',
+            'accept': '.xlsx,.csv'
+        })
+    )
+
+    vat_included = forms.BooleanField(
+        label='부가세 포함 금액',
+        required=False,
+        help_text='체크하면 총금액의 1/11 을 부가세로 계산합니다.'
+    )
+
+    dry_run = forms.BooleanField(
+        label='검증만 하기',
+        required=False,
+        help_text='저장하지 않고 오류와 합계만 확인합니다.'
+    )
+
+    def clean_file(self):
+        file = self.cleaned_data['file']
+
+        if not file.name.lower().endswith(('.xlsx', '.csv')):
+            raise ValidationError('Excel(.xlsx) 또는 CSV(.csv) 파일만 업로드 가능합니다.')
+
+        # 파일 크기 검사 (20MB 제한)
+        if file.size > 20 * 1024 * 1024:
+            raise ValidationError('파일 크기는 20MB 이하여야 합니다.')
+
+        return file
+
+    def process_file(self):
+        """파일 데이터를 DataFrame 으로 반환"""
+        from .vouchers import read_voucher_file
+
+        try:
+            return read_voucher_file(self.cleaned_data['file'])
+        except pd.errors.EmptyDataError:
+            raise ValidationError('빈 파일입니다.')
+        except Exception as e:
+            raise ValidationError(f'파일 읽기 오류: {str(e)}')
@@ -0,0 +1,437 @@
+"""
+복식부기 분개 엔진
+
+매출/매입 전표가 저장되면 차변·대변이 일치하는 분개를 분개장에 전기하고
+계정과목별 누적 잔액(AccountBalance)을 같은 트랜잭션에서 갱신한다.
+분개장은 추가만 가능하며, 전표가 수정되면 기존 분개를 역분개한 뒤 새로 전기한다.
+"""
+import logging
+from collections import OrderedDict, defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.utils import timezone
+
+from .closing import LEDGER_ACCOUNTS
+from .models import (
+    AccountBalance, AccountingCategory, JournalEntry, JournalEntryLine,
+    PurchaseVoucher, SalesVoucher,
+)
+
+logger = logging.getLogger(__name__)
+
+# 분개에 사용하는 기본 계정 (키: (계정코드, 계정명, 계정구분))
+POSTING_ACCOUNTS = {
+    **LEDGER_ACCOUNTS,
+    'cash': ('101', '현금', 'asset'),
+    'bank': ('103', '보통예금', 'asset'),
+    'vat_receivable': ('135', '부가세대급금', 'asset'),
+    'vat_payable': ('255', '부가세예수금', 'liability'),
+}
+
+# 결제방법별 입출금 계정
+SETTLEMENT_ACCOUNT_BY_METHOD = {
+    'cash': 'cash',
+}
+
+ZERO = Decimal('0')
+# 동시 전기로 분개번호가 겹칠 때 다시 번호를 매겨 볼 횟수
+ENTRY_NUMBER_RETRIES = 5
+
+
+def get_posting_accounts():
+    """분개 기본 계정 반환 (없으면 생성)"""
+    codes = {code: key for key, (code, name, category_type) in POSTING_ACCOUNTS.items()}
+    accounts = {
+        codes[account.code]: account
+        for account in AccountingCategory.objects.filter(code__in=codes)
+    }
+    for key, (code, name, category_type) in POSTING_ACCOUNTS.items():
+        if key not in accounts:
+            accounts[key], created = AccountingCategory.objects.get_or_create(
+                code=code,
+                defaults={'name': name, 'category_type': category_type}
+            )
+    return accounts
+
+
+class JournalLines:
+    """분개 항목 누적기 (같은 계정/방향은 합산, 음수 금액은 반대편으로 전기)"""
+
+    def __init__(self):
+        self._amounts = OrderedDict()
+
+    def debit(self, account_id, amount):
+        self._add(account_id, Decimal(amount or 0))
+
+    def credit(self, account_id, amount):
+        self._add(account_id, -Decimal(amount or 0))
+
+    def _add(self, account_id, signed_amount):
+        self._amounts[account_id] = self._amounts.get(account_id, ZERO) + signed_amount
+
+    def as_list(self):
+        """[(account_id, 차변, 대변)] 반환 (금액 0 인 계정 제외)"""
+        lines = []
+        for account_id, amount in self._amounts.items():
+            if amount > 0:
+                lines.append((account_id, amount, ZERO))
+            elif amount < 0:
+                lines.append((account_id, ZERO, -amount))
+        return lines
+
+
+def _item_totals(voucher):
+    """전표 항목의 계정과목별 금액 합계 (계정 미지정은 None)"""
+    return dict(
+        voucher.items.values('account_id').annotate(total=Sum('amount')).values_list('account_id', 'total')
+    )
+
+
+def _distribute(lines, side, item_totals, net_amount, default_account_id):
+    """순매출/순매입 금액을 항목 계정별로 배분하고 차액은 기본 계정으로 전기"""
+    posted = ZERO
+    for account_id, amount in item_totals.items():
+        amount = amount or ZERO
+        side(account_id or default_account_id, amount)
+        posted += amount
+    if net_amount != posted:
+        side(default_account_id, net_amount - posted)
+
+
+def build_sales_postings(voucher, accounts):
+    """매출전표 분개 생성: {분개구분: (분개일자, 적요, 분개항목)}"""
+    postings = {}
+    total = voucher.total_amount or ZERO
+    tax = voucher.tax_amount or ZERO
+
+    if total:
+        lines = JournalLines()
+        lines.debit(accounts['receivable'].id, total)
+        _distribute(lines, lines.credit, _item_totals(voucher), total - tax, accounts['sales'].id)
+        lines.credit(accounts['vat_payable'].id, tax)
+        postings['sales'] = (voucher.sales_date, f'매출 {voucher.voucher_number} {voucher.customer_name}', lines.as_list())
+
+    if total and voucher.is_received:
+        settlement_key = SETTLEMENT_ACCOUNT_BY_METHOD.get(voucher.payment_method, 'bank')
+        lines = JournalLines()
+        lines.debit(accounts[settlement_key].id, total)
+        lines.credit(accounts['receivable'].id, total)
+        postings['receipt'] = (voucher.payment_date or voucher.sales_date,
+                               f'입금 {voucher.voucher_number} {voucher.customer_name}', lines.as_list())
+    return postings
+
+
+def build_purchase_postings(voucher, accounts):
+    """매입전표 분개 생성: {분개구분: (분개일자, 적요, 분개항목)}"""
+    postings = {}
+    total = voucher.total_amount or ZERO
+    tax = voucher.tax_amount or ZERO
+    supplier_name = voucher.supplier.name if voucher.supplier_id else ''
+
+    if total:
+        lines = JournalLines()
+        _distribute(lines, lines.debit, _item_totals(voucher), total - tax, accounts['purchases'].id)
+        lines.debit(accounts['vat_receivable'].id, tax)
+        lines.credit(accounts['payable'].id, total)
+        postings['purchase'] = (voucher.purchase_date, f'매입 {voucher.voucher_number} {supplier_name}', lines.as_list())
+
+    if total and voucher.is_paid:
+        settlement_key = SETTLEMENT_ACCOUNT_BY_METHOD.get(voucher.payment_method, 'bank')
+        lines = JournalLines()
+        lines.debit(accounts['payable'].id, total)
+        lines.credit(accounts[settlement_key].id, total)
+        postings['payment'] = (voucher.payment_date or voucher.purchase_date,
+                               f'지급 {voucher.voucher_number} {supplier_name}', lines.as_list())
+    return postings
+
+
+def _generate_entry_number(entry_date):
+    """분개번호 생성: J+YYMMDD+순번"""
+    prefix = f'J{entry_date.strftime("%y%m%d")}'
+    last_number = JournalEntry.objects.filter(
+        entry_number__startswith=prefix
+    ).order_by('-entry_number').values_list('entry_number', flat=True).first()
+    sequence = int(last_number[len(prefix):]) + 1 if last_number else 1
+    return f'{prefix}{sequence:05d}'
+
+
+@transaction.atomic
+def post_entry(entry_date, description, lines, created_by, entry_type='manual',
+               sales_voucher=None, purchase_voucher=None, reversal_of=None):
+    """
+    분개 전기
+
+    lines: [(account_id, 차변, 대변)]. 차변 합계와 대변 합계가 다르면 ValueError.
+    관련 계정의 AccountBalance 행을 잠근 뒤 항목별 전기 후 잔액을 기록한다.
+    """
+    debit_total = sum((debit for _, debit, _ in lines), ZERO)
+    credit_total = sum((credit for _, _, credit in lines), ZERO)
+    if not lines or debit_total != credit_total:
+        raise ValueError(f'차변({debit_total:,})과 대변({credit_total:,}) 합계가 일치하지 않습니다.')
+
+    # 분개번호는 최대 번호 + 1 이라 동시 전기와 겹칠 수 있다 - 세이브포인트 안에서 만들고 겹치면 다시 매긴다
+    for attempt in range(ENTRY_NUMBER_RETRIES):
+        entry_number = _generate_entry_number(entry_date)
+        try:
+            with transaction.atomic():
+                entry = JournalEntry.objects.create(
+                    entry_number=entry_number,
+                    entry_date=entry_date,
+                    description=description[:200],
+                    entry_type=entry_type,
+                    sales_voucher=sales_voucher,
+                    purchase_voucher=purchase_voucher,
+                    reversal_of=reversal_of,
+                    created_by=created_by,
+                )
+            break
+        except IntegrityError:
+            # 역분개 중복 등 번호 말고 다른 제약 위반이면 그대로 올린다
+            taken = JournalEntry.objects.filter(entry_number=entry_number).exists()
+            if not taken or attempt == ENTRY_NUMBER_RETRIES - 1:
+                raise
+
+    # 계정 잔액 행 잠금 (교착 방지를 위해 계정 ID 순서로)
+    account_ids = sorted({account_id for account_id, _, _ in lines})
+    AccountBalance.objects.bulk_create(
+        [AccountBalance(account_id=account_id) for account_id in account_ids],
+        ignore_conflicts=True,
+    )
+    balances = {
+        balance.account_id: balance
+        for balance in AccountBalance.objects.select_for_update().filter(
+            account_id__in=account_ids
+        ).order_by('account_id')
+    }
+
+    running = {account_id: balances[account_id].balance for account_id in account_ids}
+    entry_lines = []
+    for account_id, debit, credit in lines:
+        running[account_id] += debit - credit
+        entry_lines.append(JournalEntryLine(
+            entry=entry,
+            account_id=account_id,
+            debit_amount=debit,
+            credit_amount=credit,
+            description=description[:100],
+            entry_date=entry_date,
+            balance_after=running[account_id],
+        ))
+    JournalEntryLine.objects.bulk_create(entry_lines)
+
+    totals = defaultdict(lambda: [ZERO, ZERO, 0, None])
+    for line in entry_lines:
+        account_total = totals[line.account_id]
+        account_total[0] += line.debit_amount
+        account_total[1] += line.credit_amount
+        account_total[2] += 1
+        account_total[3] = line.pk
+    for account_id, (debit, credit, count, last_line_id) in totals.items():
+        AccountBalance.objects.filter(account_id=account_id).update(
+            debit_total=F('debit_total') + debit,
+            credit_total=F('credit_total') + credit,
+            balance=F('balance') + debit - credit,
+            line_count=F('line_count') + count,
+            last_line_id=last_line_id,
+            updated_at=timezone.now(),
+        )
+
+    return entry
+
+
+def reverse_entry(entry, created_by=None):
+    """분개 역분개 (원 분개일자로 차변/대변을 바꿔 전기)"""
+    lines = [
+        (line.account_id, line.credit_amount, line.debit_amount)
+        for line in entry.lines.all()
+    ]
+    return post_entry(
+        entry.entry_date,
+        f'[역분개] {entry.description}',
+        lines,
+        created_by or entry.created_by,
+        entry_type='reversal',
+        sales_voucher=entry.sales_voucher,
+        purchase_voucher=entry.purchase_voucher,
+        reversal_of=entry,
+    )
+
+
+def _entry_signature(entry_date, lines):
+    return entry_date, tuple(sorted((account_id, debit, credit) for account_id, debit, credit in lines))
+
+
+def get_active_entries(voucher):
+    """전표에 연결된 유효 분개 (역분개되지 않은 원 분개) 반환: {분개구분: JournalEntry}"""
+    voucher_filter = (
+        Q(sales_voucher=voucher) if isinstance(voucher, SalesVoucher) else Q(purchase_voucher=voucher)
+    )
+    entries = JournalEntry.objects.filter(
+        voucher_filter, reversed_by__isnull=True
+    ).exclude(entry_type='reversal').prefetch_related('lines')
+    return {entry.entry_type: entry for entry in entries}
+
+
+@transaction.atomic
+def post_voucher(voucher):
+    """
+    전표 분개 동기화
+
+    현재 전표 내용으로 만들어야 할 분개와 이미 전기된 분개를 비교해
+    달라진 분개만 역분개 후 다시 전기한다. 변경이 없으면 아무것도 하지 않는다.
+    """
+    accounts = get_posting_accounts()
+    if isinstance(voucher, SalesVoucher):
+        desired = build_sales_postings(voucher, accounts)
+        kinds = ('sales', 'receipt')
+        voucher_kwargs = {'sales_voucher': voucher}
+    else:
+        desired = build_purchase_postings(voucher, accounts)
+        kinds = ('purchase', 'payment')
+        voucher_kwargs = {'purchase_voucher': voucher}
+
+    active = get_active_entries(voucher)
+    posted = []
+    for kind in kinds:
+        want = desired.get(kind)
+        have = active.get(kind)
+        have_signature = None
+        if have:
+            have_signature = _entry_signature(
+                have.entry_date,
+                [(line.account_id, line.debit_amount, line.credit_amount) for line in have.lines.all()]
+            )
+        want_signature = _entry_signature(want[0], want[2]) if want else None
+
+        if have_signature == want_signature:
+            continue
+        if have:
+            posted.append(reverse_entry(have, created_by=voucher.created_by))
+        if want:
+            entry_date, description, lines = want
+            posted.append(post_entry(
+                entry_date, description, lines, voucher.created_by,
+                entry_type=kind, **voucher_kwargs
+            ))
+    return posted
+
+
+@transaction.atomic
+def reverse_voucher(voucher):
+    """전표 삭제 전 연결된 유효 분개를 모두 역분개"""
+    return [reverse_entry(entry) for entry in get_active_entries(voucher).values()]
+
+
+def _post_voucher_by_id(model, pk):
+    try:
+        voucher = model.objects.select_related('created_by').get(pk=pk)
+    except model.DoesNotExist:
+        return
+    try:
+        post_voucher(voucher)
+    except Exception as e:
+        # 전표는 이미 커밋됨 - 예외를 올리면 사용자가 재제출해 전표가 중복되고 같은 트랜잭션의
+        # 나머지 on_commit 콜백(캐시 무효화, 프로필 재계산, 포인트 적립)도 실행되지 않으므로 기록만 남긴다
+        # (누락분은 post_voucher_journal 로 재전기)
+        logger.exception(f"분개 전기 실패 ({model.__name__} #{pk}): {e}")
+
+
+def schedule_voucher_posting(voucher):
+    """
+    트랜잭션 커밋 후 전표 분개 동기화 예약
+
+    전표와 항목을 한 트랜잭션에서 여러 번 저장해도 커밋 시점의 최종 상태로 한 번만
+    전기되고, 이후 예약분은 변경이 없으므로 조회만 하고 끝난다.
+    """
+    model, pk = type(voucher), voucher.pk
+    transaction.on_commit(lambda: _post_voucher_by_id(model, pk))
+
+
+def get_trial_balance():
+    """합계잔액시산표 - 계정 수 만큼의 행만 읽는다"""
+    rows = []
+    totals = {'debit_total': ZERO, 'credit_total': ZERO, 'debit_balance': ZERO, 'credit_balance': ZERO}
+    for balance in AccountBalance.objects.select_related('account').order_by('account__code'):
+        row = {
+            'account': balance.account,
+            'debit_total': balance.debit_total,
+            'credit_total': balance.credit_total,
+            'debit_balance': balance.balance if balance.balance > 0 else ZERO,
+            'credit_balance': -balance.balance if balance.balance < 0 else ZERO,
+            'line_count': balance.line_count,
+        }
+        for key in totals:
+            totals[key] += row[key]
+        rows.append(row)
+    return {'rows': rows, 'totals': totals, 'is_balanced': totals['debit_total'] == totals['credit_total']}
+
+
+def get_account_ledger(account, before_id=None, limit=50):
+    """
+    계정별 원장 (최근 전기 순, ID 기준 키셋 페이지네이션)
+
+    (account, -id) 인덱스로 limit 건만 읽는다.
+    """
+    lines = JournalEntryLine.objects.filter(account=account).select_related('entry')
+    if before_id:
+        lines = lines.filter(id__lt=before_id)
+    lines = list(lines.order_by('-id')[:limit + 1])
+    has_more = len(lines) > limit
+    lines = lines[:limit]
+    return {
+        'lines': lines,
+        'has_more': has_more,
+        'next_before_id': lines[-1].id if has_more and lines else None,
+    }
+
+
+def verify_balances():
+    """분개 항목 합계로 누적 잔액을 다시 계산해 AccountBalance 와 다른 계정 반환"""
+    actual = {
+        row['account_id']: row
+        for row in JournalEntryLine.objects.values('account_id').annotate(
+            debit=Sum('debit_amount'), credit=Sum('credit_amount')
+        )
+    }
+    mismatches = []
+    stored = {balance.account_id: balance for balance in AccountBalance.objects.select_related('account')}
+    for account_id in set(actual) | set(stored):
+        row = actual.get(account_id, {'debit': ZERO, 'credit': ZERO})
+        balance = stored.get(account_id)
+        expected = (row['debit'] or ZERO) - (row['credit'] or ZERO)
+        if balance is None or balance.balance != expected:
+            mismatches.append((account_id, expected, balance.balance if balance else None))
+    return mismatches
+
+
+@transaction.atomic
+def rebuild_journal():
+    """
+    전표 분개와 누적 잔액을 지우고 전체 전표를 다시 전기
+
+    전표에 연결되지 않은 분개(수기 분개와 그 역분개)는 남기고, 그 항목을 누적 잔액에 먼저 다시 반영한다.
+    """
+    voucher_entries = JournalEntry.objects.filter(Q(sales_voucher__isnull=False) | Q(purchase_voucher__isnull=False))
+    AccountBalance.objects.all().delete()
+    JournalEntryLine.objects.filter(entry__in=voucher_entries).delete()
+    voucher_entries.filter(reversal_of__isnull=False).delete()
+    voucher_entries.delete()
+
+    now = timezone.now()
+    AccountBalance.objects.bulk_create([
+        AccountBalance(account_id=row['account_id'], debit_total=row['debit'], credit_total=row['credit'],
+                       balance=row['debit'] - row['credit'], line_count=row['count'],
+                       last_line_id=row['last_line_id'], updated_at=now)
+        for row in JournalEntryLine.objects.order_by().values('account_id').annotate(
+            debit=Sum('debit_amount'), credit=Sum('credit_amount'), count=Count('pk'), last_line_id=Max('pk'))
+    ])
+    count = 0
+    for voucher in SalesVoucher.objects.select_related('created_by').iterator(chunk_size=500):
+        post_voucher(voucher)
+        count += 1
+    for voucher in PurchaseVoucher.objects.select_related('created_by', 'supplier').iterator(chunk_size=500):
+        post_voucher(voucher)
+        count += 1
+    return count
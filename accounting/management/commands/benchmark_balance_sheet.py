@@ -0,0 +1,106 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from accounting.closing import get_balances_as_of, rebuild_snapshots
+from accounting.models import PurchaseVoucher, SalesVoucher, Supplier
+from datetime import timedelta
+from decimal import Decimal
+import random
+import time
+
+User = get_user_model()
+
+
+class BenchmarkRollback(Exception):
+    """벤치마크 데이터 롤백용"""
+
+
+class Command(BaseCommand):
+    help = '재무상태표 조회 벤치마크 (전체 합산 방식 vs 마감 스냅샷 방식)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--years', type=int, default=5, help='생성할 전표 기간(년), 기본값 5')
+        parser.add_argument('--per-day', type=int, default=30, help='일별 매출/매입 전표 수, 기본값 30')
+        parser.add_argument('--repeat', type=int, default=20, help='조회 반복 횟수, 기본값 20')
+        parser.add_argument('--seed', type=int, default=42, help='난수 시드')
+        parser.add_argument('--keep', action='store_true', help='생성한 데이터를 롤백하지 않고 유지')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                if not options['keep']:
+                    raise BenchmarkRollback()
+        except BenchmarkRollback:
+            self.stdout.write('벤치마크 데이터 롤백 완료')
+
+    def _run(self, options):
+        rng = random.Random(options['seed'])
+        user = User.objects.filter(is_superuser=True).first() or User.objects.first()
+        if not user:
+            raise CommandError('전표 등록자로 사용할 사용자가 없습니다.')
+        supplier, _ = Supplier.objects.get_or_create(name='벤치마크 공급업체')
+
+        today = timezone.now().date()
+        start = today - timedelta(days=365 * options['years'])
+        per_day = options['per_day']
+
+        started = time.perf_counter()
+        sales, purchases = [], []
+        day, seq = start, 0
+        while day < today:
+            for _ in range(per_day):
+                seq += 1
+                amount = Decimal(rng.randrange(10000, 2000000, 1000))
+                paid = day < today - timedelta(days=60) or rng.random() < 0.5
+                payment_date = min(day + timedelta(days=rng.randint(0, 45)), today) if paid else None
+                sales.append(SalesVoucher(
+                    voucher_number=f'BS{seq:09d}', sales_date=day, customer_name='벤치마크',
+                    total_amount=amount, is_received=paid, payment_date=payment_date,
+                    created_by=user,
+                ))
+                purchases.append(PurchaseVoucher(
+                    voucher_number=f'BP{seq:09d}', purchase_date=day, supplier=supplier,
+                    total_amount=amount * Decimal('0.6'), is_paid=paid, payment_date=payment_date,
+                    created_by=user,
+                ))
+            day += timedelta(days=1)
+        SalesVoucher.objects.bulk_create(sales, batch_size=2000)
+        PurchaseVoucher.objects.bulk_create(purchases, batch_size=2000)
+        self.stdout.write(f'전표 생성: 매출 {len(sales):,}건 / 매입 {len(purchases):,}건 ({time.perf_counter() - started:.1f}초)')
+
+        repeat = options['repeat']
+
+        def legacy(as_of):
+            receivable = SalesVoucher.objects.filter(
+                sales_date__lte=as_of, is_received=False
+            ).aggregate(total=Sum('total_amount'))['total'] or 0
+            payable = PurchaseVoucher.objects.filter(
+                purchase_date__lte=as_of, is_paid=False
+            ).aggregate(total=Sum('total_amount'))['total'] or 0
+            return receivable, payable
+
+        def timed(fn):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                result = fn()
+            return (time.perf_counter() - started) * 1000 / repeat, result
+
+        legacy_ms, legacy_result = timed(lambda: legacy(today))
+
+        started = time.perf_counter()
+        periods = rebuild_snapshots(through_date=today)
+        rebuild_seconds = time.perf_counter() - started
+
+        snapshot_ms, snapshot_result = timed(lambda: get_balances_as_of(today))
+        balances = snapshot_result['balances']
+
+        self.stdout.write(f'스냅샷 재생성: {len(periods)}개월 ({rebuild_seconds:.1f}초)')
+        self.stdout.write(f'전체 합산 방식: {legacy_ms:.2f}ms (미수금 {legacy_result[0]:,} / 미지급금 {legacy_result[1]:,})')
+        self.stdout.write(f'스냅샷 방식:   {snapshot_ms:.2f}ms (미수금 {balances["receivable"]:,} / 미지급금 {balances["payable"]:,})')
+        if (balances['receivable'], balances['payable']) != tuple(Decimal(v) for v in legacy_result):
+            self.stdout.write(self.style.ERROR('두 방식의 잔액이 일치하지 않습니다.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('두 방식의 잔액 일치'))
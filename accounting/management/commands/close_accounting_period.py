@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from accounting.closing import close_period, iter_months, month_range
+from accounting.models import AccountingPeriod
+from datetime import date, timedelta
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = '월 회계 마감 - 계정과목별 잔액 스냅샷 생성'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--month',
+            type=str,
+            help='마감할 월 (YYYY-MM, 기본값: 지난 달)',
+        )
+        parser.add_argument(
+            '--through',
+            type=str,
+            help='해당 월(YYYY-MM)까지 마감되지 않은 모든 월을 순서대로 마감',
+        )
+        parser.add_argument(
+            '--user',
+            type=str,
+            help='마감 처리자 username (기본값: 없음)',
+        )
+
+    def _parse_month(self, value):
+        try:
+            year, month = [int(part) for part in value.split('-')]
+            return date(year, month, 1)
+        except (ValueError, TypeError):
+            raise CommandError(f'월 형식이 올바르지 않습니다 (YYYY-MM): {value}')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'사용자를 찾을 수 없습니다: {options["user"]}')
+
+        today = timezone.now().date()
+        current_month_start = today.replace(day=1)
+
+        if options['through']:
+            through = self._parse_month(options['through'])
+            closed = set(
+                AccountingPeriod.objects.filter(is_closed=True).values_list('year', 'month')
+            )
+            first_open = AccountingPeriod.objects.filter(is_closed=False).order_by('end_date').first()
+            last_closed = AccountingPeriod.objects.filter(is_closed=True).order_by('-end_date').first()
+            if first_open:
+                start = first_open.start_date
+            elif last_closed:
+                start = last_closed.start_date
+            else:
+                start = through
+            targets = [ym for ym in iter_months(start, through) if ym not in closed]
+        else:
+            if options['month']:
+                target = self._parse_month(options['month'])
+            else:
+                last_month_end = current_month_start - timedelta(days=1)
+                target = last_month_end.replace(day=1)
+            targets = [(target.year, target.month)]
+
+        for year, month in targets:
+            start_date, end_date = month_range(year, month)
+            if end_date >= today:
+                self.stdout.write(self.style.WARNING(f'{year}-{month:02d}: 아직 종료되지 않은 월은 마감할 수 없습니다.'))
+                continue
+            period = close_period(year, month, user=user)
+            balances = ', '.join(
+                f'{s.account.name} {s.balance:,}원'
+                for s in period.snapshots.select_related('account')
+            )
+            self.stdout.write(self.style.SUCCESS(f'{year}-{month:02d} 마감 완료: {balances}'))
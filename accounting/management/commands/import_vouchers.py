@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from accounting.vouchers import VoucherImporter, read_voucher_file
+import time
+
+
+class Command(BaseCommand):
+    help = '엑셀/CSV 전표 일괄 등록 (한 행이 전표 항목 하나)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='업로드 파일 경로 (.xlsx 또는 .csv)')
+        parser.add_argument('--type', dest='voucher_type', choices=['purchase', 'sales'], required=True,
+                            help='전표 구분')
+        parser.add_argument('--user', default=None, help='등록자 아이디 (기본: 첫 관리자)')
+        parser.add_argument('--vat-included', action='store_true', help='총금액의 1/11 을 부가세로 계산')
+        parser.add_argument('--dry-run', action='store_true', help='저장하지 않고 검증만')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('id').first()
+        if user is None:
+            raise CommandError('등록자를 찾을 수 없습니다.')
+
+        try:
+            df = read_voucher_file(options['path'])
+        except FileNotFoundError:
+            raise CommandError(f"파일을 찾을 수 없습니다: {options['path']}")
+
+        started = time.perf_counter()
+        importer = VoucherImporter(options['voucher_type'], user, vat_included=options['vat_included'])
+        try:
+            results = importer.import_dataframe(df, dry_run=options['dry_run'])
+        except ValidationError as e:
+            raise CommandError(' '.join(e.messages))
+        elapsed = time.perf_counter() - started
+
+        if results['errors']:
+            for error in results['error_details']:
+                self.stdout.write(self.style.ERROR(error))
+            raise CommandError(f"오류 {results['errors']}건이 있어 저장하지 않았습니다.")
+
+        action = '검증 완료' if options['dry_run'] else '등록 완료'
+        self.stdout.write(self.style.SUCCESS(
+            f"{action}: 전표 {results['vouchers']:,}건, 항목 {results['items']:,}건, "
+            f"합계 {results['total_amount']:,.0f}원 ({elapsed:.2f}초)"
+        ))
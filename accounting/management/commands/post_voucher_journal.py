@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from accounting.journal import post_voucher, rebuild_journal, verify_balances
+from accounting.models import PurchaseVoucher, SalesVoucher
+import time
+
+
+class Command(BaseCommand):
+    help = '매출/매입 전표 분개 전기 (누락·변경된 분개만 전기, --rebuild 시 전체 재전기)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true',
+                            help='기존 분개와 계정 잔액을 모두 지우고 다시 전기')
+        parser.add_argument('--verify', action='store_true',
+                            help='전기 없이 계정 잔액과 분개 합계 일치 여부만 확인')
+
+    def handle(self, *args, **options):
+        if not options['verify']:
+            started = time.perf_counter()
+            if options['rebuild']:
+                count = rebuild_journal()
+                posted = None
+            else:
+                count, posted = 0, 0
+                for voucher in SalesVoucher.objects.select_related('created_by').iterator(chunk_size=500):
+                    posted += len(post_voucher(voucher))
+                    count += 1
+                for voucher in PurchaseVoucher.objects.select_related('created_by', 'supplier').iterator(chunk_size=500):
+                    posted += len(post_voucher(voucher))
+                    count += 1
+            elapsed = time.perf_counter() - started
+
+            message = f'전표 {count}건 처리'
+            if posted is not None:
+                message += f', 분개 {posted}건 전기'
+            self.stdout.write(self.style.SUCCESS(f'{message} ({elapsed:.2f}초)'))
+
+        mismatches = verify_balances()
+        if mismatches:
+            for account_id, expected, stored in mismatches:
+                self.stdout.write(self.style.ERROR(
+                    f'계정 #{account_id}: 분개 합계 {expected:,} / 누적 잔액 {stored if stored is None else f"{stored:,}"}'
+                ))
+            self.stdout.write(self.style.ERROR(f'{len(mismatches)}개 계정 잔액 불일치'))
+        else:
+            self.stdout.write(self.style.SUCCESS('계정 잔액이 분개 합계와 일치합니다.'))
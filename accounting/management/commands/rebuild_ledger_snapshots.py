@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from accounting.closing import rebuild_snapshots
+import time
+
+
+class Command(BaseCommand):
+    help = '계정 잔액 스냅샷 전체 재생성 (첫 전표 월부터 지난 달까지 다시 마감)'
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        periods = rebuild_snapshots()
+        elapsed = time.perf_counter() - started
+
+        if not periods:
+            self.stdout.write(self.style.WARNING('마감할 전표가 없습니다.'))
+            return
+
+        first, last = periods[0], periods[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(periods)}개월 스냅샷 재생성 완료 '
+            f'({first.year}-{first.month:02d} ~ {last.year}-{last.month:02d}, {elapsed:.2f}초)'
+        ))
@@ -0,0 +1,98 @@
+# Generated by Django 5.2.5 on 2026-10-19 05:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0002_salesvoucher_happy_call_revenue_and_more'),
+        ('happycall', '0005_alter_happycall_overall_satisfaction_and_more'),
+        ('services', '0013_servicerequest_service_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountBalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of_date', models.DateField(verbose_name='기준일')),
+                ('period_debit', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='당기 차변합계')),
+                ('period_credit', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='당기 대변합계')),
+                ('balance', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='기말잔액')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+            ],
+            options={
+                'verbose_name': '계정 잔액 스냅샷',
+                'verbose_name_plural': '계정 잔액 스냅샷들',
+                'ordering': ['-as_of_date', 'account__code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AccountingPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField(verbose_name='연도')),
+                ('month', models.PositiveSmallIntegerField(verbose_name='월')),
+                ('start_date', models.DateField(verbose_name='시작일')),
+                ('end_date', models.DateField(verbose_name='종료일')),
+                ('is_closed', models.BooleanField(default=False, verbose_name='마감여부')),
+                ('closed_at', models.DateTimeField(blank=True, null=True, verbose_name='마감일시')),
+            ],
+            options={
+                'verbose_name': '회계 마감 기간',
+                'verbose_name_plural': '회계 마감 기간들',
+                'ordering': ['-end_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='purchasevoucher',
+            index=models.Index(fields=['purchase_date'], name='accounting__purchas_f9b3e6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchasevoucher',
+            index=models.Index(fields=['payment_date'], name='accounting__payment_e8409f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesvoucher',
+            index=models.Index(fields=['sales_date'], name='accounting__sales_d_8bbc5d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salesvoucher',
+            index=models.Index(fields=['payment_date'], name='accounting__payment_b73910_idx'),
+        ),
+        migrations.AddField(
+            model_name='accountbalancesnapshot',
+            name='account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_snapshots', to='accounting.accountingcategory', verbose_name='계정과목'),
+        ),
+        migrations.AddField(
+            model_name='accountingperiod',
+            name='closed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='마감자'),
+        ),
+        migrations.AddField(
+            model_name='accountbalancesnapshot',
+            name='period',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='accounting.accountingperiod', verbose_name='마감 기간'),
+        ),
+        migrations.AddIndex(
+            model_name='accountingperiod',
+            index=models.Index(fields=['is_closed', 'end_date'], name='accounting__is_clos_99420e_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='accountingperiod',
+            unique_together={('year', 'month')},
+        ),
+        migrations.AddIndex(
+            model_name='accountbalancesnapshot',
+            index=models.Index(fields=['account', 'as_of_date'], name='accounting__account_5ef40b_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='accountbalancesnapshot',
+            unique_together={('period', 'account')},
+        ),
+    ]
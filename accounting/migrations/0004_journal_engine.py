@@ -0,0 +1,88 @@
+# Generated by Django 5.2.5 on 2026-10-19 05:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0003_period_close_snapshots'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('debit_total', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='차변 누계')),
+                ('credit_total', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='대변 누계')),
+                ('balance', models.DecimalField(decimal_places=0, default=0, max_digits=14, verbose_name='잔액(차변-대변)')),
+                ('line_count', models.PositiveIntegerField(default=0, verbose_name='전기 건수')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+            ],
+            options={
+                'verbose_name': '계정 잔액',
+                'verbose_name_plural': '계정 잔액들',
+                'ordering': ['account__code'],
+            },
+        ),
+        migrations.AddField(
+            model_name='journalentry',
+            name='entry_type',
+            field=models.CharField(choices=[('sales', '매출'), ('purchase', '매입'), ('receipt', '입금'), ('payment', '지급'), ('reversal', '역분개'), ('manual', '수기')], default='manual', max_length=20, verbose_name='분개구분'),
+        ),
+        migrations.AddField(
+            model_name='journalentry',
+            name='reversal_of',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='reversed_by', to='accounting.journalentry', verbose_name='역분개 대상'),
+        ),
+        migrations.AddField(
+            model_name='journalentryline',
+            name='balance_after',
+            field=models.DecimalField(decimal_places=0, default=0, help_text='해당 계정의 차변-대변 누적 잔액', max_digits=14, verbose_name='전기 후 잔액'),
+        ),
+        migrations.AddField(
+            model_name='journalentryline',
+            name='entry_date',
+            field=models.DateField(blank=True, null=True, verbose_name='분개일자'),
+        ),
+        migrations.AlterField(
+            model_name='journalentry',
+            name='purchase_voucher',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='accounting.purchasevoucher', verbose_name='매입전표'),
+        ),
+        migrations.AlterField(
+            model_name='journalentry',
+            name='sales_voucher',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='accounting.salesvoucher', verbose_name='매출전표'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['sales_voucher', 'entry_type'], name='accounting__sales_v_75837d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['purchase_voucher', 'entry_type'], name='accounting__purchas_abbe5e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentryline',
+            index=models.Index(fields=['account', '-id'], name='accounting__account_b98e0d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='journalentryline',
+            index=models.Index(fields=['account', 'entry_date'], name='accounting__account_087b3e_idx'),
+        ),
+        migrations.AddField(
+            model_name='accountbalance',
+            name='account',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='running_balance', to='accounting.accountingcategory', verbose_name='계정과목'),
+        ),
+        migrations.AddField(
+            model_name='accountbalance',
+            name='last_line',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='accounting.journalentryline', verbose_name='최근 전기 항목'),
+        ),
+    ]
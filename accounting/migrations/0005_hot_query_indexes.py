@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-19 05:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0004_journal_engine'),
+        ('happycall', '0005_alter_happycall_overall_satisfaction_and_more'),
+        ('services', '0013_servicerequest_service_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='salesvoucher',
+            name='accounting__sales_d_8bbc5d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='salesvoucher',
+            index=models.Index(fields=['sales_date', 'revenue_source'], name='accounting__sales_d_86ff2f_idx'),
+        ),
+    ]
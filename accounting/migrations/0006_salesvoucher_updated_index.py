@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0005_hot_query_indexes'),
+        ('happycall', '0007_archive_date_indexes'),
+        ('services', '0016_grade_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='salesvoucher',
+            index=models.Index(fields=['updated_at'], name='accounting__updated_059079_idx'),
+        ),
+    ]
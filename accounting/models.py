@@ -1,11 +1,22 @@
 from django.db import models
+from core.cache import CacheInvalidationMixin
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.validators import MinValueValidator
+from django.db.models.functions import Length
 from decimal import Decimal
 
 User = get_user_model()
 
+
+def next_voucher_number(model, prefix):
+    """prefix(S/P+YYMMDD) 다음 전표번호 - 순번은 문자열이 아닌 숫자 최대값 기준 (999 다음 1000)"""
+    last_number = model.objects.filter(
+        voucher_number__startswith=prefix, voucher_number__regex=rf'^{prefix}[0-9]+$'
+    ).order_by(Length('voucher_number').desc(), '-voucher_number').values_list('voucher_number', flat=True).first()
+    return f'{prefix}{int(last_number[len(prefix):]) + 1 if last_number else 1:03d}'
+
+
 class AccountingCategory(models.Model):
     """회계 계정과목"""
     CATEGORY_TYPES = [
@@ -55,8 +66,10 @@ class Supplier(models.Model):
     def __str__(self):
         return self.name
 
-class PurchaseVoucher(models.Model):
+class PurchaseVoucher(CacheInvalidationMixin, models.Model):
     """매입전표"""
+    cache_tags = ('accounting',)  # 대시보드 캐시 무효화 태그
+    
     voucher_number = models.CharField('전표번호', max_length=20, unique=True)
     purchase_date = models.DateField('매입일자')
     supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, verbose_name='공급업체')
@@ -83,31 +96,46 @@ class PurchaseVoucher(models.Model):
         verbose_name = '매입전표'
         verbose_name_plural = '매입전표들'
         ordering = ['-purchase_date', '-created_at']
+        indexes = [
+            models.Index(fields=['purchase_date']),
+            models.Index(fields=['payment_date']),
+        ]
     
     def __str__(self):
         return f"{self.voucher_number} - {self.supplier.name} ({self.total_amount:,}원)"
     
     def save(self, *args, **kwargs):
         if not self.voucher_number:
-            # 전표번호 자동 생성: P240315001 (P+YYMMDD+순번)
-            today = timezone.now().date()
-            date_str = today.strftime('%y%m%d')
-            last_voucher = PurchaseVoucher.objects.filter(
-                voucher_number__startswith=f'P{date_str}'
-            ).order_by('voucher_number').last()
-            
-            if last_voucher:
-                last_number = int(last_voucher.voucher_number[-3:])
-                new_number = f'P{date_str}{(last_number + 1):03d}'
-            else:
-                new_number = f'P{date_str}001'
-            
-            self.voucher_number = new_number
+            # 전표번호 자동 생성: P240315001 (P+YYMMDD+순번, 1000번째부터는 4자리 이상)
+            self.voucher_number = next_voucher_number(PurchaseVoucher, f"P{timezone.now().date().strftime('%y%m%d')}")
+        
+        # 마감된 기간의 전표가 변경되면 잔액 스냅샷 무효화
+        changed_dates = [self.purchase_date, self.payment_date]
+        if self.pk:
+            changed_dates += list(PurchaseVoucher.objects.filter(pk=self.pk).values_list(
+                'purchase_date', 'payment_date').first() or [])
         
         super().save(*args, **kwargs)
+        
+        from .closing import invalidate_for_dates
+        from .journal import schedule_voucher_posting
+        invalidate_for_dates(*changed_dates)
+        schedule_voucher_posting(self)
+    
+    def delete(self, *args, **kwargs):
+        from .closing import invalidate_for_dates
+        from .journal import reverse_voucher
+        changed_dates = [self.purchase_date, self.payment_date]
+        # 분개장은 삭제하지 않고 역분개로 취소 (분개의 전표 연결은 SET_NULL)
+        reverse_voucher(self)
+        result = super().delete(*args, **kwargs)
+        invalidate_for_dates(*changed_dates)
+        return result
 
-class PurchaseVoucherItem(models.Model):
+class PurchaseVoucherItem(CacheInvalidationMixin, models.Model):
     """매입전표 상세항목"""
+    cache_tags = ('accounting',)  # 대시보드 캐시 무효화 태그
+    
     voucher = models.ForeignKey(PurchaseVoucher, on_delete=models.CASCADE, related_name='items')
     item_name = models.CharField('품목명', max_length=100)
     specification = models.CharField('규격', max_length=100, blank=True)
@@ -124,9 +152,21 @@ class PurchaseVoucherItem(models.Model):
     def save(self, *args, **kwargs):
         self.amount = self.quantity * self.unit_price
         super().save(*args, **kwargs)
+        
+        from .journal import schedule_voucher_posting
+        schedule_voucher_posting(self.voucher)
+    
+    def delete(self, *args, **kwargs):
+        from .journal import schedule_voucher_posting
+        voucher = self.voucher
+        result = super().delete(*args, **kwargs)
+        schedule_voucher_posting(voucher)
+        return result
 
-class SalesVoucher(models.Model):
+class SalesVoucher(CacheInvalidationMixin, models.Model):
     """매출전표"""
+    cache_tags = ('accounting',)  # 대시보드 캐시 무효화 태그
+    
     voucher_number = models.CharField('전표번호', max_length=20, unique=True)
     sales_date = models.DateField('매출일자')
     customer_name = models.CharField('고객명', max_length=100)
@@ -171,35 +211,54 @@ class SalesVoucher(models.Model):
         verbose_name = '매출전표'
         verbose_name_plural = '매출전표들'
         ordering = ['-sales_date', '-created_at']
+        indexes = [
+            # 기간별 매출 출처(해피콜/직접) 집계, 매출일자 단독 조회도 이 인덱스로 처리
+            models.Index(fields=['sales_date', 'revenue_source']),
+            models.Index(fields=['payment_date']),
+            # 분석용 증분 내보내기 (core.parquet_export)
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return f"{self.voucher_number} - {self.customer_name} ({self.total_amount:,}원)"
     
     def save(self, *args, **kwargs):
         if not self.voucher_number:
-            # 전표번호 자동 생성: S240315001 (S+YYMMDD+순번)
-            today = timezone.now().date()
-            date_str = today.strftime('%y%m%d')
-            last_voucher = SalesVoucher.objects.filter(
-                voucher_number__startswith=f'S{date_str}'
-            ).order_by('voucher_number').last()
-            
-            if last_voucher:
-                last_number = int(last_voucher.voucher_number[-3:])
-                new_number = f'S{date_str}{(last_number + 1):03d}'
-            else:
-                new_number = f'S{date_str}001'
-            
-            self.voucher_number = new_number
+            # 전표번호 자동 생성: S240315001 (S+YYMMDD+순번, 1000번째부터는 4자리 이상)
+            self.voucher_number = next_voucher_number(SalesVoucher, f"S{timezone.now().date().strftime('%y%m%d')}")
+        
+        # 마감된 기간의 전표가 변경되면 잔액 스냅샷 무효화
+        changed_dates = [self.sales_date, self.payment_date]
+        if self.pk:
+            changed_dates += list(SalesVoucher.objects.filter(pk=self.pk).values_list(
+                'sales_date', 'payment_date').first() or [])
         
         super().save(*args, **kwargs)
         
-        # 해피콜 매출 기록과 연동 처리
+        from .closing import invalidate_for_dates
+        from .journal import schedule_voucher_posting
+        invalidate_for_dates(*changed_dates)
+        schedule_voucher_posting(self)
+        
+        self.sync_happy_call_revenue()
+    
+    def sync_happy_call_revenue(self):
+        """해피콜 매출 기록과 연동 처리"""
         if self.happy_call_revenue and self.happy_call_revenue.status != 'completed':
             self.happy_call_revenue.actual_amount = self.total_amount
             self.happy_call_revenue.status = 'voucher_created'
             self.happy_call_revenue.save()
     
+    def delete(self, *args, **kwargs):
+        from .closing import invalidate_for_dates
+        from .journal import reverse_voucher
+        changed_dates = [self.sales_date, self.payment_date]
+        # 분개장은 삭제하지 않고 역분개로 취소 (분개의 전표 연결은 SET_NULL)
+        reverse_voucher(self)
+        result = super().delete(*args, **kwargs)
+        invalidate_for_dates(*changed_dates)
+        return result
+    
     def complete_happy_call_revenue(self):
         """해피콜 매출 기록을 완료로 처리"""
         if self.happy_call_revenue:
@@ -217,8 +276,10 @@ class SalesVoucher(models.Model):
             return self.revenue_source.replace('happy_call_', '')
         return None
 
-class SalesVoucherItem(models.Model):
+class SalesVoucherItem(CacheInvalidationMixin, models.Model):
     """매출전표 상세항목"""
+    cache_tags = ('accounting',)  # 대시보드 캐시 무효화 태그
+    
     voucher = models.ForeignKey(SalesVoucher, on_delete=models.CASCADE, related_name='items')
     item_name = models.CharField('품목명', max_length=100)
     specification = models.CharField('규격', max_length=100, blank=True)
@@ -235,18 +296,41 @@ class SalesVoucherItem(models.Model):
     def save(self, *args, **kwargs):
         self.amount = self.quantity * self.unit_price
         super().save(*args, **kwargs)
+        
+        from .journal import schedule_voucher_posting
+        schedule_voucher_posting(self.voucher)
+    
+    def delete(self, *args, **kwargs):
+        from .journal import schedule_voucher_posting
+        voucher = self.voucher
+        result = super().delete(*args, **kwargs)
+        schedule_voucher_posting(voucher)
+        return result
 
 class JournalEntry(models.Model):
     """분개장"""
+    ENTRY_TYPES = [
+        ('sales', '매출'),
+        ('purchase', '매입'),
+        ('receipt', '입금'),
+        ('payment', '지급'),
+        ('reversal', '역분개'),
+        ('manual', '수기'),
+    ]
+    
     entry_number = models.CharField('분개번호', max_length=20, unique=True)
     entry_date = models.DateField('분개일자')
     description = models.CharField('적요', max_length=200)
+    entry_type = models.CharField('분개구분', max_length=20, choices=ENTRY_TYPES, default='manual')
     
     # 연결 정보
-    purchase_voucher = models.ForeignKey(PurchaseVoucher, on_delete=models.CASCADE, 
+    purchase_voucher = models.ForeignKey(PurchaseVoucher, on_delete=models.SET_NULL, 
                                        null=True, blank=True, verbose_name='매입전표')
-    sales_voucher = models.ForeignKey(SalesVoucher, on_delete=models.CASCADE, 
+    sales_voucher = models.ForeignKey(SalesVoucher, on_delete=models.SET_NULL, 
                                     null=True, blank=True, verbose_name='매출전표')
+    # 역분개 대상 (분개장은 수정하지 않고 역분개로만 취소)
+    reversal_of = models.OneToOneField('self', on_delete=models.PROTECT, null=True, blank=True,
+                                       related_name='reversed_by', verbose_name='역분개 대상')
     
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name='등록자')
     created_at = models.DateTimeField('등록일', auto_now_add=True)
@@ -255,6 +339,10 @@ class JournalEntry(models.Model):
         verbose_name = '분개장'
         verbose_name_plural = '분개장들'
         ordering = ['-entry_date', '-created_at']
+        indexes = [
+            models.Index(fields=['sales_voucher', 'entry_type']),
+            models.Index(fields=['purchase_voucher', 'entry_type']),
+        ]
     
     def __str__(self):
         return f"{self.entry_number} - {self.description}"
@@ -267,6 +355,88 @@ class JournalEntryLine(models.Model):
     credit_amount = models.DecimalField('대변금액', max_digits=12, decimal_places=0, default=0)
     description = models.CharField('적요', max_length=100, blank=True)
     
+    # 원장 조회용 (분개 시점에 기록, 이후 변경하지 않음)
+    entry_date = models.DateField('분개일자', null=True, blank=True)
+    balance_after = models.DecimalField('전기 후 잔액', max_digits=14, decimal_places=0, default=0,
+                                        help_text='해당 계정의 차변-대변 누적 잔액')
+    
     class Meta:
         verbose_name = '분개 세부항목'
-        verbose_name_plural = '분개 세부항목들'
\ No newline at end of file
+        verbose_name_plural = '분개 세부항목들'
+        indexes = [
+            models.Index(fields=['account', '-id']),
+            models.Index(fields=['account', 'entry_date']),
+        ]
+
+class AccountBalance(models.Model):
+    """계정과목별 누적 잔액 (분개 전기 시 원자적으로 갱신)"""
+    account = models.OneToOneField(AccountingCategory, on_delete=models.CASCADE,
+                                   related_name='running_balance', verbose_name='계정과목')
+    debit_total = models.DecimalField('차변 누계', max_digits=14, decimal_places=0, default=0)
+    credit_total = models.DecimalField('대변 누계', max_digits=14, decimal_places=0, default=0)
+    balance = models.DecimalField('잔액(차변-대변)', max_digits=14, decimal_places=0, default=0)
+    line_count = models.PositiveIntegerField('전기 건수', default=0)
+    last_line = models.ForeignKey(JournalEntryLine, on_delete=models.SET_NULL, null=True, blank=True,
+                                  related_name='+', verbose_name='최근 전기 항목')
+    updated_at = models.DateTimeField('수정일', auto_now=True)
+    
+    class Meta:
+        verbose_name = '계정 잔액'
+        verbose_name_plural = '계정 잔액들'
+        ordering = ['account__code']
+    
+    def __str__(self):
+        return f"{self.account} ({self.balance:,}원)"
+    
+    @property
+    def normal_balance(self):
+        """계정 성격에 따른 잔액 (자산/비용은 차변, 나머지는 대변 기준)"""
+        if self.account.category_type in ('asset', 'expense'):
+            return self.balance
+        return -self.balance
+
+
+class AccountingPeriod(models.Model):
+    """회계 마감 기간 (월 단위)"""
+    year = models.PositiveIntegerField('연도')
+    month = models.PositiveSmallIntegerField('월')
+    start_date = models.DateField('시작일')
+    end_date = models.DateField('종료일')
+    is_closed = models.BooleanField('마감여부', default=False)
+    closed_at = models.DateTimeField('마감일시', null=True, blank=True)
+    closed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, verbose_name='마감자')
+    
+    class Meta:
+        verbose_name = '회계 마감 기간'
+        verbose_name_plural = '회계 마감 기간들'
+        ordering = ['-end_date']
+        unique_together = ['year', 'month']
+        indexes = [
+            models.Index(fields=['is_closed', 'end_date']),
+        ]
+    
+    def __str__(self):
+        status = '마감' if self.is_closed else '미마감'
+        return f"{self.year}년 {self.month}월 ({status})"
+
+class AccountBalanceSnapshot(models.Model):
+    """기간 마감 시점의 계정과목별 잔액 스냅샷"""
+    period = models.ForeignKey(AccountingPeriod, on_delete=models.CASCADE, related_name='snapshots', verbose_name='마감 기간')
+    account = models.ForeignKey(AccountingCategory, on_delete=models.CASCADE, related_name='balance_snapshots', verbose_name='계정과목')
+    as_of_date = models.DateField('기준일')
+    period_debit = models.DecimalField('당기 차변합계', max_digits=14, decimal_places=0, default=0)
+    period_credit = models.DecimalField('당기 대변합계', max_digits=14, decimal_places=0, default=0)
+    balance = models.DecimalField('기말잔액', max_digits=14, decimal_places=0, default=0)
+    created_at = models.DateTimeField('생성일', auto_now_add=True)
+    
+    class Meta:
+        verbose_name = '계정 잔액 스냅샷'
+        verbose_name_plural = '계정 잔액 스냅샷들'
+        ordering = ['-as_of_date', 'account__code']
+        unique_together = ['period', 'account']
+        indexes = [
+            models.Index(fields=['account', 'as_of_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.account} - {self.as_of_date} ({self.balance:,}원)"
@@ -19,6 +19,9 @@ urlpatterns = [
     path('sales/<int:pk>/', views.SalesVoucherDetailView.as_view(), name='sales_detail'),
     path('sales/<int:pk>/edit/', views.SalesVoucherUpdateView.as_view(), name='sales_edit'),
     
+    # 전표 일괄 등록
+    path('vouchers/import/', views.VoucherImportView.as_view(), name='voucher_import'),
+    
     # 공급업체 관리
     path('suppliers/', views.SupplierListView.as_view(), name='supplier_list'),
     path('suppliers/create/', views.SupplierCreateView.as_view(), name='supplier_create'),
@@ -28,8 +31,10 @@ urlpatterns = [
     # 재무제표
     path('reports/income-statement/', views.IncomeStatementView.as_view(), name='income_statement'),
     path('reports/balance-sheet/', views.BalanceSheetView.as_view(), name='balance_sheet'),
-    
+    path('reports/trial-balance/', views.TrialBalanceView.as_view(), name='trial_balance'),
+
     # 계정과목 관리
     path('accounts/', views.AccountingCategoryListView.as_view(), name='account_list'),
     path('accounts/create/', views.AccountingCategoryCreateView.as_view(), name='account_create'),
+    path('accounts/<int:pk>/ledger/', views.AccountLedgerView.as_view(), name='account_ledger'),
 ]
\ No newline at end of file
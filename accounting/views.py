@@ -6,61 +6,99 @@ from django.db.models import Sum, Count, Q
 from django.db.models.functions import TruncMonth
 from django.utils import timezone
 from datetime import datetime, timedelta
+from core.dbrouting import reporting_db
+from core.querybudget import query_budget
 from .models import (
     AccountingCategory, Supplier, PurchaseVoucher, PurchaseVoucherItem,
     SalesVoucher, SalesVoucherItem, JournalEntry, JournalEntryLine
 )
 
+@query_budget(10)
+@reporting_db()
 class AccountingDashboardView(LoginRequiredMixin, TemplateView):
     template_name = 'accounting/dashboard.html'
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        from core.cache import get_or_set
         
-        # 이번 달 매입/매출 요약
+        # 이번 달 매입/매출 요약 (전표 저장 시 무효화, 최대 5분 캐시)
         today = timezone.now().date()
         current_month_start = today.replace(day=1)
-        
-        # 디버그 로그
-        print(f"Debug - Today: {today}")
-        print(f"Debug - Current month start: {current_month_start}")
-        
-        current_month_purchases = PurchaseVoucher.objects.filter(
+        context.update(get_or_set(
+            'dashboard:accounting',
+            lambda: self.build_summary(current_month_start),
+            tags=('accounting',),
+            timeout=300,
+            params=current_month_start,
+        ))
+        return context
+    
+    @staticmethod
+    def build_summary(current_month_start):
+        summary = {}
+        summary['current_month_purchases'] = PurchaseVoucher.objects.filter(
             purchase_date__gte=current_month_start
-        )
-        print(f"Debug - Purchase vouchers count: {current_month_purchases.count()}")
-        
-        context['current_month_purchases'] = current_month_purchases.aggregate(
+        ).aggregate(
             total=Sum('total_amount'),
             count=Count('id'),
             unpaid_total=Sum('total_amount', filter=Q(is_paid=False))
         )
-        print(f"Debug - Purchases aggregate: {context['current_month_purchases']}")
         
-        current_month_sales = SalesVoucher.objects.filter(
+        summary['current_month_sales'] = SalesVoucher.objects.filter(
             sales_date__gte=current_month_start
-        )
-        print(f"Debug - Sales vouchers count: {current_month_sales.count()}")
-        
-        context['current_month_sales'] = current_month_sales.aggregate(
+        ).aggregate(
             total=Sum('total_amount'),
             count=Count('id'),
             unreceived_total=Sum('total_amount', filter=Q(is_received=False))
         )
-        print(f"Debug - Sales aggregate: {context['current_month_sales']}")
         
         # 최근 전표들
-        context['recent_purchases'] = PurchaseVoucher.objects.select_related('supplier').order_by('-created_at')[:5]
-        context['recent_sales'] = SalesVoucher.objects.order_by('-created_at')[:5]
+        summary['recent_purchases'] = list(PurchaseVoucher.objects.select_related('supplier').order_by('-created_at')[:5])
+        summary['recent_sales'] = list(SalesVoucher.objects.order_by('-created_at')[:5])
         
         # 이번 달 순이익 계산
-        sales_total = context['current_month_sales']['total'] or 0
-        purchase_total = context['current_month_purchases']['total'] or 0
-        context['current_month_profit'] = sales_total - purchase_total
-        
-        print(f"Debug - Sales total: {sales_total}, Purchase total: {purchase_total}, Profit: {context['current_month_profit']}")
+        sales_total = summary['current_month_sales']['total'] or 0
+        purchase_total = summary['current_month_purchases']['total'] or 0
+        summary['current_month_profit'] = sales_total - purchase_total
         
+        return summary
+
+class VoucherItemsFormMixin:
+    """전표 입력 화면의 항목을 검증 후 일괄 저장 (bulk_create + 총금액 SQL 재계산)"""
+    items_context_name = 'items'
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.object:
+            context[self.items_context_name] = self.object.items.all()
         return context
+    
+    def form_valid(self, form):
+        from django.contrib import messages
+        from django.core.exceptions import ValidationError
+        from django.db import transaction
+        from .vouchers import clean_item_rows, item_rows_from_post, save_voucher_items
+        
+        # 항목 입력란이 없는 화면에서 저장하면 기존 항목 유지
+        cleaned_rows = None
+        if 'item_name[]' in self.request.POST:
+            try:
+                cleaned_rows = clean_item_rows(item_rows_from_post(self.request.POST))
+                if not cleaned_rows:
+                    raise ValidationError('전표 항목을 1개 이상 입력해주세요.')
+            except ValidationError as e:
+                for message in e.messages:
+                    messages.error(self.request, message)
+                return self.form_invalid(form)
+        
+        with transaction.atomic():
+            if form.instance.total_amount is None:
+                form.instance.total_amount = 0
+            response = super().form_valid(form)
+            if cleaned_rows is not None:
+                save_voucher_items(self.object, cleaned_rows)
+        return response
 
 class PurchaseVoucherListView(LoginRequiredMixin, ListView):
     model = PurchaseVoucher
@@ -89,11 +127,12 @@ class PurchaseVoucherListView(LoginRequiredMixin, ListView):
             
         return queryset
 
-class PurchaseVoucherCreateView(LoginRequiredMixin, CreateView):
+class PurchaseVoucherCreateView(LoginRequiredMixin, VoucherItemsFormMixin, CreateView):
     model = PurchaseVoucher
     template_name = 'accounting/purchase_form.html'
     fields = ['supplier', 'purchase_date', 'description', 'payment_method', 'payment_date']
     success_url = reverse_lazy('accounting:purchase_list')
+    items_context_name = 'purchase_items'
     
     def form_valid(self, form):
         form.instance.created_by = self.request.user
@@ -104,15 +143,11 @@ class PurchaseVoucherDetailView(LoginRequiredMixin, DetailView):
     template_name = 'accounting/purchase_detail.html'
     context_object_name = 'voucher'
 
-class PurchaseVoucherUpdateView(LoginRequiredMixin, UpdateView):
+class PurchaseVoucherUpdateView(LoginRequiredMixin, VoucherItemsFormMixin, UpdateView):
     model = PurchaseVoucher
     template_name = 'accounting/purchase_form.html'
     fields = ['supplier', 'purchase_date', 'description', 'payment_method', 'payment_date', 'is_paid']
-    
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['purchase_items'] = self.object.items.all()
-        return context
+    items_context_name = 'purchase_items'
     
     def get_success_url(self):
         return reverse_lazy('accounting:purchase_edit', kwargs={'pk': self.object.pk})
@@ -144,11 +179,12 @@ class SalesVoucherListView(LoginRequiredMixin, ListView):
             
         return queryset
 
-class SalesVoucherCreateView(LoginRequiredMixin, CreateView):
+class SalesVoucherCreateView(LoginRequiredMixin, VoucherItemsFormMixin, CreateView):
     model = SalesVoucher
     template_name = 'accounting/sales_form.html'
     fields = ['customer_name', 'customer_phone', 'sales_date', 'description', 'payment_method', 'payment_date', 'service_request']
     success_url = reverse_lazy('accounting:sales_list')
+    items_context_name = 'sales_items'
     
     def form_valid(self, form):
         form.instance.created_by = self.request.user
@@ -159,10 +195,11 @@ class SalesVoucherDetailView(LoginRequiredMixin, DetailView):
     template_name = 'accounting/sales_detail.html'
     context_object_name = 'voucher'
 
-class SalesVoucherUpdateView(LoginRequiredMixin, UpdateView):
+class SalesVoucherUpdateView(LoginRequiredMixin, VoucherItemsFormMixin, UpdateView):
     model = SalesVoucher
     template_name = 'accounting/sales_form.html'
     fields = ['customer_name', 'customer_phone', 'sales_date', 'description', 'payment_method', 'payment_date', 'is_received']
+    items_context_name = 'sales_items'
     
     def get_success_url(self):
         return reverse_lazy('accounting:sales_detail', kwargs={'pk': self.object.pk})
@@ -204,6 +241,7 @@ class SupplierUpdateView(LoginRequiredMixin, UpdateView):
     def get_success_url(self):
         return reverse_lazy('accounting:supplier_detail', kwargs={'pk': self.object.pk})
 
+@reporting_db()
 class IncomeStatementView(LoginRequiredMixin, TemplateView):
     template_name = 'accounting/income_statement.html'
     
@@ -265,6 +303,7 @@ class IncomeStatementView(LoginRequiredMixin, TemplateView):
         
         return context
 
+@reporting_db()
 class BalanceSheetView(LoginRequiredMixin, TemplateView):
     template_name = 'accounting/balance_sheet.html'
     
@@ -276,27 +315,16 @@ class BalanceSheetView(LoginRequiredMixin, TemplateView):
         if isinstance(as_of_date, str):
             as_of_date = datetime.strptime(as_of_date, '%Y-%m-%d').date()
         
-        # 자산 계산
-        asset_accounts = AccountingCategory.objects.filter(category_type='asset')
-        # 간단한 자산 계산 (실제로는 분개장에서 계산해야 함)
-        total_assets = 0  # 실제 구현 시 분개장 기반으로 계산
-        
-        # 부채 계산
-        liability_accounts = AccountingCategory.objects.filter(category_type='liability')
-        total_liabilities = PurchaseVoucher.objects.filter(
-            purchase_date__lte=as_of_date,
-            is_paid=False
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
-        
-        # 자본 계산
-        equity_accounts = AccountingCategory.objects.filter(category_type='equity')
-        total_equity = 0  # 실제 구현 시 분개장 기반으로 계산
+        # 직전 마감 스냅샷 + 이후 발생분으로 잔액 계산
+        from .closing import get_balances_as_of
+        ledger = get_balances_as_of(as_of_date)
+        balances = ledger['balances']
         
         # 미수금 (매출전표 중 미수)
-        accounts_receivable = SalesVoucher.objects.filter(
-            sales_date__lte=as_of_date,
-            is_received=False
-        ).aggregate(total=Sum('total_amount'))['total'] or 0
+        accounts_receivable = balances['receivable']
+        
+        # 부채 (매입전표 중 미지급)
+        total_liabilities = balances['payable']
         
         context.update({
             'as_of_date': as_of_date,
@@ -304,10 +332,90 @@ class BalanceSheetView(LoginRequiredMixin, TemplateView):
             'total_assets': accounts_receivable,  # 간단히 미수금만 자산으로 계산
             'total_liabilities': total_liabilities,
             'total_equity': accounts_receivable - total_liabilities,  # 자산 - 부채
+            'base_period': ledger['base_period'],
         })
         
         return context
 
+@query_budget(10)
+@reporting_db()
+class TrialBalanceView(LoginRequiredMixin, TemplateView):
+    """합계잔액시산표 (계정별 누적 잔액 기준)"""
+    template_name = 'accounting/trial_balance.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        from .journal import get_trial_balance
+        context.update(get_trial_balance())
+        return context
+
+@reporting_db()
+class AccountLedgerView(LoginRequiredMixin, TemplateView):
+    """계정별 원장 (최근 전기 순, ?before=<항목ID> 로 이전 페이지 조회)"""
+    template_name = 'accounting/account_ledger.html'
+    paginate_by = 50
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        from .journal import get_account_ledger
+        from .models import AccountBalance
+
+        account = get_object_or_404(AccountingCategory, pk=self.kwargs['pk'])
+        before_id = self.request.GET.get('before')
+        before_id = int(before_id) if before_id and before_id.isdigit() else None
+
+        context.update(get_account_ledger(account, before_id=before_id, limit=self.paginate_by))
+        context.update({
+            'account': account,
+            'running_balance': AccountBalance.objects.filter(account=account).first(),
+            'before_id': before_id,
+        })
+        return context
+
+class VoucherImportView(LoginRequiredMixin, TemplateView):
+    """엑셀/CSV 전표 일괄 등록"""
+    template_name = 'accounting/voucher_import.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        from .forms import VoucherImportForm
+        from .vouchers import IMPORT_COLUMNS
+        context.setdefault('form', VoucherImportForm())
+        context['import_columns'] = IMPORT_COLUMNS
+        return context
+
+    def post(self, request, *args, **kwargs):
+        from django.contrib import messages
+        from django.core.exceptions import ValidationError
+        from .forms import VoucherImportForm
+        from .vouchers import VoucherImporter
+
+        form = VoucherImportForm(request.POST, request.FILES)
+        results = None
+        if form.is_valid():
+            try:
+                df = form.process_file()
+                importer = VoucherImporter(
+                    form.cleaned_data['voucher_type'], request.user,
+                    vat_included=form.cleaned_data['vat_included'],
+                )
+                results = importer.import_dataframe(df, dry_run=form.cleaned_data['dry_run'])
+            except ValidationError as e:
+                for message in e.messages:
+                    messages.error(request, message)
+
+        if results and not results['errors']:
+            action = '검증 완료' if form.cleaned_data['dry_run'] else '등록 완료'
+            messages.success(
+                request,
+                f"{action}: 전표 {results['vouchers']:,}건, 항목 {results['items']:,}건, "
+                f"합계 {results['total_amount']:,.0f}원"
+            )
+        elif results:
+            messages.error(request, f"오류 {results['errors']:,}건이 있어 저장하지 않았습니다.")
+
+        return self.render_to_response(self.get_context_data(form=form, results=results))
+
 class AccountingCategoryListView(LoginRequiredMixin, ListView):
     model = AccountingCategory
     template_name = 'accounting/account_list.html'
@@ -413,6 +521,7 @@ def complete_happycall_revenue(request, voucher_id):
     return redirect('accounting:sales_detail', pk=voucher_id)
 
 
+@reporting_db()
 class HappyCallRevenueAnalysisView(LoginRequiredMixin, TemplateView):
     """해피콜 매출 분석 대시보드"""
     template_name = 'accounting/happycall_revenue_analysis.html'
@@ -517,6 +626,7 @@ class HappyCallRevenueAnalysisView(LoginRequiredMixin, TemplateView):
         return context
 
 
+@reporting_db()
 def ajax_happycall_revenue_stats(request):
     """해피콜 매출 통계 AJAX 응답"""
     if not request.user.is_authenticated:
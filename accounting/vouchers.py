@@ -0,0 +1,401 @@
+"""
+전표 항목 일괄 저장
+
+전표 입력 화면과 엑셀/CSV 일괄 등록이 같은 경로를 사용한다.
+항목은 검증 후 bulk_create 한 번으로 저장하고, 전표의 총금액/부가세는
+항목 합계로 SQL UPDATE 한 번에 다시 계산한다.
+"""
+import logging
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+import pandas as pd
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import DecimalField, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Round
+from django.utils import timezone
+
+from .models import (
+    AccountingCategory, PurchaseVoucher, PurchaseVoucherItem,
+    SalesVoucher, SalesVoucherItem, Supplier,
+)
+
+logger = logging.getLogger(__name__)
+
+# 전표 한 건당 최대 항목 수
+MAX_VOUCHER_ITEMS = 2000
+
+BULK_BATCH_SIZE = 500
+
+ITEM_MODELS = {
+    PurchaseVoucher: PurchaseVoucherItem,
+    SalesVoucher: SalesVoucherItem,
+}
+
+
+def _to_decimal(value, field_label, row_label, integer=False):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        raise ValidationError(f'{row_label}: {field_label}을(를) 입력해주세요.')
+    try:
+        number = Decimal(str(value).replace(',', '').strip())
+    except InvalidOperation:
+        raise ValidationError(f'{row_label}: {field_label} 값이 올바르지 않습니다. ({value})')
+    if not number.is_finite() or number < 0:
+        raise ValidationError(f'{row_label}: {field_label}은(는) 0 이상이어야 합니다.')
+    if integer:
+        number = number.quantize(Decimal('1'), rounding=ROUND_HALF_UP)
+    else:
+        number = number.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    return number
+
+
+def _clean_text(value):
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    return str(value).strip()
+
+
+def clean_item_rows(rows, row_offset=1):
+    """
+    항목 입력값 검증 및 정규화
+
+    rows: [{'item_name', 'quantity', 'unit_price', 'specification', 'unit', 'account'}]
+    완전히 빈 행은 건너뛰고, 오류는 모두 모아 ValidationError 로 한 번에 반환한다.
+    """
+    cleaned = []
+    errors = []
+    for index, row in enumerate(rows, start=row_offset):
+        row_label = row.get('row_label') or f'{index}번째 항목'
+        item_name = _clean_text(row.get('item_name'))
+        quantity = row.get('quantity')
+        unit_price = row.get('unit_price')
+        if not item_name and _clean_text(quantity) == '' and _clean_text(unit_price) == '':
+            continue
+        try:
+            if not item_name:
+                raise ValidationError(f'{row_label}: 품목명을 입력해주세요.')
+            quantity = _to_decimal(quantity, '수량', row_label)
+            unit_price = _to_decimal(unit_price, '단가', row_label, integer=True)
+        except ValidationError as e:
+            errors.extend(e.messages)
+            continue
+
+        cleaned.append({
+            'item_name': item_name[:100],
+            'specification': _clean_text(row.get('specification'))[:100],
+            'unit': _clean_text(row.get('unit'))[:10],
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'amount': (quantity * unit_price).quantize(Decimal('1'), rounding=ROUND_HALF_UP),
+            'account': row.get('account'),
+        })
+
+    if len(cleaned) > MAX_VOUCHER_ITEMS:
+        errors.append(f'전표 항목은 최대 {MAX_VOUCHER_ITEMS:,}건까지 등록할 수 있습니다.')
+    if errors:
+        raise ValidationError(errors)
+    return cleaned
+
+
+def item_rows_from_post(data):
+    """전표 입력 화면의 item_name[]/quantity[]/unit_price[] 값을 항목 행으로 변환"""
+    names = data.getlist('item_name[]')
+    quantities = data.getlist('quantity[]')
+    unit_prices = data.getlist('unit_price[]')
+    specifications = data.getlist('specification[]')
+    units = data.getlist('unit[]')
+
+    rows = []
+    for index, item_name in enumerate(names):
+        rows.append({
+            'item_name': item_name,
+            'quantity': quantities[index] if index < len(quantities) else None,
+            'unit_price': unit_prices[index] if index < len(unit_prices) else None,
+            'specification': specifications[index] if index < len(specifications) else '',
+            'unit': units[index] if index < len(units) else '',
+        })
+    return rows
+
+
+def build_items(voucher, cleaned_rows):
+    """검증된 항목 행으로 저장 전 항목 객체 생성"""
+    item_model = ITEM_MODELS[type(voucher)]
+    default_unit = item_model._meta.get_field('unit').default
+    return [
+        item_model(
+            voucher=voucher,
+            item_name=row['item_name'],
+            specification=row['specification'],
+            unit=row['unit'] or default_unit,
+            quantity=row['quantity'],
+            unit_price=row['unit_price'],
+            amount=row['amount'],
+            account=row['account'],
+        )
+        for row in cleaned_rows
+    ]
+
+
+def recalculate_totals(voucher_model, voucher_ids, vat_included=False):
+    """
+    전표 총금액(항목 합계)을 UPDATE 한 번으로 재계산
+
+    vat_included 이면 부가세를 총금액의 1/11 로 함께 계산하고,
+    아니면 기존 부가세를 유지한다.
+    """
+    item_model = ITEM_MODELS[voucher_model]
+    amount_field = DecimalField(max_digits=12, decimal_places=0)
+    item_total = Subquery(
+        item_model.objects.filter(voucher=OuterRef('pk')).order_by().values('voucher').annotate(
+            total=Sum('amount')
+        ).values('total')[:1],
+        output_field=amount_field,
+    )
+    total = Coalesce(item_total, Value(Decimal('0')), output_field=amount_field)
+
+    updates = {'total_amount': total, 'updated_at': timezone.now()}
+    if vat_included:
+        # SQLite 정수 나눗셈을 피하기 위해 실수로 변환 후 반올림
+        updates['tax_amount'] = Round(Cast(total, FloatField()) / Value(11.0), output_field=amount_field)
+    return voucher_model.objects.filter(pk__in=voucher_ids).update(**updates)
+
+
+def after_totals_changed(vouchers):
+    """
+    SQL 로 금액을 갱신한 뒤 save() 에서 하던 후속 처리 수행
+
+    (마감 스냅샷 무효화, 분개 전기 예약, 해피콜 매출 금액 연동)
+    """
+    from core.cache import invalidate
+    from .closing import invalidate_for_dates
+    from .journal import schedule_voucher_posting
+
+    dates = []
+    for voucher in vouchers:
+        voucher.refresh_from_db(fields=['total_amount', 'tax_amount'])
+        if isinstance(voucher, SalesVoucher):
+            dates += [voucher.sales_date, voucher.payment_date]
+            voucher.sync_happy_call_revenue()
+        else:
+            dates += [voucher.purchase_date, voucher.payment_date]
+        schedule_voucher_posting(voucher)
+    invalidate_for_dates(*dates)
+    if vouchers:
+        invalidate(*type(vouchers[0]).cache_tags)
+
+
+@transaction.atomic
+def save_voucher_items(voucher, cleaned_rows, vat_included=False):
+    """
+    전표 항목 전체 교체 저장
+
+    기존 항목을 한 번에 삭제하고 새 항목을 bulk_create 한 뒤 총금액을 재계산한다.
+    """
+    item_model = ITEM_MODELS[type(voucher)]
+    item_model.objects.filter(voucher=voucher).delete()
+    item_model.objects.bulk_create(build_items(voucher, cleaned_rows), batch_size=BULK_BATCH_SIZE)
+    recalculate_totals(type(voucher), [voucher.pk], vat_included=vat_included)
+    after_totals_changed([voucher])
+    return voucher
+
+
+# ===================== 엑셀/CSV 일괄 등록 =====================
+
+IMPORT_COLUMNS = {
+    'purchase': {
+        'required': ['purchase_date', 'supplier_name', 'item_name', 'quantity', 'unit_price'],
+        'optional': ['voucher_key', 'supplier_business_number', 'payment_method', 'payment_date',
+                     'description', 'specification', 'unit', 'account_code'],
+    },
+    'sales': {
+        'required': ['sales_date', 'customer_name', 'item_name', 'quantity', 'unit_price'],
+        'optional': ['voucher_key', 'customer_phone', 'payment_method', 'payment_date',
+                     'description', 'specification', 'unit', 'account_code'],
+    },
+}
+
+
+def _parse_date(value, field_label, row_label, required=True):
+    if value is None or (not isinstance(value, str) and pd.isna(value)) or str(value).strip() == '':
+        if required:
+            raise ValidationError(f'{row_label}: {field_label}을(를) 입력해주세요.')
+        return None
+    try:
+        return pd.to_datetime(value).date()
+    except (ValueError, TypeError):
+        raise ValidationError(f'{row_label}: {field_label} 형식이 올바르지 않습니다. ({value})')
+
+
+class VoucherImporter:
+    """
+    엑셀/CSV 전표 일괄 등록
+
+    한 행이 전표 항목 하나이며, voucher_key(없으면 일자+거래처)가 같은 행을
+    한 전표로 묶는다. 전체 행을 먼저 검증하고 오류가 없을 때만 한 트랜잭션으로 저장한다.
+    """
+
+    def __init__(self, voucher_type, user, vat_included=False):
+        if voucher_type not in IMPORT_COLUMNS:
+            raise ValueError(f'지원하지 않는 전표 구분: {voucher_type}')
+        self.voucher_type = voucher_type
+        self.voucher_model = PurchaseVoucher if voucher_type == 'purchase' else SalesVoucher
+        self.user = user
+        self.vat_included = vat_included
+        self.results = {
+            'vouchers': 0,
+            'items': 0,
+            'total_amount': Decimal('0'),
+            'errors': 0,
+            'error_details': [],
+        }
+
+    def _lookup_tables(self, df):
+        accounts = {}
+        if 'account_code' in df.columns:
+            codes = {_clean_text(code) for code in df['account_code'] if _clean_text(code)}
+            accounts = {a.code: a for a in AccountingCategory.objects.filter(code__in=codes)}
+
+        suppliers = {}
+        if self.voucher_type == 'purchase':
+            names = {_clean_text(name) for name in df['supplier_name'] if _clean_text(name)}
+            for supplier in Supplier.objects.filter(name__in=names, is_active=True).order_by('id'):
+                suppliers.setdefault(('name', supplier.name), supplier)
+            if 'supplier_business_number' in df.columns:
+                numbers = {_clean_text(n) for n in df['supplier_business_number'] if _clean_text(n)}
+                for supplier in Supplier.objects.filter(business_number__in=numbers):
+                    suppliers[('business_number', supplier.business_number)] = supplier
+        return accounts, suppliers
+
+    def _group_rows(self, df):
+        """행을 전표 단위로 묶어 {그룹키: {'header': ..., 'rows': [...]}} 반환"""
+        accounts, suppliers = self._lookup_tables(df)
+        date_field = 'purchase_date' if self.voucher_type == 'purchase' else 'sales_date'
+        groups = OrderedDict()
+        errors = []
+
+        for position, record in enumerate(df.to_dict('records')):
+            row_label = f'{position + 2}행'  # 헤더 다음 행부터
+            get = lambda column: record.get(column)
+            try:
+                voucher_date = _parse_date(get(date_field), '전표일자', row_label)
+                payment_date = _parse_date(get('payment_date'), '결제일자', row_label, required=False)
+
+                account = None
+                account_code = _clean_text(get('account_code'))
+                if account_code:
+                    account = accounts.get(account_code)
+                    if account is None:
+                        raise ValidationError(f'{row_label}: 등록되지 않은 계정코드입니다. ({account_code})')
+
+                payment_method = _clean_text(get('payment_method'))
+                valid_methods = dict(self.voucher_model._meta.get_field('payment_method').choices)
+                if payment_method and payment_method not in valid_methods:
+                    raise ValidationError(f'{row_label}: 결제방법은 {", ".join(valid_methods)} 중 하나여야 합니다.')
+
+                header = {
+                    date_field: voucher_date,
+                    'payment_date': payment_date,
+                    'description': _clean_text(get('description'))[:200],
+                }
+                if payment_method:
+                    header['payment_method'] = payment_method
+
+                if self.voucher_type == 'purchase':
+                    business_number = _clean_text(get('supplier_business_number'))
+                    supplier_name = _clean_text(get('supplier_name'))
+                    supplier = (suppliers.get(('business_number', business_number)) if business_number
+                                else suppliers.get(('name', supplier_name)))
+                    if supplier is None:
+                        raise ValidationError(f'{row_label}: 등록되지 않은 공급업체입니다. ({business_number or supplier_name})')
+                    header['supplier'] = supplier
+                    party_key = supplier.pk
+                else:
+                    customer_name = _clean_text(get('customer_name'))
+                    if not customer_name:
+                        raise ValidationError(f'{row_label}: 고객명을 입력해주세요.')
+                    header['customer_name'] = customer_name[:100]
+                    header['customer_phone'] = _clean_text(get('customer_phone'))[:20]
+                    party_key = customer_name
+            except ValidationError as e:
+                errors.extend(e.messages)
+                continue
+
+            voucher_key = _clean_text(get('voucher_key'))
+            group_key = ('key', voucher_key) if voucher_key else ('auto', voucher_date, party_key)
+            group = groups.setdefault(group_key, {'header': header, 'rows': []})
+            group['rows'].append({
+                'row_label': row_label,
+                'item_name': get('item_name'),
+                'quantity': get('quantity'),
+                'unit_price': get('unit_price'),
+                'specification': get('specification'),
+                'unit': get('unit'),
+                'account': account,
+            })
+
+        for group in groups.values():
+            try:
+                group['items'] = clean_item_rows(group['rows'])
+            except ValidationError as e:
+                errors.extend(e.messages)
+        return groups, errors
+
+    def import_dataframe(self, df, dry_run=False):
+        """DataFrame 을 검증 후 전표로 저장 (오류가 하나라도 있으면 저장하지 않음)"""
+        missing_columns = set(IMPORT_COLUMNS[self.voucher_type]['required']) - set(df.columns)
+        if missing_columns:
+            raise ValidationError(f'필수 컬럼이 누락되었습니다: {", ".join(sorted(missing_columns))}')
+
+        groups, errors = self._group_rows(df)
+        groups = [group for group in groups.values() if group.get('items')]
+        if errors:
+            self.results['errors'] = len(errors)
+            self.results['error_details'] = errors
+            return self.results
+
+        self.results['vouchers'] = len(groups)
+        self.results['items'] = sum(len(group['items']) for group in groups)
+        self.results['total_amount'] = sum(
+            (row['amount'] for group in groups for row in group['items']), Decimal('0')
+        )
+        if dry_run or not groups:
+            return self.results
+
+        with transaction.atomic():
+            vouchers = []
+            items = []
+            for group in groups:
+                voucher = self.voucher_model(created_by=self.user, total_amount=0, **group['header'])
+                if voucher.payment_date:
+                    if self.voucher_type == 'purchase':
+                        voucher.is_paid = True
+                    else:
+                        voucher.is_received = True
+                voucher.save()
+                vouchers.append(voucher)
+                items.extend(build_items(voucher, group['items']))
+
+            item_model = ITEM_MODELS[self.voucher_model]
+            item_model.objects.bulk_create(items, batch_size=BULK_BATCH_SIZE)
+            recalculate_totals(self.voucher_model, [v.pk for v in vouchers], vat_included=self.vat_included)
+            after_totals_changed(vouchers)
+
+        logger.info(
+            f"전표 일괄 등록: {self.voucher_type} {len(vouchers)}건, 항목 {len(items)}건 (등록자: {self.user})"
+        )
+        return self.results
+
+
+def read_voucher_file(file):
+    """업로드 파일(.csv/.xlsx)을 DataFrame 으로 읽기"""
+    import io
+    name = getattr(file, 'name', str(file)).lower()
+    if name.endswith('.csv'):
+        if hasattr(file, 'read'):
+            content = file.read()
+        else:
+            with open(file, 'rb') as f:
+                content = f.read()
+        return pd.read_csv(io.StringIO(content.decode('utf-8-sig')), dtype=str)
+    return pd.read_excel(file, dtype=str)
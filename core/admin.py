@@ -1,3 +1,61 @@
 from django.contrib import admin
+from .models import ArchiveSegment, PhoneAccessLog, RequestMetric, SearchDocument
 
-# Register your models here.
+
+@admin.register(PhoneAccessLog)
+class PhoneAccessLogAdmin(admin.ModelAdmin):
+    list_display = ['accessed_at', 'username', 'path', 'phone_count', 'sources', 'ip_address']
+    list_filter = ['accessed_at']
+    search_fields = ['username', 'path', 'ip_address']
+    date_hierarchy = 'accessed_at'
+    readonly_fields = ['user', 'username', 'path', 'method', 'ip_address', 'sources',
+                       'phone_count', 'customer_ids', 'accessed_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+
+@admin.register(RequestMetric)
+class RequestMetricAdmin(admin.ModelAdmin):
+    list_display = ['period_end', 'method', 'view_name', 'request_count', 'max_ms',
+                    'query_count', 'duplicate_count', 'error_count']
+    list_filter = ['method', 'period_end']
+    search_fields = ['view_name']
+    date_hierarchy = 'period_end'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ['source', 'object_id', 'customer', 'title', 'source_date', 'updated_at']
+    list_filter = ['source']
+    search_fields = ['title']
+    raw_id_fields = ['customer']
+    readonly_fields = ['source', 'object_id', 'customer', 'title', 'body', 'tokens', 'source_date', 'url', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
+
+@admin.register(ArchiveSegment)
+class ArchiveSegmentAdmin(admin.ModelAdmin):
+    list_display = ['source', 'month', 'row_count', 'min_pk', 'max_pk', 'size_bytes', 'created_at']
+    list_filter = ['source']
+    search_fields = ['path']
+    date_hierarchy = 'month'
+    readonly_fields = ['source', 'month', 'path', 'row_count', 'min_pk', 'max_pk', 'min_date', 'max_date',
+                       'size_bytes', 'sha256', 'created_at']
+
+    def has_add_permission(self, request):
+        return False
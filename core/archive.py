@@ -0,0 +1,323 @@
+"""
+오래된 로그/이력 보관 (월별 압축 파일)
+
+SMS 발송 로그, 매출 회복 로그, 콜 실패 매출 손실, 고객 소통 이력은 계속 쌓이기만 하고 화면과 리포트는
+대부분 최근 기간만 본다. 보관 기간(ARCHIVE_RETENTION_DAYS)보다 오래된 행을 월별 gzip JSONL 파일
+(ARCHIVE_DIR/<대상>/<YYYY-MM>/<최소 ID>-<최대 ID>.jsonl.gz)로 옮기고 운영 테이블에서 지워 테이블과
+인덱스를 작게 유지한다. 파일 목록은 ArchiveSegment 에 남는다 (manage.py archive_logs).
+
+  - 한 달 치를 파일로 다 쓰고 행 수를 다시 읽어 확인한 뒤, ArchiveSegment 기록과 원본 삭제를 한 트랜잭션으로 한다.
+    파일 이름이 행 범위로 정해지므로 중간에 실패하면 다시 실행하면 된다 (지우는 것은 파일에 쓴 ID 뿐).
+  - history() / history_totals() 는 운영 테이블과 보관 파일을 합쳐 읽는다. 기간이 보관된 범위와 겹치는
+    파일만 열므로 최근 기간 조회는 ArchiveSegment 조회 한 번만 더 든다.
+  - 운영 테이블에 매출 회복 로그가 남아 있는 콜 실패 기록은 보관하지 않는다 (CASCADE 로 로그가 함께 지워짐).
+    그래서 ARCHIVES 는 회복 로그를 먼저 보관하는 순서로 둔다.
+  - 보관한 소통 이력은 전문 검색 문서도 지운다 (검색은 운영 테이블만 대상).
+  - key_field 가 있는 대상(소통 이력의 고객 ID)은 파일마다 들어 있는 키 값을 ArchiveSegmentKey 에 남겨,
+    고객 타임라인처럼 한 고객의 보관 행을 읽을 때 그 고객이 들어 있는 파일만 연다.
+    보관 파일은 고객 합치기(customers.dedup)로 고쳐 쓰지 않으므로, 읽을 때 key_aliases 로 합쳐진 고객 ID 도
+    함께 찾고 대표 고객 ID 로 바꿔 돌려준다.
+"""
+import gzip
+import hashlib
+import json
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, models, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+ARCHIVE_BATCH_SIZE = 5000
+
+
+class ArchiveSpec:
+    """
+    보관 대상 하나: 모델, 기준 일시 필드, 보관하지 않을 행 조건, 파일별로 색인할 키 필드(attname),
+    키 값 → 같은 대상으로 볼 예전 키 값 목록 함수 (합쳐진 고객 ID 등)
+    """
+
+    def __init__(self, model, date_field, exclude=None, key_field=None, key_aliases=None, description=''):
+        self.model_label = model
+        self.date_field = date_field
+        self.exclude = exclude
+        self.key_field = key_field
+        self.key_aliases = key_aliases
+        self.description = description
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def fields(self):
+        return [field.attname for field in self.model._meta.concrete_fields]
+
+    def queryset(self):
+        queryset = self.model._default_manager.all()
+        if self.exclude is not None:
+            queryset = queryset.exclude(self.exclude)
+        return queryset
+
+
+def merged_customer_ids(customer_id):
+    """대표 고객으로 합쳐진 고객 ID 목록 (연쇄 합치기도 합친 기록의 대표 고객이 옮겨지므로 한 번에 조회)"""
+    from customers.models import CustomerMergeLog
+
+    return list(CustomerMergeLog.objects.filter(survivor_id=customer_id).values_list('merged_customer_id', flat=True))
+
+
+# 보관 대상 (보관 순서대로)
+ARCHIVES = {
+    'revenue_recovery_log': ArchiveSpec('happycall.RevenueRecoveryLog', 'recovery_date', description='매출 회복 로그'),
+    'call_failure_revenue_loss': ArchiveSpec('happycall.CallFailureRevenueLoss', 'recorded_at',
+                                             exclude=Q(recovery_logs__isnull=False),
+                                             description='콜 실패 매출 손실'),
+    'sms_log': ArchiveSpec('happycall.SMSLog', 'sent_at', description='SMS 발송 로그'),
+    'communication': ArchiveSpec('customers.CustomerCommunication', 'communication_date', key_field='customer_id',
+                                 key_aliases=merged_customer_ids, description='고객 소통 이력'),
+}
+
+
+def archive_dir():
+    return Path(getattr(settings, 'ARCHIVE_DIR', Path(settings.BASE_DIR) / 'archive'))
+
+
+def archive_cutoff(retention_days=None, now=None):
+    """이 시각보다 오래된 행을 보관한다"""
+    if retention_days is None:
+        retention_days = getattr(settings, 'ARCHIVE_RETENTION_DAYS', 365)
+    return (now or timezone.now()) - timedelta(days=retention_days)
+
+
+def _month_start(value):
+    return timezone.localtime(value).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+# ===================== 보관 =====================
+
+def archive_source(key, before, batch_size=ARCHIVE_BATCH_SIZE, dry_run=False):
+    """
+    대상 하나의 before 이전 행을 월별 파일로 옮김, [(월, 행 수)] 반환
+
+    dry_run 이면 월별 행 수만 센다.
+    """
+    spec = ARCHIVES[key]
+    queryset = spec.queryset().filter(**{f'{spec.date_field}__lt': before})
+    first = queryset.order_by(spec.date_field).values_list(spec.date_field, flat=True).first()
+    if first is None:
+        return []
+    archived = []
+    month = _month_start(first)
+    while month < before:
+        end = min(_next_month(month), before)
+        month_rows = queryset.filter(**{f'{spec.date_field}__gte': month, f'{spec.date_field}__lt': end})
+        count = month_rows.count() if dry_run else _archive_month(key, spec, month, month_rows, batch_size)
+        if count:
+            archived.append((month.date(), count))
+        month = _next_month(month)
+    return archived
+
+
+def _archive_month(key, spec, month, queryset, batch_size):
+    from .fulltext import FullTextIndexMixin, remove_documents
+    from .models import ArchiveSegment, ArchiveSegmentKey
+
+    pk_name = spec.model._meta.pk.attname
+    folder = archive_dir() / key / f'{month:%Y-%m}'
+    folder.mkdir(parents=True, exist_ok=True)
+    temp_path = folder / f'.writing-{os.getpid()}.jsonl.gz'
+    pks, keys, min_date, max_date = [], set(), None, None
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as handle:
+        for row in queryset.order_by('pk').values(*spec.fields).iterator(chunk_size=batch_size):
+            handle.write(json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False))
+            handle.write('\n')
+            pks.append(row[pk_name])
+            if spec.key_field and row[spec.key_field] is not None:
+                keys.add(row[spec.key_field])
+            date = row[spec.date_field]
+            min_date = date if min_date is None or date < min_date else min_date
+            max_date = date if max_date is None or date > max_date else max_date
+    if not pks:
+        temp_path.unlink()
+        return 0
+
+    path = folder / f'{pks[0]}-{pks[-1]}.jsonl.gz'
+    os.replace(temp_path, path)
+    digest, written = _verify(path)
+    if written != len(pks):
+        raise RuntimeError(f'{path}: 보관 파일 행 수 불일치 ({written} != {len(pks)})')
+
+    with transaction.atomic():
+        segment = ArchiveSegment.objects.create(
+            source=key, month=month.date(), path=str(path.relative_to(archive_dir())), row_count=len(pks),
+            min_pk=pks[0], max_pk=pks[-1], min_date=min_date, max_date=max_date,
+            size_bytes=path.stat().st_size, sha256=digest,
+        )
+        ArchiveSegmentKey.objects.bulk_create([ArchiveSegmentKey(segment=segment, value=value) for value in keys],
+                                              batch_size=batch_size)
+        for offset in range(0, len(pks), batch_size):
+            chunk = pks[offset:offset + batch_size]
+            spec.model._default_manager.filter(pk__in=chunk).delete()
+            if issubclass(spec.model, FullTextIndexMixin):
+                remove_documents(spec.model.search_source, chunk)
+    return len(pks)
+
+
+def _verify(path):
+    """(sha256, 행 수) - 압축을 풀어 끝까지 읽어 본다"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    lines = 0
+    with gzip.open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            lines += block.count(b'\n')
+    return digest.hexdigest(), lines
+
+
+# ===================== 읽기 (운영 + 보관) =====================
+
+def _date_filter(field, start, end):
+    """__range 와 같은 양 끝 포함 조건"""
+    if start and end:
+        return {f'{field}__range': (start, end)}
+    if start:
+        return {f'{field}__gte': start}
+    if end:
+        return {f'{field}__lte': end}
+    return {}
+
+
+def archived_rows(key, start=None, end=None, fields=None, **equals):
+    """
+    보관 파일의 행 dict (필드 attname 기준, 값은 모델 필드 타입으로 변환)
+
+    기간과 겹치는 파일만 열고, start <= 기준 일시 <= end 와 equals(attname=값) 를 만족하는 행만 돌려준다.
+    fields 를 주면 그 필드만 변환해 담는다 (합계용, 전체 변환보다 몇 배 빠르다).
+    equals 에 key_field 가 있으면 그 값(과 key_aliases 의 예전 값)이 들어 있는 파일만 열고,
+    예전 값으로 보관된 행의 키는 요청한 값으로 바꿔 돌려준다.
+    """
+    from .models import ArchiveSegment
+
+    spec = ARCHIVES[key]
+    segments = ArchiveSegment.objects.filter(source=key)
+    key_value, key_values = None, None
+    if spec.key_field and equals.get(spec.key_field) is not None:
+        key_value = equals.pop(spec.key_field)
+        key_values = {key_value, *(spec.key_aliases(key_value) if spec.key_aliases else ())}
+        segments = segments.filter(keys__value__in=key_values).distinct()
+    if start:
+        segments = segments.filter(max_date__gte=start)
+    if end:
+        segments = segments.filter(min_date__lte=end)
+    paths = list(segments.order_by('min_date', 'min_pk').values_list('path', flat=True))
+    if not paths:
+        return
+    converters = {field.attname: field.to_python for field in spec.model._meta.concrete_fields}
+    date_to_python = converters[spec.date_field]
+    checks = [(name, converters[name], value) for name, value in equals.items()]
+    key_to_python = converters[spec.key_field] if key_values else None
+    wanted = list(converters) if fields is None else [name for name in converters if name in set(fields)]
+    for path in paths:
+        with gzip.open(archive_dir() / path, 'rt', encoding='utf-8') as handle:
+            for line in handle:
+                raw = json.loads(line)
+                date = date_to_python(raw[spec.date_field])
+                if (start and date < start) or (end and date > end):
+                    continue
+                if any(to_python(raw.get(name)) != value for name, to_python, value in checks):
+                    continue
+                if key_values and key_to_python(raw.get(spec.key_field)) not in key_values:
+                    continue
+                row = {name: converters[name](raw.get(name)) for name in wanted}
+                row[spec.date_field] = date
+                if key_values and spec.key_field in row:
+                    row[spec.key_field] = key_value
+                yield row
+
+
+def history(key, start=None, end=None, **equals):
+    """운영 테이블과 보관 파일의 행 dict 목록 (기준 일시 최근 순)"""
+    spec = ARCHIVES[key]
+    rows = list(spec.model._default_manager.filter(**_date_filter(spec.date_field, start, end), **equals)
+                .values(*spec.fields))
+    rows.extend(archived_rows(key, start, end, **equals))
+    rows.sort(key=lambda row: row[spec.date_field], reverse=True)
+    return rows
+
+
+def history_totals(key, fields, start=None, end=None, group_by=None, **equals):
+    """
+    운영 테이블 + 보관 파일 합계 {'count': 행 수, 필드: 합계}, group_by 가 있으면 {값: 합계 dict}
+
+    불리언 필드는 참인 행 수를 센다. 운영 테이블은 DB 집계, 보관 파일은 겹치는 파일만 읽어 더한다.
+    """
+    spec = ARCHIVES[key]
+    model = spec.model
+    aggregates = {'count': Count('pk')}
+    for field in fields:
+        if isinstance(model._meta.get_field(field), models.BooleanField):
+            aggregates[field] = Count('pk', filter=Q(**{field: True}))
+        else:
+            aggregates[field] = Sum(field)
+    queryset = model._default_manager.filter(**_date_filter(spec.date_field, start, end), **equals)
+    if group_by:
+        hot = {row.pop(group_by): row for row in queryset.order_by().values(group_by).annotate(**aggregates)}
+    else:
+        hot = {None: queryset.aggregate(**aggregates)}
+
+    totals = {}
+    for group, row in hot.items():
+        totals[group] = {name: value or 0 for name, value in row.items()}
+    for row in archived_rows(key, start, end, fields=[*fields, group_by] if group_by else fields, **equals):
+        group = row[group_by] if group_by else None
+        total = totals.setdefault(group, {name: 0 for name in aggregates})
+        total['count'] += 1
+        for field in fields:
+            value = row[field]
+            if isinstance(value, bool):
+                total[field] += int(value)
+            elif value is not None:
+                total[field] += value
+    if group_by:
+        return totals
+    return totals.get(None) or {name: 0 for name in aggregates}
+
+
+# ===================== 측정 =====================
+
+def table_size(model):
+    """운영 테이블 (행 수, 테이블+인덱스 바이트) - 크기를 알 수 없는 DB 는 None"""
+    table = model._meta.db_table
+    rows = model._default_manager.count()
+    size = None
+    with connection.cursor() as cursor:
+        try:
+            if connection.vendor == 'sqlite':
+                cursor.execute('SELECT SUM(pgsize) FROM dbstat WHERE name = %s OR name IN '
+                               '(SELECT name FROM sqlite_master WHERE type = %s AND tbl_name = %s)',
+                               [table, 'index', table])
+            elif connection.vendor == 'postgresql':
+                cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+            elif connection.vendor == 'mysql':
+                cursor.execute('SELECT data_length + index_length FROM information_schema.tables '
+                               'WHERE table_schema = DATABASE() AND table_name = %s', [table])
+            else:
+                return rows, None
+            result = cursor.fetchone()
+            size = int(result[0]) if result and result[0] is not None else None
+        except DatabaseError:
+            # SQLite 가 dbstat 없이 빌드된 경우 등
+            size = None
+    return rows, size
+
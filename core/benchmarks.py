@@ -0,0 +1,269 @@
+"""
+주요 화면/API 벤치마크
+
+테스트 클라이언트로 실제 미들웨어·템플릿까지 거쳐 각 화면을 반복 호출하고
+응답 시간(최소/중앙값/p95/최대), 쿼리 수, 응답 크기를 JSON 리포트로 남긴다.
+같은 합성 데이터(generate_dataset, 같은 seed)에서 만든 리포트끼리 비교하면
+코드 변경에 따른 성능 회귀를 확인할 수 있다.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .cache import invalidate
+
+REPORT_VERSION = 1
+ALL_CACHE_TAGS = ('customers', 'services', 'happycalls', 'employees', 'schedules', 'accounting')
+
+
+class BenchmarkCase:
+    """
+    벤치마크 대상 하나
+
+    url_name/params 로 GET 요청을 보내거나, runner(client, user) 로 직접 실행한다.
+    cold=True 이면 매 반복 전에 대시보드 캐시를 무효화해 캐시 미적중 시간을 잰다.
+    """
+
+    def __init__(self, name, url_name=None, params=None, url_kwargs=None, runner=None, cold=False):
+        self.name = name
+        self.url_name = url_name
+        self.params = params or {}
+        self.url_kwargs = url_kwargs
+        self.runner = runner
+        self.cold = cold
+
+    def run(self, client, user):
+        """한 번 실행 후 (상태 코드, 응답 바이트 수) 반환"""
+        if self.runner is not None:
+            return self.runner(client, user)
+        url = reverse(self.url_name, kwargs=self.url_kwargs)
+        response = client.get(url, self.params)
+        if getattr(response, 'streaming', False):
+            size = sum(len(chunk) for chunk in response.streaming_content)
+        else:
+            size = len(response.content)
+        return response.status_code, size
+
+
+def _sample_values():
+    """현재 데이터에서 검색어/직원 ID 등 요청 파라미터 추출"""
+    from customers.models import Customer, MarketingCampaign
+    from employees.models import Employee
+
+    customer = (Customer.objects.filter(name__isnull=False).exclude(name='')
+                .order_by('pk').only('name', 'phone').first())
+    employee = Employee.objects.order_by('pk').only('pk').first()
+    phone = customer._get_raw_phone() if customer else '010-0000-0000'
+    return {
+        'name': (customer.name if customer else '김민')[:2],
+        'phone_digits': phone.replace('-', '')[-4:],
+        'employee_id': employee.pk if employee else None,
+        'customer_id': customer.pk if customer else None,
+        'campaign_id': MarketingCampaign.objects.order_by('pk').values_list('pk', flat=True).first(),
+    }
+
+
+def _upload_runner(rows):
+    """고객 엑셀 업로드 처리 시간 (트랜잭션 롤백으로 데이터는 남기지 않음)"""
+    def run(client, user):
+        import pandas as pd
+        from .upload_handlers import DataUploadHandler
+
+        df = pd.DataFrame([{
+            'name': f'업로드{number:05d}',
+            'phone': f'017-9{number // 10000:03d}-{number % 10000:04d}',
+            'privacy_consent': 'TRUE',
+            'marketing_consent': 'TRUE' if number % 3 == 0 else 'FALSE',
+            'address_main': '경기도 평택시 비전동',
+        } for number in range(rows)])
+        with transaction.atomic():
+            results = DataUploadHandler('customers', 'skip', user).process_data(df)
+            transaction.set_rollback(True)
+        return (200 if not results['errors'] else 500), len(df)
+    return run
+
+
+def build_cases(upload_rows=200):
+    """기본 벤치마크 목록"""
+    from customers.hangul import chosung_key
+
+    values = _sample_values()
+    today = timezone.localdate()
+    month_start = today.replace(day=1)
+    cases = [
+        BenchmarkCase('customer_search_api:name', 'services:customer_search_api',
+                      {'q': values['name'], 'type': 'name'}),
+        BenchmarkCase('customer_search_api:phone', 'services:customer_search_api',
+                      {'q': values['phone_digits'], 'type': 'phone'}),
+        BenchmarkCase('customer_search', 'customers:customer_search', {'q': values['name']}),
+        BenchmarkCase('customer_search:chosung', 'customers:customer_search', {'q': chosung_key(values['name'])}),
+        BenchmarkCase('customer_list', 'customers:customer_list'),
+        BenchmarkCase('search_api', 'core:search_api', {'q': '엔진오일 교환'}),
+        BenchmarkCase('happycall_assign', 'happycall:assign'),
+        BenchmarkCase('happycall_assign:3month', 'happycall:assign', {'filter_type': 'inspected_3month'}),
+        BenchmarkCase('happycall_assign:oil_due', 'happycall:assign', {'filter_type': 'oil_due'}),
+        BenchmarkCase('get_events:month', 'scheduling:api_events', {
+            'start': month_start.isoformat(),
+            'end': (month_start + timedelta(days=42)).isoformat(),
+        }),
+        BenchmarkCase('admin_dashboard:cold', 'core:dashboard', cold=True),
+        BenchmarkCase('admin_dashboard:warm', 'core:dashboard'),
+        BenchmarkCase('happycall_manager_dashboard:cold', 'happycall:manager_dashboard', cold=True),
+        BenchmarkCase('accounting_dashboard:cold', 'accounting:dashboard', cold=True),
+        BenchmarkCase('accounting_trial_balance', 'accounting:trial_balance'),
+        BenchmarkCase('customer_export:excel', 'customers:customer_list', {'export': 'excel'}),
+        BenchmarkCase('segment_preview', 'customers:segment_preview', {'criteria': json.dumps({
+            'membership': ['basic', 'premium', 'vip'], 'marketing_consent': True,
+            'last_service': {'within_days': 180}, 'not': {'tags': ['블랙리스트']},
+        })}),
+    ]
+    if values['customer_id']:
+        cases.append(BenchmarkCase('customer_timeline', 'customers:customer_timeline',
+                                   url_kwargs={'pk': values['customer_id']}))
+    if values['campaign_id']:
+        cases.append(BenchmarkCase('campaign_status', 'customers:campaign_status',
+                                   url_kwargs={'pk': values['campaign_id']}))
+    if values['employee_id']:
+        cases.append(BenchmarkCase('employee_detail', 'employees:employee_detail',
+                                   url_kwargs={'employee_id': values['employee_id']}))
+    if upload_rows:
+        cases.append(BenchmarkCase(f'upload:customers:{upload_rows}', runner=_upload_runner(upload_rows)))
+    return cases
+
+
+def _client_host():
+    for host in settings.ALLOWED_HOSTS:
+        if host and host != '*':
+            return host.lstrip('.')
+    return 'localhost'
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_case(case, client, user, iterations, warmup=1):
+    """한 항목을 warmup 후 iterations 번 실행한 통계"""
+    for _ in range(warmup):
+        if case.cold:
+            invalidate(*ALL_CACHE_TAGS)
+        case.run(client, user)
+
+    timings, queries, statuses, sizes = [], [], set(), []
+    for _ in range(iterations):
+        if case.cold:
+            invalidate(*ALL_CACHE_TAGS)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            status, size = case.run(client, user)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+        statuses.add(status)
+        sizes.append(size)
+
+    return {
+        'iterations': iterations,
+        'status': sorted(statuses),
+        'min_ms': round(min(timings), 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(_percentile(timings, 0.95), 2),
+        'max_ms': round(max(timings), 2),
+        'mean_ms': round(statistics.fmean(timings), 2),
+        'queries': int(statistics.median(queries)),
+        'max_queries': max(queries),
+        'response_bytes': int(statistics.median(sizes)),
+    }
+
+
+def dataset_counts():
+    """리포트에 남길 데이터 규모"""
+    from accounting.models import PurchaseVoucher, SalesVoucher
+    from customers.models import Customer, Vehicle
+    from happycall.models import HappyCall
+    from scheduling.models import Schedule
+    from services.models import ServiceRequest
+
+    return {
+        model._meta.label: model.objects.count()
+        for model in (Customer, Vehicle, ServiceRequest, HappyCall, Schedule, SalesVoucher, PurchaseVoucher)
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmarks(user, iterations=5, warmup=1, only=None, upload_rows=200, progress=None):
+    """
+    전체 벤치마크 실행 후 리포트(dict) 반환
+
+    only 에 이름 일부를 주면 해당 항목만 실행한다.
+    """
+    client = Client(HTTP_HOST=_client_host())
+    client.force_login(user)
+    results = {}
+    for case in build_cases(upload_rows=upload_rows):
+        if only and not any(token in case.name for token in only):
+            continue
+        results[case.name] = run_case(case, client, user, iterations, warmup)
+        if progress:
+            progress(case.name, results[case.name])
+
+    return {
+        'version': REPORT_VERSION,
+        'generated_at': timezone.now().isoformat(),
+        'git_revision': _git_revision(),
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'debug': settings.DEBUG,
+        },
+        'dataset': dataset_counts(),
+        'results': results,
+    }
+
+
+def compare_reports(baseline, current, threshold=20.0):
+    """
+    두 리포트의 중앙값 응답 시간과 쿼리 수 비교
+
+    중앙값이 threshold(%) 이상 느려졌거나 쿼리 수가 늘어난 항목을 회귀로 표시한다.
+    """
+    rows = []
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            rows.append({'name': name, 'status': 'new', 'median_ms': result['median_ms'],
+                         'queries': result['queries']})
+            continue
+        change = ((result['median_ms'] - before['median_ms']) / before['median_ms'] * 100
+                  if before['median_ms'] else 0.0)
+        regressed = change >= threshold or result['queries'] > before['queries']
+        rows.append({
+            'name': name,
+            'status': 'regressed' if regressed else ('improved' if change <= -threshold else 'same'),
+            'baseline_ms': before['median_ms'],
+            'median_ms': result['median_ms'],
+            'change_pct': round(change, 1),
+            'baseline_queries': before['queries'],
+            'queries': result['queries'],
+        })
+    return rows
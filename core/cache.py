@@ -0,0 +1,168 @@
+"""
+캐시 태그/버전 관리
+
+대시보드·리포트처럼 여러 모델에 의존하는 값은 태그와 함께 캐시한다.
+캐시 키에는 태그별 현재 버전이 포함되므로, 모델 저장 시 태그 버전만 올리면
+의존하는 키가 모두 무효화된다 (기존 값은 타임아웃으로 자연히 정리됨).
+
+사용 예:
+    stats = get_or_set('dashboard:admin', build_stats, tags=['customers', 'services'])
+    invalidate('customers')
+"""
+import functools
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'default'
+DEFAULT_TIMEOUT = 300  # 5분
+TAG_KEY_PREFIX = 'cache_tag'
+UPLOAD_PROGRESS_TIMEOUT = 300
+
+_deferred = threading.local()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def _tag_key(tag):
+    return f'{TAG_KEY_PREFIX}:{tag}'
+
+
+def _initial_version():
+    # 태그 키가 축출된 뒤 다시 만들어져도 이전 버전과 겹치지 않도록 시각 기반으로 시작
+    return int(time.time() * 1000)
+
+
+def get_tag_versions(tags):
+    """태그별 현재 버전 반환 (없는 태그는 새로 생성)"""
+    if not tags:
+        return ()
+    cache = get_cache()
+    keys = [_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            version = _initial_version()
+            if not cache.add(key, version, timeout=None):
+                version = cache.get(key, version)
+            versions[key] = version
+    return tuple(versions[key] for key in keys)
+
+
+def make_key(name, tags=(), params=None):
+    """이름 + 파라미터 + 태그 버전으로 캐시 키 생성"""
+    key = name
+    if params is not None:
+        digest = hashlib.md5(repr(params).encode('utf-8')).hexdigest()[:16]
+        key = f'{key}:{digest}'
+    versions = get_tag_versions(tuple(tags))
+    if versions:
+        key = f"{key}:v{'.'.join(str(v) for v in versions)}"
+    return key
+
+
+def get_or_set(name, builder, tags=(), timeout=DEFAULT_TIMEOUT, params=None):
+    """캐시된 값 반환, 없으면 builder() 결과를 저장 후 반환"""
+    cache = get_cache()
+    key = make_key(name, tags, params)
+    missing = object()
+    value = cache.get(key, missing)
+    if value is missing:
+        value = builder()
+        cache.set(key, value, timeout)
+    return value
+
+
+def cached(name, tags=(), timeout=DEFAULT_TIMEOUT):
+    """함수 결과 캐시 데코레이터 (인자는 키 파라미터로 사용)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_set(
+                name, lambda: func(*args, **kwargs), tags=tags, timeout=timeout,
+                params=(args, sorted(kwargs.items())) if (args or kwargs) else None,
+            )
+        return wrapper
+    return decorator
+
+
+def _bump(tags):
+    cache = get_cache()
+    for tag in tags:
+        key = _tag_key(tag)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # 태그 키가 없으면 새 버전으로 생성
+            cache.set(key, _initial_version(), timeout=None)
+
+
+def invalidate(*tags):
+    """
+    태그에 의존하는 캐시 무효화
+
+    트랜잭션 안에서 호출되면 커밋 후에 버전을 올린다 (커밋 전 데이터로
+    다시 캐시되는 것을 방지).
+    """
+    tags = [tag for tag in tags if tag]
+    if not tags:
+        return
+    pending = getattr(_deferred, 'tags', None)
+    if pending is not None:
+        pending.update(tags)
+        return
+    transaction.on_commit(lambda: _bump(tags))
+
+
+@contextmanager
+def deferred_invalidation():
+    """
+    블록 안의 무효화를 모아 블록 종료 시 한 번만 수행
+
+    일괄 업로드처럼 저장이 많은 작업에서 행마다 태그 버전을 올리지 않도록 한다.
+    """
+    if getattr(_deferred, 'tags', None) is not None:
+        yield
+        return
+    _deferred.tags = set()
+    try:
+        yield
+    finally:
+        tags, _deferred.tags = _deferred.tags, None
+        invalidate(*sorted(tags))
+
+
+class CacheInvalidationMixin:
+    """저장/삭제 시 cache_tags 에 지정된 태그를 무효화하는 모델 믹스인"""
+    cache_tags = ()
+
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        invalidate(*self.cache_tags)
+        return result
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate(*self.cache_tags)
+        return result
+
+
+# ===================== 업로드 진행률 =====================
+
+def set_upload_progress(progress_key, progress_data):
+    """업로드 진행 상황 저장 (공유 캐시라 다른 워커에서도 조회 가능)"""
+    get_cache().set(f'upload_progress_{progress_key}', progress_data, timeout=UPLOAD_PROGRESS_TIMEOUT)
+
+
+def get_upload_progress(progress_key):
+    """업로드 진행 상황 조회"""
+    return get_cache().get(f'upload_progress_{progress_key}')
@@ -0,0 +1,174 @@
+"""
+동시 접속 벤치마크
+
+해피콜 상담원 N 명이 동시에 자기 콜 목록을 읽고 통화 결과를 저장하는 동안
+(선택적으로) 엑셀 업로드처럼 큰 쓰기 트랜잭션이 반복되는 상황을 스레드로 흉내 내어
+읽기/쓰기 처리량, 지연 시간, "database is locked" 오류 수를 잰다.
+
+쓰기는 합성 데이터(generate_dataset)의 해피콜 메모만 바꾸고,
+업로드 흉내로 만든 고객은 매 회차 바로 지운다.
+"""
+import random
+import statistics
+import threading
+import time
+
+from django.db import OperationalError, connections, transaction
+from django.utils import timezone
+
+from .synthetic import SYNTHETIC_PHONE_PREFIX
+
+# 기존 설정(롤백 journal, 기본 5초 대기, 지연 트랜잭션)과 운영 프로필 비교용
+PROFILES = {
+    'default': {
+        'pragmas': {'busy_timeout': 5000, 'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+        'transaction_mode': None,
+    },
+    'tuned': {
+        'pragmas': None,  # settings.SQLITE_PRAGMAS 그대로
+        'transaction_mode': 'IMMEDIATE',
+    },
+}
+UPLOAD_PHONE_PREFIX = f'{SYNTHETIC_PHONE_PREFIX}9'
+
+
+class AgentStats:
+    def __init__(self):
+        self.reads = []
+        self.writes = []
+        self.locked = 0
+        self.errors = 0
+
+
+def _is_locked(error):
+    return 'locked' in str(error) or 'busy' in str(error)
+
+
+def _agent(user_id, happycall_ids, write_ratio, stop_at, seed, stats, barrier):
+    """상담원 한 명: 콜 목록 조회, write_ratio 확률로 통화 결과 저장"""
+    from happycall.models import HappyCall
+
+    rng = random.Random(seed)
+    barrier.wait()
+    try:
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                if rng.random() < write_ratio:
+                    happycall_id = rng.choice(happycall_ids)
+                    with transaction.atomic():
+                        # 읽은 뒤 쓰는 패턴 (지연 트랜잭션에서 잠금 충돌이 나는 경로)
+                        notes = HappyCall.objects.filter(pk=happycall_id).values_list(
+                            'first_call_notes', flat=True).first() or ''
+                        HappyCall.objects.filter(pk=happycall_id).update(
+                            first_call_notes=f'{notes[:200]}.'[-200:], updated_at=timezone.now())
+                    stats.writes.append(time.perf_counter() - started)
+                else:
+                    list(HappyCall.objects.filter(first_call_caller_id=user_id)
+                         .select_related('service_request__customer')
+                         .order_by('-created_at')[:20])
+                    stats.reads.append(time.perf_counter() - started)
+            except OperationalError as e:
+                if _is_locked(e):
+                    stats.locked += 1
+                else:
+                    stats.errors += 1
+    finally:
+        connections.close_all()
+
+
+def _uploader(rows, interval, stop_at, stats, barrier):
+    """업로드 흉내: 고객 rows 명을 한 트랜잭션으로 넣고 지우기를 interval 초 간격으로 반복"""
+    from customers.models import Customer
+
+    barrier.wait()
+    cycle = 0
+    try:
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    Customer.objects.bulk_create([
+                        Customer(name=f'동시성{number:05d}',
+                                 phone=f'{UPLOAD_PHONE_PREFIX}{cycle % 1000:03d}-{number:04d}')
+                        for number in range(rows)
+                    ])
+                with transaction.atomic():
+                    Customer.objects.filter(phone__startswith=UPLOAD_PHONE_PREFIX).delete()
+                stats.writes.append(time.perf_counter() - started)
+            except OperationalError as e:
+                if _is_locked(e):
+                    stats.locked += 1
+                else:
+                    stats.errors += 1
+            cycle += 1
+            time.sleep(interval)
+    finally:
+        connections.close_all()
+
+
+def _latency(values):
+    if not values:
+        return {'median_ms': None, 'p95_ms': None}
+    ordered = sorted(values)
+    return {
+        'median_ms': round(statistics.median(ordered) * 1000, 2),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+    }
+
+
+def run_concurrency_benchmark(agents=8, seconds=10.0, write_ratio=0.2, upload_rows=500, upload_interval=1.0,
+                              seed=42):
+    """
+    현재 DB 설정으로 한 번 실행한 결과(dict)
+
+    합성 해피콜이 없으면 ValueError.
+    """
+    from django.contrib.auth import get_user_model
+    from happycall.models import HappyCall
+
+    happycall_ids = list(HappyCall.objects.filter(
+        service_request__customer__phone__startswith=SYNTHETIC_PHONE_PREFIX,
+    ).order_by('pk').values_list('pk', flat=True)[:5000])
+    if not happycall_ids:
+        raise ValueError('합성 해피콜이 없습니다. generate_dataset 을 먼저 실행하세요.')
+    user_ids = list(get_user_model().objects.order_by('pk').values_list('pk', flat=True)[:agents]) or [None]
+    connections.close_all()
+
+    agent_stats = [AgentStats() for _ in range(agents)]
+    upload_stats = AgentStats()
+    barrier = threading.Barrier(agents + (1 if upload_rows else 0) + 1)
+    stop_at = time.perf_counter() + seconds + 0.5  # 준비 시간 여유
+
+    threads = [
+        threading.Thread(target=_agent, args=(user_ids[index % len(user_ids)], happycall_ids, write_ratio,
+                                               stop_at, f'{seed}:{index}', agent_stats[index], barrier))
+        for index in range(agents)
+    ]
+    if upload_rows:
+        threads.append(threading.Thread(
+            target=_uploader, args=(upload_rows, upload_interval, stop_at, upload_stats, barrier)))
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    reads = [value for stats in agent_stats for value in stats.reads]
+    writes = [value for stats in agent_stats for value in stats.writes]
+    return {
+        'agents': agents,
+        'seconds': round(elapsed, 2),
+        'reads': len(reads),
+        'writes': len(writes),
+        'reads_per_sec': round(len(reads) / elapsed, 1),
+        'writes_per_sec': round(len(writes) / elapsed, 1),
+        'read_latency': _latency(reads),
+        'write_latency': _latency(writes),
+        'locked_errors': sum(stats.locked for stats in agent_stats),
+        'other_errors': sum(stats.errors for stats in agent_stats),
+        'uploads': len(upload_stats.writes),
+        'upload_locked_errors': upload_stats.locked,
+    }
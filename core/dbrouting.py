@@ -0,0 +1,137 @@
+"""
+리포트용 읽기 전용 DB 라우팅
+
+회계 리포트, 대시보드, 엑셀 내보내기, 콜 실패 분석처럼 무거운 집계를 상담원이 쓰는
+기본 DB 가 아닌 DATABASES['reporting'] (읽기 복제본)에서 실행한다.
+
+  - reporting_db() 로 감싼 뷰/함수/블록 안의 읽기만 reporting 으로 보낸다. 쓰기는 항상 default.
+  - reporting 별칭이 없으면 모든 조회가 default 로 간다 (설정만으로 켜고 끄기).
+  - 같은 요청에서 쓰기가 있었거나, 사용자가 최근 REPORTING_STICKY_SECONDS 초 안에 POST 를
+    보냈다면 default 에서 읽는다 (방금 저장한 내용이 리포트에 안 보이는 문제 방지).
+
+복제본은 마지막 동기화 시점 기준이므로, 그 사이 저장된 내용은 다음 동기화 전까지
+리포트/대시보드 캐시에 반영되지 않을 수 있다. 로컬에서는 sync_reporting_db 명령으로
+SQLite 파일 두 개를 맞춘다.
+
+사용 예:
+    @reporting_db()
+    def admin_dashboard(request): ...
+
+    @reporting_db()
+    class TrialBalanceView(...): ...
+
+    with reporting_db():
+        report = build_report()
+"""
+import threading
+from contextlib import ContextDecorator
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.decorators import method_decorator
+
+REPORTING_ALIAS = 'reporting'
+STICKY_COOKIE = 'db_sticky'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+# 복제본에서 읽으면 안 되는 앱 (DB 캐시 테이블: 무효화된 값을 복제본에서 다시 읽게 됨, 세션)
+DEFAULT_ONLY_APPS = {'django_cache', 'sessions'}
+
+_state = threading.local()
+
+
+def reporting_configured():
+    return REPORTING_ALIAS in settings.DATABASES
+
+
+def reporting_alias():
+    """지금 읽기에 쓸 별칭 (reporting_db 밖이거나 고정 상태이면 default)"""
+    if not getattr(_state, 'depth', 0) or getattr(_state, 'sticky', False) or getattr(_state, 'wrote', False):
+        return DEFAULT_DB_ALIAS
+    return REPORTING_ALIAS if reporting_configured() else DEFAULT_DB_ALIAS
+
+
+def mark_sticky(sticky=True):
+    """현재 스레드의 읽기를 default 로 고정 (미들웨어/명령용)"""
+    _state.sticky = sticky
+
+
+def reset_state():
+    _state.sticky = False
+    _state.wrote = False
+
+
+class reporting_db(ContextDecorator):
+    """리포트 읽기를 reporting DB 로 보내는 데코레이터/컨텍스트 매니저 (중첩 가능)"""
+
+    def __call__(self, func):
+        if isinstance(func, type):
+            # 클래스 기반 뷰는 dispatch 를 감싼다
+            return method_decorator(self, name='dispatch')(func)
+        return super().__call__(func)
+
+    def __enter__(self):
+        _state.depth = getattr(_state, 'depth', 0) + 1
+        if _state.depth == 1:
+            _state.wrote = False
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _state.depth -= 1
+        return False
+
+
+class ReportingRouter:
+    """reporting_db() 안의 읽기만 reporting 으로 보내는 라우터"""
+
+    # 별칭을 항상 명시한다. None 을 돌려주면 Django 가 인스턴스의 _state.db 를 따라가
+    # 복제본에서 읽은 객체의 save() 가 복제본으로 가거나, 캐시된 객체가 복제본을 계속 읽게 된다.
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in DEFAULT_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        return reporting_alias()
+
+    def db_for_write(self, model, **hints):
+        # 쓰기 이후의 읽기는 같은 블록 안에서 default 로 (read-your-writes)
+        if model._meta.app_label not in DEFAULT_ONLY_APPS:
+            _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 복제본은 같은 데이터이므로 별칭이 달라도 관계 허용
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPORTING_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # 복제본은 default 를 복사해 맞추므로 직접 마이그레이션하지 않는다
+        if db == REPORTING_ALIAS:
+            return False
+        return None
+
+
+class ReportingStickinessMiddleware:
+    """
+    POST 등 쓰기 요청 뒤 REPORTING_STICKY_SECONDS 초 동안 해당 브라우저의 리포트 읽기를 default 로 고정
+
+    reporting 별칭이 없으면 미들웨어 자체가 빠진다.
+    """
+
+    def __init__(self, get_response):
+        if not reporting_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPORTING_STICKY_SECONDS', 10)
+
+    def __call__(self, request):
+        reset_state()
+        mark_sticky(STICKY_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_state()
+        if request.method not in SAFE_METHODS and self.sticky_seconds:
+            response.set_cookie(STICKY_COOKIE, '1', max_age=self.sticky_seconds, httponly=True,
+                                samesite='Lax')
+        return response
@@ -0,0 +1,86 @@
+"""
+DB 연결 초기화 튜닝
+
+SQLite 를 운영 DB 로 쓰는 지점에서 해피콜 상담원 여러 명이 동시에 저장하거나
+엑셀 업로드가 도는 동안 "database is locked" 가 나지 않도록, 새 연결마다
+settings.SQLITE_PRAGMAS 의 PRAGMA 를 적용한다 (core.apps 에서 connection_created 에 연결).
+
+  - journal_mode=WAL      : 읽기와 쓰기가 서로 막지 않음 (쓰기는 여전히 한 번에 하나)
+  - busy_timeout          : 잠금이 풀릴 때까지 기다리는 시간(ms), 즉시 실패하지 않음
+  - synchronous=NORMAL    : WAL 에서는 커밋마다 fsync 하지 않아도 DB 가 깨지지 않음
+  - mmap_size, cache_size : 읽기 캐시 (cache_size 음수는 KiB 단위)
+
+다른 DB 엔진은 settings 의 CONN_MAX_AGE 로 연결을 재사용한다.
+"""
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+# 적용 순서가 중요: 잠금 대기를 먼저 켜야 journal_mode 변경이 잠금 때문에 실패하지 않는다
+PRAGMA_ORDER = ('busy_timeout', 'journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store')
+
+
+def get_sqlite_pragmas():
+    return getattr(settings, 'SQLITE_PRAGMAS', None) or {}
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created 수신기: SQLite 연결에만 PRAGMA 적용"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = get_sqlite_pragmas()
+    if not pragmas:
+        return
+    names = [name for name in PRAGMA_ORDER if name in pragmas]
+    names += [name for name in pragmas if name not in PRAGMA_ORDER]
+    with connection.cursor() as cursor:
+        for name in names:
+            value = pragmas[name]
+            if value is None or value == '':
+                continue
+            if name == 'journal_mode' and connection.is_in_memory_db():
+                continue  # 메모리 DB 는 WAL 불가
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def current_sqlite_settings(using='default'):
+    """현재 연결에 실제 적용된 PRAGMA 값 (확인/리포트용)"""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return {}
+    values = {}
+    with connection.cursor() as cursor:
+        for name in PRAGMA_ORDER:
+            cursor.execute(f'PRAGMA {name}')
+            row = cursor.fetchone()
+            values[name] = row[0] if row else None
+    return values
+
+
+@contextmanager
+def sqlite_profile(pragmas, transaction_mode=None, using='default'):
+    """
+    PRAGMA/트랜잭션 모드를 잠시 바꿔 새로 여는 연결에 적용 (벤치마크 비교용)
+
+    이미 열린 연결은 닫아 다음 쿼리부터 새 설정으로 연결되게 한다.
+    journal_mode 는 DB 파일에 남으므로 비교할 때는 명시적으로 지정해야 한다.
+    """
+    options = connections[using].settings_dict.setdefault('OPTIONS', {})
+    previous_pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    previous_mode = options.get('transaction_mode')
+    settings.SQLITE_PRAGMAS = pragmas
+    if transaction_mode is None:
+        options.pop('transaction_mode', None)
+    else:
+        options['transaction_mode'] = transaction_mode
+    connections[using].close()
+    try:
+        yield
+    finally:
+        connections[using].close()
+        settings.SQLITE_PRAGMAS = previous_pragmas
+        if previous_mode is None:
+            options.pop('transaction_mode', None)
+        else:
+            options['transaction_mode'] = previous_mode
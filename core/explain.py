@@ -0,0 +1,222 @@
+"""
+주요 조회 쿼리 실행 계획(EXPLAIN) 검사
+
+화면/집계에서 자주 쓰는 조회 모양을 모아 두고, DB 의 실행 계획에서
+대상 테이블을 인덱스 없이 전체 스캔하는지 확인한다 (check_query_plans 명령).
+인덱스를 지우거나 조회 조건을 바꿔 인덱스를 못 타게 되면 검사가 실패한다.
+
+지원 DB
+  - SQLite     : EXPLAIN QUERY PLAN 의 'SCAN <테이블>' (인덱스 없는 전체 스캔)
+  - PostgreSQL : EXPLAIN 의 'Seq Scan on <테이블>'
+                 작은 테이블에서는 순차 스캔이 더 싸게 잡히므로 enable_seqscan 을 끄고
+                 '쓸 수 있는 인덱스가 있는지'를 확인한다.
+"""
+import re
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+_SQLITE_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?! USING (?:COVERING )?INDEX)\b')
+_SQLITE_SEARCH = re.compile(r'\bSEARCH (?:TABLE )?(\w+) USING (?:COVERING )?(?:INDEX (\w+)|INTEGER PRIMARY KEY)')
+_POSTGRES_SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+_POSTGRES_INDEX_SCAN = re.compile(r'(?:Index Scan|Index Only Scan|Bitmap Index Scan) (?:using|on) (\w+)(?: on (\w+))?')
+
+
+class PlanCase:
+    """
+    검사 대상 조회 하나
+
+    build() 는 쿼리셋을 돌려준다. 실행 계획에서 queryset.model 의 테이블이
+    전체 스캔되면 실패로 본다 (조인된 작은 코드 테이블은 검사하지 않음).
+    """
+
+    def __init__(self, name, build, description=''):
+        self.name = name
+        self.build = build
+        self.description = description
+
+
+def _sample_ids():
+    """실행 계획용 파라미터 (값 자체는 계획에 영향이 거의 없음)"""
+    from customers.models import Customer, Vehicle
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    return {
+        'customer': Customer.objects.order_by('pk').values_list('pk', flat=True).first() or 1,
+        'vehicle': Vehicle.objects.order_by('pk').values_list('pk', flat=True).first() or 1,
+        'user': User.objects.order_by('pk').values_list('pk', flat=True).first() or 1,
+    }
+
+
+def build_cases():
+    """기본 검사 목록 (views/서비스 코드의 실제 조회 모양)"""
+    from accounting.models import SalesVoucher
+    from core.archive import ARCHIVES
+    from customers.hangul import prefix_q
+    from customers.models import (Customer, CustomerCampaignHistory, CustomerPointHistory, CustomerVehicle, Vehicle,
+                                  VehicleMileage)
+    from happycall.models import HappyCall
+    from scheduling.models import Schedule
+    from services.models import ServiceRequest
+
+    ids = _sample_ids()
+    now = timezone.now()
+    today = timezone.localdate()
+
+    return [
+        PlanCase('servicerequest:customer_history',
+                 lambda: ServiceRequest.objects.filter(customer_id=ids['customer']).order_by('-service_date'),
+                 '고객 상세/해피콜 배정의 최근 서비스 조회'),
+        PlanCase('servicerequest:customer_timeline',
+                 lambda: ServiceRequest.objects.filter(customer_id=ids['customer']).order_by('-created_at', '-pk'),
+                 '고객 타임라인/프로필의 최근 접수 서비스'),
+        PlanCase('pointhistory:customer_timeline',
+                 lambda: CustomerPointHistory.objects.filter(
+                     customer_id=ids['customer']).order_by('-transaction_date', '-pk'),
+                 '고객 타임라인 포인트 이력'),
+        PlanCase('pointhistory:expiry',
+                 lambda: CustomerPointHistory.objects.filter(
+                     remaining_points__gt=0, expires_at__lte=now).order_by('expires_at', 'id'),
+                 '포인트 만료 대상 적립분 (expire_points)'),
+        PlanCase('campaignhistory:customer_timeline',
+                 lambda: CustomerCampaignHistory.objects.filter(
+                     customer_id=ids['customer']).order_by('-sent_date', '-pk'),
+                 '고객 타임라인 캠페인 이력'),
+        PlanCase('servicerequest:vehicle_history',
+                 lambda: ServiceRequest.objects.filter(
+                     vehicle_id=ids['vehicle'], service_date__gte=now - timedelta(days=365),
+                 ).order_by('-service_date'),
+                 '차량별 서비스 이력'),
+        PlanCase('servicerequest:status_recent',
+                 lambda: ServiceRequest.objects.filter(status='pending', created_at__gte=now - timedelta(days=30)),
+                 '상태별 최근 접수 목록'),
+        PlanCase('servicerequest:service_date_range',
+                 lambda: ServiceRequest.objects.filter(
+                     service_date__gte=now - timedelta(days=9), service_date__lt=now - timedelta(days=4),
+                 ),
+                 '검사 후 N일 고객 추출 (해피콜 배정)'),
+        PlanCase('servicerequest:updated_since',
+                 lambda: ServiceRequest.objects.filter(updated_at__gte=now - timedelta(days=1)).order_by()
+                 .values_list('customer_id', flat=True),
+                 '등급 증분 산정/세그먼트 증분 갱신 대상 고객'),
+        PlanCase('customer:updated_since',
+                 lambda: Customer.objects.filter(updated_at__gte=now - timedelta(days=1)).order_by().values_list('pk', flat=True),
+                 '세그먼트 증분 갱신 대상 고객'),
+        PlanCase('customer:name_chosung',
+                 lambda: Customer.objects.filter(prefix_q('ㄱㅁ', 'name_jamo', 'name_chosung'), is_active=True)
+                 .order_by('name_chosung'),
+                 '고객 초성 검색 (customer_search)'),
+        PlanCase('customer:name_jamo',
+                 lambda: Customer.objects.filter(prefix_q('김미', 'name_jamo', 'name_chosung')).order_by('name_jamo'),
+                 '고객명 앞부분 검색 (customer_search_api)'),
+        PlanCase('vehicle:model_jamo',
+                 lambda: Vehicle.objects.filter(prefix_q('소나', 'model_jamo', 'model_chosung')).order_by('model_jamo'),
+                 '차종 앞부분 검색 (customer_search_api)'),
+        PlanCase('customer:region',
+                 lambda: Customer.objects.filter(address_city='경기도', address_district='평택시', is_active=True),
+                 '고객 목록 지역 필터'),
+        PlanCase('customervehicle:current_by_customer',
+                 lambda: CustomerVehicle.objects.filter(customer_id=ids['customer'], end_date__isnull=True)
+                 .order_by('-start_date', '-pk'),
+                 '고객별 현재 차량 (current_ownerships Prefetch)'),
+        PlanCase('vehicle:oil_due_range',
+                 lambda: Vehicle.objects.filter(next_oil_change_date__range=(today, today + timedelta(days=14)))
+                 .order_by().values_list('current_owner_id', flat=True),
+                 '엔진오일 교환 예정 차량 (해피콜 배정)'),
+        PlanCase('vehiclemileage:vehicle_history',
+                 lambda: VehicleMileage.objects.filter(vehicle_id=ids['vehicle']).order_by('recorded_on'),
+                 '차량별 주행거리 기록 (다음 정비 예정일 예측)'),
+        PlanCase('servicerequest:created_recent',
+                 lambda: ServiceRequest.objects.filter(created_at__gte=now - timedelta(days=30)).order_by(),
+                 '대시보드 이번 달 서비스 수'),
+        PlanCase('schedule:assignee_range',
+                 lambda: Schedule.objects.filter(
+                     assignee_id=ids['user'], start_datetime__gte=now, start_datetime__lt=now + timedelta(days=7),
+                 ),
+                 '담당자별 주간 일정'),
+        PlanCase('schedule:calendar_range',
+                 lambda: Schedule.objects.filter(
+                     start_datetime__gte=now - timedelta(days=7), end_datetime__lte=now + timedelta(days=35),
+                 ),
+                 '캘린더 이벤트 API'),
+        PlanCase('salesvoucher:date_source',
+                 lambda: SalesVoucher.objects.filter(
+                     sales_date__gte=today.replace(day=1), sales_date__lte=today,
+                     revenue_source__startswith='happy_call_',
+                 ),
+                 '기간별 해피콜 매출 집계'),
+        PlanCase('happycall:stage',
+                 lambda: HappyCall.objects.filter(call_stage='1st_pending').order_by(),
+                 '단계별 해피콜 현황'),
+        PlanCase('happycall:created_range',
+                 lambda: HappyCall.objects.filter(created_at__gte=now - timedelta(days=30)).order_by(),
+                 '팀장 대시보드 기간 집계'),
+    ] + [
+        PlanCase(f'archive:{key}',
+                 lambda spec=spec: spec.model.objects.filter(**{
+                     f'{spec.date_field}__gte': now - timedelta(days=400),
+                     f'{spec.date_field}__lt': now - timedelta(days=370),
+                 }).order_by(),
+                 f'{spec.description} 월별 보관 구간/기간 리포트')
+        for key, spec in ARCHIVES.items()
+    ]
+
+
+def _explain(queryset):
+    """실행 계획 텍스트 (PostgreSQL 은 순차 스캔을 끈 상태)"""
+    if connection.vendor == 'postgresql':
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+            transaction.set_rollback(True)
+        return plan
+    return queryset.explain()
+
+
+def analyse_plan(plan, table, vendor=None):
+    """
+    실행 계획에서 table 의 접근 방식 판정
+
+    (전체 스캔 여부, 사용한 인덱스 이름 목록) 을 돌려준다.
+    """
+    vendor = vendor or connection.vendor
+    if vendor == 'postgresql':
+        full_scan = table in _POSTGRES_SEQ_SCAN.findall(plan)
+        indexes = [index for index, on_table in _POSTGRES_INDEX_SCAN.findall(plan)
+                   if not on_table or on_table == table]
+        return full_scan, indexes
+    full_scan = table in _SQLITE_SCAN.findall(plan)
+    indexes = [index or 'PRIMARY KEY' for searched, index in _SQLITE_SEARCH.findall(plan) if searched == table]
+    return full_scan, indexes
+
+
+def check_plans(cases=None, only=None):
+    """
+    검사 실행
+
+    항목별 {'name', 'table', 'full_scan', 'indexes', 'plan', 'description'} 목록을 돌려준다.
+    지원하지 않는 DB 에서는 NotImplementedError.
+    """
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        raise NotImplementedError(f'{connection.vendor} 실행 계획 검사는 지원하지 않습니다.')
+
+    results = []
+    for case in cases or build_cases():
+        if only and not any(token in case.name for token in only):
+            continue
+        queryset = case.build()
+        table = queryset.model._meta.db_table
+        plan = _explain(queryset)
+        full_scan, indexes = analyse_plan(plan, table)
+        results.append({
+            'name': case.name,
+            'description': case.description,
+            'table': table,
+            'full_scan': full_scan or not indexes,
+            'indexes': indexes,
+            'plan': plan,
+        })
+    return results
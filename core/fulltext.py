@@ -0,0 +1,297 @@
+"""
+메모/피드백/소통 내용 전문 검색
+
+해피콜 의견·단계별 메모, 고객 소통 내용, 고객 메모, 해피콜 거부 사유를 SearchDocument 한 테이블에 모아
+DB 의 전문 검색 색인으로 찾는다. 원본 모델은 FullTextIndexMixin 으로 저장/삭제 때 자기 문서를 갱신하고,
+처음 채우거나 어긋났을 때는 rebuild_search_index 로 다시 만든다.
+
+  - 한국어는 띄어쓰기 단위와 찾는 말이 맞지 않으므로("엔진오일교환" 에서 "오일") 형태소 대신 2-gram 으로 색인한다.
+    ngram_tokens() 가 단어를 글자 두 개씩 겹쳐 잘라 tokens 컬럼에 두고, 검색어도 같은 방식으로 잘라 연속한
+    토큰(구문)으로 찾으므로 단어 중간 일치도 색인으로 찾는다. 한 글자 단어는 색인/검색하지 않는다.
+  - 색인은 DB 별로 tokens 컬럼에 만든다 (core 0003 마이그레이션).
+      SQLite: FTS5 외부 콘텐츠 테이블 core_searchdocument_fts + 트리거 (bm25 순위)
+      PostgreSQL: to_tsvector('simple', tokens) GIN 인덱스 (ts_rank 순위)
+      MySQL: ngram 파서 FULLTEXT 인덱스 (MATCH ... AGAINST 점수)
+    그 밖의 DB 는 tokens LIKE 로 찾는다 (색인 없음, 최근 순).
+  - 관련도 점수는 일치한 문서 중 최근 RANK_WINDOW 건에만 매긴다 (흔한 말도 검색 시간이 일정하다).
+  - 원본이 연쇄 삭제되면(delete() 를 거치지 않음) 문서가 남을 수 있다. 고객이 삭제되면 고객 FK 로 함께 지워지고,
+    나머지는 rebuild_search_index 가 정리한다.
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models import Q
+
+NGRAM = 2
+WORD_PATTERN = re.compile(r'[^\W_]+')
+FTS_TABLE = 'core_searchdocument_fts'
+SEARCH_LIMIT, MAX_SEARCH_LIMIT = 20, 100
+RANK_WINDOW = 2000  # 관련도 점수를 매길 최근 일치 문서 수
+SNIPPET_LENGTH = 80
+TITLE_LENGTH = 200
+
+# 검색 대상: 출처 키 → 모델 (모델은 FullTextIndexMixin 을 쓰고 search_source 가 이 키)
+SOURCES = {
+    'happycall': 'happycall.HappyCall',
+    'rejection': 'happycall.CallRejection',
+    'communication': 'customers.CustomerCommunication',
+    'customer': 'customers.Customer',
+}
+SOURCE_LABELS = {
+    'happycall': '해피콜',
+    'rejection': '해피콜 거부',
+    'communication': '소통이력',
+    'customer': '고객 메모',
+}
+
+
+def _words(text):
+    return WORD_PATTERN.findall((text or '').lower())
+
+
+def _grams(word):
+    return [word[index:index + NGRAM] for index in range(len(word) - NGRAM + 1)]
+
+
+def ngram_tokens(text):
+    """색인용 2-gram 토큰 문자열 (엔진오일 교환 → 엔진 진오 오일 교환)"""
+    return ' '.join(gram for word in _words(text) if len(word) >= NGRAM for gram in _grams(word))
+
+
+def query_terms(query):
+    """검색어 → 단어별 2-gram 목록 (한 글자 단어는 뺀다, 모든 단어가 있어야 찾는다)"""
+    return [_grams(word) for word in _words(query) if len(word) >= NGRAM]
+
+
+class FullTextIndexMixin:
+    """
+    저장/삭제 시 전문 검색 문서를 갱신하는 모델 믹스인
+
+    search_source(SOURCES 키), search_fields(색인할 텍스트 필드), search_document() 를 정한다.
+    update_fields 로 저장하면서 search_fields 를 건드리지 않으면 다시 색인하지 않는다.
+    """
+    search_source = ''
+    search_fields = ()
+    search_related = ()  # 재색인 시 search_document() 가 읽는 관계 (select_related)
+
+    def search_text(self):
+        values = (str(getattr(self, field) or '').strip() for field in self.search_fields)
+        return '\n'.join(value for value in values if value)
+
+    def search_document(self):
+        """(고객 ID, 제목, 기준 일시, URL)"""
+        raise NotImplementedError
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        result = super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(self.search_fields):
+            # 내용 없이 새로 만든 객체는 지울 문서도 없으므로 쿼리를 내지 않는다
+            if not (adding and not self.search_text()):
+                index_objects([self])
+        return result
+
+    def delete(self, *args, **kwargs):
+        pk = self.pk
+        result = super().delete(*args, **kwargs)
+        remove_documents(self.search_source, [pk])
+        return result
+
+
+def _document_values(obj):
+    """객체 → SearchDocument 필드 값 (색인할 내용이 없으면 None)"""
+    body = obj.search_text()
+    tokens = ngram_tokens(body)
+    if not tokens:
+        return None
+    customer_id, title, source_date, url = obj.search_document()
+    return {
+        'customer_id': customer_id,
+        'title': (title or '')[:TITLE_LENGTH],
+        'body': body,
+        'tokens': tokens,
+        'source_date': source_date,
+        'url': url or '',
+    }
+
+
+def index_objects(objects):
+    """원본 객체들의 문서 갱신 (내용이 비면 삭제, 바뀐 것만 저장), 저장한 문서 수 반환"""
+    from .models import SearchDocument
+
+    saved = 0
+    by_source = {}
+    for obj in objects:
+        by_source.setdefault(obj.search_source, []).append(obj)
+    for source, items in by_source.items():
+        documents = [(obj, _document_values(obj)) for obj in items]
+        # 내용이 빈 객체는 조회 없이 삭제만 (메모 없는 고객 저장은 DELETE 한 번)
+        remove_documents(source, [obj.pk for obj, values in documents if values is None])
+        documents = [(obj, values) for obj, values in documents if values is not None]
+        if not documents:
+            continue
+        existing = {
+            row['object_id']: row
+            for row in SearchDocument.objects.filter(source=source, object_id__in=[obj.pk for obj, _ in documents])
+            .values('pk', 'object_id', 'customer_id', 'title', 'body', 'source_date', 'url')
+        }
+        for obj, values in documents:
+            current = existing.get(obj.pk)
+            if current:
+                if all(current[field] == value for field, value in values.items() if field != 'tokens'):
+                    continue
+                SearchDocument.objects.filter(pk=current['pk']).update(**values)
+            else:
+                SearchDocument.objects.create(source=source, object_id=obj.pk, **values)
+            saved += 1
+    return saved
+
+
+def remove_documents(source, object_ids):
+    from .models import SearchDocument
+
+    if object_ids:
+        SearchDocument.objects.filter(source=source, object_id__in=object_ids).delete()
+
+
+def rebuild_source(source, batch_size=2000):
+    """
+    출처 하나의 문서 전체 재생성 (원본 pk 순으로 끊어 지우고 bulk_create), (원본 수, 문서 수) 반환
+
+    원본이 없어진 문서도 함께 지운다.
+    """
+    from .models import SearchDocument
+
+    model = apps.get_model(SOURCES[source])
+    has_text = reduce(or_, (Q(**{f'{field}__gt': ''}) for field in model.search_fields))
+    queryset = model.objects.filter(has_text).select_related(*model.search_related).order_by('pk')
+    checked = created = 0
+    last_pk = 0
+    while True:
+        objects = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        upper = objects[-1].pk if objects else None
+        stale = SearchDocument.objects.filter(source=source, object_id__gt=last_pk)
+        if upper is not None:
+            stale = stale.filter(object_id__lte=upper)
+        documents = []
+        for obj in objects:
+            values = _document_values(obj)
+            if values:
+                documents.append(SearchDocument(source=source, object_id=obj.pk, **values))
+        with transaction.atomic():
+            stale.delete()
+            SearchDocument.objects.bulk_create(documents, batch_size=batch_size)
+        checked += len(objects)
+        created += len(documents)
+        if upper is None:
+            return checked, created
+        last_pk = upper
+
+
+# ===================== 검색 =====================
+
+def _window_search(from_sql, id_sql, match_sql, score_sql, match, source, limit):
+    """
+    색인 일치 문서 중 최근 RANK_WINDOW 건만 점수를 매겨 상위 limit 건 [(문서 id, 점수)]
+
+    흔한 말은 수십만 건이 일치하고 점수 계산은 일치 건수에 비례하므로(1백만 건 중 23만 건 일치 시 0.5초),
+    최근 문서 범위로 자른 뒤 관련도 순으로 정렬한다.
+    """
+    where = match_sql + (' AND d.source = %s' if source else '')
+    where_params = [match] + ([source] if source else [])
+    sql = (f'SELECT {id_sql}, {score_sql} AS score FROM {from_sql} WHERE {where} '
+           f'AND {id_sql} >= (SELECT COALESCE(MIN(w.id), 0) FROM '
+           f'(SELECT {id_sql} AS id FROM {from_sql} WHERE {where} ORDER BY {id_sql} DESC LIMIT %s) w) '
+           f'ORDER BY score DESC, {id_sql} DESC LIMIT %s')
+    params = ([match] if '%s' in score_sql else []) + where_params + where_params + [RANK_WINDOW, limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _sqlite_search(terms, source, limit):
+    # 범위 조건은 FTS 가 바로 쓰도록 f.rowid 로, bm25(rank) 는 작을수록 관련도가 높다
+    return _window_search(
+        f'{FTS_TABLE} f JOIN core_searchdocument d ON d.id = f.rowid', 'f.rowid', f'f.{FTS_TABLE} MATCH %s', '-f.rank',
+        ' AND '.join('"' + ' '.join(grams) + '"' for grams in terms), source, limit)
+
+
+def _postgresql_search(terms, source, limit):
+    return _window_search(
+        'core_searchdocument d', 'd.id', "to_tsvector('simple', d.tokens) @@ to_tsquery('simple', %s)",
+        "ts_rank(to_tsvector('simple', d.tokens), to_tsquery('simple', %s))",
+        ' & '.join('(' + ' <-> '.join(grams) + ')' for grams in terms), source, limit)
+
+
+def _mysql_search(terms, source, limit):
+    return _window_search(
+        'core_searchdocument d', 'd.id', 'MATCH(d.tokens) AGAINST (%s IN BOOLEAN MODE)',
+        'MATCH(d.tokens) AGAINST (%s IN BOOLEAN MODE)',
+        ' '.join('+"' + ' '.join(grams) + '"' for grams in terms), source, limit)
+
+
+def _fallback_search(terms, source, limit):
+    from .models import SearchDocument
+
+    queryset = SearchDocument.objects.all()
+    for grams in terms:
+        queryset = queryset.filter(tokens__contains=' '.join(grams))
+    if source:
+        queryset = queryset.filter(source=source)
+    return [(pk, 0.0) for pk in queryset.order_by('-source_date', '-pk').values_list('pk', flat=True)[:limit]]
+
+
+BACKENDS = {
+    'sqlite': _sqlite_search,
+    'postgresql': _postgresql_search,
+    'mysql': _mysql_search,
+}
+
+
+def snippet(body, terms, length=SNIPPET_LENGTH):
+    """본문에서 처음 일치한 단어 주변 length 글자"""
+    text = ' '.join(body.split())
+    lowered = text.lower()
+    words = [grams[0] + ''.join(gram[-1] for gram in grams[1:]) for grams in terms]
+    found = [position for position in (lowered.find(word) for word in words) if position >= 0]
+    start = max(min(found) - length // 4, 0) if found else 0
+    end = start + length
+    return ('…' if start else '') + text[start:end] + ('…' if end < len(text) else '')
+
+
+def search(query, source=None, limit=SEARCH_LIMIT):
+    """
+    전문 검색 - 관련도 순 결과 dict 목록
+
+    쿼리는 색인 조회 한 번과 문서(고객 이름 포함) 조회 한 번이다.
+    """
+    from .models import SearchDocument
+
+    terms = query_terms(query)
+    if not terms:
+        return []
+    limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
+    ranked = BACKENDS.get(connection.vendor, _fallback_search)(terms, source, limit)
+    documents = SearchDocument.objects.select_related('customer').in_bulk([pk for pk, _ in ranked])
+    results = []
+    for pk, score in ranked:
+        document = documents.get(pk)
+        if document is None:
+            continue
+        results.append({
+            'source': document.source,
+            'source_label': SOURCE_LABELS.get(document.source, document.source),
+            'object_id': document.object_id,
+            'customer_id': document.customer_id,
+            'customer_name': document.customer.name if document.customer else '',
+            'title': document.title,
+            'snippet': snippet(document.body, terms),
+            'date': document.source_date.isoformat() if document.source_date else None,
+            'url': document.url,
+            'score': round(float(score or 0), 4),
+        })
+    return results
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.archive import ARCHIVE_BATCH_SIZE, ARCHIVES, archive_cutoff, archive_source, table_size
+from datetime import timedelta
+import statistics
+import time
+
+
+class Command(BaseCommand):
+    help = '보관 기간이 지난 SMS/매출 회복/콜 실패/소통 이력을 월별 압축 파일로 옮기고 운영 테이블 크기와 조회 시간 비교'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=list(ARCHIVES), default=None, help='한 대상만 보관')
+        parser.add_argument('--retention-days', type=int, default=None,
+                            help='운영 테이블에 남길 기간 (기본 ARCHIVE_RETENTION_DAYS)')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='한 번에 읽고 지울 행 수')
+        parser.add_argument('--dry-run', action='store_true', help='옮기지 않고 월별 대상 행 수만 출력')
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['retention_days'])
+        self.stdout.write(f'보관 기준: {timezone.localtime(cutoff):%Y-%m-%d %H:%M} 이전')
+        keys = [options['only']] if options['only'] else list(ARCHIVES)
+        for key in keys:
+            spec = ARCHIVES[key]
+            before = self._measure(spec)
+            started = time.perf_counter()
+            months = archive_source(key, cutoff, options['batch_size'], dry_run=options['dry_run'])
+            elapsed = time.perf_counter() - started
+            moved = sum(count for _, count in months)
+            action = '대상' if options['dry_run'] else '보관'
+            self.stdout.write(f'  ✓ {key:<26} {len(months)}개월 {moved:,}건 {action} ({elapsed:.2f}초)')
+            for month, count in months:
+                self.stdout.write(f'      {month:%Y-%m} {count:>10,}건')
+            if moved and not options['dry_run']:
+                after = self._measure(spec)
+                self.stdout.write(f'      행 {before["rows"]:,} → {after["rows"]:,}, '
+                                  f'크기 {self._size(before["bytes"])} → {self._size(after["bytes"])}, '
+                                  f'최근 30일 조회 {before["ms"]:.1f}ms → {after["ms"]:.1f}ms')
+        self.stdout.write(self.style.SUCCESS('확인 완료' if options['dry_run'] else '보관 완료'))
+
+    def _measure(self, spec, repeat=5):
+        # 화면/리포트의 흔한 조회: 최근 30일 건수 + 최근 50건
+        rows, size = table_size(spec.model)
+        recent = spec.model._default_manager.filter(
+            **{f'{spec.date_field}__gte': timezone.now() - timedelta(days=30)})
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            recent.count()
+            list(recent.order_by(f'-{spec.date_field}').values_list('pk', flat=True)[:50])
+            timings.append((time.perf_counter() - started) * 1000)
+        return {'rows': rows, 'bytes': size, 'ms': statistics.median(timings)}
+
+    def _size(self, size):
+        return '-' if size is None else f'{size / 1024 / 1024:.1f}MB'
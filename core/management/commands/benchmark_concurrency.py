@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from core.concurrency import PROFILES, run_concurrency_benchmark
+from core.dbtuning import current_sqlite_settings, sqlite_profile
+
+
+class Command(BaseCommand):
+    help = '해피콜 상담원 N 명 동시 읽기/쓰기 처리량 벤치마크 (SQLite 는 기존/운영 프로필 비교)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--agents', type=int, default=8, help='동시 상담원 수 (기본: 8)')
+        parser.add_argument('--seconds', type=float, default=10.0, help='프로필별 실행 시간(초) (기본: 10)')
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='저장 요청 비율 (기본: 0.2)')
+        parser.add_argument('--upload-rows', type=int, default=500,
+                            help='동시에 반복할 업로드 트랜잭션의 고객 수 (0 이면 업로드 없음)')
+        parser.add_argument('--upload-interval', type=float, default=1.0, help='업로드 반복 간격(초) (기본: 1)')
+        parser.add_argument('--profile', choices=['both', *PROFILES], default='both',
+                            help='SQLite PRAGMA 프로필 (기본: 둘 다 실행해 비교)')
+
+    def handle(self, *args, **options):
+        if options['agents'] < 1:
+            raise CommandError('상담원 수는 1 이상이어야 합니다.')
+
+        if connection.vendor != 'sqlite':
+            self._run('current', options)
+            return
+
+        profiles = list(PROFILES) if options['profile'] == 'both' else [options['profile']]
+        for name in profiles:
+            profile = PROFILES[name]
+            pragmas = profile['pragmas'] if profile['pragmas'] is not None else settings.SQLITE_PRAGMAS
+            with sqlite_profile(pragmas, profile['transaction_mode']):
+                applied = current_sqlite_settings()
+                self.stdout.write(f"[{name}] journal_mode={applied['journal_mode']} "
+                                  f"synchronous={applied['synchronous']} busy_timeout={applied['busy_timeout']} "
+                                  f"transaction_mode={profile['transaction_mode'] or 'DEFERRED'}")
+                self._run(name, options)
+
+    def _run(self, name, options):
+        try:
+            result = run_concurrency_benchmark(
+                agents=options['agents'], seconds=options['seconds'],
+                write_ratio=options['write_ratio'], upload_rows=options['upload_rows'],
+                upload_interval=options['upload_interval'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        read, write = result['read_latency'], result['write_latency']
+        self.stdout.write(
+            f"  읽기 {result['reads_per_sec']:>8.1f}/초 (중앙값 {read['median_ms']}ms, p95 {read['p95_ms']}ms)\n"
+            f"  쓰기 {result['writes_per_sec']:>8.1f}/초 (중앙값 {write['median_ms']}ms, p95 {write['p95_ms']}ms)\n"
+            f"  업로드 {result['uploads']}회, 잠금 오류 상담원 {result['locked_errors']}건 / "
+            f"업로드 {result['upload_locked_errors']}건, 기타 오류 {result['other_errors']}건"
+        )
+        style = self.style.SUCCESS if not result['locked_errors'] else self.style.WARNING
+        self.stdout.write(style(f'[{name}] 완료'))
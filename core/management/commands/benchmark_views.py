@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.benchmarks import compare_reports, run_benchmarks
+from pathlib import Path
+import json
+
+
+class Command(BaseCommand):
+    help = '주요 화면/API 응답 시간·쿼리 수 벤치마크 후 JSON 리포트 저장 (이전 리포트와 비교 가능)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=5, help='항목별 반복 횟수 (기본: 5)')
+        parser.add_argument('--warmup', type=int, default=1, help='측정 전 예열 횟수 (기본: 1)')
+        parser.add_argument('--only', nargs='+', default=None, help='이름에 해당 문자열이 포함된 항목만 실행')
+        parser.add_argument('--upload-rows', type=int, default=200, help='업로드 벤치마크 행 수 (0 이면 생략)')
+        parser.add_argument('--user', default=None, help='요청 사용자 아이디 (기본: 첫 관리자)')
+        parser.add_argument('--output', default=None,
+                            help='리포트 경로 (기본: benchmarks/benchmark-YYYYmmdd-HHMMSS.json)')
+        parser.add_argument('--compare', default=None, help='비교할 이전 리포트 경로')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='회귀로 판단할 중앙값 증가율(%%) (기본: 20)')
+        parser.add_argument('--fail-on-regression', action='store_true', help='회귀가 있으면 오류로 종료')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('id').first()
+        if user is None:
+            raise CommandError('벤치마크를 실행할 사용자를 찾을 수 없습니다.')
+
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text(encoding='utf-8'))
+            except (OSError, ValueError) as e:
+                raise CommandError(f"비교 리포트를 읽을 수 없습니다: {e}")
+
+        def progress(name, result):
+            self.stdout.write(
+                f"  {name:<36} 중앙값 {result['median_ms']:>9.1f}ms  p95 {result['p95_ms']:>9.1f}ms  "
+                f"쿼리 {result['queries']:>4}  상태 {','.join(str(s) for s in result['status'])}"
+            )
+
+        report = run_benchmarks(
+            user, iterations=max(options['iterations'], 1), warmup=max(options['warmup'], 0),
+            only=options['only'], upload_rows=options['upload_rows'], progress=progress,
+        )
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmarks' /
+                      f"benchmark-{timezone.localtime():%Y%m%d-%H%M%S}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        self.stdout.write(self.style.SUCCESS(f'리포트 저장: {output}'))
+
+        if baseline is None:
+            return
+
+        rows = compare_reports(baseline, report, threshold=options['threshold'])
+        regressions = [row for row in rows if row['status'] == 'regressed']
+        for row in rows:
+            if row['status'] == 'new':
+                self.stdout.write(f"  {row['name']:<36} 신규 항목")
+                continue
+            line = (f"  {row['name']:<36} {row['baseline_ms']:>9.1f} → {row['median_ms']:>9.1f}ms "
+                    f"({row['change_pct']:+.1f}%)  쿼리 {row['baseline_queries']} → {row['queries']}")
+            if row['status'] == 'regressed':
+                self.stdout.write(self.style.ERROR(line))
+            elif row['status'] == 'improved':
+                self.stdout.write(self.style.SUCCESS(line))
+            else:
+                self.stdout.write(line)
+
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f'성능 회귀 {len(regressions)}건')
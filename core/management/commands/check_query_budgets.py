@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from core.benchmarks import ALL_CACHE_TAGS, _client_host, build_cases
+from core.cache import invalidate
+from core.querybudget import (QueryBudgetExceeded, clear_last_report, get_last_report, override_mode,
+                              registry)
+import logging
+
+
+class Command(BaseCommand):
+    help = '주요 화면을 한 번씩 호출해 쿼리 예산 초과/N+1 반복 쿼리 검사 (CI 용, 위반 시 오류 종료)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', nargs='+', default=None, help='이름에 해당 문자열이 포함된 항목만 검사')
+        parser.add_argument('--user', default=None, help='요청 사용자 아이디 (기본: 첫 관리자)')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('id').first()
+        if user is None:
+            raise CommandError('검사를 실행할 사용자를 찾을 수 없습니다.')
+
+        # 위반 예외는 테스트 클라이언트가 그대로 다시 던진다 (django.request 의 중복 오류 로그는 숨김)
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        client = Client(HTTP_HOST=_client_host())
+        client.force_login(user)
+        failures = []
+        checked = set()
+
+        # 업로드 항목은 뷰가 아니므로 제외
+        for case in build_cases(upload_rows=0):
+            if options['only'] and not any(token in case.name for token in options['only']):
+                continue
+            if case.cold:
+                invalidate(*ALL_CACHE_TAGS)
+            clear_last_report()
+            try:
+                with override_mode('raise'):
+                    status, _ = case.run(client, user)
+            except QueryBudgetExceeded as e:
+                failures.append(case.name)
+                checked.add(e.report.name)
+                self.stdout.write(self.style.ERROR(f'  ✗ {case.name}\n{e.report}'))
+                continue
+
+            report = get_last_report()
+            if report is None:
+                self.stdout.write(self.style.WARNING(f'  - {case.name}: 예산 미선언 (상태 {status})'))
+                continue
+            checked.add(report.name)
+            self.stdout.write(
+                f'  ✓ {case.name:<36} 쿼리 {report.query_count:>4} / 예산 {report.max_queries}  (상태 {status})'
+            )
+
+        unchecked = sorted(set(registry) - checked)
+        if unchecked and not options['only']:
+            self.stdout.write(f"예산이 선언되었지만 검사 항목이 없는 뷰: {', '.join(unchecked)}")
+
+        if failures:
+            raise CommandError(f"쿼리 예산 위반 {len(failures)}건: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('쿼리 예산 검사 통과'))
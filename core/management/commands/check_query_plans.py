@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.explain import check_plans
+
+
+class Command(BaseCommand):
+    help = '주요 조회 쿼리의 실행 계획(EXPLAIN) 검사 - 인덱스 없이 전체 스캔하면 오류 종료 (CI 용)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', nargs='+', default=None, help='이름에 해당 문자열이 포함된 항목만 검사')
+        parser.add_argument('--show-plan', action='store_true', help='항목별 실행 계획 전체 출력')
+
+    def handle(self, *args, **options):
+        try:
+            results = check_plans(only=options['only'])
+        except NotImplementedError as e:
+            raise CommandError(str(e))
+
+        failures = []
+        for result in results:
+            if result['full_scan']:
+                failures.append(result['name'])
+                self.stdout.write(self.style.ERROR(
+                    f"  ✗ {result['name']:<36} {result['table']} 전체 스캔  ({result['description']})"))
+            else:
+                self.stdout.write(
+                    f"  ✓ {result['name']:<36} {', '.join(result['indexes'])}")
+            if options['show_plan'] or result['full_scan']:
+                self.stdout.write('\n'.join(f'      {line}' for line in result['plan'].splitlines()))
+
+        if failures:
+            raise CommandError(f"인덱스를 쓰지 않는 조회 {len(failures)}건: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f'실행 계획 검사 통과 ({len(results)}건)'))
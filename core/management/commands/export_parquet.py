@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from core.parquet_export import DATASETS, EXPORT_BATCH_SIZE, HAS_PYARROW, export_dataset, export_dir
+import time
+
+
+class Command(BaseCommand):
+    help = '고객/차량/서비스/해피콜/매출을 분석용 Parquet 월 파티션 파일로 내보내기 (두 번째부터 updated_at 기준 증분)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=list(DATASETS), nargs='+', default=None, help='이 대상만 내보냄')
+        parser.add_argument('--full', action='store_true', help='증분 기준을 무시하고 전체를 다시 내보냄 (기존 파일 교체)')
+        parser.add_argument('--batch-size', type=int, default=EXPORT_BATCH_SIZE, help='한 번에 읽어 쓸 행 수')
+
+    def handle(self, *args, **options):
+        if not HAS_PYARROW:
+            raise CommandError('pyarrow 가 설치되어 있지 않습니다 (pip install pyarrow).')
+        self.stdout.write(f'내보내기 위치: {export_dir()}')
+        for key in options['only'] or list(DATASETS):
+            started = time.perf_counter()
+            result = export_dataset(key, full=options['full'], batch_size=options['batch_size'])
+            elapsed = time.perf_counter() - started
+            mode = '전체' if result['mode'] == 'full' else f"증분 ({timezone.localtime(result['since']):%Y-%m-%d %H:%M} 이후)"
+            self.stdout.write(f"  ✓ {key:<11} {mode} {result['rows']:,}행, {len(result['months'])}개월 "
+                              f"({elapsed:.2f}초, {result['rows'] / elapsed if elapsed else 0:,.0f}행/초)")
+        self.stdout.write(self.style.SUCCESS('내보내기 완료'))
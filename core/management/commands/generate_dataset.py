@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounting.closing import reopen_periods_from
+from accounting.journal import rebuild_journal
+from core.cache import invalidate
+from core.synthetic import (SCALES, SyntheticDataGenerator, flush_synthetic_data, has_synthetic_data)
+from datetime import timedelta
+import time
+
+
+class Command(BaseCommand):
+    help = '벤치마크용 대용량 합성 데이터 생성 (고객 10k/100k/1m 규모, 같은 seed 면 같은 데이터)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='10k', help='고객 수 규모 (기본: 10k)')
+        parser.add_argument('--customers', type=int, default=None, help='고객 수 직접 지정 (--scale 대신)')
+        parser.add_argument('--seed', type=int, default=42, help='난수 시드 (기본: 42)')
+        parser.add_argument('--batch-size', type=int, default=2000, help='bulk_create 배치 크기')
+        parser.add_argument('--flush', action='store_true', help='기존 합성 데이터를 지우고 다시 생성')
+        parser.add_argument('--flush-only', action='store_true', help='합성 데이터 삭제만 수행')
+        parser.add_argument('--post-journal', action='store_true',
+                            help='생성 후 전체 전표 분개 재전기 (대규모에서는 오래 걸림)')
+
+    def handle(self, *args, **options):
+        if options['flush'] or options['flush_only']:
+            started = time.perf_counter()
+            deleted = flush_synthetic_data()
+            summary = ', '.join(f'{name} {count:,}' for name, count in deleted.items())
+            self.stdout.write(self.style.WARNING(
+                f'합성 데이터 삭제: {summary} ({time.perf_counter() - started:.1f}초)'))
+            if deleted['journal_entries'] and not options['flush_only']:
+                options['post_journal'] = True
+            elif deleted['journal_entries']:
+                self.stdout.write('삭제된 전표의 분개가 남아 있습니다. post_voucher_journal --rebuild 를 실행하세요.')
+            if options['flush_only']:
+                invalidate('customers', 'services', 'happycalls', 'employees', 'schedules', 'accounting')
+                return
+        elif has_synthetic_data():
+            raise CommandError('이미 합성 데이터가 있습니다. --flush 로 지운 뒤 다시 생성하세요.')
+
+        customers = options['customers'] or SCALES[options['scale']]
+        if customers <= 0:
+            raise CommandError('고객 수는 1 이상이어야 합니다.')
+
+        self.stdout.write(f"합성 데이터 생성 시작: 고객 {customers:,}명 (seed={options['seed']})")
+        generator = SyntheticDataGenerator(customers, seed=options['seed'], batch_size=options['batch_size'])
+        started = time.perf_counter()
+        last_report = [0]
+
+        def progress(done, total):
+            # 약 5% 마다 진행 상황 출력
+            if done - last_report[0] >= max(total // 20, 1) or done == total:
+                last_report[0] = done
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f'  {done:,}/{total:,}명 ({elapsed:.1f}초)')
+
+        counts = generator.run(progress=progress)
+        elapsed = time.perf_counter() - started
+        for label, count in counts.items():
+            self.stdout.write(f'  {label}: {count:,}건')
+
+        # bulk_create 는 save() 를 거치지 않으므로 후처리를 한 번에 수행
+        reopen_periods_from(generator.today - timedelta(days=generator.history_days))
+        invalidate('customers', 'services', 'happycalls', 'employees', 'schedules', 'accounting')
+        if options['post_journal']:
+            journal_started = time.perf_counter()
+            posted = rebuild_journal()
+            self.stdout.write(f'  분개 재전기: 전표 {posted:,}건 ({time.perf_counter() - journal_started:.1f}초)')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'합성 데이터 생성 완료: {sum(counts.values()):,}건 ({elapsed:.1f}초)'))
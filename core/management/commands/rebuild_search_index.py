@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from core.fulltext import SOURCES, rebuild_source
+import time
+
+
+class Command(BaseCommand):
+    help = '메모/피드백/소통 내용 전문 검색 문서 다시 만들기 (원본이 없어진 문서도 정리)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=sorted(SOURCES), default=None, help='한 종류만 다시 만듦')
+        parser.add_argument('--batch-size', type=int, default=2000, help='한 번에 읽고 저장할 원본 수')
+
+    def handle(self, *args, **options):
+        sources = [options['only']] if options['only'] else sorted(SOURCES)
+        for source in sources:
+            started = time.perf_counter()
+            checked, created = rebuild_source(source, options['batch_size'])
+            self.stdout.write(f'  ✓ {source:<14} {checked:>10,}건 확인, 문서 {created:,}건 '
+                              f'({time.perf_counter() - started:.2f}초)')
+        self.stdout.write(self.style.SUCCESS('색인 완료'))
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from core.dbrouting import REPORTING_ALIAS, reporting_configured
+from pathlib import Path
+import sqlite3
+import time
+
+
+class Command(BaseCommand):
+    help = "리포트용 SQLite 복제본(DATABASES['reporting'])을 default DB 로 덮어써 동기화 (로컬/단일 서버용)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=None,
+                            help='지정하면 이 간격(초)마다 계속 동기화 (Ctrl+C 로 종료)')
+
+    def handle(self, *args, **options):
+        if not reporting_configured():
+            raise CommandError('reporting DB 가 설정되지 않았습니다. REPORTING_DB_NAME 을 지정하세요.')
+        source, target = connections['default'], connections[REPORTING_ALIAS]
+        if source.vendor != 'sqlite' or target.vendor != 'sqlite':
+            raise CommandError('SQLite 끼리만 복사할 수 있습니다. 다른 DB 는 DB 서버의 복제 기능을 사용하세요.')
+        if source.is_in_memory_db() or target.is_in_memory_db():
+            raise CommandError('메모리 DB 는 동기화할 수 없습니다.')
+
+        source_path = str(source.settings_dict['NAME'])
+        target_path = str(target.settings_dict['NAME'])
+        if Path(source_path).resolve() == Path(target_path).resolve():
+            raise CommandError('default 와 reporting 이 같은 파일입니다.')
+
+        while True:
+            started = time.perf_counter()
+            self._copy(source_path, target_path)
+            self.stdout.write(self.style.SUCCESS(
+                f'{source_path} → {target_path} 동기화 ({time.perf_counter() - started:.2f}초)'))
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
+
+    def _copy(self, source_path, target_path):
+        # 열린 reporting 연결을 닫고 SQLite 온라인 백업으로 일관된 시점의 사본을 만든다
+        # (WAL 이면 복사 중에도 default 쓰기는 막히지 않음)
+        connections[REPORTING_ALIAS].close()
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
@@ -0,0 +1,287 @@
+"""
+뷰별 요청 성능 계측
+
+미들웨어가 요청마다 DB execute wrapper 를 걸어 쿼리 수, SQL 시간, 중복 쿼리 수를 세고,
+응답 시간과 함께 프로세스 메모리의 뷰별 히스토그램에 누적한다.
+누적값은 REQUEST_METRICS_FLUSH_INTERVAL(초) 마다 백그라운드 스레드가 RequestMetric 에 한 행씩 저장하며,
+여러 워커가 같은 구간을 저장해도 리포트에서 뷰별로 합산한다.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# 히스토그램 버킷 상한 (마지막 버킷은 그 이상 전부)
+LATENCY_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)  # ms
+QUERY_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500)  # 건
+SLOW_QUERY_LIMIT = 5  # 뷰별로 보관할 느린 SQL 수
+SQL_MAX_LENGTH = 2000
+
+_lock = threading.Lock()
+_stats = {}
+_period_start = timezone.now()
+_last_flush = time.monotonic()
+_flushing = threading.Lock()
+
+
+def _bucket_index(buckets, value):
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            return index
+    return len(buckets)
+
+
+def percentile_from_histogram(histogram, buckets, fraction):
+    """히스토그램에서 백분위 근사값 (해당 버킷 상한) 계산"""
+    total = sum(histogram)
+    if not total:
+        return 0
+    threshold = total * fraction
+    cumulative = 0
+    for index, count in enumerate(histogram):
+        cumulative += count
+        if cumulative >= threshold:
+            return buckets[index] if index < len(buckets) else float('inf')
+    return float('inf')
+
+
+class QueryRecorder:
+    """connection.execute_wrapper 용 쿼리 계측기 (요청 한 건 동안 사용)"""
+
+    def __init__(self):
+        self.count = 0
+        self.sql_ms = 0.0
+        self.templates = Counter()
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.sql_ms += elapsed
+            # 파라미터가 분리된 SQL 문자열 자체가 정규화된 형태 (N+1 은 같은 문장이 반복됨)
+            self.templates[sql] += 1
+            self._keep_slowest(sql, elapsed)
+
+    def _keep_slowest(self, sql, elapsed):
+        if len(self.slowest) < SLOW_QUERY_LIMIT or elapsed > self.slowest[-1][0]:
+            self.slowest.append((elapsed, sql))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOW_QUERY_LIMIT:]
+
+    @property
+    def duplicate_count(self):
+        return sum(count - 1 for count in self.templates.values() if count > 1)
+
+    def record(self):
+        """모든 DB 연결에 계측기를 건 컨텍스트 반환"""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+class EndpointStats:
+    """한 뷰의 누적 통계"""
+
+    __slots__ = ('request_count', 'error_count', 'total_ms', 'max_ms', 'query_count', 'max_queries',
+                 'sql_ms', 'duplicate_count', 'latency_histogram', 'query_histogram', 'slow_queries')
+
+    def __init__(self):
+        self.request_count = 0
+        self.error_count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.query_count = 0
+        self.max_queries = 0
+        self.sql_ms = 0.0
+        self.duplicate_count = 0
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.query_histogram = [0] * (len(QUERY_BUCKETS) + 1)
+        self.slow_queries = []
+
+    def add(self, elapsed_ms, status_code, recorder):
+        self.request_count += 1
+        if status_code >= 500:
+            self.error_count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.query_count += recorder.count
+        self.max_queries = max(self.max_queries, recorder.count)
+        self.sql_ms += recorder.sql_ms
+        self.duplicate_count += recorder.duplicate_count
+        self.latency_histogram[_bucket_index(LATENCY_BUCKETS, elapsed_ms)] += 1
+        self.query_histogram[_bucket_index(QUERY_BUCKETS, recorder.count)] += 1
+        if recorder.slowest:
+            merged = self.slow_queries + [(ms, sql[:SQL_MAX_LENGTH]) for ms, sql in recorder.slowest]
+            merged.sort(key=lambda item: item[0], reverse=True)
+            self.slow_queries = merged[:SLOW_QUERY_LIMIT]
+
+
+def endpoint_name(request):
+    """URL 이름(app:name) 기준 뷰 식별자, 해석 실패 시 '<unresolved>'"""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name or match._func_path
+
+
+def record_request(name, method, elapsed_ms, status_code, recorder):
+    """요청 한 건의 계측 결과를 누적하고, 주기가 지났으면 백그라운드 저장"""
+    key = (name, method)
+    with _lock:
+        stats = _stats.get(key)
+        if stats is None:
+            stats = _stats[key] = EndpointStats()
+        stats.add(elapsed_ms, status_code, recorder)
+    interval = getattr(settings, 'REQUEST_METRICS_FLUSH_INTERVAL', 60)
+    if time.monotonic() - _last_flush >= interval:
+        threading.Thread(target=_flush_in_background, name='request-metrics-flush', daemon=True).start()
+
+
+def _flush_in_background():
+    try:
+        flush()
+    finally:
+        connections.close_all()
+
+
+def _swap():
+    global _stats, _period_start, _last_flush
+    with _lock:
+        stats, period_start = _stats, _period_start
+        _stats = {}
+        _period_start = timezone.now()
+        _last_flush = time.monotonic()
+    return stats, period_start
+
+
+def flush():
+    """누적 통계를 RequestMetric 에 저장 (동시에 한 스레드만 수행)"""
+    if not _flushing.acquire(blocking=False):
+        return 0
+    try:
+        stats, period_start = _swap()
+        if not stats:
+            return 0
+        from .models import RequestMetric
+
+        period_end = timezone.now()
+        rows = [
+            RequestMetric(
+                period_start=period_start,
+                period_end=period_end,
+                view_name=name[:200],
+                method=method[:10],
+                request_count=item.request_count,
+                error_count=item.error_count,
+                total_ms=item.total_ms,
+                max_ms=item.max_ms,
+                query_count=item.query_count,
+                max_queries=item.max_queries,
+                sql_ms=item.sql_ms,
+                duplicate_count=item.duplicate_count,
+                latency_histogram=item.latency_histogram,
+                query_histogram=item.query_histogram,
+                slow_queries=[{'ms': round(ms, 2), 'sql': sql} for ms, sql in item.slow_queries],
+            )
+            for (name, method), item in stats.items()
+        ]
+        try:
+            RequestMetric.objects.bulk_create(rows)
+        except Exception as e:
+            logger.error(f"요청 성능 통계 저장 실패 ({len(rows)}건): {e}")
+            return 0
+        return len(rows)
+    finally:
+        _flushing.release()
+
+
+REPORT_ORDERINGS = {
+    'total': 'total_ms',
+    'p95': 'p95_ms',
+    'avg': 'avg_ms',
+    'queries': 'avg_queries',
+    'duplicates': 'duplicate_count',
+    'sql': 'sql_ms',
+}
+
+
+def build_report(since, order='total', limit=50):
+    """
+    since 이후 저장된 RequestMetric 을 뷰별로 합산한 리포트
+
+    히스토그램은 버킷별로 더한 뒤 p50/p95 를 근사하고, 느린 SQL 은 뷰별 상위만 남긴다.
+    """
+    from .models import RequestMetric
+
+    merged = {}
+    rows = RequestMetric.objects.filter(period_end__gte=since).values_list(
+        'view_name', 'method', 'request_count', 'error_count', 'total_ms', 'max_ms', 'query_count',
+        'max_queries', 'sql_ms', 'duplicate_count', 'latency_histogram', 'query_histogram', 'slow_queries',
+    )
+    for (view_name, method, request_count, error_count, total_ms, max_ms, query_count, max_queries,
+         sql_ms, duplicate_count, latency_histogram, query_histogram, slow_queries) in rows.iterator():
+        item = merged.get((view_name, method))
+        if item is None:
+            item = merged[(view_name, method)] = {
+                'view_name': view_name, 'method': method, 'request_count': 0, 'error_count': 0,
+                'total_ms': 0.0, 'max_ms': 0.0, 'query_count': 0, 'max_queries': 0, 'sql_ms': 0.0,
+                'duplicate_count': 0, 'latency_histogram': [0] * (len(LATENCY_BUCKETS) + 1),
+                'query_histogram': [0] * (len(QUERY_BUCKETS) + 1), 'slow_queries': [],
+            }
+        item['request_count'] += request_count
+        item['error_count'] += error_count
+        item['total_ms'] += total_ms
+        item['max_ms'] = max(item['max_ms'], max_ms)
+        item['query_count'] += query_count
+        item['max_queries'] = max(item['max_queries'], max_queries)
+        item['sql_ms'] += sql_ms
+        item['duplicate_count'] += duplicate_count
+        # 버킷 구성이 바뀐 과거 행은 분포 합산에서 제외
+        if len(latency_histogram) == len(item['latency_histogram']):
+            item['latency_histogram'] = [a + b for a, b in zip(item['latency_histogram'], latency_histogram)]
+        if len(query_histogram) == len(item['query_histogram']):
+            item['query_histogram'] = [a + b for a, b in zip(item['query_histogram'], query_histogram)]
+        if slow_queries:
+            item['slow_queries'] = sorted(item['slow_queries'] + slow_queries,
+                                          key=lambda query: query['ms'], reverse=True)[:SLOW_QUERY_LIMIT]
+
+    report = []
+    for item in merged.values():
+        count = item['request_count'] or 1
+        item['avg_ms'] = item['total_ms'] / count
+        item['avg_queries'] = item['query_count'] / count
+        item['avg_sql_ms'] = item['sql_ms'] / count
+        item['p50_ms'] = percentile_from_histogram(item['latency_histogram'], LATENCY_BUCKETS, 0.5)
+        item['p95_ms'] = percentile_from_histogram(item['latency_histogram'], LATENCY_BUCKETS, 0.95)
+        item['latency_buckets'] = list(zip(bucket_labels(LATENCY_BUCKETS, 'ms'), item['latency_histogram']))
+        report.append(item)
+
+    sort_key = REPORT_ORDERINGS.get(order, 'total_ms')
+    report.sort(key=lambda item: item[sort_key], reverse=True)
+    return report[:limit]
+
+
+def bucket_labels(buckets, unit):
+    """히스토그램 버킷 표시용 라벨 ('≤10ms', ..., '>5000ms')"""
+    return [f'≤{bound}{unit}' for bound in buckets] + [f'>{buckets[-1]}{unit}']
+
+
+@atexit.register
+def _shutdown():
+    try:
+        flush()
+    except Exception:
+        pass
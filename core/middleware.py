@@ -1,42 +1,37 @@
 import logging
-import re
+import time
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
-from django.http import JsonResponse
 from django.contrib.auth.models import AnonymousUser
+from .phone_audit import begin_request, end_request, enqueue
+from . import metrics
 
 logger = logging.getLogger('phone_access')
 
 class AdminPhoneAccessLogMiddleware(MiddlewareMixin):
     """
-    관리자의 전화번호 접근을 로깅하는 미들웨어
+    전화번호 원본 노출을 요청 단위로 감사 기록하는 미들웨어
+
+    노출은 원본 번호를 만드는 곳(Customer.get_phone_for_user / to_dict / 템플릿·관리자·폼의 phone 접근)에서
+    요청 버퍼에 기록되고, 여기서는 응답 시 버퍼를 큐에 넘기기만 한다.
+    응답 본문은 읽지 않으므로 스트리밍 응답에도 영향이 없다.
     """
     
+    def process_request(self, request):
+        request._phone_access_token = begin_request()
+    
     def process_response(self, request, response):
-        # 관리자가 아니거나 익명 사용자면 로깅하지 않음
-        if isinstance(request.user, AnonymousUser) or not request.user.is_staff:
-            return response
-            
-        # 응답이 HTML이거나 JSON인 경우에만 체크
-        content_type = response.get('Content-Type', '')
-        if not ('text/html' in content_type or 'application/json' in content_type):
+        token = getattr(request, '_phone_access_token', None)
+        if token is None:
             return response
-            
-        # 전화번호 패턴 검색 (한국 전화번호 형식)
-        phone_pattern = r'0\d{1,2}-?\d{3,4}-?\d{4}'
         
         try:
-            if hasattr(response, 'content'):
-                content = response.content.decode('utf-8', errors='ignore')
-                phones = re.findall(phone_pattern, content)
-                
-                if phones:
-                    logger.info(
-                        f"Phone access by admin - User: {request.user.username} "
-                        f"({request.user.get_full_name()}) | "
-                        f"URL: {request.get_full_path()} | "
-                        f"IP: {self._get_client_ip(request)} | "
-                        f"Phone count: {len(phones)}"
-                    )
+            buffer = end_request(token)
+            if buffer is not None and buffer.count:
+                user = getattr(request, 'user', None)
+                if isinstance(user, AnonymousUser):
+                    user = None
+                enqueue(buffer, user, request.get_full_path(), request.method, self._get_client_ip(request))
         except Exception as e:
             # 로깅 실패해도 응답은 정상 반환
             logger.error(f"Error in phone access logging: {e}")
@@ -61,4 +56,37 @@ class PhoneSecurityMiddleware(MiddlewareMixin):
     def process_request(self, request):
         # 현재는 특별한 보안 처리 없음
         # 필요시 IP 제한, 접근 빈도 제한 등 구현 가능
-        return None
\ No newline at end of file
+        return None
+
+
+class RequestMetricsMiddleware:
+    """
+    뷰별 응답 시간·쿼리 수·SQL 시간·중복 쿼리 계측 미들웨어
+
+    요청 동안 모든 DB 연결에 execute wrapper 를 걸고, 결과는 프로세스 메모리에
+    누적했다가 주기적으로 RequestMetric 에 저장한다 (core.metrics 참고).
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_METRICS_ENABLED', True)
+    
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        
+        recorder = metrics.QueryRecorder()
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            with recorder.record():
+                response = self.get_response(request)
+            status_code = response.status_code
+            return response
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            try:
+                metrics.record_request(metrics.endpoint_name(request), request.method,
+                                       elapsed_ms, status_code, recorder)
+            except Exception as e:
+                logger.error(f"Error in request metrics: {e}")
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 05:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PhoneAccessLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(blank=True, max_length=150, verbose_name='사용자명')),
+                ('path', models.CharField(blank=True, max_length=500, verbose_name='요청 경로')),
+                ('method', models.CharField(blank=True, max_length=10, verbose_name='요청 방식')),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True, verbose_name='IP 주소')),
+                ('sources', models.CharField(blank=True, help_text='get_phone_for_user, to_dict, template 등', max_length=200, verbose_name='노출 경로')),
+                ('phone_count', models.PositiveIntegerField(default=0, verbose_name='노출 건수')),
+                ('customer_ids', models.JSONField(blank=True, default=list, help_text='노출된 고객 ID (최대 500건)', verbose_name='고객 ID')),
+                ('accessed_at', models.DateTimeField(db_index=True, verbose_name='접근 시각')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='phone_access_logs', to=settings.AUTH_USER_MODEL, verbose_name='사용자')),
+            ],
+            options={
+                'verbose_name': '전화번호 접근 기록',
+                'verbose_name_plural': '전화번호 접근 기록들',
+                'ordering': ['-accessed_at'],
+                'indexes': [models.Index(fields=['user', '-accessed_at'], name='core_phonea_user_id_02e369_idx')],
+            },
+        ),
+    ]
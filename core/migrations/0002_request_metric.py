@@ -0,0 +1,40 @@
+# Generated by Django 5.2.5 on 2026-10-19 05:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_phone_access_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateTimeField(verbose_name='집계 시작')),
+                ('period_end', models.DateTimeField(db_index=True, verbose_name='집계 종료')),
+                ('view_name', models.CharField(max_length=200, verbose_name='뷰')),
+                ('method', models.CharField(max_length=10, verbose_name='요청 방식')),
+                ('request_count', models.PositiveIntegerField(default=0, verbose_name='요청 수')),
+                ('error_count', models.PositiveIntegerField(default=0, help_text='5xx 응답', verbose_name='오류 수')),
+                ('total_ms', models.FloatField(default=0, verbose_name='총 응답 시간(ms)')),
+                ('max_ms', models.FloatField(default=0, verbose_name='최대 응답 시간(ms)')),
+                ('query_count', models.PositiveIntegerField(default=0, verbose_name='총 쿼리 수')),
+                ('max_queries', models.PositiveIntegerField(default=0, verbose_name='요청당 최대 쿼리 수')),
+                ('sql_ms', models.FloatField(default=0, verbose_name='총 SQL 시간(ms)')),
+                ('duplicate_count', models.PositiveIntegerField(default=0, help_text='같은 요청 안에서 반복 실행된 동일 SQL', verbose_name='중복 쿼리 수')),
+                ('latency_histogram', models.JSONField(default=list, verbose_name='응답 시간 분포')),
+                ('query_histogram', models.JSONField(default=list, verbose_name='쿼리 수 분포')),
+                ('slow_queries', models.JSONField(blank=True, default=list, verbose_name='느린 SQL')),
+            ],
+            options={
+                'verbose_name': '요청 성능 기록',
+                'verbose_name_plural': '요청 성능 기록들',
+                'ordering': ['-period_end'],
+                'indexes': [models.Index(fields=['view_name', '-period_end'], name='core_reques_view_na_00ed03_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# DB 별 전문 검색 색인 (core.fulltext) - 2-gram 토큰 컬럼(tokens)에 건다
+FULLTEXT_SQL = {
+    'sqlite': [
+        """CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5(
+            tokens, content='core_searchdocument', content_rowid='id', tokenize='unicode61')""",
+        """CREATE TRIGGER core_searchdocument_fts_ai AFTER INSERT ON core_searchdocument BEGIN
+            INSERT INTO core_searchdocument_fts(rowid, tokens) VALUES (new.id, new.tokens);
+        END""",
+        """CREATE TRIGGER core_searchdocument_fts_ad AFTER DELETE ON core_searchdocument BEGIN
+            INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, tokens) VALUES ('delete', old.id, old.tokens);
+        END""",
+        """CREATE TRIGGER core_searchdocument_fts_au AFTER UPDATE OF tokens ON core_searchdocument BEGIN
+            INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, tokens) VALUES ('delete', old.id, old.tokens);
+            INSERT INTO core_searchdocument_fts(rowid, tokens) VALUES (new.id, new.tokens);
+        END""",
+    ],
+    'postgresql': [
+        "CREATE INDEX core_searchdocument_tokens_gin ON core_searchdocument USING GIN (to_tsvector('simple', tokens))",
+    ],
+    'mysql': [
+        'ALTER TABLE core_searchdocument ADD FULLTEXT INDEX core_searchdocument_tokens_ft (tokens) WITH PARSER ngram',
+    ],
+}
+FULLTEXT_DROP_SQL = {
+    'sqlite': [
+        'DROP TRIGGER IF EXISTS core_searchdocument_fts_ai',
+        'DROP TRIGGER IF EXISTS core_searchdocument_fts_ad',
+        'DROP TRIGGER IF EXISTS core_searchdocument_fts_au',
+        'DROP TABLE IF EXISTS core_searchdocument_fts',
+    ],
+    'postgresql': ['DROP INDEX IF EXISTS core_searchdocument_tokens_gin'],
+    'mysql': ['ALTER TABLE core_searchdocument DROP INDEX core_searchdocument_tokens_ft'],
+}
+
+
+def create_fulltext_index(apps, schema_editor):
+    for sql in FULLTEXT_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    for sql in FULLTEXT_DROP_SQL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_request_metric'),
+        ('customers', '0013_vehicle_mileage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='happycall, rejection, communication, customer', max_length=30, verbose_name='출처')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='원본 ID')),
+                ('title', models.CharField(blank=True, max_length=200, verbose_name='제목')),
+                ('body', models.TextField(help_text='색인한 원문 (검색 결과 발췌용)', verbose_name='본문')),
+                ('tokens', models.TextField(help_text='2-gram 토큰 (DB 별 전문 검색 색인 대상)', verbose_name='검색 토큰')),
+                ('source_date', models.DateTimeField(blank=True, null=True, verbose_name='기준 일시')),
+                ('url', models.CharField(blank=True, max_length=200, verbose_name='원본 주소')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+                ('customer', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='customers.customer', verbose_name='고객')),
+            ],
+            options={
+                'verbose_name': '전문 검색 문서',
+                'verbose_name_plural': '전문 검색 문서들',
+                'constraints': [models.UniqueConstraint(fields=('source', 'object_id'), name='searchdocument_source_object_uniq')],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
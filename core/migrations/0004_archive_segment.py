@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='core.archive.ARCHIVES 키', max_length=40, verbose_name='보관 대상')),
+                ('month', models.DateField(help_text='행 기준 일시의 월 첫날', verbose_name='보관 월')),
+                ('path', models.CharField(help_text='ARCHIVE_DIR 기준 상대 경로', max_length=255, verbose_name='파일 경로')),
+                ('row_count', models.PositiveIntegerField(verbose_name='행 수')),
+                ('min_pk', models.PositiveBigIntegerField(verbose_name='최소 ID')),
+                ('max_pk', models.PositiveBigIntegerField(verbose_name='최대 ID')),
+                ('min_date', models.DateTimeField(verbose_name='최초 기준 일시')),
+                ('max_date', models.DateTimeField(verbose_name='최종 기준 일시')),
+                ('size_bytes', models.PositiveBigIntegerField(default=0, verbose_name='파일 크기')),
+                ('sha256', models.CharField(max_length=64, verbose_name='체크섬')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='보관일')),
+            ],
+            options={
+                'verbose_name': '보관 파일',
+                'verbose_name_plural': '보관 파일들',
+                'ordering': ['source', 'month', 'min_pk'],
+                'indexes': [models.Index(fields=['source', 'min_date', 'max_date'], name='core_archiv_source_ff3b4e_idx')],
+            },
+        ),
+    ]
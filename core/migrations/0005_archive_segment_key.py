@@ -0,0 +1,55 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:08
+
+import gzip
+import json
+from pathlib import Path
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# 이미 만들어진 보관 파일 중 키 색인이 필요한 대상 (core.archive.ARCHIVES 의 key_field)
+KEY_FIELDS = {'communication': 'customer_id'}
+
+
+def index_existing_segments(apps, schema_editor):
+    # 보관 파일을 다시 읽어 들어 있는 키 값을 남긴다 (파일이 없으면 건너뜀)
+    ArchiveSegment = apps.get_model('core', 'ArchiveSegment')
+    ArchiveSegmentKey = apps.get_model('core', 'ArchiveSegmentKey')
+    root = Path(getattr(settings, 'ARCHIVE_DIR', Path(settings.BASE_DIR) / 'archive'))
+    for segment in ArchiveSegment.objects.filter(source__in=list(KEY_FIELDS)):
+        path = root / segment.path
+        if not path.exists():
+            continue
+        field, values = KEY_FIELDS[segment.source], set()
+        with gzip.open(path, 'rt', encoding='utf-8') as handle:
+            for line in handle:
+                value = json.loads(line).get(field)
+                if value is not None:
+                    values.add(value)
+        ArchiveSegmentKey.objects.bulk_create([ArchiveSegmentKey(segment=segment, value=value) for value in values],
+                                              batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_archive_segment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveSegmentKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.PositiveBigIntegerField(verbose_name='키 값')),
+                ('segment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='keys', to='core.archivesegment', verbose_name='보관 파일')),
+            ],
+            options={
+                'verbose_name': '보관 파일 키',
+                'verbose_name_plural': '보관 파일 키들',
+                'indexes': [models.Index(fields=['value', 'segment'], name='core_archiv_value_8404b8_idx')],
+            },
+        ),
+        migrations.RunPython(index_existing_segments, migrations.RunPython.noop),
+    ]
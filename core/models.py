@@ -1,3 +1,126 @@
 from django.db import models
+from django.conf import settings
 
-# Create your models here.
+
+class PhoneAccessLog(models.Model):
+    """전화번호 원본 노출 감사 기록 (요청 단위로 모아 비동기 일괄 저장)"""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='phone_access_logs', verbose_name='사용자')
+    username = models.CharField('사용자명', max_length=150, blank=True)
+    path = models.CharField('요청 경로', max_length=500, blank=True)
+    method = models.CharField('요청 방식', max_length=10, blank=True)
+    ip_address = models.GenericIPAddressField('IP 주소', null=True, blank=True)
+    sources = models.CharField('노출 경로', max_length=200, blank=True,
+                               help_text='get_phone_for_user, to_dict, template 등')
+    phone_count = models.PositiveIntegerField('노출 건수', default=0)
+    customer_ids = models.JSONField('고객 ID', default=list, blank=True,
+                                    help_text='노출된 고객 ID (최대 500건)')
+    accessed_at = models.DateTimeField('접근 시각', db_index=True)
+    
+    class Meta:
+        verbose_name = '전화번호 접근 기록'
+        verbose_name_plural = '전화번호 접근 기록들'
+        ordering = ['-accessed_at']
+        indexes = [
+            models.Index(fields=['user', '-accessed_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.username} {self.path} ({self.phone_count}건)"
+
+
+class RequestMetric(models.Model):
+    """뷰별 요청 성능 집계 (프로세스별 누적값을 주기적으로 한 행씩 저장)"""
+    period_start = models.DateTimeField('집계 시작')
+    period_end = models.DateTimeField('집계 종료', db_index=True)
+    view_name = models.CharField('뷰', max_length=200)
+    method = models.CharField('요청 방식', max_length=10)
+    request_count = models.PositiveIntegerField('요청 수', default=0)
+    error_count = models.PositiveIntegerField('오류 수', default=0, help_text='5xx 응답')
+    total_ms = models.FloatField('총 응답 시간(ms)', default=0)
+    max_ms = models.FloatField('최대 응답 시간(ms)', default=0)
+    query_count = models.PositiveIntegerField('총 쿼리 수', default=0)
+    max_queries = models.PositiveIntegerField('요청당 최대 쿼리 수', default=0)
+    sql_ms = models.FloatField('총 SQL 시간(ms)', default=0)
+    duplicate_count = models.PositiveIntegerField('중복 쿼리 수', default=0,
+                                                  help_text='같은 요청 안에서 반복 실행된 동일 SQL')
+    latency_histogram = models.JSONField('응답 시간 분포', default=list)
+    query_histogram = models.JSONField('쿼리 수 분포', default=list)
+    slow_queries = models.JSONField('느린 SQL', default=list, blank=True)
+    
+    class Meta:
+        verbose_name = '요청 성능 기록'
+        verbose_name_plural = '요청 성능 기록들'
+        ordering = ['-period_end']
+        indexes = [
+            models.Index(fields=['view_name', '-period_end']),
+        ]
+    
+    def __str__(self):
+        return f"{self.method} {self.view_name} ({self.request_count}건)"
+
+
+class SearchDocument(models.Model):
+    """전문 검색 문서 (core.fulltext, 원본 모델 저장/삭제 시 갱신)"""
+    source = models.CharField('출처', max_length=30, help_text='happycall, rejection, communication, customer')
+    object_id = models.PositiveBigIntegerField('원본 ID')
+    customer = models.ForeignKey('customers.Customer', on_delete=models.CASCADE, null=True, blank=True,
+                                 related_name='search_documents', verbose_name='고객')
+    title = models.CharField('제목', max_length=200, blank=True)
+    body = models.TextField('본문', help_text='색인한 원문 (검색 결과 발췌용)')
+    tokens = models.TextField('검색 토큰', help_text='2-gram 토큰 (DB 별 전문 검색 색인 대상)')
+    source_date = models.DateTimeField('기준 일시', null=True, blank=True)
+    url = models.CharField('원본 주소', max_length=200, blank=True)
+    updated_at = models.DateTimeField('수정일', auto_now=True)
+    
+    class Meta:
+        verbose_name = '전문 검색 문서'
+        verbose_name_plural = '전문 검색 문서들'
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'object_id'], name='searchdocument_source_object_uniq'),
+        ]
+    
+    def __str__(self):
+        return f"{self.source}#{self.object_id} {self.title}"
+
+
+class ArchiveSegment(models.Model):
+    """보관 파일 목록 (core.archive, 오래된 로그 행을 월별 gzip JSONL 파일로 옮긴 기록)"""
+    source = models.CharField('보관 대상', max_length=40, help_text='core.archive.ARCHIVES 키')
+    month = models.DateField('보관 월', help_text='행 기준 일시의 월 첫날')
+    path = models.CharField('파일 경로', max_length=255, help_text='ARCHIVE_DIR 기준 상대 경로')
+    row_count = models.PositiveIntegerField('행 수')
+    min_pk = models.PositiveBigIntegerField('최소 ID')
+    max_pk = models.PositiveBigIntegerField('최대 ID')
+    min_date = models.DateTimeField('최초 기준 일시')
+    max_date = models.DateTimeField('최종 기준 일시')
+    size_bytes = models.PositiveBigIntegerField('파일 크기', default=0)
+    sha256 = models.CharField('체크섬', max_length=64)
+    created_at = models.DateTimeField('보관일', auto_now_add=True)
+    
+    class Meta:
+        verbose_name = '보관 파일'
+        verbose_name_plural = '보관 파일들'
+        ordering = ['source', 'month', 'min_pk']
+        indexes = [
+            models.Index(fields=['source', 'min_date', 'max_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.source} {self.month:%Y-%m} ({self.row_count:,}건)"
+
+
+class ArchiveSegmentKey(models.Model):
+    """보관 파일에 들어 있는 키 값 (ArchiveSpec.key_field, 예: 고객 ID) - 고객별 조회 시 열 파일만 고르는 색인"""
+    segment = models.ForeignKey(ArchiveSegment, on_delete=models.CASCADE, related_name='keys', verbose_name='보관 파일')
+    value = models.PositiveBigIntegerField('키 값')
+    
+    class Meta:
+        verbose_name = '보관 파일 키'
+        verbose_name_plural = '보관 파일 키들'
+        indexes = [
+            models.Index(fields=['value', 'segment']),
+        ]
+    
+    def __str__(self):
+        return f"{self.segment} #{self.value}"
@@ -0,0 +1,317 @@
+"""
+분석용 Parquet 내보내기 (고객/차량/서비스/해피콜/해피콜 매출/매출전표)
+
+운영 DB 에 직접 붙는 분석 쿼리 대신 열 단위(Parquet) 파일로 내보내 pandas/DuckDB/Spark 에서 읽게 한다.
+파일은 EXPORT_DIR/<대상>/month=<YYYY-MM>/part-<실행시각>.parquet (Hive 파티션) 로 쓴다 (manage.py export_parquet).
+
+  - 기준 열 순서로 .values_list().iterator() 를 돌며 batch_size 행씩 RecordBatch 로 바로 쓴다. 한 번에 한 달 파일만
+    열려 있고 전체를 메모리에 올리지 않는다 (기준 열 인덱스 순서로 읽으므로 정렬도 없다).
+  - 열 타입은 모델 필드에서 정한다 (정수/FK → int64, 금액 → decimal128, 일시 → UTC timestamp, 날짜 → date32).
+  - 해피콜은 1~4차콜을 한 행씩 펼친다 (예정일/통화일이 모두 없는 단계는 뺌).
+  - 두 번째 실행부터는 증분이다: 지난 실행 이후 updated_at 이 바뀐 행만 새 part 파일로 추가한다.
+    같은 행의 이전 버전이 앞 part 에 남으므로 읽을 때 id(해피콜은 happycall_id, stage) 별로 updated_at 이 가장
+    큰 행만 쓴다. 지워진 행은 증분에 나오지 않으니 가끔 --full 로 다시 내보낸다.
+  - 연락처/이메일/이름/상세주소/차량번호 같은 개인정보와 updated_at 을 갱신하지 않는 포인트 잔액은 내보내지 않는다.
+"""
+import json
+import os
+import shutil
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+EXPORT_BATCH_SIZE = 10000
+# 증분 구간 끝을 실행 시각보다 조금 앞으로 (실행 중 커밋된 트랜잭션의 updated_at 이 이전 시각일 수 있음)
+WATERMARK_LAG = timedelta(minutes=1)
+WATERMARK_FILE = '_watermarks.json'
+
+
+class ExportDataset:
+    """내보낼 대상 하나: 모델, 열 [(열 이름, values_list 조회명)], 월 파티션 기준 열"""
+
+    def __init__(self, model, columns, partition_field, description=''):
+        self.model_label = model
+        self.columns = columns
+        self.partition_field = partition_field
+        self.description = description
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    @property
+    def lookups(self):
+        return [lookup for _, lookup in self.columns]
+
+    def schema(self):
+        return pa.schema([(name, _arrow_type(_resolve_field(self.model, lookup))) for name, lookup in self.columns])
+
+    def queryset(self, since=None, until=None, month=None):
+        """since < updated_at <= until, 기준 열이 month(해당 월 1일) 안인 행"""
+        queryset = self.model._default_manager.all()
+        if since:
+            queryset = queryset.filter(updated_at__gt=since)
+        if until:
+            queryset = queryset.filter(updated_at__lte=until)
+        if month:
+            field = _resolve_field(self.model, self.partition_lookup)
+            start, end = month, (month + timedelta(days=32)).replace(day=1)
+            if isinstance(field, models.DateTimeField):
+                start, end = (timezone.make_aware(datetime.combine(day, datetime.min.time())) for day in (start, end))
+            queryset = queryset.filter(**{f'{self.partition_lookup}__gte': start,
+                                          f'{self.partition_lookup}__lt': end})
+        return queryset
+
+    @property
+    def partition_lookup(self):
+        return dict(self.columns)[self.partition_field]
+
+    def rows(self, values):
+        """values_list 행 → 내보낼 행"""
+        return values
+
+
+class HappyCallStageDataset(ExportDataset):
+    """해피콜을 콜 단계(1~4차)마다 한 행으로 펼친다"""
+
+    STAGES = ['first', 'second', 'third', 'fourth']
+    STAGE_COLUMNS = [
+        ('scheduled_at', '{}_call_scheduled_date'),
+        ('called_at', '{}_call_date'),
+        ('caller_id', '{}_call_caller_id'),
+        ('success', '{}_call_success'),
+    ]
+
+    @property
+    def lookups(self):
+        return [*super().lookups,
+                *(lookup.format(stage) for stage in self.STAGES for _, lookup in self.STAGE_COLUMNS)]
+
+    def schema(self):
+        stage_fields = [(name, _arrow_type(_resolve_field(self.model, lookup.format(self.STAGES[0]))))
+                        for name, lookup in self.STAGE_COLUMNS]
+        return pa.schema([*super().schema(), ('stage', pa.int8()), *stage_fields])
+
+    def rows(self, values):
+        width, size = len(self.columns), len(self.STAGE_COLUMNS)
+        for row in values:
+            base = row[:width]
+            for number in range(len(self.STAGES)):
+                stage = row[width + number * size:width + (number + 1) * size]
+                if stage[0] is None and stage[1] is None:
+                    continue
+                yield (*base, number + 1, *stage)
+
+
+DATASETS = {
+    'customers': ExportDataset('customers.Customer', [
+        ('id', 'id'), ('customer_status', 'customer_status'), ('customer_type', 'customer_type'),
+        ('address_city', 'address_city'), ('address_district', 'address_district'),
+        ('address_dong', 'address_dong'), ('membership_status', 'membership_status'),
+        ('membership_join_date', 'membership_join_date'), ('membership_expire_date', 'membership_expire_date'),
+        ('privacy_consent', 'privacy_consent'), ('marketing_consent', 'marketing_consent'),
+        ('preferred_contact_method', 'preferred_contact_method'), ('do_not_contact', 'do_not_contact'),
+        ('is_banned', 'is_banned'), ('acquisition_source', 'acquisition_source'),
+        ('customer_grade', 'customer_grade'), ('first_service_date', 'first_service_date'),
+        ('last_service_date', 'last_service_date'), ('last_contact_date', 'last_contact_date'),
+        ('total_service_count', 'total_service_count'), ('total_service_amount', 'total_service_amount'),
+        ('is_active', 'is_active'), ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ], 'created_at', description='고객 (개인정보 제외)'),
+    'vehicles': ExportDataset('customers.Vehicle', [
+        ('id', 'id'), ('model', 'model'), ('year', 'year'),
+        ('current_owner_id', 'current_owner_id'), ('mileage', 'mileage'), ('daily_mileage', 'daily_mileage'),
+        ('next_oil_change_date', 'next_oil_change_date'), ('next_inspection_date', 'next_inspection_date'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ], 'created_at', description='차량'),
+    'services': ExportDataset('services.ServiceRequest', [
+        ('id', 'id'), ('customer_id', 'customer_id'), ('vehicle_id', 'vehicle_id'),
+        ('service_type_id', 'service_type_id'), ('service_type_name', 'service_type__name'),
+        ('service_category', 'service_type__category'), ('status', 'status'), ('priority', 'priority'),
+        ('estimated_price', 'estimated_price'), ('requested_date', 'requested_date'),
+        ('scheduled_date', 'scheduled_date'), ('service_date', 'service_date'),
+        ('assigned_employee_id', 'assigned_employee_id'), ('source_happycall_id', 'source_happycall_id'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ], 'created_at', description='서비스 요청'),
+    'happycalls': HappyCallStageDataset('happycall.HappyCall', [
+        ('happycall_id', 'id'), ('service_request_id', 'service_request_id'),
+        ('customer_id', 'service_request__customer_id'), ('call_stage', 'call_stage'), ('status', 'status'),
+        ('overall_satisfaction', 'overall_satisfaction'), ('service_quality', 'service_quality'),
+        ('staff_kindness', 'staff_kindness'), ('price_satisfaction', 'price_satisfaction'),
+        ('will_revisit', 'will_revisit'), ('recommend_to_others', 'recommend_to_others'),
+        ('total_call_attempts', 'total_call_attempts'), ('total_revenue_generated', 'total_revenue_generated'),
+        ('customer_rejected', 'customer_rejected'), ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ], 'created_at', description='해피콜 (콜 단계별 한 행)'),
+    'revenues': ExportDataset('happycall.HappyCallRevenue', [
+        ('id', 'id'), ('happycall_id', 'happy_call_id'), ('call_stage', 'call_stage'),
+        ('revenue_type', 'revenue_type'), ('sales_voucher_id', 'sales_voucher_id'),
+        ('expected_amount', 'expected_amount'), ('actual_amount', 'actual_amount'),
+        ('commission_rate', 'commission_rate'), ('commission_amount', 'commission_amount'), ('status', 'status'),
+        ('proposed_by_id', 'proposed_by_id'), ('proposed_at', 'proposed_at'), ('accepted_at', 'accepted_at'),
+        ('completed_at', 'completed_at'), ('updated_at', 'updated_at'),
+    ], 'proposed_at', description='해피콜 매출'),
+    'vouchers': ExportDataset('accounting.SalesVoucher', [
+        ('id', 'id'), ('voucher_number', 'voucher_number'), ('sales_date', 'sales_date'),
+        ('total_amount', 'total_amount'), ('tax_amount', 'tax_amount'), ('payment_method', 'payment_method'),
+        ('payment_date', 'payment_date'), ('is_received', 'is_received'),
+        ('service_request_id', 'service_request_id'), ('happy_call_revenue_id', 'happy_call_revenue_id'),
+        ('revenue_source', 'revenue_source'), ('created_by_id', 'created_by_id'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ], 'sales_date', description='매출전표'),
+}
+
+
+def export_dir():
+    return Path(getattr(settings, 'EXPORT_DIR', Path(settings.BASE_DIR) / 'exports'))
+
+
+def _resolve_field(model, lookup):
+    *relations, name = lookup.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def _arrow_type(field):
+    if field.is_relation:
+        return _arrow_type(field.target_field)
+    if isinstance(field, models.BooleanField):
+        return pa.bool_()
+    if isinstance(field, models.DecimalField):
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    if isinstance(field, models.FloatField):
+        return pa.float64()
+    if isinstance(field, models.IntegerField):
+        return pa.int64()
+    if isinstance(field, models.DateTimeField):
+        return pa.timestamp('us', tz='UTC')
+    if isinstance(field, models.DateField):
+        return pa.date32()
+    return pa.string()
+
+
+def _month_key(value):
+    if value is None:
+        return 'unknown'
+    if isinstance(value, datetime):
+        value = timezone.localtime(value)
+    return f'{value:%Y-%m}'
+
+
+# ===================== 읽기 → RecordBatch =====================
+
+def _batches(dataset, queryset, batch_size):
+    """(월, RecordBatch) 를 월 순서로 - 월이 바뀌거나 batch_size 행이 모이면 내보낸다"""
+    schema = dataset.schema()
+    partition = schema.names.index(dataset.partition_field)
+    values = (queryset.order_by(dataset.partition_lookup, 'pk').values_list(*dataset.lookups)
+              .iterator(chunk_size=batch_size))
+    month, rows = None, []
+    for row in dataset.rows(values):
+        row_month = _month_key(row[partition])
+        if rows and (row_month != month or len(rows) >= batch_size):
+            yield month, _record_batch(rows, schema)
+            rows = []
+        month = row_month
+        rows.append(row)
+    if rows:
+        yield month, _record_batch(rows, schema)
+
+
+def _record_batch(rows, schema):
+    arrays = [pa.array(column, type=field.type) for column, field in zip(zip(*rows), schema)]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+# ===================== 내보내기 =====================
+
+def load_watermarks():
+    path = export_dir() / WATERMARK_FILE
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding='utf-8'))
+
+
+def _save_watermarks(watermarks):
+    path = export_dir() / WATERMARK_FILE
+    temp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    temp_path.write_text(json.dumps(watermarks, ensure_ascii=False, indent=2), encoding='utf-8')
+    os.replace(temp_path, path)
+
+
+def export_dataset(key, full=False, batch_size=EXPORT_BATCH_SIZE, now=None):
+    """
+    대상 하나를 월 파티션 파일로 내보냄, {'mode', 'rows', 'months', 'since', 'until'} 반환
+
+    지난 실행 기록이 없거나 full 이면 전체를 새로 쓰고(기존 파일 교체), 아니면 증분 part 를 추가한다.
+    파일은 임시 디렉터리에 다 쓴 뒤 옮기고 마지막에 기준 시각을 저장하므로, 중간에 실패하면 다시 실행하면 된다.
+    """
+    dataset = DATASETS[key]
+    root = export_dir()
+    root.mkdir(parents=True, exist_ok=True)
+    watermarks = load_watermarks()
+    since = None if full or key not in watermarks else datetime.fromisoformat(watermarks[key]['until'])
+    until = (now or timezone.now()) - WATERMARK_LAG
+    run = f'{until:%Y%m%dT%H%M%S}'
+
+    staging = root / f'.staging-{key}-{run}'
+    shutil.rmtree(staging, ignore_errors=True)
+    rows, writer = defaultdict(int), None
+    try:
+        for month, batch in _batches(dataset, dataset.queryset(since=since, until=until), batch_size):
+            if month not in rows:
+                if writer:
+                    writer.close()
+                folder = staging / f'month={month}'
+                folder.mkdir(parents=True)
+                writer = pq.ParquetWriter(folder / f'part-{run}.parquet', batch.schema)
+            writer.write_batch(batch)
+            rows[month] += batch.num_rows
+    finally:
+        if writer:
+            writer.close()
+
+    target = root / key
+    if since is None:
+        shutil.rmtree(target, ignore_errors=True)
+        if rows:
+            os.replace(staging, target)
+        else:
+            target.mkdir()
+    else:
+        for month in rows:
+            folder = target / f'month={month}'
+            folder.mkdir(parents=True, exist_ok=True)
+            os.replace(staging / f'month={month}' / f'part-{run}.parquet', folder / f'part-{run}.parquet')
+    shutil.rmtree(staging, ignore_errors=True)
+
+    watermarks[key] = {'until': until.isoformat(), 'exported_at': timezone.now().isoformat()}
+    _save_watermarks(watermarks)
+    return {'mode': 'full' if since is None else 'incremental', 'rows': sum(rows.values()),
+            'months': dict(sorted(rows.items())), 'since': since, 'until': until}
+
+
+def write_file(key, where, since=None, month=None, batch_size=EXPORT_BATCH_SIZE):
+    """
+    대상 하나를 Parquet 파일 하나로 씀 (월 파티션 없이), 행 수 반환
+
+    since 이후 updated_at 이 바뀐 행, month(해당 월 1일) 가 주어지면 그 달 행만. where 는 경로나 파일 객체.
+    """
+    dataset = DATASETS[key]
+    rows = 0
+    with pq.ParquetWriter(where, dataset.schema()) as writer:
+        for _, batch in _batches(dataset, dataset.queryset(since=since, month=month), batch_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
@@ -0,0 +1,193 @@
+"""
+전화번호 노출 감사 로깅
+
+원본 전화번호가 만들어지는 지점(Customer.get_phone_for_user, to_dict, 그리고 저장/검증 내부가 아닌
+phone 속성 접근 - 템플릿 출력, 관리자 목록, 폼 초기값)에서
+요청별 버퍼에 고객 ID 만 쌓아 두고, 응답 시 요청당 한 건의 로그 레코드를
+QueueHandler 로 넘긴다. 별도 스레드가 큐를 비우며 PhoneAccessLog 에 묶음 저장하므로
+요청 처리 중에는 응답 본문을 읽거나 DB 에 쓰지 않는다.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+from contextvars import ContextVar
+
+from django.utils import timezone
+
+logger = logging.getLogger('phone_access')
+
+# 요청 단위 노출 버퍼 (요청 밖에서는 None)
+_buffer = ContextVar('phone_access_buffer', default=None)
+
+BATCH_SIZE = 100
+FLUSH_INTERVAL = 2.0  # 초
+MAX_CUSTOMER_IDS = 500
+QUEUE_MAX_SIZE = 10000
+
+_queue = queue.Queue(maxsize=QUEUE_MAX_SIZE)
+_audit_logger = logging.getLogger('phone_access.audit')
+_audit_logger.propagate = False
+_worker = None
+_worker_lock = threading.Lock()
+
+
+class PhoneAccessBuffer:
+    """한 요청 동안 노출된 원본 전화번호 기록"""
+
+    __slots__ = ('customer_ids', 'count', 'sources')
+
+    def __init__(self):
+        self.customer_ids = []
+        self.count = 0
+        self.sources = set()
+
+    def add(self, customer_id, source):
+        self.count += 1
+        self.sources.add(source)
+        if customer_id is not None and len(self.customer_ids) < MAX_CUSTOMER_IDS:
+            self.customer_ids.append(customer_id)
+
+
+def begin_request():
+    """요청 시작 시 버퍼 생성 (reset 용 토큰 반환)"""
+    return _buffer.set(PhoneAccessBuffer())
+
+
+def end_request(token):
+    """요청 종료 시 버퍼를 꺼내고 초기화"""
+    buffer = _buffer.get()
+    _buffer.reset(token)
+    return buffer
+
+
+def in_request():
+    """요청 처리 중(노출 버퍼가 열려 있음) 여부"""
+    return _buffer.get() is not None
+
+
+def record_phone_exposure(customer_id, source):
+    """
+    원본 전화번호 노출 기록
+
+    요청 중이면 버퍼에만 추가하고, 관리 명령 등 요청 밖에서는 바로 큐에 넣는다.
+    """
+    buffer = _buffer.get()
+    if buffer is not None:
+        buffer.add(customer_id, source)
+        return
+    single = PhoneAccessBuffer()
+    single.add(customer_id, source)
+    enqueue(single, user=None, path='', method='', ip_address=None)
+
+
+def enqueue(buffer, user, path, method, ip_address):
+    """요청 한 건의 노출 기록을 감사 큐에 넣기 (블로킹 없음)"""
+    if not buffer or not buffer.count:
+        return
+    _ensure_worker()
+    _audit_logger.info(
+        'phone access',
+        extra={'audit': {
+            'user_id': getattr(user, 'pk', None),
+            'username': getattr(user, 'username', '') or '',
+            'path': path[:500],
+            'method': method[:10],
+            'ip_address': ip_address,
+            'sources': ','.join(sorted(buffer.sources))[:200],
+            'phone_count': buffer.count,
+            'customer_ids': list(buffer.customer_ids),
+            'accessed_at': timezone.now(),
+        }},
+    )
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 대기하지 않고 버린 뒤 경고만 남김"""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            logger.warning('전화번호 접근 감사 큐가 가득 차 기록 1건을 버렸습니다.')
+
+
+class AuditWriter(threading.Thread):
+    """감사 큐를 비우며 PhoneAccessLog 에 묶음 저장하는 백그라운드 스레드"""
+
+    def __init__(self, audit_queue):
+        super().__init__(name='phone-access-audit', daemon=True)
+        self.queue = audit_queue
+        self._stop_event = threading.Event()
+
+    def run(self):
+        pending = []
+        last_flush = time.monotonic()
+        while not (self._stop_event.is_set() and self.queue.empty()):
+            try:
+                record = self.queue.get(timeout=FLUSH_INTERVAL / 4)
+                pending.append(record)
+            except queue.Empty:
+                pass
+            if pending and (len(pending) >= BATCH_SIZE
+                            or time.monotonic() - last_flush >= FLUSH_INTERVAL
+                            or self._stop_event.is_set()
+                            or self.queue.empty()):
+                self._flush(pending)
+                pending = []
+                last_flush = time.monotonic()
+
+    def _flush(self, records):
+        from django.db import connection
+        from .models import PhoneAccessLog
+
+        entries = [record.audit for record in records if hasattr(record, 'audit')]
+        try:
+            PhoneAccessLog.objects.bulk_create([PhoneAccessLog(**entry) for entry in entries])
+            for entry in entries:
+                logger.info(
+                    f"Phone access - User: {entry['username'] or '-'} | URL: {entry['path'] or '-'} | "
+                    f"IP: {entry['ip_address'] or '-'} | Phone count: {entry['phone_count']} | "
+                    f"Source: {entry['sources']}"
+                )
+        except Exception as e:
+            logger.error(f"전화번호 접근 감사 기록 저장 실패 ({len(entries)}건): {e}")
+        finally:
+            for _ in records:
+                self.queue.task_done()
+            connection.close()
+
+    def stop(self, timeout=5.0):
+        self._stop_event.set()
+        self.join(timeout)
+
+
+def _ensure_worker():
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _worker_lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        if not any(isinstance(h, NonBlockingQueueHandler) for h in _audit_logger.handlers):
+            _audit_logger.addHandler(NonBlockingQueueHandler(_queue))
+            _audit_logger.setLevel(logging.INFO)
+        _worker = AuditWriter(_queue)
+        _worker.start()
+
+
+def flush(timeout=5.0):
+    """큐에 쌓인 감사 기록이 모두 저장될 때까지 대기 (관리 명령/테스트용)"""
+    if _worker is None:
+        return
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@atexit.register
+def _shutdown():
+    if _worker is not None and _worker.is_alive():
+        _worker.stop()
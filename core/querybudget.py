@@ -0,0 +1,252 @@
+"""
+뷰별 쿼리 예산과 N+1 탐지
+
+@query_budget(30) 처럼 뷰에 허용 쿼리 수를 선언하면, 요청 동안 실행된 SQL 을
+모양(파라미터·숫자·IN 목록 길이를 지운 SQL)별로 세어 예산 초과와 반복 실행(N+1)을 찾는다.
+반복된 SQL 은 두 번째 실행 시점의 프로젝트 코드 호출 위치를 함께 남긴다.
+
+동작 모드 (settings.QUERY_BUDGET_MODE)
+  - off   : 검사하지 않음 (운영 기본값, 오버헤드 없음)
+  - warn  : 초과/반복 시 경고 로그 (DEBUG 기본값)
+  - raise : QueryBudgetExceeded 예외 (CI 의 check_query_budgets 명령에서 사용)
+
+사용 예:
+    @query_budget(40)
+    def admin_dashboard(request): ...
+
+    @query_budget(15)
+    class CustomerListView(...): ...
+
+    with query_budget(5, name='월간 집계'):
+        build_summary()
+"""
+import logging
+import re
+import threading
+import traceback
+from contextlib import ContextDecorator, ExitStack, contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.decorators import method_decorator
+
+logger = logging.getLogger(__name__)
+
+MODES = ('off', 'warn', 'raise')
+DEFAULT_REPEAT_THRESHOLD = 5  # 같은 모양의 SQL 이 이 횟수 이상 반복되면 N+1 로 판단
+STACK_DEPTH = 4
+
+_IN_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_SPACES = re.compile(r'\s+')
+_override = threading.local()
+
+# 호출 위치에서 제외할 execute_wrapper 모듈 (이 모듈, 요청 지표 수집기)
+_WRAPPER_FILES = {str(Path(__file__).resolve()), str(Path(__file__).with_name('metrics.py').resolve())}
+
+# 예산이 선언된 뷰 (check_query_budgets 리포트용)
+registry = {}
+
+
+class QueryBudgetExceeded(Exception):
+    """쿼리 예산 초과 또는 N+1 탐지 (raise 모드)"""
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__(str(report))
+
+
+def get_mode():
+    mode = getattr(_override, 'mode', None)
+    if mode is None:
+        mode = getattr(settings, 'QUERY_BUDGET_MODE', 'warn' if settings.DEBUG else 'off')
+    return mode if mode in MODES else 'off'
+
+
+def get_last_report():
+    """현재 스레드에서 마지막으로 검사한 예산 결과"""
+    return getattr(_override, 'last_report', None)
+
+
+def clear_last_report():
+    _override.last_report = None
+
+
+@contextmanager
+def override_mode(mode):
+    """현재 스레드의 검사 모드를 잠시 변경 (명령/테스트용)"""
+    previous = getattr(_override, 'mode', None)
+    _override.mode = mode
+    try:
+        yield
+    finally:
+        _override.mode = previous
+
+
+def normalize_sql(sql):
+    """반복 여부 비교용 SQL 모양 (IN 목록 길이, 숫자 리터럴, 공백 차이 제거)"""
+    sql = _IN_LIST.sub('(%s, ...)', sql)
+    sql = _NUMBER.sub('?', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def _project_stack():
+    """프로젝트 코드 프레임만 남긴 호출 위치 (가장 안쪽이 마지막)"""
+    base_dir = str(Path(settings.BASE_DIR).resolve())
+    frames = []
+    for frame in traceback.extract_stack()[:-2]:
+        filename = str(Path(frame.filename).resolve())
+        if not filename.startswith(base_dir) or filename in _WRAPPER_FILES or 'site-packages' in filename:
+            continue
+        relative = filename[len(base_dir):].lstrip('/\\')
+        frames.append(f'{relative}:{frame.lineno} in {frame.name}: {frame.line or ""}'.rstrip())
+    return frames[-STACK_DEPTH:]
+
+
+class QueryInspector:
+    """connection.execute_wrapper 용 SQL 모양별 실행 횟수 집계기"""
+
+    def __init__(self, capture_stacks=True):
+        self.count = 0
+        self.shapes = {}
+        self.capture_stacks = capture_stacks
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        shape = normalize_sql(sql)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            self.shapes[shape] = entry = [0, None]
+        entry[0] += 1
+        # 두 번째 실행 위치가 반복(루프)을 일으킨 코드
+        if entry[0] == 2 and self.capture_stacks:
+            entry[1] = _project_stack()
+        return execute(sql, params, many, context)
+
+    def repeated(self, threshold=DEFAULT_REPEAT_THRESHOLD):
+        """threshold 번 이상 반복된 (모양, 횟수, 호출 위치) 목록, 많이 반복된 순 (None 이면 검사 안 함)"""
+        if threshold is None:
+            return []
+        items = [(shape, count, stack or []) for shape, (count, stack) in self.shapes.items()
+                 if count >= threshold]
+        return sorted(items, key=lambda item: item[1], reverse=True)
+
+    def record(self):
+        """모든 DB 연결에 집계기를 건 컨텍스트"""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+
+class QueryBudgetReport:
+    """예산 검사 결과"""
+
+    def __init__(self, name, inspector, max_queries=None, repeat_threshold=DEFAULT_REPEAT_THRESHOLD):
+        self.name = name
+        self.max_queries = max_queries
+        self.query_count = inspector.count
+        self.repeated = inspector.repeated(repeat_threshold)
+
+    @property
+    def over_budget(self):
+        return self.max_queries is not None and self.query_count > self.max_queries
+
+    @property
+    def has_problems(self):
+        return self.over_budget or bool(self.repeated)
+
+    def __str__(self):
+        budget = f'{self.max_queries}' if self.max_queries is not None else '-'
+        lines = [f'{self.name}: 쿼리 {self.query_count}건 (예산 {budget})']
+        for shape, count, stack in self.repeated:
+            lines.append(f'  반복 {count}회: {shape[:300]}')
+            lines.extend(f'    {frame}' for frame in stack)
+        return '\n'.join(lines)
+
+
+class query_budget(ContextDecorator):
+    """
+    쿼리 예산 데코레이터/컨텍스트 매니저
+
+    max_queries 를 넘거나 같은 모양의 SQL 이 repeat_threshold 번 이상 반복되면
+    모드에 따라 경고 또는 예외를 낸다. 중첩되면 가장 바깥 예산만 검사한다.
+    페이지 크기만큼 반복이 남아 있는 뷰는 repeat_threshold 를 그보다 크게 두어
+    반복 횟수가 늘어나는 회귀만 잡는다.
+    """
+
+    def __init__(self, max_queries=None, repeat_threshold=DEFAULT_REPEAT_THRESHOLD, name=None):
+        self.max_queries = max_queries
+        self.repeat_threshold = repeat_threshold
+        self.name = name
+        self._local = threading.local()
+
+    def __call__(self, func):
+        if self.name is None:
+            self.name = f'{func.__module__}.{func.__qualname__}'
+        registry[self.name] = self
+        if isinstance(func, type):
+            # 클래스 기반 뷰는 dispatch 를 감싼다
+            func = method_decorator(self, name='dispatch')(func)
+            func.query_budget = self
+            return func
+        wrapped = super().__call__(func)
+        wrapped.query_budget = self
+        return wrapped
+
+    def __enter__(self):
+        self._local.stack = None
+        if get_mode() == 'off' or getattr(_override, 'active', False):
+            return self
+        _override.active = True
+        self._local.inspector = QueryInspector()
+        self._local.stack = self._local.inspector.record()
+        self._local.stack.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            return False
+        stack.__exit__(exc_type, exc, tb)
+        _override.active = False
+        self._local.stack = None
+        if exc_type is not None:
+            return False
+        report = QueryBudgetReport(self.name or '쿼리 예산', self._local.inspector,
+                                   self.max_queries, self.repeat_threshold)
+        _override.checked = True  # 요청 단위 탐지 미들웨어의 중복 경고 방지
+        _override.last_report = report
+        if report.has_problems:
+            if get_mode() == 'raise':
+                raise QueryBudgetExceeded(report)
+            logger.warning(f'쿼리 예산 경고\n{report}')
+        return False
+
+
+class NPlusOneDetectionMiddleware:
+    """
+    예산이 선언되지 않은 뷰까지 요청 단위로 반복 SQL 을 탐지하는 미들웨어 (경고 로그만)
+
+    QUERY_BUDGET_MODE 가 off 이면 미들웨어 자체가 빠진다.
+    """
+
+    def __init__(self, get_response):
+        if get_mode() == 'off':
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        inspector = QueryInspector()
+        _override.checked = False
+        with inspector.record():
+            response = self.get_response(request)
+        if getattr(_override, 'checked', False):
+            return response
+        repeated = inspector.repeated()
+        if repeated:
+            report = QueryBudgetReport(f'{request.method} {request.path}', inspector)
+            logger.warning(f'N+1 의심 쿼리\n{report}')
+        return response
@@ -0,0 +1,708 @@
+"""
+대용량 합성 데이터 생성
+
+고객 수 기준 규모(10k/100k/1m)로 고객·차량·소유관계·서비스·주행거리 기록·일정·해피콜(1~4차)·
+해피콜 매출·매출/매입 전표를 bulk_create 로 만든다. 고객 CHUNK_SIZE 명 단위로
+(seed, 청크 번호) 에서 난수를 새로 뽑으므로 같은 seed·규모면 항상 같은 데이터가 만들어진다.
+
+합성 데이터는 아래 값으로 구분되며 flush_synthetic_data() 로 지울 수 있다.
+  - 고객 전화번호 018-XXXX-XXXX
+  - 전표번호 SYN-S- / SYN-P- 접두사
+  - 일정 iCal UID synthetic-...@unsan-crm.local
+  - 직원 계정 synthetic_staff_NN, 공급업체명 '합성 공급업체 NN'
+
+bulk_create 는 save() 를 거치지 않으므로 일정 연동·분개 전기·캐시 무효화는 하지 않는다.
+생성 후 한 번에 처리한다 (분개는 post_voucher_journal --rebuild).
+"""
+import random
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+CHUNK_SIZE = 1000  # 난수 시드 단위 (바꾸면 같은 seed 라도 다른 데이터가 생성됨)
+MAX_VEHICLES_PER_CUSTOMER = 3
+MAX_SERVICES_PER_CUSTOMER = 10
+MAX_PURCHASES_PER_CHUNK = 400
+
+SYNTHETIC_PHONE_PREFIX = '018-'
+SALES_NUMBER_PREFIX = 'SYN-S-'
+PURCHASE_NUMBER_PREFIX = 'SYN-P-'
+SCHEDULE_UID_PREFIX = 'synthetic-'
+STAFF_USERNAME_PREFIX = 'synthetic_staff_'
+SUPPLIER_NAME_PREFIX = '합성 공급업체'
+
+SURNAMES = ['김', '이', '박', '최', '정', '강', '조', '윤', '장', '임', '한', '오', '서', '신', '권', '황', '안', '송', '류', '홍']
+SURNAME_WEIGHTS = [21, 15, 8, 5, 4, 2, 2, 2, 2, 2, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+GIVEN_SYLLABLES = ['민', '서', '준', '지', '현', '우', '도', '하', '윤', '수', '영', '진', '재', '성', '은', '예', '주', '원',
+                   '시', '연', '태', '경', '혜', '동', '승', '유', '희', '정', '나', '상']
+REGIONS = {
+    '경기도': {
+        '평택시': ['비전동', '세교동', '안중읍', '포승읍', '송탄동', '고덕동'],
+        '안성시': ['공도읍', '대덕면', '안성1동', '안성2동'],
+        '오산시': ['중앙동', '대원동', '신장동'],
+        '화성시': ['향남읍', '봉담읍', '동탄1동', '남양읍'],
+    },
+    '충청남도': {
+        '천안시 서북구': ['성정동', '쌍용동', '불당동'],
+        '아산시': ['배방읍', '온양1동', '탕정면'],
+        '당진시': ['송악읍', '합덕읍'],
+    },
+    '서울특별시': {
+        '강남구': ['역삼동', '삼성동', '대치동'],
+        '송파구': ['잠실동', '가락동'],
+    },
+}
+VEHICLE_MODELS = [
+    ('현대', ['아반떼', '쏘나타', '그랜저', '투싼', '싼타페', '팰리세이드', '포터2', '스타리아', '캐스퍼']),
+    ('기아', ['모닝', 'K3', 'K5', 'K8', '스포티지', '쏘렌토', '카니발', '봉고3', '레이']),
+    ('제네시스', ['G70', 'G80', 'GV70', 'GV80']),
+    ('쉐보레', ['스파크', '트랙스', '말리부']),
+    ('르노코리아', ['QM6', 'SM6', 'XM3']),
+    ('KG모빌리티', ['티볼리', '토레스', '렉스턴']),
+]
+PLATE_HANGUL = ['가', '나', '다', '라', '마', '거', '너', '더', '러', '머', '버', '서', '어', '저', '고', '노', '도', '로',
+                '모', '보', '소', '오', '조', '구', '누', '두', '루', '무', '부', '수', '우', '주', '하', '허', '호']
+
+CUSTOMER_STATUS_WEIGHTS = (('registered', 70), ('temporary', 15), ('prospect', 5), ('inactive', 10))
+MEMBERSHIP_WEIGHTS = (('none', 40), ('basic', 40), ('premium', 15), ('vip', 5))
+GRADE_WEIGHTS = (('A', 10), ('B', 40), ('C', 35), ('D', 15))
+SERVICE_COUNT_WEIGHTS = ((0, 10), (1, 25), (2, 20), (3, 15), (4, 12), (5, 8), (7, 6), (10, 4))
+VEHICLE_COUNT_WEIGHTS = ((1, 75), (2, 20), (3, 5))
+PAYMENT_WEIGHTS = (('card', 65), ('cash', 10), ('transfer', 20), ('credit', 5))
+SURVEY_WEIGHTS = ((3, 70), (2, 22), (1, 8))
+STAGES = ('1st', '2nd', '3rd', '4th')
+STAGE_FIELDS = ('first', 'second', 'third', 'fourth')
+# 서비스 후 단계 시작 시점 (1주 / 3개월 / 6개월 / 9개월)
+STAGE_OFFSETS = (timedelta(days=7), timedelta(days=90), timedelta(days=180), timedelta(days=270))
+STAGE_STATE_WEIGHTS = (('pending_approval', 5), ('pending', 30), ('in_progress', 5), ('completed', 50), ('failed', 10))
+STAGE_STATUS = {
+    'pending_approval': 'pending', 'pending': 'pending', 'in_progress': 'in_progress',
+    'completed': 'completed', 'failed': 'failed',
+}
+REVENUE_TYPES = {
+    '1st': 'engine_oil', '2nd': 'additional_service', '3rd': 'insurance_commission', '4th': 'next_inspection',
+}
+DEFAULT_DEPARTMENTS = [
+    ('engine_oil', '엔진오일팀'),
+    ('inspection', '검사팀'),
+    ('insurance', '보험영업팀'),
+]
+DEFAULT_SERVICE_TYPES = [
+    ('엔진오일 교환', '엔진오일교환', 30, 80000, 'engine_oil'),
+    ('정기점검', '정비점검', 60, 50000, 'inspection'),
+    ('자동차 종합검사', '자동차검사', 60, 65000, 'inspection'),
+    ('브레이크 패드 교환', '정비점검', 90, 150000, 'inspection'),
+    ('타이어 교환', '정비점검', 60, 400000, 'inspection'),
+]
+PURCHASE_ITEMS = [('엔진오일 5W-30', 'L', 9000), ('오일필터', '개', 6000), ('에어필터', '개', 12000),
+                  ('브레이크 패드', '세트', 45000), ('부동액', 'L', 7000), ('와이퍼', '개', 15000)]
+
+
+def _weighted(rng, pairs):
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights)[0]
+
+
+def _aware(dt):
+    return timezone.make_aware(dt) if timezone.is_naive(dt) else dt
+
+
+def synthetic_phone(index):
+    return f'{SYNTHETIC_PHONE_PREFIX}{index // 10000:04d}-{index % 10000:04d}'
+
+
+def synthetic_vehicle_number(index):
+    block, serial = divmod(index, 10000)
+    prefix, hangul = divmod(block, len(PLATE_HANGUL))
+    return f'{100 + prefix}{PLATE_HANGUL[hangul]}{serial:04d}'
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """auto_now/auto_now_add 를 잠시 꺼서 생성일·수정일을 직접 지정할 수 있게 함"""
+    saved = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def has_synthetic_data():
+    from customers.models import Customer
+    return Customer.objects.filter(phone__startswith=SYNTHETIC_PHONE_PREFIX).exists()
+
+
+def _delete(queryset):
+    """삭제 후 대상 모델 자체의 삭제 건수 반환 (연쇄 삭제 건수 제외)"""
+    return queryset.delete()[1].get(queryset.model._meta.label, 0)
+
+
+def flush_synthetic_data():
+    """합성 데이터 삭제 (분개가 있었다면 다시 전기해야 함), 삭제 건수 반환"""
+    from accounting.models import JournalEntry, PurchaseVoucher, SalesVoucher, Supplier
+    from customers.models import Customer, Vehicle
+    from scheduling.models import Schedule
+
+    User = get_user_model()
+    deleted = {}
+    with transaction.atomic():
+        sales = SalesVoucher.objects.filter(voucher_number__startswith=SALES_NUMBER_PREFIX)
+        purchases = PurchaseVoucher.objects.filter(voucher_number__startswith=PURCHASE_NUMBER_PREFIX)
+        journal = JournalEntry.objects.filter(sales_voucher__in=sales) | JournalEntry.objects.filter(
+            purchase_voucher__in=purchases)
+        deleted['journal_entries'] = journal.count()
+        deleted['sales_vouchers'] = _delete(sales)
+        deleted['purchase_vouchers'] = _delete(purchases)
+        vehicles = Vehicle.objects.filter(
+            ownerships__customer__phone__startswith=SYNTHETIC_PHONE_PREFIX).values_list('pk', flat=True)
+        vehicle_ids = list(vehicles.distinct())
+        deleted['customers'] = _delete(Customer.objects.filter(phone__startswith=SYNTHETIC_PHONE_PREFIX))
+        for start in range(0, len(vehicle_ids), 5000):
+            Vehicle.objects.filter(pk__in=vehicle_ids[start:start + 5000]).delete()
+        deleted['vehicles'] = len(vehicle_ids)
+        deleted['schedules'] = _delete(Schedule.objects.filter(ical_uid__startswith=SCHEDULE_UID_PREFIX))
+        deleted['suppliers'] = _delete(Supplier.objects.filter(name__startswith=SUPPLIER_NAME_PREFIX))
+        deleted['staff'] = _delete(User.objects.filter(username__startswith=STAFF_USERNAME_PREFIX))
+    return deleted
+
+
+class SyntheticDataGenerator:
+    """
+    규모별 합성 데이터 생성기
+
+    사용 예:
+        generator = SyntheticDataGenerator(customers=100_000, seed=42)
+        counts = generator.run(progress=print)
+    """
+
+    def __init__(self, customers, seed=42, batch_size=2000, today=None, history_days=3 * 365):
+        self.customers = customers
+        self.seed = seed
+        self.batch_size = batch_size
+        self.today = today or timezone.localdate()
+        self.history_days = history_days
+        self.counts = {}
+
+    # ===================== 기준 데이터 =====================
+
+    def _prepare_reference_data(self):
+        from accounting.models import Supplier
+        from employees.models import Employee
+        from scheduling.models import Department
+        from services.models import ServiceType
+
+        User = get_user_model()
+        departments = {}
+        for name, display_name in DEFAULT_DEPARTMENTS:
+            departments[name], _ = Department.objects.get_or_create(
+                name=name, defaults={'display_name': display_name})
+
+        self.service_types = list(ServiceType.objects.filter(is_active=True).select_related('department'))
+        if not self.service_types:
+            for name, category, duration, price, department in DEFAULT_SERVICE_TYPES:
+                self.service_types.append(ServiceType.objects.create(
+                    name=name, category=category, estimated_duration=duration,
+                    base_price=price, department=departments[department],
+                ))
+
+        # 1만 고객당 직원 2명 (최소 5명, 최대 50명)
+        staff_count = max(5, min(50, self.customers // 5000))
+        self.staff = []
+        department_list = list(departments.values())
+        for number in range(1, staff_count + 1):
+            user, created = User.objects.get_or_create(
+                username=f'{STAFF_USERNAME_PREFIX}{number:02d}',
+                defaults={'first_name': f'직원{number:02d}', 'is_staff': True},
+            )
+            if created:
+                user.set_unusable_password()
+                user.save(update_fields=['password'])
+            Employee.objects.get_or_create(
+                user=user,
+                defaults={
+                    'employee_id': f'SYN{number:04d}',
+                    'department': department_list[number % len(department_list)],
+                    'position': 'manager' if number == 1 else 'staff',
+                    'hire_date': self.today - timedelta(days=365 * 2),
+                },
+            )
+            self.staff.append(user)
+
+        self.suppliers = [
+            Supplier.objects.get_or_create(name=f'{SUPPLIER_NAME_PREFIX} {number:02d}')[0]
+            for number in range(1, 21)
+        ]
+
+    # ===================== 생성 =====================
+
+    def run(self, progress=None):
+        """전체 생성, 모델별 생성 건수 반환"""
+        from accounting.models import (PurchaseVoucher, PurchaseVoucherItem, SalesVoucher,
+                                       SalesVoucherItem)
+        from customers.models import Customer, CustomerVehicle, Vehicle
+        from happycall.models import HappyCall, HappyCallRevenue
+        from scheduling.models import Schedule
+        from services.models import ServiceRequest
+
+        self._prepare_reference_data()
+        self.counts = {}
+        chunk_count = (self.customers + CHUNK_SIZE - 1) // CHUNK_SIZE
+        models = (Customer, Vehicle, CustomerVehicle, Schedule, ServiceRequest, HappyCall,
+                  HappyCallRevenue, SalesVoucher, SalesVoucherItem, PurchaseVoucher, PurchaseVoucherItem)
+        with explicit_timestamps(*models):
+            for chunk_no in range(chunk_count):
+                start = chunk_no * CHUNK_SIZE
+                size = min(CHUNK_SIZE, self.customers - start)
+                with transaction.atomic():
+                    self._generate_chunk(chunk_no, start, size)
+                if progress:
+                    progress(start + size, self.customers)
+        return self.counts
+
+    def _bulk_create(self, model, objects):
+        if hasattr(model, 'refresh_search_keys'):
+            # bulk_create 는 save() 를 거치지 않으므로 초성/자모 검색 키를 미리 채운다
+            for obj in objects:
+                obj.refresh_search_keys()
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.counts[model._meta.label] = self.counts.get(model._meta.label, 0) + len(objects)
+        return objects
+
+    def _random_datetime(self, rng, start, end):
+        """start~end(date) 사이 영업시간(9~18시) 임의 시각"""
+        days = max((end - start).days, 0)
+        day = start + timedelta(days=rng.randint(0, days))
+        return _aware(datetime.combine(day, time(rng.randint(9, 17), rng.choice((0, 10, 20, 30, 40, 50)))))
+
+    def _generate_chunk(self, chunk_no, start, size):
+        from services.models import ServiceRequest
+
+        rng = random.Random(f'{self.seed}:{chunk_no}')
+        history_start = self.today - timedelta(days=self.history_days)
+
+        customers = self._create_customers(rng, start, size, history_start)
+        owned = self._create_vehicles(rng, chunk_no, customers)
+        services = self._build_services(rng, customers, owned)
+        self._create_schedules(rng, chunk_no, services)
+        self._bulk_create(ServiceRequest, [service for service, _ in services])
+        self._create_mileage_records(chunk_no, services)
+        happy_calls, revenues = self._create_happy_calls(rng, services)
+        self._create_sales_vouchers(rng, chunk_no, services, happy_calls, revenues)
+        self._create_purchase_vouchers(rng, chunk_no, size, history_start)
+
+    def _create_customers(self, rng, start, size, history_start):
+        from customers.models import Customer
+
+        customers = []
+        for index in range(start, start + size):
+            created_at = self._random_datetime(rng, history_start, self.today)
+            customer_type = 'corporate' if rng.random() < 0.05 else 'individual'
+            status = _weighted(rng, CUSTOMER_STATUS_WEIGHTS)
+            city = rng.choice(list(REGIONS))
+            district = rng.choice(list(REGIONS[city]))
+            dong = rng.choice(REGIONS[city][district])
+            name = None
+            if status != 'temporary':
+                name = rng.choices(SURNAMES, SURNAME_WEIGHTS)[0] + ''.join(rng.choices(GIVEN_SYLLABLES, k=2))
+            marketing = rng.random() < 0.4
+            do_not_contact = rng.random() < 0.03
+            customers.append(Customer(
+                customer_status=status,
+                customer_type=customer_type,
+                name=name,
+                phone=synthetic_phone(index),
+                email=f'user{index}@example.com' if rng.random() < 0.3 else '',
+                address_main=f'{city} {district} {dong}' if status != 'temporary' else '',
+                address_city=city if status != 'temporary' else '',
+                address_district=district if status != 'temporary' else '',
+                address_dong=dong if status != 'temporary' else '',
+                address_detail=f'{rng.randint(1, 999)}번지' if status != 'temporary' else '',
+                company_name=f'{name}상사' if customer_type == 'corporate' and name else '',
+                membership_status=_weighted(rng, MEMBERSHIP_WEIGHTS),
+                membership_points=rng.choice((0, 0, 0, 500, 1000, 3000, 10000)),
+                privacy_consent=status != 'temporary',
+                privacy_consent_date=created_at if status != 'temporary' else None,
+                marketing_consent=marketing,
+                marketing_consent_date=created_at if marketing else None,
+                do_not_contact=do_not_contact,
+                do_not_contact_date=created_at if do_not_contact else None,
+                acquisition_source=rng.choice(('방문', '지인소개', '온라인', '해피콜', '')),
+                customer_grade=_weighted(rng, GRADE_WEIGHTS),
+                created_at=created_at,
+                updated_at=created_at,
+                is_active=status != 'inactive' or rng.random() < 0.5,
+            ))
+        return self._bulk_create(Customer, customers)
+
+    def _create_vehicles(self, rng, chunk_no, customers):
+        """고객별 차량과 소유관계 생성 (10% 는 이전 소유자 이력 포함), 고객별 현재 차량 목록 반환"""
+        from customers.models import CustomerVehicle, Vehicle
+
+        plans = [(customer, _weighted(rng, VEHICLE_COUNT_WEIGHTS)) for customer in customers]
+        vehicles = []
+        vehicle_owner = []
+        base = chunk_no * CHUNK_SIZE * MAX_VEHICLES_PER_CUSTOMER
+        for customer, count in plans:
+            for _ in range(count):
+                make, models = rng.choice(VEHICLE_MODELS)
+                year = rng.randint(self.today.year - 15, self.today.year)
+                vehicles.append(Vehicle(
+                    vehicle_number=synthetic_vehicle_number(base + len(vehicles)),
+                    model=f'{make} {rng.choice(models)}',
+                    year=year,
+                    current_owner=customer,
+                    created_at=customer.created_at,
+                    updated_at=customer.created_at,
+                ))
+                vehicle_owner.append(customer)
+
+        self._bulk_create(Vehicle, vehicles)
+
+        ownerships = []
+        owned = {}
+        for vehicle, customer in zip(vehicles, vehicle_owner):
+            start_date = customer.created_at.date() - timedelta(days=rng.randint(0, 365 * 3))
+            if rng.random() < 0.1 and len(customers) > 1:
+                previous = rng.choice(customers)
+                if previous is not customer:
+                    ownerships.append(CustomerVehicle(
+                        customer=previous, vehicle=vehicle,
+                        start_date=start_date - timedelta(days=rng.randint(365, 365 * 5)),
+                        end_date=start_date, created_at=previous.created_at,
+                    ))
+            ownerships.append(CustomerVehicle(
+                customer=customer, vehicle=vehicle, start_date=start_date, created_at=customer.created_at,
+            ))
+            owned.setdefault(customer.pk, []).append(vehicle)
+        self._bulk_create(CustomerVehicle, ownerships)
+        return owned
+
+    def _build_services(self, rng, customers, owned):
+        """
+        서비스 요청 객체 생성 (일정 연결 후 저장하므로 (서비스, 금액) 목록만 반환)
+
+        과거 서비스는 대부분 완료, 미래 30일 안은 접수/일정확정 상태로 만든다.
+        고객의 최초/최근 서비스일과 누적 금액도 함께 채운다.
+        """
+        from customers.models import Customer
+        from services.models import ServiceRequest
+
+        services = []
+        touched = []
+        for customer in customers:
+            count = min(_weighted(rng, SERVICE_COUNT_WEIGHTS), MAX_SERVICES_PER_CUSTOMER)
+            vehicles = owned.get(customer.pk)
+            if not count or not vehicles or customer.customer_status == 'prospect':
+                continue
+            first_day = customer.created_at.date()
+            dates = sorted(
+                self._random_datetime(rng, first_day, self.today + timedelta(days=30)) for _ in range(count)
+            )
+            total_amount = Decimal(0)
+            completed = 0
+            for service_date in dates:
+                service_type = rng.choice(self.service_types)
+                price = Decimal(int(service_type.base_price * Decimal(rng.uniform(0.8, 1.5)) / 1000) * 1000)
+                staff = rng.choice(self.staff)
+                is_future = service_date.date() > self.today
+                if is_future:
+                    status = rng.choice(('pending', 'scheduled', 'scheduled'))
+                elif rng.random() < 0.05:
+                    status = 'cancelled'
+                elif (self.today - service_date.date()).days < 2 and rng.random() < 0.5:
+                    status = 'in_progress'
+                else:
+                    status = 'completed'
+                created_at = service_date - timedelta(days=rng.randint(0, 14), hours=rng.randint(0, 8))
+                service = ServiceRequest(
+                    customer=customer,
+                    vehicle=rng.choice(vehicles),
+                    service_type=service_type,
+                    description=f'{service_type.name} 요청',
+                    estimated_price=price,
+                    status=status,
+                    priority=rng.choices(('low', 'normal', 'high', 'urgent'), (10, 75, 12, 3))[0],
+                    requested_date=service_date,
+                    scheduled_date=service_date if status != 'pending' else None,
+                    service_date=service_date if status in ('completed', 'in_progress') else None,
+                    assigned_employee=staff if status != 'pending' else None,
+                    created_by=rng.choice(self.staff),
+                    created_at=created_at,
+                    updated_at=service_date if not is_future else created_at,
+                )
+                services.append((service, price))
+                if status == 'completed':
+                    completed += 1
+                    total_amount += price
+                    customer.first_service_date = customer.first_service_date or service_date.date()
+                    customer.last_service_date = service_date.date()
+            if completed:
+                customer.total_service_count = completed
+                customer.total_service_amount = total_amount
+                touched.append(customer)
+        if touched:
+            Customer.objects.bulk_update(
+                touched, ['first_service_date', 'last_service_date', 'total_service_count', 'total_service_amount'],
+                batch_size=self.batch_size,
+            )
+        return services
+
+    def _create_mileage_records(self, chunk_no, services):
+        """
+        완료/진행 서비스의 주행거리 기록 (80%) 과 차량 최근 주행거리
+
+        차량마다 일평균 주행거리(중앙값 약 35km)를 정하고 연식 해 7월 1일부터 그 비율로 달린 값에 ±5% 흔들림을 준다.
+        기존 데이터가 바뀌지 않도록 난수는 청크 난수와 따로 뽑는다.
+        """
+        from customers.models import Vehicle, VehicleMileage
+
+        rng = random.Random(f'{self.seed}:{chunk_no}:mileage')
+        rates = {}
+        records = []
+        latest = {}  # 차량 ID → 차량 (최근 주행거리 갱신 대상)
+        for service, _ in services:
+            if service.status not in ('completed', 'in_progress') or rng.random() < 0.2:
+                continue
+            vehicle = service.vehicle
+            if vehicle.pk not in rates:
+                rates[vehicle.pk] = rng.lognormvariate(3.55, 0.45)
+            day = service.service_date.date()
+            driven_days = max((day - datetime(vehicle.year, 7, 1).date()).days, 30)
+            mileage = max(int(rates[vehicle.pk] * driven_days * rng.uniform(0.95, 1.05)), 1)
+            records.append(VehicleMileage(vehicle=vehicle, service_request=service, mileage=mileage, recorded_on=day,
+                                          source='completion' if service.status == 'completed' else 'request'))
+            if vehicle.mileage is None or mileage > vehicle.mileage:
+                vehicle.mileage = mileage
+                latest[vehicle.pk] = vehicle
+        self._bulk_create(VehicleMileage, records)
+        if latest:
+            Vehicle.objects.bulk_update(list(latest.values()), ['mileage'], batch_size=self.batch_size)
+
+    def _create_schedules(self, rng, chunk_no, services):
+        """일정확정/진행/최근 완료 서비스의 일정 생성 후 서비스에 연결"""
+        from scheduling.models import Schedule
+
+        recent = self.today - timedelta(days=90)
+        schedules = []
+        linked = []
+        for service, _ in services:
+            if not service.scheduled_date or service.status == 'cancelled':
+                continue
+            if service.status == 'completed' and service.scheduled_date.date() < recent:
+                continue
+            schedule_status = {'completed': 'completed', 'in_progress': 'confirmed'}.get(service.status, 'confirmed')
+            schedules.append(Schedule(
+                title=f'서비스: {service.service_type.name} - {service.customer.name or service.customer.phone}',
+                description=f'요청사항: {service.description}',
+                start_datetime=service.scheduled_date,
+                end_datetime=service.scheduled_date + timedelta(minutes=service.service_type.estimated_duration),
+                creator=service.created_by,
+                department=service.service_type.department,
+                assignee=service.assigned_employee,
+                status=schedule_status,
+                priority=service.priority,
+                is_confirmed_by_assignee=rng.random() < 0.8,
+                created_at=service.created_at,
+                updated_at=service.created_at,
+                ical_uid=f'{SCHEDULE_UID_PREFIX}{chunk_no}-{len(schedules)}@unsan-crm.local',
+            ))
+            linked.append(service)
+        self._bulk_create(Schedule, schedules)
+        for service, schedule in zip(linked, schedules):
+            service.linked_schedule = schedule
+
+    def _create_happy_calls(self, rng, services):
+        """
+        완료 후 1주가 지난 서비스의 해피콜 생성
+
+        서비스 후 경과일로 현재 단계(1~4차)를 정하고, 이전 단계는 완료 처리한다.
+        완료된 단계 일부에는 해피콜 매출을 만든다 (전표는 _create_sales_vouchers 에서 연결).
+        """
+        from happycall.models import HappyCall, HappyCallRevenue
+
+        now = timezone.now()
+        happy_calls = []
+        for service, price in services:
+            if service.status != 'completed' or now - service.service_date < STAGE_OFFSETS[0]:
+                continue
+            if rng.random() < 0.15:
+                continue  # 해피콜 미생성 (대상 제외)
+            age = now - service.service_date
+            stage_index = max(index for index, offset in enumerate(STAGE_OFFSETS) if age >= offset)
+            state = _weighted(rng, STAGE_STATE_WEIGHTS)
+            call = HappyCall(
+                service_request=service,
+                call_stage=f'{STAGES[stage_index]}_{state}',
+                status=STAGE_STATUS[state],
+                created_at=service.service_date + timedelta(days=1),
+                updated_at=min(now, service.service_date + STAGE_OFFSETS[stage_index]),
+            )
+            attempts = 0
+            for index in range(stage_index + 1):
+                prefix = STAGE_FIELDS[index]
+                scheduled = service.service_date + STAGE_OFFSETS[index]
+                setattr(call, f'{prefix}_call_scheduled_date', scheduled)
+                finished = index < stage_index or state in ('completed', 'failed')
+                if finished:
+                    success = index < stage_index or state == 'completed'
+                    setattr(call, f'{prefix}_call_date', scheduled + timedelta(hours=rng.randint(0, 48)))
+                    setattr(call, f'{prefix}_call_caller', rng.choice(self.staff))
+                    setattr(call, f'{prefix}_call_success', success)
+                    attempts += 1 if success else rng.randint(2, 4)
+            if stage_index > 0 or state == 'completed':
+                call.overall_satisfaction = _weighted(rng, SURVEY_WEIGHTS)
+                call.service_quality = _weighted(rng, SURVEY_WEIGHTS)
+                call.staff_kindness = _weighted(rng, SURVEY_WEIGHTS)
+                call.price_satisfaction = _weighted(rng, SURVEY_WEIGHTS)
+                call.will_revisit = call.overall_satisfaction > 1
+            call.total_call_attempts = attempts
+            if state in ('pending', 'pending_approval'):
+                call.next_call_date = service.service_date + STAGE_OFFSETS[stage_index]
+            happy_calls.append(call)
+        self._bulk_create(HappyCall, happy_calls)
+
+        revenues = []
+        for call in happy_calls:
+            stage_index = STAGES.index(call.call_stage[:3])
+            for index in range(stage_index + 1):
+                if index == stage_index and not call.call_stage.endswith('completed'):
+                    break
+                if rng.random() >= 0.12:
+                    continue
+                stage = STAGES[index]
+                amount = Decimal(rng.choice((50000, 80000, 120000, 200000, 350000)))
+                completed_at = getattr(call, f'{STAGE_FIELDS[index]}_call_date')
+                revenues.append(HappyCallRevenue(
+                    happy_call=call,
+                    call_stage=stage,
+                    revenue_type=REVENUE_TYPES[stage],
+                    description=f'{stage} 해피콜 매출',
+                    expected_amount=amount,
+                    actual_amount=amount,
+                    status='voucher_created',
+                    proposed_by=getattr(call, f'{STAGE_FIELDS[index]}_call_caller') or rng.choice(self.staff),
+                    proposed_at=completed_at,
+                    accepted_at=completed_at,
+                    completed_at=completed_at,
+                    updated_at=completed_at,
+                ))
+        self._bulk_create(HappyCallRevenue, revenues)
+        return happy_calls, revenues
+
+    def _create_sales_vouchers(self, rng, chunk_no, services, happy_calls, revenues):
+        """완료 서비스(직접 매출)와 해피콜 매출의 매출전표 + 항목 생성"""
+        from accounting.models import SalesVoucher, SalesVoucherItem
+        from happycall.models import HappyCall
+
+        vouchers = []
+        item_names = []
+        base = chunk_no * CHUNK_SIZE * (MAX_SERVICES_PER_CUSTOMER + len(STAGES) * MAX_SERVICES_PER_CUSTOMER)
+
+        def add_voucher(sales_date, customer, amount, service, item_name, **extra):
+            received = rng.random() < 0.9
+            payment_method = _weighted(rng, PAYMENT_WEIGHTS)
+            created_at = _aware(datetime.combine(sales_date, time(18, 0)))
+            vouchers.append(SalesVoucher(
+                voucher_number=f'{SALES_NUMBER_PREFIX}{base + len(vouchers):09d}',
+                sales_date=sales_date,
+                customer_name=customer.name or '',
+                customer_phone=customer.phone,
+                total_amount=amount,
+                tax_amount=(amount / 11).quantize(Decimal('1')),
+                description=item_name,
+                payment_method=payment_method,
+                is_received=received and payment_method != 'credit',
+                payment_date=sales_date if received and payment_method != 'credit' else None,
+                service_request=service,
+                created_by=service.created_by,
+                created_at=created_at,
+                updated_at=created_at,
+                **extra,
+            ))
+            item_names.append(item_name)
+
+        for service, price in services:
+            if service.status == 'completed' and price:
+                add_voucher(service.service_date.date(), service.customer, price, service, service.service_type.name)
+
+        totals = {}
+        for revenue in revenues:
+            service = revenue.happy_call.service_request
+            add_voucher(revenue.completed_at.date(), service.customer, revenue.actual_amount, service,
+                        revenue.get_revenue_type_display(),
+                        happy_call_revenue=revenue, revenue_source=f'happy_call_{revenue.call_stage}')
+            call_totals = totals.setdefault(revenue.happy_call.pk, [revenue.happy_call, Decimal(0), 0])
+            call_totals[1] += revenue.actual_amount
+            call_totals[2] += 1
+
+        self._bulk_create(SalesVoucher, vouchers)
+        self._bulk_create(SalesVoucherItem, [
+            SalesVoucherItem(voucher=voucher, item_name=name, quantity=1, unit_price=voucher.total_amount,
+                             amount=voucher.total_amount)
+            for voucher, name in zip(vouchers, item_names)
+        ])
+
+        updated = []
+        for call, amount, count in totals.values():
+            call.total_revenue_generated = amount
+            call.revenue_count = count
+            updated.append(call)
+        if updated:
+            HappyCall.objects.bulk_update(updated, ['total_revenue_generated', 'revenue_count'],
+                                          batch_size=self.batch_size)
+
+    def _create_purchase_vouchers(self, rng, chunk_no, size, history_start):
+        """부품/소모품 매입전표 (고객 100명당 약 8건)"""
+        from accounting.models import PurchaseVoucher, PurchaseVoucherItem
+
+        count = min(MAX_PURCHASES_PER_CHUNK, max(1, size * 8 // 100))
+        base = chunk_no * MAX_PURCHASES_PER_CHUNK
+        vouchers = []
+        items = []
+        for number in range(count):
+            purchase_date = history_start + timedelta(days=rng.randint(0, (self.today - history_start).days))
+            lines = []
+            for item_name, unit, unit_price in rng.sample(PURCHASE_ITEMS, rng.randint(1, 3)):
+                quantity = rng.randint(1, 40)
+                lines.append((item_name, unit, unit_price, quantity, Decimal(unit_price * quantity)))
+            total = sum(line[4] for line in lines)
+            paid = rng.random() < 0.85
+            created_at = _aware(datetime.combine(purchase_date, time(10, 0)))
+            vouchers.append(PurchaseVoucher(
+                voucher_number=f'{PURCHASE_NUMBER_PREFIX}{base + number:09d}',
+                purchase_date=purchase_date,
+                supplier=rng.choice(self.suppliers),
+                total_amount=total,
+                tax_amount=(total / 11).quantize(Decimal('1')),
+                description=lines[0][0] + (f' 외 {len(lines) - 1}건' if len(lines) > 1 else ''),
+                payment_method=rng.choice(('transfer', 'transfer', 'card', 'credit')),
+                is_paid=paid,
+                payment_date=purchase_date if paid else None,
+                created_by=rng.choice(self.staff),
+                created_at=created_at,
+                updated_at=created_at,
+            ))
+            items.append(lines)
+        self._bulk_create(PurchaseVoucher, vouchers)
+        self._bulk_create(PurchaseVoucherItem, [
+            PurchaseVoucherItem(voucher=voucher, item_name=name, unit=unit, quantity=quantity,
+                                unit_price=unit_price, amount=amount)
+            for voucher, lines in zip(vouchers, items)
+            for name, unit, unit_price, quantity, amount in lines
+        ])
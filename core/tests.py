@@ -1,3 +1,37 @@
-from django.test import TestCase
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.synthetic import SyntheticDataGenerator
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   REQUEST_METRICS_ENABLED=False)
+class QueryBudgetTests(TestCase):
+    """주요 화면의 쿼리 예산/N+1 검사 (check_query_budgets) 를 작은 합성 데이터로 실행"""
+
+    @classmethod
+    def setUpTestData(cls):
+        get_user_model().objects.create_superuser('budget-admin', 'admin@example.com', 'password')
+        SyntheticDataGenerator(customers=60, seed=7).run()
+
+    def test_views_stay_within_query_budgets(self):
+        # 위반 시 CommandError 로 실패
+        out = StringIO()
+        call_command('check_query_budgets', stdout=out)
+        self.assertIn('쿼리 예산 검사 통과', out.getvalue())
+
+
+class QueryPlanTests(TestCase):
+    """주요 조회 쿼리의 실행 계획 검사 (check_query_plans) - 인덱스 없이 전체 스캔하면 실패"""
+
+    @classmethod
+    def setUpTestData(cls):
+        SyntheticDataGenerator(customers=20, seed=7).run()
+
+    def test_lookups_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('실행 계획 검사 통과', out.getvalue())
@@ -1,7 +1,8 @@
 from django.db import transaction
 from django.utils import timezone
-from django.core.cache import cache
+from core.cache import deferred_invalidation, get_upload_progress, set_upload_progress
 from datetime import datetime
+from customers.dedup import normalize_phone, phone_variants
 from customers.models import Customer, Vehicle, CustomerVehicle
 from services.models import ServiceType, ServiceRequest
 from django.contrib.auth import get_user_model
@@ -51,25 +52,27 @@ class DataUploadHandler:
             'message': message,
             'results': self.results.copy()
         }
-        cache.set(f'upload_progress_{self.progress_key}', progress_data, timeout=300)
+        set_upload_progress(self.progress_key, progress_data)
     
     def get_progress(self):
         """현재 진행 상황 반환"""
-        return cache.get(f'upload_progress_{self.progress_key}')
+        return get_upload_progress(self.progress_key)
     
     def process_data(self, df):
         """DataFrame 데이터 처리"""
         total_rows = len(df)
         self.update_progress(5, f'총 {total_rows}건의 데이터를 처리합니다...')
         
-        if self.upload_type == 'customers':
-            return self._process_customers(df)
-        elif self.upload_type == 'vehicles':
-            return self._process_vehicles(df)
-        elif self.upload_type == 'services':
-            return self._process_services(df)
-        else:
-            raise ValueError(f"지원하지 않는 업로드 타입: {self.upload_type}")
+        # 행마다 대시보드 캐시를 무효화하지 않고 업로드 종료 시 한 번만
+        with deferred_invalidation():
+            if self.upload_type == 'customers':
+                return self._process_customers(df)
+            elif self.upload_type == 'vehicles':
+                return self._process_vehicles(df)
+            elif self.upload_type == 'services':
+                return self._process_services(df)
+            else:
+                raise ValueError(f"지원하지 않는 업로드 타입: {self.upload_type}")
     
     def _process_customers(self, df):
         """고객 데이터 처리"""
@@ -107,23 +110,24 @@ class DataUploadHandler:
     
     def _process_customer_chunk(self, chunk_df, chunk_start):
         """고객 데이터 청크 처리"""
-        # 청크 내 모든 전화번호를 한 번에 조회 (성능 최적화)
-        phones_in_chunk = [str(row['phone']).strip() for _, row in chunk_df.iterrows()]
+        # 청크 내 모든 전화번호를 한 번에 조회 (성능 최적화, 정규화 전 숫자만 저장된 기존 고객 포함)
+        phones_in_chunk = [phone for _, row in chunk_df.iterrows() for phone in phone_variants(row['phone'])]
         existing_customers = {
-            customer.phone: customer 
+            customer._get_raw_phone(): customer
             for customer in Customer.objects.filter(phone__in=phones_in_chunk)
         }
         
         for index, row in chunk_df.iterrows():
             try:
                 with transaction.atomic():  # 각 행을 개별 트랜잭션으로 처리
-                    phone = str(row['phone']).strip()
+                    phone = normalize_phone(row['phone'])
                     
                     # 미리 조회한 딕셔너리에서 찾기 (또는 실시간 재확인)
-                    existing = existing_customers.get(phone)
+                    variants = phone_variants(row['phone'])
+                    existing = next((existing_customers[v] for v in variants if v in existing_customers), None)
                     if not existing:
                         # 미리 조회했지만 다시 한번 확인 (동시성 문제 방지)
-                        existing = Customer.objects.filter(phone=phone).first()
+                        existing = Customer.objects.filter(phone__in=variants).first()
                 
                     if existing:
                         if self.duplicate_handling == 'skip':
@@ -194,7 +198,7 @@ class DataUploadHandler:
     
     def _create_customer(self, row):
         """새 고객 생성"""
-        phone = str(row['phone']).strip()
+        phone = normalize_phone(row['phone'])
         
         # 개인정보 동의 확인 (필수)
         privacy_consent = str(row.get('privacy_consent', '')).upper() == 'TRUE'
@@ -251,8 +255,8 @@ class DataUploadHandler:
         processed = chunk_start
         for index, row in chunk_df.iterrows():
             try:
-                phone = str(row['phone']).strip()
-                existing = Customer.objects.filter(phone=phone).first()
+                phone = normalize_phone(row['phone'])
+                existing = Customer.objects.filter(phone__in=phone_variants(row['phone'])).first()
                 
                 if existing:
                     if self.duplicate_handling == 'skip':
@@ -327,22 +331,24 @@ class DataUploadHandler:
         }
         
         # 청크 내 모든 고객 전화번호를 한 번에 조회
-        customer_phones_in_chunk = [str(row['customer_phone']).strip() for _, row in chunk_df.iterrows()]
+        customer_phones_in_chunk = [phone for _, row in chunk_df.iterrows()
+                                    for phone in phone_variants(row['customer_phone'])]
         existing_customers = {
-            customer.phone: customer 
+            customer._get_raw_phone(): customer
             for customer in Customer.objects.filter(phone__in=customer_phones_in_chunk)
         }
         
         for index, row in chunk_df.iterrows():
             try:
                 vehicle_number = str(row['vehicle_number']).strip()
-                customer_phone = str(row['customer_phone']).strip()
+                customer_phone = normalize_phone(row['customer_phone'])
                 
                 # 미리 조회한 딕셔너리에서 고객 찾기
-                customer = existing_customers.get(customer_phone)
+                variants = phone_variants(row['customer_phone'])
+                customer = next((existing_customers[v] for v in variants if v in existing_customers), None)
                 if not customer:
                     # 딕셔너리에 없으면 개별 조회 시도
-                    customer = Customer.objects.filter(phone=customer_phone).first()
+                    customer = Customer.objects.filter(phone__in=variants).first()
                     if not customer:
                         raise ValueError(f"고객을 찾을 수 없습니다: {customer_phone}")
                 
@@ -422,14 +428,13 @@ class DataUploadHandler:
             
             for index, row in chunk_df.iterrows():
                 try:
-                    customer_phone = str(row['customer_phone']).strip()
+                    customer_phone = normalize_phone(row['customer_phone'])
                     vehicle_number = str(row['vehicle_number']).strip()
                     service_type_name = str(row['service_type']).strip()
                     
                     # 고객 찾기
-                    try:
-                        customer = Customer.objects.get(phone=customer_phone)
-                    except Customer.DoesNotExist:
+                    customer = Customer.objects.filter(phone__in=phone_variants(row['customer_phone'])).first()
+                    if not customer:
                         raise ValueError(f"고객을 찾을 수 없습니다: {customer_phone}")
                     
                     # 차량 찾기
@@ -566,10 +571,10 @@ class DataUploadHandler:
         for index, row in chunk_df.iterrows():
             try:
                 vehicle_number = str(row['vehicle_number']).strip()
-                customer_phone = str(row['customer_phone']).strip()
+                customer_phone = normalize_phone(row['customer_phone'])
                 
                 # 고객 찾기
-                customer = Customer.objects.filter(phone=customer_phone).first()
+                customer = Customer.objects.filter(phone__in=phone_variants(row['customer_phone'])).first()
                 if not customer:
                     raise ValueError(f"고객을 찾을 수 없습니다: {customer_phone}")
                 
@@ -9,4 +9,7 @@ urlpatterns = [
     path('upload/start/', views.start_upload, name='start_upload'),
     path('template/<str:template_type>/', views.download_template, name='download_template'),
     path('upload/progress/<str:progress_key>/', views.upload_progress, name='upload_progress'),
+    path('performance/', views.performance_report, name='performance_report'),
+    path('search/api/', views.search_api, name='search_api'),  # 메모/피드백/소통 내용 전문 검색
+    path('export/<str:dataset>.parquet', views.parquet_export, name='parquet_export'),  # 분석용 Parquet 내보내기
 ]
\ No newline at end of file
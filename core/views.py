@@ -1,7 +1,9 @@
 from django.shortcuts import render, redirect
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Q, Avg
+from django.db.models import Avg, Count, F, Func, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.contrib import messages
 from datetime import datetime, timedelta
@@ -10,7 +12,11 @@ from services.models import ServiceRequest
 from customers.models import Customer
 from employees.models import Employee
 from scheduling.models import Schedule
+from . import metrics
+from .cache import get_or_set, get_upload_progress, set_upload_progress
 from .forms import DataUploadForm
+from .dbrouting import reporting_db
+from .querybudget import query_budget
 from .upload_handlers import DataUploadHandler
 
 User = get_user_model()
@@ -37,14 +43,27 @@ def dashboard(request):
     return render(request, "core/dashboard.html", context)
 
 
-@login_required
-def admin_dashboard(request):
-    """관리자 대시보드"""
-    if not request.user.is_superuser:
-        return dashboard(request)
+# 관리자 대시보드 통계가 의존하는 캐시 태그
+ADMIN_DASHBOARD_CACHE_TAGS = ("customers", "services", "happycalls", "employees", "schedules")
 
-    # 기본 통계
-    today = timezone.now().date()
+
+def _happycall_count_for_user(condition):
+    """
+    직원(Employee) 쿼리셋에 붙일 담당 해피콜 수 서브쿼리
+
+    condition(user) 는 OuterRef("user") 를 받아 해피콜 필터 Q 를 만든다.
+    """
+    counts = (
+        HappyCall.objects.filter(condition(OuterRef("user")))
+        .order_by()
+        .annotate(total=Func(F("pk"), function="COUNT"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _build_admin_dashboard_stats(today):
+    """관리자 대시보드 통계 집계 (캐시 대상)"""
     week_ago = today - timedelta(days=7)
     month_ago = today - timedelta(days=30)
 
@@ -59,106 +78,74 @@ def admin_dashboard(request):
     month_services = ServiceRequest.objects.filter(created_at__gte=month_ago).count()
     week_happycalls = HappyCall.objects.filter(created_at__gte=week_ago).count()
 
-    # 직원별 해피콜 배정 현황
+    # 직원별 해피콜 배정 현황 (직원 수와 무관하게 한 번의 쿼리로 집계)
     employee_happycall_stats = []
-    employees = Employee.objects.filter(status="active").select_related("user")
-
-    for employee in employees:
-        # 진행 중인 해피콜 (미완료)
-        pending_calls = (
-            HappyCall.objects.filter(
-                Q(
-                    first_call_caller=employee.user,
-                    call_stage__in=["1st_pending", "1st_in_progress"],
-                )
-                | Q(
-                    second_call_caller=employee.user,
-                    call_stage__in=["2nd_pending", "2nd_in_progress"],
-                )
-                | Q(
-                    third_call_caller=employee.user,
-                    call_stage__in=["3rd_pending", "3rd_in_progress"],
-                )
-                | Q(
-                    fourth_call_caller=employee.user,
-                    call_stage__in=["4th_pending", "4th_in_progress"],
-                )
-            )
-            .distinct()
-            .count()
-        )
-
-        # 완료된 해피콜 (이번 주)
-        completed_calls = (
-            HappyCall.objects.filter(
-                Q(
-                    first_call_caller=employee.user,
-                    first_call_success=True,
-                    first_call_date__gte=week_ago,
-                )
-                | Q(
-                    second_call_caller=employee.user,
-                    second_call_success=True,
-                    second_call_date__gte=week_ago,
-                )
-                | Q(
-                    third_call_caller=employee.user,
-                    third_call_success=True,
-                    third_call_date__gte=week_ago,
-                )
-                | Q(
-                    fourth_call_caller=employee.user,
-                    fourth_call_success=True,
-                    fourth_call_date__gte=week_ago,
-                )
-            )
-            .distinct()
-            .count()
-        )
-
-        # 전체 담당 해피콜
-        total_assigned = (
-            HappyCall.objects.filter(
-                Q(first_call_caller=employee.user)
-                | Q(second_call_caller=employee.user)
-                | Q(third_call_caller=employee.user)
-                | Q(fourth_call_caller=employee.user)
-            )
-            .distinct()
-            .count()
+    employees = (
+        Employee.objects.filter(status="active")
+        .select_related("user")
+        .annotate(
+            # 진행 중인 해피콜 (미완료)
+            pending_calls=_happycall_count_for_user(
+                lambda user: Q(first_call_caller=user, call_stage__in=["1st_pending", "1st_in_progress"])
+                | Q(second_call_caller=user, call_stage__in=["2nd_pending", "2nd_in_progress"])
+                | Q(third_call_caller=user, call_stage__in=["3rd_pending", "3rd_in_progress"])
+                | Q(fourth_call_caller=user, call_stage__in=["4th_pending", "4th_in_progress"])
+            ),
+            # 완료된 해피콜 (이번 주)
+            completed_calls_week=_happycall_count_for_user(
+                lambda user: Q(first_call_caller=user, first_call_success=True, first_call_date__gte=week_ago)
+                | Q(second_call_caller=user, second_call_success=True, second_call_date__gte=week_ago)
+                | Q(third_call_caller=user, third_call_success=True, third_call_date__gte=week_ago)
+                | Q(fourth_call_caller=user, fourth_call_success=True, fourth_call_date__gte=week_ago)
+            ),
+            # 전체 담당 해피콜
+            total_assigned=_happycall_count_for_user(
+                lambda user: Q(first_call_caller=user)
+                | Q(second_call_caller=user)
+                | Q(third_call_caller=user)
+                | Q(fourth_call_caller=user)
+            ),
         )
+    )
 
+    for employee in employees:
         employee_happycall_stats.append(
             {
                 "employee": employee,
-                "pending_calls": pending_calls,
-                "completed_calls_week": completed_calls,
-                "total_assigned": total_assigned,
+                "pending_calls": employee.pending_calls,
+                "completed_calls_week": employee.completed_calls_week,
+                "total_assigned": employee.total_assigned,
             }
         )
 
     # 해피콜 단계별 현황
-    happycall_stage_stats = {
-        "1st_pending": HappyCall.objects.filter(call_stage="1st_pending").count(),
-        "1st_completed": HappyCall.objects.filter(call_stage="1st_completed").count(),
-        "2nd_pending": HappyCall.objects.filter(call_stage="2nd_pending").count(),
-        "2nd_completed": HappyCall.objects.filter(call_stage="2nd_completed").count(),
-        "3rd_pending": HappyCall.objects.filter(call_stage="3rd_pending").count(),
-        "3rd_completed": HappyCall.objects.filter(call_stage="3rd_completed").count(),
-        "4th_pending": HappyCall.objects.filter(call_stage="4th_pending").count(),
-        "completed": HappyCall.objects.filter(call_stage="completed").count(),
-    }
+    stage_keys = [
+        "1st_pending", "1st_completed", "2nd_pending", "2nd_completed",
+        "3rd_pending", "3rd_completed", "4th_pending", "completed",
+    ]
+    happycall_stage_stats = HappyCall.objects.aggregate(
+        **{stage: Count("id", filter=Q(call_stage=stage)) for stage in stage_keys}
+    )
 
     # 서비스 타입별 통계 (이번 달)
-    service_type_stats = (
+    service_type_stats = list(
         ServiceRequest.objects.filter(created_at__gte=month_ago)
         .values("service_type__name")
         .annotate(count=Count("id"))
         .order_by("-count")
     )
 
+    # 지역별 고객 수 상위 10곳 (시/도, 시/군/구 인덱스만 읽어 집계)
+    region_stats = list(
+        Customer.objects.exclude(address_district="")
+        .order_by()
+        .values("address_city", "address_district")
+        .annotate(count=Count("id"))
+        .order_by("-count")[:10]
+    )
+
     # 최근 일정 (오늘부터 일주일)
-    upcoming_schedules = (
+    upcoming_schedules = list(
         Schedule.objects.filter(
             start_datetime__gte=timezone.now(),
             start_datetime__lte=timezone.now() + timedelta(days=7),
@@ -167,8 +154,7 @@ def admin_dashboard(request):
         .order_by("start_datetime")[:10]
     )
 
-    context = {
-        "is_admin_dashboard": True,
+    return {
         "total_customers": total_customers,
         "total_services": total_services,
         "total_happycalls": total_happycalls,
@@ -179,13 +165,80 @@ def admin_dashboard(request):
         "employee_happycall_stats": employee_happycall_stats,
         "happycall_stage_stats": happycall_stage_stats,
         "service_type_stats": service_type_stats,
+        "region_stats": region_stats,
         "upcoming_schedules": upcoming_schedules,
+    }
+
+
+@login_required
+@query_budget(20)
+@reporting_db()
+def admin_dashboard(request):
+    """관리자 대시보드"""
+    if not request.user.is_superuser:
+        return dashboard(request)
+
+    # 기본 통계 (관련 모델 저장 시 무효화, 최대 5분 캐시)
+    today = timezone.now().date()
+    stats = get_or_set(
+        "dashboard:admin",
+        lambda: _build_admin_dashboard_stats(today),
+        tags=ADMIN_DASHBOARD_CACHE_TAGS,
+        timeout=300,
+        params=today,
+    )
+
+    context = {
+        "is_admin_dashboard": True,
+        **stats,
         "today": today,
     }
 
     return render(request, "core/admin_dashboard.html", context)
 
 
+@login_required
+def performance_report(request):
+    """뷰별 응답 시간/쿼리 수 리포트 (관리자 전용)"""
+    if not request.user.is_superuser:
+        messages.error(request, "관리자만 접근할 수 있습니다.")
+        return redirect("core:dashboard")
+
+    if request.method == "POST":
+        # 현재 프로세스에 누적된 통계를 즉시 저장
+        saved = metrics.flush()
+        messages.success(request, f"현재 프로세스 통계 {saved}건을 저장했습니다.")
+        return redirect(request.get_full_path())
+
+    try:
+        hours = max(1, min(int(request.GET.get("hours", 24)), 24 * 30))
+    except ValueError:
+        hours = 24
+    order = request.GET.get("order", "total")
+    if order not in metrics.REPORT_ORDERINGS:
+        order = "total"
+
+    since = timezone.now() - timedelta(hours=hours)
+    endpoints = metrics.build_report(since, order=order)
+
+    context = {
+        "endpoints": endpoints,
+        "hours": hours,
+        "order": order,
+        "hour_choices": [1, 6, 24, 24 * 7],
+        "order_choices": [
+            ("total", "총 응답 시간"),
+            ("p95", "p95 응답 시간"),
+            ("avg", "평균 응답 시간"),
+            ("queries", "평균 쿼리 수"),
+            ("duplicates", "중복 쿼리 수"),
+            ("sql", "총 SQL 시간"),
+        ],
+        "latency_slow_ms": metrics.LATENCY_BUCKETS[-1],
+    }
+    return render(request, "core/performance_report.html", context)
+
+
 @login_required
 def data_upload(request):
     """데이터 업로드 페이지"""
@@ -467,10 +520,7 @@ def upload_progress(request, progress_key):
     if not request.user.is_superuser:
         return JsonResponse({"error": "권한이 없습니다."}, status=403)
 
-    from django.http import JsonResponse
-    from django.core.cache import cache
-
-    progress_data = cache.get(f"upload_progress_{progress_key}")
+    progress_data = get_upload_progress(progress_key)
 
     if progress_data:
         return JsonResponse(progress_data)
@@ -496,15 +546,12 @@ def start_upload(request):
     if not request.user.is_superuser:
         return JsonResponse({"error": "권한이 없습니다."}, status=403)
 
-    from django.http import JsonResponse
     import uuid
 
     # progress_key 생성
     progress_key = str(uuid.uuid4())
 
     # 초기 진행 상태 설정
-    from django.core.cache import cache
-
     progress_data = {
         "percent": 0,
         "message": "업로드 준비 중...",
@@ -516,6 +563,65 @@ def start_upload(request):
             "error_details": [],
         },
     }
-    cache.set(f"upload_progress_{progress_key}", progress_data, timeout=300)
+    set_upload_progress(progress_key, progress_data)
 
     return JsonResponse({"success": True, "progress_key": progress_key})
+
+
+@login_required
+@query_budget(5)
+def search_api(request):
+    """메모/피드백/소통 내용 전문 검색 API (q, source, limit) - 관련도 순"""
+    from .fulltext import SEARCH_LIMIT, SOURCES, search
+
+    query = request.GET.get('q', '').strip()
+    source = request.GET.get('source') or None
+    if source and source not in SOURCES:
+        return JsonResponse({'success': False, 'message': '알 수 없는 검색 대상입니다.'}, status=400)
+    try:
+        limit = int(request.GET.get('limit', SEARCH_LIMIT))
+    except ValueError:
+        limit = SEARCH_LIMIT
+    if len(query) < 2:
+        return JsonResponse({'success': True, 'results': []})
+    return JsonResponse({'success': True, 'results': search(query, source=source, limit=limit)})
+
+
+@login_required
+def parquet_export(request, dataset):
+    """
+    분석용 Parquet 파일 다운로드 (관리자 전용)
+
+    since(일시/날짜) 이후 수정된 행, month(YYYY-MM) 가 주어지면 그 달 행만. 임시 파일에 나눠 쓴 뒤 내려준다.
+    """
+    import tempfile
+    from django.http import FileResponse
+    from django.utils.dateparse import parse_date, parse_datetime
+    from .parquet_export import DATASETS, HAS_PYARROW, write_file
+
+    if not request.user.is_superuser:
+        return JsonResponse({"error": "권한이 없습니다."}, status=403)
+    if dataset not in DATASETS:
+        return JsonResponse({'success': False, 'message': '알 수 없는 내보내기 대상입니다.'}, status=404)
+    if not HAS_PYARROW:
+        return JsonResponse({'success': False, 'message': 'pyarrow 가 설치되어 있지 않습니다.'}, status=503)
+
+    since = month = None
+    try:
+        if request.GET.get('since'):
+            value = request.GET['since']
+            since = parse_datetime(value) or datetime.combine(parse_date(value), datetime.min.time())
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+        if request.GET.get('month'):
+            month = datetime.strptime(request.GET['month'], '%Y-%m').date()
+    except (TypeError, ValueError):
+        return JsonResponse({'success': False, 'message': 'since 는 날짜/일시, month 는 YYYY-MM 형식입니다.'},
+                            status=400)
+
+    handle = tempfile.TemporaryFile()
+    write_file(dataset, handle, since=since, month=month)
+    handle.seek(0)
+    suffix = f'-{month:%Y-%m}' if month else ''
+    return FileResponse(handle, as_attachment=True, filename=f'{dataset}{suffix}.parquet',
+                        content_type='application/vnd.apache.parquet')
@@ -0,0 +1,73 @@
+"""
+주소 지역 구분
+
+Customer.address_main("경기도 평택시 비전동 123") 에서 시/도, 시/군/구, 동/읍/면을 뽑아
+address_city / address_district / address_dong 에 저장해 두고, 지역 필터와 지역별 집계는
+이 컬럼(인덱스)으로 한다. 화면마다 주소 문자열을 split() 하지 않는다.
+
+  - 시/도는 줄임말("서울", "경기")을 정식 명칭으로 맞춘다.
+  - 시/군/구는 "천안시 서북구" 처럼 일반구가 딸린 시는 두 단어를 함께 둔다.
+  - 동은 "역삼동", "안중읍", "종로1가" 같은 단어, 도로명 주소면 괄호 안 참고항목("(역삼동)")에서 찾는다.
+"""
+import re
+
+CITY_ALIASES = {
+    '서울': '서울특별시', '서울시': '서울특별시',
+    '부산': '부산광역시', '부산시': '부산광역시',
+    '대구': '대구광역시', '대구시': '대구광역시',
+    '인천': '인천광역시', '인천시': '인천광역시',
+    '광주': '광주광역시',  # '광주시' 는 경기도 광주시일 수 있어 시/군/구로 본다
+    '대전': '대전광역시', '대전시': '대전광역시',
+    '울산': '울산광역시', '울산시': '울산광역시',
+    '세종': '세종특별자치시', '세종시': '세종특별자치시',
+    '경기': '경기도',
+    '강원': '강원특별자치도', '강원도': '강원특별자치도',
+    '충북': '충청북도',
+    '충남': '충청남도',
+    '전북': '전북특별자치도', '전라북도': '전북특별자치도',
+    '전남': '전라남도',
+    '경북': '경상북도',
+    '경남': '경상남도',
+    '제주': '제주특별자치도', '제주도': '제주특별자치도',
+}
+CITIES = set(CITY_ALIASES.values())
+CITY_LENGTH, DISTRICT_LENGTH, DONG_LENGTH = 50, 100, 100  # 모델 필드 길이
+
+DONG_PATTERN = re.compile(r'^[가-힣][가-힣0-9·.]*(동|읍|면|가|리)$')
+DISTRICT_PATTERN = re.compile(r'^[가-힣]+(시|군|구)$')
+
+
+def _dong_from_note(address):
+    """도로명 주소 괄호 참고항목의 동 ("(역삼동, 래미안)" → 역삼동)"""
+    match = re.search(r'\(([^)]*)\)', address)
+    if match:
+        first = match.group(1).split(',')[0].strip()
+        if DONG_PATTERN.match(first):
+            return first
+    return ''
+
+
+def parse_region(address):
+    """주소에서 (시/도, 시/군/구, 동) - 못 찾은 부분은 빈 문자열"""
+    tokens = re.sub(r'\([^)]*\)', ' ', address or '').split()
+    city = district = dong = ''
+    index = 0
+    if tokens and (tokens[0] in CITY_ALIASES or tokens[0] in CITIES):
+        city = CITY_ALIASES.get(tokens[0], tokens[0])
+        index = 1
+
+    if index < len(tokens) and DISTRICT_PATTERN.match(tokens[index]):
+        district = tokens[index]
+        index += 1
+        # 일반구가 있는 시 (천안시 서북구, 성남시 분당구)
+        if district.endswith('시') and index < len(tokens) and re.match(r'^[가-힣]+구$', tokens[index]):
+            district = f'{district} {tokens[index]}'
+            index += 1
+
+    for token in tokens[index:index + 2]:
+        if DONG_PATTERN.match(token):
+            dong = token
+            break
+    if not dong:
+        dong = _dong_from_note(address or '')
+    return city[:CITY_LENGTH], district[:DISTRICT_LENGTH], dong[:DONG_LENGTH]
@@ -1,8 +1,10 @@
+from django import forms
 from django.contrib import admin
 from .models import (
     Customer, Tag, CustomerTag, Vehicle, CustomerVehicle,
     CustomerCommunication, MarketingCampaign,
-    CustomerCampaignHistory, CustomerPointHistory
+    CustomerCampaignHistory, CustomerPointHistory, CustomerProfile, CustomerGradeRun,
+    CustomerSegment, CustomerMergeLog, VehicleMileage
 )
 
 
@@ -31,10 +33,17 @@ class CustomerCommunicationInline(admin.TabularInline):
 class CustomerPointHistoryInline(admin.TabularInline):
     model = CustomerPointHistory
     extra = 0
-    fields = ('transaction_date', 'point_type', 'points', 'balance_after', 'reason')
-    readonly_fields = ('created_at',)
+    fields = ('transaction_date', 'point_type', 'points', 'balance_after', 'remaining_points', 'expires_at', 'reason')
+    # 포인트 원장은 customers.points 로만 기록 (잔액 일관성)
+    readonly_fields = fields
     ordering = ('-transaction_date',)
 
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 
 # Main admin classes
 @admin.register(Customer)
@@ -48,7 +57,8 @@ class CustomerAdmin(admin.ModelAdmin):
         'marketing_consent', 'do_not_contact', 'is_active', 'created_at'
     ]
     search_fields = ['name', 'phone', 'email', 'company_name']
-    readonly_fields = ['created_at', 'updated_at', 'total_service_count', 'total_service_amount']
+    # 적립포인트는 포인트 원장(customers.points)의 누적 잔액이므로 여기서 수정하지 않는다
+    readonly_fields = ['created_at', 'updated_at', 'total_service_count', 'total_service_amount', 'membership_points']
     inlines = [CustomerTagInline, CustomerVehicleInline, CustomerCommunicationInline, 
                CustomerPointHistoryInline]
     
@@ -110,13 +120,26 @@ class CustomerTagAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
 
 
+class VehicleMileageInline(admin.TabularInline):
+    model = VehicleMileage
+    extra = 0
+    fields = ('recorded_on', 'mileage', 'source', 'service_request')
+    # 주행거리 기록은 customers.mileage.record_mileage 로만 (차량 최근 주행거리 갱신)
+    readonly_fields = fields
+    ordering = ('-recorded_on',)
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Vehicle)
 class VehicleAdmin(admin.ModelAdmin):
-    list_display = ['vehicle_number', 'model', 'year', 'created_at']
+    list_display = ['vehicle_number', 'model', 'year', 'mileage', 'next_oil_change_date', 'next_inspection_date',
+                    'created_at']
     list_filter = ['year', 'created_at']
     search_fields = ['vehicle_number', 'model']
-    readonly_fields = ['created_at', 'updated_at']
-    inlines = [CustomerVehicleInline]
+    readonly_fields = ['created_at', 'updated_at', 'daily_mileage', 'next_oil_change_date', 'next_inspection_date']
+    inlines = [CustomerVehicleInline, VehicleMileageInline]
 
 
 @admin.register(CustomerVehicle)
@@ -166,23 +189,26 @@ class CustomerCommunicationAdmin(admin.ModelAdmin):
 
 @admin.register(MarketingCampaign)
 class MarketingCampaignAdmin(admin.ModelAdmin):
-    list_display = ['name', 'campaign_type', 'start_date', 'end_date', 'status', 'created_by', 'created_at']
+    list_display = ['name', 'campaign_type', 'start_date', 'end_date', 'status', 'launched_at', 'created_by',
+                    'created_at']
     list_filter = ['campaign_type', 'status', 'start_date', 'end_date']
     search_fields = ['name', 'description']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'launched_at']
     
     fieldsets = (
         ('캠페인 정보', {
-            'fields': ('name', 'description', 'campaign_type')
+            'fields': ('name', 'description', 'campaign_type', 'message')
         }),
         ('기간 설정', {
             'fields': ('start_date', 'end_date', 'status')
         }),
         ('타겟팅', {
-            'fields': ('target_criteria',)
+            'fields': ('target_criteria',),
+            'description': '세그먼트 조건 JSON (예: {"membership": ["vip"], "marketing_consent": true}). '
+                           '조건 형식은 customers/segments.py 참고',
         }),
         ('시스템 정보', {
-            'fields': ('created_by', 'created_at'),
+            'fields': ('created_by', 'created_at', 'launched_at'),
             'classes': ['collapse']
         }),
     )
@@ -195,18 +221,111 @@ class CustomerCampaignHistoryAdmin(admin.ModelAdmin):
         'response_type', 'roi_amount'
     ]
     list_filter = ['delivery_status', 'response_type', 'sent_date']
-    search_fields = ['customer__name', 'customer__phone', 'campaign__name']
+    search_fields = ['customer__name', 'customer__phone', 'campaign__name', 'provider_message_id']
     readonly_fields = ['created_at'] if hasattr(CustomerCampaignHistory, 'created_at') else []
     date_hierarchy = 'sent_date'
 
 
+class PointAdjustmentForm(forms.ModelForm):
+    """관리자 포인트 조정 입력 (고객, 조정 포인트, 사유) - 저장은 customers.points.adjust 로"""
+
+    class Meta:
+        model = CustomerPointHistory
+        fields = ['customer', 'points', 'reason']
+        labels = {'points': '조정 포인트'}
+        help_texts = {'points': '+는 무기한 적립, -는 오래된 적립분부터 차감'}
+
+    def clean(self):
+        cleaned_data = super().clean()
+        customer, points = cleaned_data.get('customer'), cleaned_data.get('points')
+        if points == 0:
+            self.add_error('points', '0 이 아닌 포인트를 입력하세요.')
+        elif customer is not None and points is not None and customer.membership_points + points < 0:
+            self.add_error('points', f'잔액({customer.membership_points:,}P)보다 많이 차감할 수 없습니다.')
+        return cleaned_data
+
+
 @admin.register(CustomerPointHistory)
 class CustomerPointHistoryAdmin(admin.ModelAdmin):
+    """포인트 원장은 조회만 하고, 추가는 관리자 조정(customers.points.adjust)으로만 기록 (잔액 일관성)"""
     list_display = [
         'customer', 'transaction_date', 'point_type', 'points', 
-        'balance_after', 'reason', 'created_by'
+        'balance_after', 'remaining_points', 'expires_at', 'reason', 'created_by'
     ]
     list_filter = ['point_type', 'transaction_date']
     search_fields = ['customer__name', 'customer__phone', 'reason']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'balance_after', 'remaining_points', 'expires_at']
+    raw_id_fields = ['customer']
     date_hierarchy = 'transaction_date'
+
+    def get_form(self, request, obj=None, **kwargs):
+        if obj is None:
+            kwargs['form'] = PointAdjustmentForm
+        return super().get_form(request, obj, **kwargs)
+
+    def get_fields(self, request, obj=None):
+        if obj is None:
+            return PointAdjustmentForm._meta.fields
+        return super().get_fields(request, obj)
+
+    def get_readonly_fields(self, request, obj=None):
+        return [] if obj is None else super().get_readonly_fields(request, obj)
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        from .points import adjust
+
+        entry = adjust(obj.customer_id, obj.points, obj.reason, created_by=request.user)
+        obj.pk = entry.pk
+        obj._state.adding = False
+
+
+@admin.register(CustomerProfile)
+class CustomerProfileAdmin(admin.ModelAdmin):
+    list_display = ['customer', 'version', 'revision', 'is_stale', 'built_at']
+    list_filter = ['is_stale', 'version']
+    search_fields = ['customer__name']
+    readonly_fields = ['customer', 'data', 'version', 'revision', 'is_stale', 'built_at']
+
+
+@admin.register(CustomerGradeRun)
+class CustomerGradeRunAdmin(admin.ModelAdmin):
+    list_display = ['started_at', 'mode', 'customer_count', 'updated_count', 'finished_at']
+    list_filter = ['mode']
+    readonly_fields = ['mode', 'started_at', 'finished_at', 'customer_count', 'updated_count',
+                       'grade_counts', 'thresholds']
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(CustomerSegment)
+class CustomerSegmentAdmin(admin.ModelAdmin):
+    list_display = ['name', 'customer_count', 'built_at', 'full_built_at', 'created_by']
+    search_fields = ['name', 'description']
+    readonly_fields = ['customer_count', 'built_at', 'full_built_at', 'created_at', 'updated_at']
+    actions = ['refresh_full']
+
+    @admin.action(description='선택한 세그먼트 전체 재계산')
+    def refresh_full(self, request, queryset):
+        from .segments import refresh_segment
+
+        for segment in queryset:
+            refresh_segment(segment, full=True)
+        self.message_user(request, f'{queryset.count()}개 세그먼트를 다시 계산했습니다.')
+
+
+@admin.register(CustomerMergeLog)
+class CustomerMergeLogAdmin(admin.ModelAdmin):
+    list_display = ['merged_at', 'merged_customer_id', 'survivor', 'score', 'merged_by']
+    search_fields = ['merged_customer_id', 'survivor__name']
+    raw_id_fields = ['survivor']
+    readonly_fields = ['survivor', 'merged_customer_id', 'snapshot', 'score', 'reasons', 'merged_at', 'merged_by']
+
+    def has_add_permission(self, request):
+        return False
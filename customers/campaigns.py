@@ -0,0 +1,332 @@
+"""
+캠페인 발송
+
+  - launch_campaign(): 타겟 조건(customers.segments)에 맞고 수신 동의/연락 가능 조건을 만족하는
+    고객을 ID 순 청크로 읽어 CustomerCampaignHistory 를 발송대기(pending)로 bulk_create 한다.
+    (고객, 캠페인)이 unique 라 다시 실행하면 이미 만든 고객은 건너뛴다(ignore_conflicts).
+  - send_pending(): 발송대기 이력을 배치로 읽어 CAMPAIGN_SENDER 로 보내고 결과를 bulk_update 로
+    저장한다. CAMPAIGN_SEND_RATE(분당 건수)를 넘지 않도록 배치 사이에 쉰다. 발송 직전에 동의를
+    다시 확인해 그 사이 수신을 거부한 고객은 보내지 않고 수신거부로 남긴다.
+  - apply_delivery_updates(): 발송사의 전달/오픈/반응 결과를 배치 단위 bulk_update 로 반영한다.
+  - campaign_stats(): 상태별 건수와 분당 처리량.
+
+한 캠페인의 발송 작업은 동시에 하나만 돌린다 (start_sending 은 프로세스 안에서 캠페인당 스레드 하나).
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMinute
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+
+from .segments import campaign_audience
+
+logger = logging.getLogger(__name__)
+
+# 캠페인 유형별 연락처 필드 (비어 있으면 발송 대상에서 제외)
+CONTACT_FIELDS = {
+    'sms': 'phone',
+    'phone': 'phone',
+    'email': 'email',
+    'dm': 'address_main',
+}
+FAN_OUT_CHUNK_SIZE = 5000
+SEND_BATCH_SIZE = 100
+UPDATE_BATCH_SIZE = 1000
+UPDATE_FIELDS = ('delivery_status', 'opened_date', 'response_date', 'response_type', 'roi_amount')
+
+_senders = {}
+_senders_lock = threading.Lock()
+
+
+def reachable_q(campaign_type):
+    """마케팅 수신 동의, 연락 금지/블랙리스트 아님, 활성, 연락처 있음"""
+    q = Q(marketing_consent=True, do_not_contact=False, is_banned=False, is_active=True)
+    field = CONTACT_FIELDS.get(campaign_type)
+    if field:
+        q &= Q(**{f'{field}__isnull': False}) & ~Q(**{field: ''})
+    return q
+
+
+def render_message(campaign, name):
+    """발송 메시지 ({name} 은 고객명)"""
+    return (campaign.message or campaign.name).replace('{name}', name or '고객')
+
+
+# ===================== 대상 생성 =====================
+
+def launch_campaign(campaign, chunk_size=FAN_OUT_CHUNK_SIZE):
+    """
+    캠페인 대상 고객의 발송대기 이력 생성
+
+    {'audience': 발송 가능 대상 수, 'created': 새로 만든 이력 수} 를 돌려준다.
+    타겟 조건이 잘못됐으면 SegmentError.
+    """
+    from .models import CustomerCampaignHistory
+
+    audience = campaign_audience(campaign).filter(reachable_q(campaign.campaign_type)).order_by('pk')
+    history = CustomerCampaignHistory.objects.filter(campaign=campaign)
+    before = history.count()
+    now = timezone.now()
+    total, last_id = 0, 0
+    while True:
+        customer_ids = list(audience.filter(pk__gt=last_id).values_list('pk', flat=True)[:chunk_size])
+        if not customer_ids:
+            break
+        last_id = customer_ids[-1]
+        total += len(customer_ids)
+        CustomerCampaignHistory.objects.bulk_create(
+            [CustomerCampaignHistory(customer_id=customer_id, campaign=campaign, sent_date=now,
+                                     delivery_status='pending') for customer_id in customer_ids],
+            ignore_conflicts=True, batch_size=1000,
+        )
+
+    update_fields = ['launched_at']
+    campaign.launched_at = now
+    if campaign.status == 'draft':
+        campaign.status = 'active'
+        update_fields.append('status')
+    campaign.save(update_fields=update_fields)
+    return {'audience': total, 'created': history.count() - before}
+
+
+# ===================== 발송 =====================
+
+def mock_sender(campaign, recipients):
+    """
+    기본 발송기 (실제 발송사 연동 전까지 모두 성공 처리)
+
+    recipients 는 [(이력 ID, 연락처, 메시지)], 반환은 {이력 ID: (성공 여부, 메시지 ID 또는 오류 내용)}.
+    """
+    return {history_id: (True, f'mock-{campaign.pk}-{history_id}') for history_id, _, _ in recipients}
+
+
+def _throughput(processed, elapsed):
+    return processed * 60 / elapsed if elapsed > 0 else 0.0
+
+
+def send_pending(campaign, rate=None, batch_size=SEND_BATCH_SIZE, limit=None, progress=None, stop_event=None):
+    """
+    발송대기 이력 발송 (분당 rate 건 이하, 0 이면 제한 없음)
+
+    sent/failed/refused 건수, elapsed(초), per_minute(분당 처리량) 통계를 돌려준다.
+    progress 를 주면 1분마다 그때까지의 통계로 부른다.
+    """
+    from .models import CustomerCampaignHistory
+
+    sender = import_string(getattr(settings, 'CAMPAIGN_SENDER', 'customers.campaigns.mock_sender'))
+    rate = getattr(settings, 'CAMPAIGN_SEND_RATE', 600) if rate is None else rate
+    field = CONTACT_FIELDS.get(campaign.campaign_type, 'phone')
+    pending = CustomerCampaignHistory.objects.filter(campaign=campaign, delivery_status='pending')
+
+    stats = {'sent': 0, 'failed': 0, 'refused': 0}
+    started = time.monotonic()
+    next_report = started + 60
+    last_id = 0
+    while limit is None or sum(stats.values()) < limit:
+        size = batch_size if limit is None else min(batch_size, limit - sum(stats.values()))
+        rows = list(pending.filter(pk__gt=last_id).order_by('pk').values_list(
+            'pk', 'customer__name', f'customer__{field}', 'customer__marketing_consent',
+            'customer__do_not_contact', 'customer__is_banned', 'customer__is_active',
+        )[:size])
+        if not rows:
+            break
+        last_id = rows[-1][0]
+
+        now = timezone.now()
+        updates, recipients = [], []
+        for pk, name, contact, consent, do_not_contact, banned, active in rows:
+            if consent and not do_not_contact and not banned and active and contact:
+                recipients.append((pk, contact, render_message(campaign, name)))
+            else:
+                updates.append(CustomerCampaignHistory(
+                    pk=pk, delivery_status='refused', sent_date=now, provider_message_id='',
+                    notes='발송 직전 수신 동의/연락 가능 여부 확인에서 제외'))
+        results = sender(campaign, recipients) if recipients else {}
+        for pk, _, _ in recipients:
+            success, detail = results.get(pk, (False, '발송 결과 없음'))
+            updates.append(CustomerCampaignHistory(
+                pk=pk, delivery_status='sent' if success else 'failed', sent_date=now,
+                provider_message_id=detail if success else '', notes='' if success else detail))
+        CustomerCampaignHistory.objects.bulk_update(
+            updates, ['delivery_status', 'sent_date', 'provider_message_id', 'notes'])
+        for row in updates:
+            stats[row.delivery_status] += 1
+
+        processed = sum(stats.values())
+        if rate:
+            # 지금까지 보낸 건수가 분당 rate 를 넘지 않을 때까지 대기
+            wait = processed * 60 / rate - (time.monotonic() - started)
+            if wait > 0:
+                if stop_event is not None:
+                    stop_event.wait(wait)
+                else:
+                    time.sleep(wait)
+        if stop_event is not None and stop_event.is_set():
+            break
+        if progress is not None and time.monotonic() >= next_report:
+            next_report += 60
+            elapsed = time.monotonic() - started
+            progress({**stats, 'elapsed': elapsed, 'per_minute': _throughput(processed, elapsed)})
+
+    elapsed = time.monotonic() - started
+    stats.update({'elapsed': elapsed, 'per_minute': _throughput(sum(stats.values()), elapsed)})
+    return stats
+
+
+class CampaignSender(threading.Thread):
+    """캠페인 하나의 발송대기 이력을 모두 보내는 백그라운드 스레드"""
+
+    def __init__(self, campaign_id, rate=None):
+        super().__init__(name=f'campaign-sender-{campaign_id}', daemon=True)
+        self.campaign_id = campaign_id
+        self.rate = rate
+        self.stats = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        from .models import MarketingCampaign
+
+        try:
+            campaign = MarketingCampaign.objects.get(pk=self.campaign_id)
+            self.stats = send_pending(campaign, rate=self.rate, stop_event=self._stop_event)
+            logger.info(f"캠페인 {campaign.pk} 발송 완료: 성공 {self.stats['sent']}, 실패 {self.stats['failed']}, "
+                        f"수신거부 {self.stats['refused']} (분당 {self.stats['per_minute']:.0f}건)")
+        except Exception as e:
+            # 남은 발송대기 이력은 다음 실행(launch_campaign 명령 --send-only)에서 이어서 보낸다
+            logger.error(f'캠페인 {self.campaign_id} 발송 실패: {e}')
+        finally:
+            connection.close()
+
+    def stop(self, timeout=5.0):
+        self._stop_event.set()
+        self.join(timeout)
+
+
+def start_sending(campaign_id, rate=None):
+    """캠페인 발송 스레드 시작 (이미 돌고 있으면 그 스레드를 돌려준다)"""
+    with _senders_lock:
+        sender = _senders.get(campaign_id)
+        if sender is None or not sender.is_alive():
+            sender = CampaignSender(campaign_id, rate)
+            _senders[campaign_id] = sender
+            sender.start()
+        return sender
+
+
+# ===================== 전달/반응 결과 =====================
+
+def _parse_update(update, choices):
+    """결과 dict → 바꿀 필드 dict (잘못된 값은 ValueError)"""
+    changes = {}
+    for name in UPDATE_FIELDS:
+        if name not in update:
+            continue
+        value = update[name]
+        if name in ('delivery_status', 'response_type'):
+            if value not in choices[name]:
+                raise ValueError(f'{name}: 알 수 없는 값 {value}')
+        elif name in ('opened_date', 'response_date'):
+            value = parse_datetime(value) if isinstance(value, str) else value
+            if value is None:
+                raise ValueError(f'{name}: 잘못된 일시')
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+        elif name == 'roi_amount':
+            try:
+                value = Decimal(str(value))
+            except InvalidOperation as e:
+                raise ValueError(f'{name}: 잘못된 금액 {value}') from e
+        changes[name] = value
+    return changes
+
+
+def apply_delivery_updates(updates, batch_size=UPDATE_BATCH_SIZE):
+    """
+    전달/반응 결과 반영
+
+    updates 는 dict 의 이터러블(제너레이터 가능)로, 각 dict 는 message_id(발송 시 받은 메시지 ID)
+    또는 id(이력 ID)와 delivery_status, opened_date, response_date, response_type, roi_amount 중
+    바뀐 값을 담는다. batch_size 건씩 읽어 한 번의 조회와 bulk_update 로 저장한다.
+    {'updated': 반영 건수, 'unknown': 이력을 못 찾은 건수, 'invalid': 잘못된 건수} 를 돌려준다.
+    """
+    from .models import CustomerCampaignHistory
+
+    choices = {
+        'delivery_status': dict(CustomerCampaignHistory.DELIVERY_STATUS_CHOICES),
+        'response_type': dict(CustomerCampaignHistory.RESPONSE_TYPES),
+    }
+    result = {'updated': 0, 'unknown': 0, 'invalid': 0}
+    updates = iter(updates)
+    while True:
+        batch = list(islice(updates, batch_size))
+        if not batch:
+            return result
+
+        parsed = []
+        for update in batch:
+            try:
+                if not isinstance(update, dict):
+                    raise ValueError('결과는 JSON 객체여야 합니다.')
+                key = ('message_id', str(update['message_id'])) if update.get('message_id') else ('id', int(update['id']))
+                parsed.append((key, _parse_update(update, choices)))
+            except (KeyError, TypeError, ValueError):
+                result['invalid'] += 1
+
+        message_ids = [value for kind, value in (key for key, _ in parsed) if kind == 'message_id']
+        ids = [value for kind, value in (key for key, _ in parsed) if kind == 'id']
+        rows = CustomerCampaignHistory.objects.filter(
+            Q(provider_message_id__in=message_ids) | Q(pk__in=ids)
+        ).only('pk', 'provider_message_id', *UPDATE_FIELDS)
+        by_key = {}
+        for row in rows:
+            by_key[('id', row.pk)] = row
+            if row.provider_message_id:
+                by_key[('message_id', row.provider_message_id)] = row
+
+        changed, fields = {}, set()
+        for key, changes in parsed:
+            row = by_key.get(key)
+            if row is None:
+                result['unknown'] += 1
+                continue
+            for name, value in changes.items():
+                setattr(row, name, value)
+            fields.update(changes)
+            changed[row.pk] = row
+            result['updated'] += 1
+        if changed and fields:
+            CustomerCampaignHistory.objects.bulk_update(list(changed.values()), sorted(fields))
+
+
+# ===================== 통계 =====================
+
+def campaign_stats(campaign, minutes=60):
+    """
+    상태별 건수, 반응 건수, 최근 minutes 분의 분당 처리량
+
+    {'counts': {상태: 건수}, 'responses': {반응유형: 건수},
+     'throughput': [{'minute': 분, 'count': 건수}], 'per_minute': 최근 구간 평균}
+    """
+    from .models import CustomerCampaignHistory
+
+    history = CustomerCampaignHistory.objects.filter(campaign=campaign).order_by()
+    counts = dict(history.values_list('delivery_status').annotate(count=Count('id')))
+    responses = dict(history.exclude(response_type='').values_list('response_type').annotate(count=Count('id')))
+    since = timezone.now() - timedelta(minutes=minutes)
+    throughput = [
+        {'minute': minute, 'count': count}
+        for minute, count in history.filter(sent_date__gte=since).exclude(delivery_status='pending')
+        .annotate(minute=TruncMinute('sent_date')).values_list('minute').annotate(count=Count('id'))
+        .order_by('minute')
+    ]
+    per_minute = sum(entry['count'] for entry in throughput) / len(throughput) if throughput else 0.0
+    return {'counts': counts, 'responses': responses, 'throughput': throughput, 'per_minute': per_minute}
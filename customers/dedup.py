@@ -0,0 +1,414 @@
+"""
+고객 중복 정리
+
+엑셀 업로드/서비스 접수 임시고객 등 여러 경로로 들어온 같은 사람을 찾아 하나로 합친다.
+
+  - 전화번호는 normalize_phone() 으로 010-1234-5678 형식으로 맞춘다
+    (Customer.save() 와 업로드/임시고객 생성 경로가 이 형식으로 저장·조회한다).
+  - 후보는 블로킹 키가 같은 고객끼리만 비교한다: 전화번호 숫자, (이름, 차량번호).
+  - 후보 쌍마다 전화번호/이름/차량/이메일/주소/사업자번호 일치 여부로 점수를 매겨
+    MERGE_THRESHOLD 이상이면 합치고, REVIEW_THRESHOLD 이상이면 검토 대상으로 보고만 한다.
+  - 합칠 때는 고객을 참조하는 모든 FK(서비스, 차량 소유, 해피콜, 포인트, 소통/캠페인 이력,
+    태그, 프로필)를 CASE UPDATE 로 한꺼번에 대표 고객에게 옮긴 뒤 나머지 고객을 지운다.
+    지운 고객의 원래 값은 CustomerMergeLog 에 남긴다.
+"""
+import json
+import re
+from collections import defaultdict
+from itertools import combinations
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.forms.models import model_to_dict
+from django.utils import timezone
+
+MERGE_THRESHOLD = 0.8
+REVIEW_THRESHOLD = 0.4
+MAX_BLOCK_SIZE = 20  # 이보다 큰 블록(공용 번호 등)은 비교하지 않고 보고만 한다
+MERGE_BATCH_SIZE = 200  # 한 트랜잭션에서 합치는 그룹 수
+CASE_CHUNK_SIZE = 500
+
+# 대표 고객의 빈 값을 다른 고객 값으로 채우는 필드
+FILL_FIELDS = ('name', 'email', 'address_main', 'address_detail', 'business_number', 'company_name',
+               'acquisition_source')
+# 합칠 때 대표 고객에서 다시 저장하는 필드 (_merged_values 가 바꿀 수 있는 필드)
+MERGED_FIELDS = (*FILL_FIELDS, 'marketing_consent', 'privacy_consent', 'privacy_consent_date',
+                 'do_not_contact', 'do_not_contact_reason', 'do_not_contact_date',
+                 'is_banned', 'banned_reason', 'banned_date',
+                 'membership_status', 'membership_join_date', 'membership_expire_date', 'customer_grade',
+                 'membership_points', 'total_service_count', 'total_service_amount',
+                 'first_service_date', 'last_service_date', 'last_contact_date', 'created_at', 'notes', 'phone',
+                 'name_jamo', 'name_chosung', 'address_city', 'address_district', 'address_dong')
+MEMBERSHIP_RANK = {'none': 0, 'basic': 1, 'premium': 2, 'vip': 3}
+STATUS_RANK = {'inactive': 0, 'temporary': 1, 'prospect': 2, 'registered': 3}
+
+
+# ===================== 정규화 =====================
+
+def phone_digits(value):
+    """전화번호 숫자만 (+82 국가번호, 엑셀 숫자 변환으로 빠진 앞 0 보정)"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    digits = re.sub(r'\D', '', str(value if value is not None else ''))
+    if digits.startswith('82') and len(digits) in (11, 12):
+        digits = '0' + digits[2:]
+    elif digits.startswith('1') and len(digits) in (9, 10):
+        digits = '0' + digits
+    return digits
+
+
+def normalize_phone(value):
+    """휴대폰번호를 010-1234-5678 형식으로 (휴대폰번호가 아니면 앞뒤 공백만 제거)"""
+    digits = phone_digits(value)
+    if re.fullmatch(r'01\d{8,9}', digits):
+        return f'{digits[:3]}-{digits[3:-4]}-{digits[-4:]}'
+    return str(value if value is not None else '').strip()
+
+
+def phone_variants(value):
+    """저장돼 있을 수 있는 전화번호 형식 - 정규화 형식, 정규화 전 기존 행의 숫자만 형식 순"""
+    return list(dict.fromkeys(filter(None, [normalize_phone(value), phone_digits(value)])))
+
+
+def phone_search_q(query, field='phone'):
+    """전화번호 검색 조건 - 저장 형식(010-1234-5678)과 검색어의 '-' 유무에 관계없이 숫자로 찾는다
+
+    휴대폰 전체 번호면 정규화 값(정규화 전 숫자만 저장된 행 포함)과 일치, 일부 숫자면 자리 사이 '-' 를 허용한 정규식"""
+    formatted = normalize_phone(query)
+    if re.fullmatch(r'01\d-\d{3,4}-\d{4}', formatted):
+        return Q(**{f'{field}__in': phone_variants(query)})
+    digits = re.sub(r'\D', '', query or '')
+    return Q(**{f'{field}__regex': '-?'.join(digits)})
+
+
+def _normalize_name(value):
+    return re.sub(r'\s+', '', value or '').lower()
+
+
+def _normalize_plate(value):
+    return re.sub(r'[\s-]+', '', value or '').upper()
+
+
+# ===================== 후보 찾기 =====================
+
+def _blocks():
+    """블로킹 키 → 고객 ID 목록 (두 명 이상인 블록만)"""
+    from .models import Customer, CustomerVehicle
+
+    # 키별 첫 고객만 들고 있다가 두 번째 고객이 나오면 블록을 만든다 (고객 100만 명 대비)
+    first, blocks = {}, {}
+
+    def add(key, customer_id):
+        seen = first.setdefault(key, customer_id)
+        if seen != customer_id:
+            blocks.setdefault(key, {seen}).add(customer_id)
+
+    for pk, phone in Customer.objects.order_by().values_list('pk', 'phone').iterator(chunk_size=50000):
+        digits = phone_digits(phone)
+        if digits:
+            add(f'phone:{digits}', pk)
+    ownerships = CustomerVehicle.objects.order_by().values_list(
+        'customer_id', 'customer__name', 'vehicle__vehicle_number')
+    for customer_id, name, plate in ownerships.iterator(chunk_size=50000):
+        name, plate = _normalize_name(name), _normalize_plate(plate)
+        if name and plate:
+            add(f'name_vehicle:{name}|{plate}', customer_id)
+    return {key: sorted(ids) for key, ids in blocks.items()}
+
+
+def _load(customer_ids):
+    """점수 계산용 고객 정보 {ID: dict}"""
+    from .models import Customer, CustomerVehicle
+
+    customers = {}
+    ids = sorted(customer_ids)
+    for offset in range(0, len(ids), CASE_CHUNK_SIZE):
+        chunk = ids[offset:offset + CASE_CHUNK_SIZE]
+        for row in Customer.objects.filter(pk__in=chunk).order_by().values(
+                'pk', 'name', 'phone', 'email', 'address_main', 'business_number'):
+            row['phone_digits'] = phone_digits(row['phone'])
+            row['plates'] = set()
+            customers[row['pk']] = row
+        for customer_id, plate in CustomerVehicle.objects.filter(customer_id__in=chunk).order_by().values_list(
+                'customer_id', 'vehicle__vehicle_number'):
+            customers[customer_id]['plates'].add(_normalize_plate(plate))
+    return customers
+
+
+def score_pair(a, b):
+    """두 고객이 같은 사람일 점수(0–1)와 근거 목록"""
+    score, reasons = 0.0, []
+    if a['phone_digits'] and a['phone_digits'] == b['phone_digits']:
+        score += 0.7
+        reasons.append('전화번호 일치')
+
+    name_a, name_b = _normalize_name(a['name']), _normalize_name(b['name'])
+    if name_a and name_b:
+        if name_a == name_b:
+            score += 0.2
+            reasons.append('이름 일치')
+        else:
+            score -= 0.3
+            reasons.append('이름 다름')
+    elif name_a or name_b:
+        # 전화번호만 있는 임시고객
+        score += 0.1
+        reasons.append('한쪽 이름 없음')
+
+    if a['plates'] & b['plates']:
+        score += 0.3
+        reasons.append('차량 일치')
+    if a['email'] and a['email'].lower() == (b['email'] or '').lower():
+        score += 0.2
+        reasons.append('이메일 일치')
+    if a['address_main'] and a['address_main'].strip() == (b['address_main'] or '').strip():
+        score += 0.1
+        reasons.append('주소 일치')
+    if a['business_number'] and b['business_number'] and a['business_number'] != b['business_number']:
+        score -= 0.5
+        reasons.append('사업자번호 다름')
+    return max(0.0, min(1.0, round(score, 2))), reasons
+
+
+def find_duplicates():
+    """
+    중복 후보 분석
+
+    {'pairs': [(ID, ID, 점수, 근거)], 'groups': [[대표 ID, 합칠 ID...]], 'skipped_blocks': [(키, 고객 수)]}
+    를 돌려준다. pairs 는 REVIEW_THRESHOLD 이상인 쌍, groups 는 MERGE_THRESHOLD 이상 쌍으로 이어진 묶음.
+    """
+    blocks = _blocks()
+    skipped = [(key, len(ids)) for key, ids in blocks.items() if len(ids) > MAX_BLOCK_SIZE]
+    candidates = set()
+    for ids in blocks.values():
+        if len(ids) <= MAX_BLOCK_SIZE:
+            candidates.update(combinations(ids, 2))
+
+    customers = _load({pk for pair in candidates for pk in pair})
+    pairs = []
+    for a, b in sorted(candidates):
+        if a in customers and b in customers:
+            score, reasons = score_pair(customers[a], customers[b])
+            if score >= REVIEW_THRESHOLD:
+                pairs.append((a, b, score, reasons))
+
+    # 합칠 쌍을 union-find 로 묶는다
+    parent = {}
+
+    def find(pk):
+        parent.setdefault(pk, pk)
+        while parent[pk] != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    for a, b, score, _ in pairs:
+        if score >= MERGE_THRESHOLD:
+            parent[find(a)] = find(b)
+    members = defaultdict(list)
+    for pk in parent:
+        members[find(pk)].append(pk)
+    groups = [_order_group(ids) for ids in members.values() if len(ids) > 1]
+    return {'pairs': pairs, 'groups': sorted(groups), 'skipped_blocks': skipped}
+
+
+def _order_group(customer_ids):
+    """[대표 고객 ID, 나머지...] - 정식고객, 이름 있음, 서비스 많음, 먼저 등록 순"""
+    from .models import Customer
+
+    rows = Customer.objects.filter(pk__in=customer_ids).values_list(
+        'pk', 'customer_status', 'name', 'total_service_count', 'created_at')
+    ranked = sorted(rows, key=lambda row: (-STATUS_RANK.get(row[1], 0), not row[2], -row[3], row[4], row[0]))
+    return [row[0] for row in ranked]
+
+
+# ===================== 합치기 =====================
+
+def _case(mapping, field='customer_id'):
+    return Case(*[When(**{field: loser}, then=Value(survivor)) for loser, survivor in mapping.items()],
+                output_field=IntegerField())
+
+
+def _customer_relations():
+    """고객을 참조하는 (모델, FK 필드명, 함께 unique 인 필드 목록 또는 None, 1:1 여부)"""
+    from .models import Customer
+
+    relations = []
+    for relation in Customer._meta.related_objects:
+        model, field = relation.related_model, relation.field
+        unique_with = None
+        for fields in model._meta.unique_together:
+            if field.name in fields:
+                unique_with = [name for name in fields if name != field.name]
+        relations.append((model, field, unique_with, field.one_to_one))
+    return relations
+
+
+def _repoint(mapping):
+    """mapping {합칠 ID: 대표 ID} 의 고객 참조를 모두 대표 고객으로 옮김"""
+    relations = _customer_relations()
+    losers = list(mapping)
+    now = timezone.now()
+    for model, field, unique_with, one_to_one in relations:
+        column = field.attname
+        if one_to_one:
+            # 고객당 하나뿐인 행(프로필)은 대표 고객 것만 남긴다
+            model.objects.filter(**{f'{column}__in': losers}).delete()
+            continue
+        if unique_with:
+            # 대표 고객이 이미 가진(또는 같은 그룹에서 먼저 옮겨질) 조합은 지운다
+            group_ids = set(losers) | set(mapping.values())
+            rows = model.objects.filter(**{f'{column}__in': group_ids}).order_by().values_list(
+                'pk', column, *unique_with)
+            kept, duplicates = set(), []
+            for pk, customer_id, *others in sorted(rows, key=lambda row: (row[1] in mapping, row[0])):
+                key = (mapping.get(customer_id, customer_id), *others)
+                if key in kept:
+                    duplicates.append(pk)
+                else:
+                    kept.add(key)
+            model.objects.filter(pk__in=duplicates).delete()
+        for offset in range(0, len(losers), CASE_CHUNK_SIZE):
+            chunk = {loser: mapping[loser] for loser in losers[offset:offset + CASE_CHUNK_SIZE]}
+            updates = {column: _case(chunk, column)}
+            if any(other.name == 'updated_at' for other in model._meta.concrete_fields):
+                updates['updated_at'] = now  # 분석용 증분 내보내기가 옮겨진 행을 다시 내보내도록
+            model.objects.filter(**{f'{column}__in': list(chunk)}).update(**updates)
+
+
+def _merged_values(survivor, others):
+    """대표 고객에 반영할 값 {필드: 값}"""
+    values = {}
+    for name in FILL_FIELDS:
+        if not getattr(survivor, name):
+            filled = next((getattr(other, name) for other in others if getattr(other, name)), None)
+            if filled:
+                values[name] = filled
+    everyone = [survivor, *others]
+
+    # 수신 동의는 모두 동의했을 때만, 연락 금지/블랙리스트는 하나라도 있으면 유지
+    if survivor.marketing_consent and not all(customer.marketing_consent for customer in others):
+        values['marketing_consent'] = False
+    if not survivor.privacy_consent:
+        consented = next((other for other in others if other.privacy_consent), None)
+        if consented:
+            values.update(privacy_consent=True, privacy_consent_date=consented.privacy_consent_date)
+    for flag, reason, date in (('do_not_contact', 'do_not_contact_reason', 'do_not_contact_date'),
+                               ('is_banned', 'banned_reason', 'banned_date')):
+        if not getattr(survivor, flag):
+            flagged = next((other for other in others if getattr(other, flag)), None)
+            if flagged:
+                values.update({flag: True, reason: getattr(flagged, reason), date: getattr(flagged, date)})
+
+    best = max(everyone, key=lambda customer: MEMBERSHIP_RANK.get(customer.membership_status, 0))
+    if best is not survivor:
+        values.update(membership_status=best.membership_status, membership_join_date=best.membership_join_date,
+                      membership_expire_date=best.membership_expire_date)
+    grades = [customer.customer_grade for customer in everyone if customer.customer_grade]
+    if grades and min(grades) != survivor.customer_grade:
+        values['customer_grade'] = min(grades)
+
+    # 포인트 원장 행을 함께 옮기므로 잔액도 합친다
+    values['membership_points'] = sum(customer.membership_points for customer in everyone)
+    values['total_service_count'] = sum(customer.total_service_count for customer in everyone)
+    values['total_service_amount'] = sum(customer.total_service_amount for customer in everyone)
+    for name, pick in (('first_service_date', min), ('last_service_date', max), ('last_contact_date', max)):
+        dates = [getattr(customer, name) for customer in everyone if getattr(customer, name)]
+        if dates:
+            values[name] = pick(dates)
+    values['created_at'] = min(customer.created_at for customer in everyone)
+    notes = [other.notes for other in others if other.notes]
+    if notes:
+        values['notes'] = '\n'.join(filter(None, [survivor.notes, *notes]))
+    values['phone'] = normalize_phone(survivor._get_raw_phone())
+    return values
+
+
+def _snapshot(customer):
+    """지운 고객의 원래 값 (JSON)"""
+    data = model_to_dict(customer)
+    data.update(phone=customer._get_raw_phone(), created_at=customer.created_at)
+    return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+
+
+def merge_groups(groups, scores=None, merged_by=None):
+    """
+    그룹별로 고객을 대표 고객 하나로 합침 (그룹은 [대표 ID, 합칠 ID...])
+
+    MERGE_BATCH_SIZE 그룹씩 한 트랜잭션에서 FK 를 옮기고 고객을 지운다. 합친 고객 수를 돌려준다.
+    scores 는 {(ID, ID): (점수, 근거)} 로 주면 합친 기록에 함께 남긴다.
+    """
+    from core.cache import invalidate
+    from .models import Customer, CustomerMergeLog
+    from .profile import schedule_profile_rebuild
+
+    scores = scores or {}
+    merged = 0
+    for offset in range(0, len(groups), MERGE_BATCH_SIZE):
+        batch = [group for group in groups[offset:offset + MERGE_BATCH_SIZE] if len(group) > 1]
+        with transaction.atomic():
+            ids = [pk for group in batch for pk in group]
+            customers = Customer.objects.select_for_update().in_bulk(ids)
+            batch = [[pk for pk in group if pk in customers] for group in batch]
+            batch = [group for group in batch if len(group) > 1]
+            mapping = {loser: group[0] for group in batch for loser in group[1:]}
+            if not mapping:
+                continue
+
+            now = timezone.now()
+            logs, survivors = [], []
+            for survivor_id, *loser_ids in batch:
+                survivor = customers[survivor_id]
+                others = [customers[pk] for pk in loser_ids]
+                for name, value in _merged_values(survivor, others).items():
+                    setattr(survivor, name, value)
+                survivor.refresh_search_keys()
+                survivor.refresh_region()
+                survivors.append(survivor)
+                for other in others:
+                    score, reasons = scores.get((min(survivor_id, other.pk), max(survivor_id, other.pk)), (None, []))
+                    logs.append(CustomerMergeLog(survivor_id=survivor_id, merged_customer_id=other.pk,
+                                                 snapshot=_snapshot(other), score=score, reasons=reasons,
+                                                 merged_at=now, merged_by=merged_by))
+
+            _repoint(mapping)
+            # 지울 고객이 정규화된 번호를 쓰고 있을 수 있으므로 먼저 지우고 대표 고객을 저장한다
+            Customer.objects.filter(pk__in=list(mapping)).delete()
+            Customer.objects.bulk_update(survivors, MERGED_FIELDS)
+            CustomerMergeLog.objects.bulk_create(logs)
+            schedule_profile_rebuild(*[survivor.pk for survivor in survivors])
+            merged += len(mapping)
+    if merged:
+        invalidate('customers', 'services', 'happycalls')
+    return merged
+
+
+def normalize_phones(batch_size=CASE_CHUNK_SIZE):
+    """
+    저장된 전화번호를 정규화 형식으로 바꿈 (바꾼 고객 수 반환)
+
+    정규화한 번호를 다른 고객이 쓰고 있으면(아직 합치지 않은 중복) 건너뛴다.
+    """
+    from .models import Customer
+
+    used = set()
+    pending = {}
+    for pk, phone in Customer.objects.order_by().values_list('pk', 'phone').iterator(chunk_size=50000):
+        normalized = normalize_phone(phone)
+        used.add(phone)
+        if normalized != phone:
+            pending[pk] = normalized
+    changes = {pk: phone for pk, phone in pending.items() if phone not in used}
+    # 같은 번호로 바뀌는 고객이 둘 이상이면 둘 다 건너뛴다
+    counts = defaultdict(int)
+    for phone in changes.values():
+        counts[phone] += 1
+    changes = {pk: phone for pk, phone in changes.items() if counts[phone] == 1}
+
+    ids = list(changes)
+    for offset in range(0, len(ids), batch_size):
+        chunk = ids[offset:offset + batch_size]
+        Customer.objects.filter(pk__in=chunk).update(phone=Case(
+            *[When(pk=pk, then=Value(changes[pk])) for pk in chunk]))
+    return len(ids)
@@ -0,0 +1,93 @@
+"""
+한글 초성/자모 검색 키
+
+접수 직원이 입력하는 "ㄱㅁㅅ"(초성) 이나 입력 중인 "김미"(자모 일부) 로 고객명/차종을 찾기 위해
+저장 시점에 두 가지 검색 키를 만들어 둔다.
+
+  - 자모 키: 음절을 첫소리/가운뎃소리/끝소리 낱자로 풀어 쓴 문자열 (김민수 → ㄱㅣㅁㅁㅣㄴㅅㅜ).
+    겹모음/겹받침도 낱자로 풀어 두므로 입력기가 조합 중인 글자도 앞부분이 그대로 맞는다.
+  - 초성 키: 음절의 첫소리만 모은 문자열 (김민수 → ㄱㅁㅅ).
+
+두 키 모두 공백을 빼고 영문은 소문자로 바꾼다. 조회는 prefix_q() 의 범위 조건(키 >= 입력, 키 < 입력 + U+FFFF)
+으로 해서 일반 인덱스만으로 앞부분 일치를 찾는다 (LIKE 는 DB/대소문자 설정에 따라 인덱스를 못 탄다).
+"""
+from django.db.models import Q
+
+SYLLABLE_FIRST, SYLLABLE_LAST = 0xAC00, 0xD7A3
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSUNG = ('ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅗㅏ', 'ㅗㅐ', 'ㅗㅣ', 'ㅛ', 'ㅜ', 'ㅜㅓ',
+            'ㅜㅔ', 'ㅜㅣ', 'ㅠ', 'ㅡ', 'ㅡㅣ', 'ㅣ')
+JONGSUNG = ('', 'ㄱ', 'ㄲ', 'ㄱㅅ', 'ㄴ', 'ㄴㅈ', 'ㄴㅎ', 'ㄷ', 'ㄹ', 'ㄹㄱ', 'ㄹㅁ', 'ㄹㅂ', 'ㄹㅅ', 'ㄹㅌ',
+            'ㄹㅍ', 'ㄹㅎ', 'ㅁ', 'ㅂ', 'ㅂㅅ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ')
+# 낱자로 입력된 겹모음/겹받침
+COMPOUND_JAMO = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ', 'ㄾ': 'ㄹㅌ',
+    'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ', 'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ',
+    'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+}
+CONSONANTS = set('ㄱㄲㄳㄴㄵㄶㄷㄸㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅃㅄㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ')
+JAMO_KEY_LENGTH, CHOSUNG_KEY_LENGTH = 255, 100  # 모델 필드 길이
+KEY_UPPER_BOUND = '\uffff'  # 모든 키 문자보다 큰 문자 (앞부분 일치 범위의 끝)
+
+
+def _syllable(char):
+    """완성형 음절의 (첫소리, 가운뎃소리, 끝소리) 번호, 음절이 아니면 None"""
+    code = ord(char)
+    if not SYLLABLE_FIRST <= code <= SYLLABLE_LAST:
+        return None
+    rest, last = divmod(code - SYLLABLE_FIRST, 28)
+    first, middle = divmod(rest, 21)
+    return first, middle, last
+
+
+def jamo_key(text):
+    """자모 검색 키 (김민수 → ㄱㅣㅁㅁㅣㄴㅅㅜ)"""
+    parts = []
+    for char in ''.join((text or '').split()).lower():
+        indexes = _syllable(char)
+        if indexes:
+            first, middle, last = indexes
+            parts.append(CHOSUNG[first] + JUNGSUNG[middle] + JONGSUNG[last])
+        else:
+            parts.append(COMPOUND_JAMO.get(char, char))
+    return ''.join(parts)
+
+
+def chosung_key(text):
+    """초성 검색 키 (김민수 → ㄱㅁㅅ, 한글이 아닌 글자는 그대로)"""
+    parts = []
+    for char in ''.join((text or '').split()).lower():
+        indexes = _syllable(char)
+        parts.append(CHOSUNG[indexes[0]] if indexes else char)
+    return ''.join(parts)
+
+
+def search_keys(text):
+    """저장용 (자모 키, 초성 키) - 필드 길이에 맞춰 자른다"""
+    return jamo_key(text)[:JAMO_KEY_LENGTH], chosung_key(text)[:CHOSUNG_KEY_LENGTH]
+
+
+def is_chosung_query(text):
+    """초성만으로 된 검색어인지 (ㄱㅁㅅ)"""
+    chars = ''.join((text or '').split())
+    return bool(chars) and all(char in CONSONANTS for char in chars)
+
+
+def prefix_q(text, jamo_field, chosung_field):
+    """
+    검색어로 시작하는 행을 찾는 Q (인덱스 범위 조건)
+
+    초성만 입력하면 초성 키, 아니면 자모 키로 찾는다. 키가 비면 None.
+    """
+    if is_chosung_query(text):
+        field, key = chosung_field, chosung_key(text)
+    else:
+        field, key = jamo_field, jamo_key(text)
+    if not key:
+        return None
+    return Q(**{f'{field}__gte': key, f'{field}__lt': key + KEY_UPPER_BOUND})
+
+
+def key_field_for(text, jamo_field, chosung_field):
+    """prefix_q() 가 쓰는 키 필드 (같은 필드로 정렬하면 인덱스 순서대로 LIMIT 까지만 읽는다)"""
+    return chosung_field if is_chosung_query(text) else jamo_field
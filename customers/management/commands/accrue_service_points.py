@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from customers.points import accrual_rate, accrue_for_services
+from datetime import datetime, time as dt_time
+import time
+
+
+class Command(BaseCommand):
+    help = '완료된 서비스 중 포인트가 적립되지 않은 건을 일괄 적립 (POINTS_ACCRUAL_RATE 기준)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='이 날짜(YYYY-MM-DD) 이후 서비스만 적립')
+
+    def handle(self, *args, **options):
+        if accrual_rate() <= 0:
+            raise CommandError('POINTS_ACCRUAL_RATE 가 0 입니다. 적립률을 설정하세요.')
+        since = None
+        if options['since']:
+            day = parse_date(options['since'])
+            if day is None:
+                raise CommandError('--since 는 YYYY-MM-DD 형식이어야 합니다.')
+            since = timezone.make_aware(datetime.combine(day, dt_time.min))
+
+        started = time.perf_counter()
+        count = accrue_for_services(since=since)
+        self.stdout.write(self.style.SUCCESS(
+            f'서비스 {count:,}건 포인트 적립 (적립률 {accrual_rate()}, {time.perf_counter() - started:.2f}초)'))
@@ -6,6 +6,7 @@ from customers.models import (
     CustomerCommunication, HappyCall, MarketingCampaign,
     CustomerCampaignHistory, CustomerPointHistory
 )
+from customers.ownership import refresh_current_owners
 import random
 from datetime import date, datetime, timedelta
 from faker import Faker
@@ -178,7 +179,7 @@ class Command(BaseCommand):
                 membership_join_date=membership_join_date,
                 membership_points=membership_points,
                 marketing_consent=random.choice([True, False]),
-                marketing_consent_date=timezone.make_aware(timezone.make_aware(fake.date_time_between(start_date='-1y', end_date='now')) if random.random() < 0.7 else None,
+                marketing_consent_date=timezone.make_aware(fake.date_time_between(start_date='-1y', end_date='now')) if random.random() < 0.7 else None,
                 preferred_contact_method=random.choice(['sms', 'phone', 'email']),
                 do_not_contact=random.choice([True, False]) if random.random() < 0.1 else False,
                 acquisition_source=random.choice(acquisition_sources),
@@ -188,7 +189,7 @@ class Command(BaseCommand):
                 total_service_count=random.randint(0, 50),
                 total_service_amount=random.randint(0, 5000000),
                 notes=fake.text(max_nb_chars=200) if random.random() < 0.3 else '',
-                created_at=timezone.make_aware(timezone.make_aware(fake.date_time_between(start_date='-2y', end_date='now'))
+                created_at=timezone.make_aware(fake.date_time_between(start_date='-2y', end_date='now'))
             )
             customers.append(customer)
         
@@ -218,7 +219,7 @@ class Command(BaseCommand):
                         customer=customer,
                         tag=tag,
                         created_by=admin_user,
-                        created_at=timezone.make_aware(fake.date_time_between(start_date=customer.created_at, end_date='now')
+                        created_at=timezone.make_aware(fake.date_time_between(start_date=customer.created_at, end_date='now'))
                     ))
         
         CustomerTag.objects.bulk_create(customer_tags, batch_size=100)
@@ -262,7 +263,7 @@ class Command(BaseCommand):
                 vehicle_number=vehicle_number,
                 model=model,
                 year=year,
-                created_at=timezone.make_aware(timezone.make_aware(fake.date_time_between(start_date='-2y', end_date='now'))
+                created_at=timezone.make_aware(fake.date_time_between(start_date='-2y', end_date='now'))
             ))
         
         Vehicle.objects.bulk_create(vehicles, batch_size=100)
@@ -297,10 +298,12 @@ class Command(BaseCommand):
                         vehicle=vehicle,
                         start_date=start_date,
                         end_date=end_date,
-                        created_at=timezone.make_aware(fake.date_time_between(start_date=start_date, end_date='now')
+                        created_at=timezone.make_aware(fake.date_time_between(start_date=start_date, end_date='now'))
                     ))
         
         CustomerVehicle.objects.bulk_create(customer_vehicles, batch_size=100)
+        # bulk_create 는 save() 를 거치지 않으므로 차량의 현재 소유자를 따로 맞춤
+        refresh_current_owners({link.vehicle_id for link in customer_vehicles})
         self.stdout.write(f'고객-차량 관계 {len(customer_vehicles)}건 생성 완료')
 
     def create_communications(self):
@@ -333,7 +336,7 @@ class Command(BaseCommand):
                 
                 communications.append(CustomerCommunication(
                     customer=customer,
-                    communication_date=timezone.make_aware(fake.date_time_between(start_date='-1y', end_date='now'),
+                    communication_date=timezone.make_aware(fake.date_time_between(start_date='-1y', end_date='now')),
                     communication_type=comm_type,
                     method=method,
                     direction=direction,
@@ -342,7 +345,7 @@ class Command(BaseCommand):
                     result=result,
                     follow_up_needed=random.choice([True, False]),
                     created_by=admin_user,
-                    created_at=timezone.make_aware(fake.date_time_between(start_date='-1y', end_date='now')
+                    created_at=timezone.make_aware(fake.date_time_between(start_date='-1y', end_date='now'))
                 ))
         
         CustomerCommunication.objects.bulk_create(communications, batch_size=100)
@@ -363,14 +366,14 @@ class Command(BaseCommand):
             
             for i in range(num_calls):
                 call_sequence = random.choice([1, 2, 3])
-                scheduled_date = timezone.make_aware(fake.date_time_between(start_date='-6m', end_date='+1m')
+                scheduled_date = timezone.make_aware(fake.date_time_between(start_date='-6m', end_date='+1m'))
                 
                 # 80% 확률로 완료된 콜
                 is_completed = random.random() < 0.8
                 completed_date = timezone.make_aware(fake.date_time_between(
                     start_date=scheduled_date, 
                     end_date='now'
-                ) if is_completed else None
+                )) if is_completed else None
                 
                 contact_result = random.choice(['completed', 'no_answer', 'refused']) if is_completed else ''
                 satisfaction_score = random.choice([1, 2, 3, 4, 5]) if contact_result == 'completed' else None
@@ -392,7 +395,7 @@ class Command(BaseCommand):
                     next_call_scheduled=random.choice([True, False]) if call_sequence < 3 else False,
                     notes=fake.text(max_nb_chars=150),
                     created_by=admin_user,
-                    created_at=timezone.make_aware(fake.date_time_between(start_date=scheduled_date, end_date='now')
+                    created_at=timezone.make_aware(fake.date_time_between(start_date=scheduled_date, end_date='now'))
                 ))
         
         HappyCall.objects.bulk_create(happy_calls, batch_size=100)
@@ -454,7 +457,7 @@ class Command(BaseCommand):
                 end_date=camp_data['end_date'],
                 status=camp_data['status'],
                 created_by=admin_user,
-                created_at=timezone.make_aware(fake.date_time_between(start_date='-6m', end_date='now')
+                created_at=timezone.make_aware(fake.date_time_between(start_date='-6m', end_date='now'))
             )
             created_campaigns.append(campaign)
         
@@ -479,7 +482,7 @@ class Command(BaseCommand):
                 sent_date = timezone.make_aware(fake.date_time_between(
                     start_date=campaign.start_date, 
                     end_date=campaign.end_date
-                )
+                ))
                 
                 delivery_status = random.choices(
                     ['sent', 'failed', 'refused'],
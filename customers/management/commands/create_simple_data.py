@@ -78,6 +78,7 @@ class Command(BaseCommand):
                 total_service_amount=random.randint(0, 1000000),
                 created_at=timezone.now() - timedelta(days=random.randint(1, 730))
             )
+            customer.refresh_search_keys()
             customers.append(customer)
         
         # 배치 생성
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from customers.dedup import MERGE_THRESHOLD, find_duplicates, merge_groups, normalize_phones
+import csv
+import time
+
+
+class Command(BaseCommand):
+    help = '중복 고객 찾기 (기본: 보고만), --merge 로 대표 고객에 합치기'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--merge', action='store_true', help='합칠 그룹을 실제로 합침 (기본은 보고만)')
+        parser.add_argument('--report', metavar='CSV', default=None, help='후보 쌍과 판단 결과를 CSV 로 저장')
+        parser.add_argument('--normalize-phones', action='store_true',
+                            help='저장된 전화번호를 010-1234-5678 형식으로 정규화 (합친 뒤 실행)')
+        parser.add_argument('--samples', type=int, default=10, help='출력할 그룹 예시 수')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = find_duplicates()
+        pairs, groups = result['pairs'], result['groups']
+        merge_pairs = sum(1 for pair in pairs if pair[2] >= MERGE_THRESHOLD)
+        self.stdout.write(
+            f'후보 쌍 {len(pairs):,}건 (합침 {merge_pairs:,}, 검토 {len(pairs) - merge_pairs:,}), '
+            f'합칠 그룹 {len(groups):,}개 / 고객 {sum(len(group) - 1 for group in groups):,}명 '
+            f'({time.perf_counter() - started:.2f}초)'
+        )
+        for key, size in result['skipped_blocks'][:options['samples']]:
+            self.stdout.write(self.style.WARNING(f'  블록이 너무 커서 건너뜀: {key} ({size:,}명)'))
+        for group in groups[:options['samples']]:
+            self.stdout.write(f'  #{group[0]} ← ' + ', '.join(f'#{pk}' for pk in group[1:]))
+
+        if options['report']:
+            self._write_report(options['report'], pairs)
+
+        if options['merge']:
+            started = time.perf_counter()
+            scores = {(a, b): (score, reasons) for a, b, score, reasons in pairs}
+            merged = merge_groups(groups, scores=scores)
+            self.stdout.write(self.style.SUCCESS(
+                f'고객 {merged:,}명을 합쳤습니다 ({time.perf_counter() - started:.2f}초)'))
+        elif groups:
+            self.stdout.write('보고만 했습니다. 합치려면 --merge 를 붙여 실행하세요.')
+
+        if options['normalize_phones']:
+            changed = normalize_phones()
+            self.stdout.write(self.style.SUCCESS(f'전화번호 {changed:,}건을 정규화했습니다.'))
+
+    def _write_report(self, path, pairs):
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['고객 ID', '고객 ID', '점수', '판단', '근거'])
+            for a, b, score, reasons in pairs:
+                decision = '합침' if score >= MERGE_THRESHOLD else '검토'
+                writer.writerow([a, b, score, decision, ', '.join(reasons)])
+        self.stdout.write(f'보고서 저장: {path}')
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from customers.points import EXPIRY_CHUNK_SIZE, expire_points
+from datetime import datetime, time as dt_time
+import time
+
+
+class Command(BaseCommand):
+    help = '유효기간이 지난 적립 포인트 소멸 처리 (선입선출 원장 기준, 청크 단위 일괄 처리)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--as-of', help='이 날짜(YYYY-MM-DD) 끝 기준으로 만료 처리 (기본: 지금)')
+        parser.add_argument('--chunk-size', type=int, default=EXPIRY_CHUNK_SIZE,
+                            help=f'한 트랜잭션에서 처리할 적립 행 수 (기본: {EXPIRY_CHUNK_SIZE})')
+
+    def handle(self, *args, **options):
+        as_of = None
+        if options['as_of']:
+            day = parse_date(options['as_of'])
+            if day is None:
+                raise CommandError('--as-of 는 YYYY-MM-DD 형식이어야 합니다.')
+            as_of = timezone.make_aware(datetime.combine(day, dt_time.max))
+
+        started = time.perf_counter()
+        result = expire_points(as_of=as_of, chunk_size=max(1, options['chunk_size']))
+        self.stdout.write(self.style.SUCCESS(
+            f"적립 {result['lots']:,}건, 고객 {result['customers']:,}명, {result['points']:,}P 소멸 "
+            f"({time.perf_counter() - started:.2f}초)"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from customers.rfm import run_grading
+import time
+
+
+class Command(BaseCommand):
+    help = '완료 서비스 RFM(최근성/빈도/금액) 기준 고객 등급(A–D) 산정'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--incremental', action='store_true',
+                            help='마지막 실행 이후 서비스가 바뀐 고객만 마지막 전체 산정 기준으로 재산정')
+        parser.add_argument('--dry-run', action='store_true', help='등급을 저장하지 않고 결과만 출력')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        run = run_grading(incremental=options['incremental'], dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - started
+
+        if options['incremental'] and run.mode == 'full':
+            self.stdout.write(self.style.WARNING('이전 전체 산정 기록이 없어 전체 산정으로 실행했습니다.'))
+        counts = ', '.join(f'{grade} {count:,}명' for grade, count in run.grade_counts.items())
+        self.stdout.write(f'[{run.get_mode_display()}] 고객 {run.customer_count:,}명 ({counts})')
+        for name, values in run.thresholds.items():
+            if name != 'computed_at':
+                self.stdout.write(f"  {name} 분위수 경계: {', '.join(f'{value:,.0f}' for value in values)}")
+        message = f'등급 변경 {run.updated_count:,}명 ({elapsed:.2f}초)'
+        if options['dry_run']:
+            message += ' - dry run, 저장 안 함'
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError
+from customers.campaigns import SEND_BATCH_SIZE, apply_delivery_updates, launch_campaign, send_pending
+from customers.models import MarketingCampaign
+from customers.segments import SegmentError
+import json
+import sys
+import time
+
+
+class Command(BaseCommand):
+    help = '캠페인 발송 대상 생성 후 분당 발송량을 지켜 발송, 또는 발송사 결과(JSON Lines) 반영'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign_id', type=int, nargs='?', help='캠페인 ID')
+        parser.add_argument('--no-send', action='store_true', help='발송대기 이력만 만들고 발송하지 않음')
+        parser.add_argument('--send-only', action='store_true', help='대상 생성 없이 남은 발송대기 이력만 발송')
+        parser.add_argument('--rate', type=int, default=None, help='분당 발송 건수 (기본: CAMPAIGN_SEND_RATE, 0 은 제한 없음)')
+        parser.add_argument('--batch-size', type=int, default=SEND_BATCH_SIZE, help='발송 배치 크기')
+        parser.add_argument('--limit', type=int, default=None, help='이번 실행에서 보낼 최대 건수')
+        parser.add_argument('--results', metavar='FILE', default=None,
+                            help='발송사 결과 JSON Lines 파일 반영 (- 는 표준입력)')
+
+    def handle(self, *args, **options):
+        if options['results']:
+            self._apply_results(options['results'])
+            return
+
+        if options['campaign_id'] is None:
+            raise CommandError('캠페인 ID 가 필요합니다.')
+        campaign = MarketingCampaign.objects.filter(pk=options['campaign_id']).first()
+        if campaign is None:
+            raise CommandError(f"캠페인을 찾을 수 없습니다: {options['campaign_id']}")
+
+        if not options['send_only']:
+            started = time.perf_counter()
+            try:
+                result = launch_campaign(campaign)
+            except SegmentError as e:
+                raise CommandError(f'타겟 조건 오류: {e}')
+            self.stdout.write(f"발송 가능 대상 {result['audience']:,}명, 새 발송대기 {result['created']:,}건 "
+                              f'({time.perf_counter() - started:.2f}초)')
+        if options['no_send']:
+            return
+
+        stats = send_pending(campaign, rate=options['rate'], batch_size=options['batch_size'],
+                             limit=options['limit'], progress=self._progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"발송 완료: 성공 {stats['sent']:,}, 실패 {stats['failed']:,}, 수신거부 {stats['refused']:,} "
+            f"({stats['elapsed']:.1f}초, 분당 {stats['per_minute']:,.0f}건)"
+        ))
+
+    def _progress(self, stats):
+        processed = stats['sent'] + stats['failed'] + stats['refused']
+        self.stdout.write(f"  {stats['elapsed'] / 60:5.1f}분  처리 {processed:,}건  분당 {stats['per_minute']:,.0f}건")
+
+    @staticmethod
+    def _read_lines(stream):
+        # 깨진 줄은 None 으로 넘겨 잘못된 값으로 센다
+        for line in stream:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    yield None
+
+    def _apply_results(self, path):
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        try:
+            result = apply_delivery_updates(self._read_lines(stream))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        self.stdout.write(self.style.SUCCESS(
+            f"결과 반영 {result['updated']:,}건 (이력 없음 {result['unknown']:,}, 잘못된 값 {result['invalid']:,})"
+        ))
@@ -0,0 +1,40 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+from customers.mileage import PREDICT_CHUNK_SIZE, import_history_mileage, predict_service_dates
+from customers.models import Vehicle
+import time
+
+
+class Command(BaseCommand):
+    help = '주행거리 기록으로 차량별 일평균 주행거리와 다음 엔진오일 교환일/정기검사일 예측 (바뀐 차량만 저장)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--import-history', action='store_true',
+                            help='먼저 서비스 이력의 완료 시 주행거리 중 기록되지 않은 것을 주행거리 기록으로 가져옴')
+        parser.add_argument('--vehicle', type=int, nargs='+', default=None, help='이 차량 ID 만 예측')
+        parser.add_argument('--batch-size', type=int, default=PREDICT_CHUNK_SIZE, help='한 번에 예측할 차량 수')
+
+    def handle(self, *args, **options):
+        if options['import_history']:
+            started = time.perf_counter()
+            imported = import_history_mileage()
+            self.stdout.write(f'  ✓ 서비스 이력 주행거리 {imported:,}건 가져옴 ({time.perf_counter() - started:.2f}초)')
+
+        started = time.perf_counter()
+        checked, changed = predict_service_dates(options['vehicle'], chunk_size=options['batch_size'])
+        self.stdout.write(f'  ✓ 차량 {checked:,}대 확인, {changed:,}대 갱신 ({time.perf_counter() - started:.2f}초)')
+
+        today = timezone.localdate()
+        stats = Vehicle.objects.aggregate(
+            measured=Count('pk', filter=Q(daily_mileage__isnull=False)),
+            average=Avg('daily_mileage'),
+            oil_due=Count('pk', filter=Q(next_oil_change_date__range=(today, today + timedelta(days=14)))),
+            inspection_due=Count('pk', filter=Q(next_inspection_date__range=(today, today + timedelta(days=30)))),
+        )
+        self.stdout.write(f"  주행거리 추정 차량 {stats['measured']:,}대, 일평균 {stats['average'] or 0:.1f}km")
+        self.stdout.write(f"  14일 안 엔진오일 교환 예정 {stats['oil_due']:,}대, "
+                          f"30일 안 정기검사 예정 {stats['inspection_due']:,}대")
+        self.stdout.write(self.style.SUCCESS('예측 완료'))
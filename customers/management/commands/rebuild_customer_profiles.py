@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from customers.models import Customer
+from customers.profile import PROFILE_VERSION, REBUILD_BATCH_SIZE, rebuild_profiles
+import time
+
+
+class Command(BaseCommand):
+    help = '고객 360 프로필 재생성 (기본: 없거나 재계산 필요/형식 버전이 다른 고객만)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='모든 고객 프로필을 다시 생성')
+        parser.add_argument('--customer', type=int, action='append', dest='customer_ids',
+                            help='특정 고객 ID만 재생성 (여러 번 지정 가능)')
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE,
+                            help=f'한 번에 처리할 고객 수 (기본: {REBUILD_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        customers = Customer.objects.order_by('pk')
+        if options['customer_ids']:
+            customers = customers.filter(pk__in=options['customer_ids'])
+        elif not options['all']:
+            customers = customers.filter(
+                Q(profile__isnull=True) | Q(profile__is_stale=True) | ~Q(profile__version=PROFILE_VERSION))
+        customer_ids = list(customers.values_list('pk', flat=True))
+
+        started = time.perf_counter()
+        batch_size = max(1, options['batch_size'])
+        for offset in range(0, len(customer_ids), batch_size):
+            rebuild_profiles(customer_ids[offset:offset + batch_size], force=options['all'])
+            self.stdout.write(f'  {min(offset + batch_size, len(customer_ids))}/{len(customer_ids)}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'고객 프로필 {len(customer_ids)}건 재생성 ({time.perf_counter() - started:.2f}초)'))
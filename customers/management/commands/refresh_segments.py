@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from customers.models import CustomerSegment
+from customers.segments import SegmentError, preview, refresh_segment
+import time
+
+
+class Command(BaseCommand):
+    help = '저장된 고객 세그먼트 비트맵 갱신 (기본: 바뀐 고객만 증분 갱신) 또는 조건 미리보기'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--segment', nargs='+', default=None, help='갱신할 세그먼트 이름 (기본: 전체)')
+        parser.add_argument('--full', action='store_true', help='증분 대신 처음부터 다시 계산')
+        parser.add_argument('--preview', default=None, metavar='JSON', help='조건 JSON 의 대상 고객 수만 출력')
+
+    def handle(self, *args, **options):
+        if options['preview'] is not None:
+            started = time.perf_counter()
+            try:
+                result = preview(options['preview'])
+            except SegmentError as e:
+                raise CommandError(str(e))
+            self.stdout.write(f"대상 고객 {result['count']:,}명 ({time.perf_counter() - started:.2f}초)")
+            return
+
+        segments = CustomerSegment.objects.all()
+        if options['segment']:
+            segments = segments.filter(name__in=options['segment'])
+            missing = set(options['segment']) - set(segments.values_list('name', flat=True))
+            if missing:
+                raise CommandError(f"세그먼트를 찾을 수 없습니다: {', '.join(sorted(missing))}")
+
+        for segment in segments:
+            started = time.perf_counter()
+            try:
+                mode = refresh_segment(segment, full=options['full'])
+            except SegmentError as e:
+                self.stdout.write(self.style.ERROR(f'  ✗ {segment.name}: {e}'))
+                continue
+            label = '전체' if mode == 'full' else '증분'
+            self.stdout.write(f'  ✓ {segment.name:<20} {segment.customer_count:>10,}명  '
+                              f'[{label}] {time.perf_counter() - started:.2f}초, 비트맵 {len(segment.bitmap):,}바이트')
+        self.stdout.write(self.style.SUCCESS('세그먼트 갱신 완료'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from customers.points import open_balances, verify_balances
+
+
+class Command(BaseCommand):
+    help = '고객 포인트 잔액과 포인트 원장 합계 일치 여부 확인'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--open-balances', action='store_true',
+                            help='원장이 없는 고객의 기존 잔액을 기초 잔액 조정 행으로 먼저 기록')
+        parser.add_argument('--limit', type=int, default=100, help='표시할 불일치 고객 수 (기본: 100)')
+
+    def handle(self, *args, **options):
+        if options['open_balances']:
+            count = open_balances()
+            self.stdout.write(self.style.SUCCESS(f'고객 {count:,}명 기초 잔액 기록'))
+
+        mismatches = verify_balances(limit=options['limit'])
+        if mismatches:
+            for customer_id, ledger_total, stored in mismatches:
+                self.stdout.write(self.style.ERROR(
+                    f'고객 #{customer_id}: 원장 합계 {ledger_total:,}P / 잔액 {stored:,}P'))
+            more = ' 이상' if len(mismatches) >= options['limit'] else ''
+            self.stdout.write(self.style.ERROR(f'{len(mismatches)}명{more} 잔액 불일치'))
+        else:
+            self.stdout.write(self.style.SUCCESS('고객 포인트 잔액이 원장 합계와 일치합니다.'))
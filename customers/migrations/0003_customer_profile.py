@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:05
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_banned_by_customer_banned_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerProfile',
+            fields=[
+                ('customer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='profile', serialize=False, to='customers.customer', verbose_name='고객')),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='프로필')),
+                ('version', models.PositiveSmallIntegerField(default=0, verbose_name='형식 버전')),
+                ('revision', models.PositiveIntegerField(default=0, verbose_name='변경 횟수')),
+                ('is_stale', models.BooleanField(default=False, verbose_name='재계산 필요')),
+                ('built_at', models.DateTimeField(verbose_name='생성일시')),
+            ],
+            options={
+                'verbose_name': '고객 프로필',
+                'verbose_name_plural': '고객 프로필들',
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_customer_profile'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customercampaignhistory',
+            index=models.Index(fields=['customer', '-sent_date'], name='customers_c_custome_830b65_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerpointhistory',
+            index=models.Index(fields=['customer', '-transaction_date'], name='customers_c_custome_f69f88_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0004_timeline_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customerpointhistory',
+            name='expires_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='만료일시'),
+        ),
+        migrations.AddField(
+            model_name='customerpointhistory',
+            name='remaining_points',
+            field=models.PositiveIntegerField(default=0, help_text='적립 포인트 중 아직 사용/만료되지 않은 포인트', verbose_name='미사용 잔량'),
+        ),
+        migrations.AddIndex(
+            model_name='customerpointhistory',
+            index=models.Index(condition=models.Q(('remaining_points__gt', 0)), fields=['customer', 'expires_at', 'id'], name='points_open_lot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customerpointhistory',
+            index=models.Index(condition=models.Q(('remaining_points__gt', 0)), fields=['expires_at', 'id'], name='points_expiry_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='customerpointhistory',
+            constraint=models.UniqueConstraint(condition=models.Q(('point_type', 'earned'), ('related_service_id__isnull', False)), fields=('customer', 'related_service_id'), name='points_unique_service_accrual'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0005_points_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerGradeRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('full', '전체'), ('incremental', '증분')], max_length=20, verbose_name='산정 방식')),
+                ('started_at', models.DateTimeField(verbose_name='시작일시')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='완료일시')),
+                ('customer_count', models.PositiveIntegerField(default=0, verbose_name='산정 고객 수')),
+                ('updated_count', models.PositiveIntegerField(default=0, verbose_name='등급 변경 고객 수')),
+                ('grade_counts', models.JSONField(blank=True, default=dict, verbose_name='등급별 고객 수')),
+                ('thresholds', models.JSONField(blank=True, default=dict, verbose_name='분위수 기준')),
+            ],
+            options={
+                'verbose_name': '고객 등급 산정',
+                'verbose_name_plural': '고객 등급 산정 기록',
+                'ordering': ['-started_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0006_customer_grade_run'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='세그먼트명')),
+                ('description', models.TextField(blank=True, verbose_name='설명')),
+                ('criteria', models.JSONField(blank=True, default=dict, verbose_name='조건')),
+                ('bitmap', models.BinaryField(default=b'', verbose_name='대상 고객 비트맵')),
+                ('customer_count', models.PositiveIntegerField(default=0, verbose_name='대상 고객 수')),
+                ('built_at', models.DateTimeField(blank=True, null=True, verbose_name='갱신일시')),
+                ('full_built_at', models.DateTimeField(blank=True, null=True, verbose_name='전체 재계산일시')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+            ],
+            options={
+                'verbose_name': '고객 세그먼트',
+                'verbose_name_plural': '고객 세그먼트들',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['updated_at'], name='customers_c_updated_7518c4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customertag',
+            index=models.Index(fields=['created_at'], name='customers_c_created_0a7b62_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customervehicle',
+            index=models.Index(fields=['created_at'], name='customers_c_created_edcc43_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['updated_at'], name='customers_v_updated_3bc770_idx'),
+        ),
+        migrations.AddField(
+            model_name='customersegment',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='생성자'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0007_customer_segments'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customercampaignhistory',
+            name='provider_message_id',
+            field=models.CharField(blank=True, help_text='발송사가 돌려준 메시지 ID (전달/반응 결과 매칭용)', max_length=100, verbose_name='발송 메시지 ID'),
+        ),
+        migrations.AddField(
+            model_name='marketingcampaign',
+            name='launched_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='발송 대상 생성일시'),
+        ),
+        migrations.AddField(
+            model_name='marketingcampaign',
+            name='message',
+            field=models.TextField(blank=True, help_text='{name} 은 고객명으로 바뀝니다', verbose_name='발송 메시지'),
+        ),
+        migrations.AlterField(
+            model_name='customercampaignhistory',
+            name='delivery_status',
+            field=models.CharField(choices=[('pending', '발송대기'), ('sent', '발송완료'), ('failed', '발송실패'), ('refused', '수신거부')], max_length=20, verbose_name='발송상태'),
+        ),
+        migrations.AddIndex(
+            model_name='customercampaignhistory',
+            index=models.Index(fields=['campaign', 'delivery_status'], name='customers_c_campaig_741077_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customercampaignhistory',
+            index=models.Index(fields=['provider_message_id'], name='customers_c_provide_3f594a_idx'),
+        ),
+    ]
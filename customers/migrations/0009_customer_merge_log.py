@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:38
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0008_campaign_fan_out'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CustomerMergeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('merged_customer_id', models.PositiveIntegerField(db_index=True, verbose_name='합쳐진 고객 ID')),
+                ('snapshot', models.JSONField(default=dict, verbose_name='합쳐진 고객 정보')),
+                ('score', models.FloatField(blank=True, null=True, verbose_name='중복 점수')),
+                ('reasons', models.JSONField(blank=True, default=list, verbose_name='판단 근거')),
+                ('merged_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='합친 일시')),
+                ('merged_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL, verbose_name='처리자')),
+                ('survivor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='merge_logs', to='customers.customer', verbose_name='대표 고객')),
+            ],
+            options={
+                'verbose_name': '고객 합치기 기록',
+                'verbose_name_plural': '고객 합치기 기록들',
+                'ordering': ['-merged_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:41
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0009_customer_merge_log'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='name_chosung',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='고객명 초성'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='name_jamo',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255, verbose_name='고객명 자모'),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='model_chosung',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='모델명 초성'),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='model_jamo',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255, verbose_name='모델명 자모'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['name_jamo'], name='customers_c_name_ja_d55142_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['name_chosung'], name='customers_c_name_ch_32db06_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['model_jamo'], name='customers_v_model_j_828400_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['model_chosung'], name='customers_v_model_c_628fb2_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0010_search_keys'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='address_city',
+            field=models.CharField(blank=True, default='', editable=False, max_length=50, verbose_name='시/도'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='address_district',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='시/군/구'),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='address_dong',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100, verbose_name='동/읍/면'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['address_city', 'address_district', 'address_dong'], name='customers_c_address_ac5e01_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['address_district', 'address_dong'], name='customers_c_address_c5bf31_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_current_owners(apps, schema_editor):
+    # 현재 소유(종료일 없음) 중 가장 최근에 시작한 고객을 한 번의 UPDATE 로 채운다
+    Vehicle = apps.get_model('customers', 'Vehicle')
+    CustomerVehicle = apps.get_model('customers', 'CustomerVehicle')
+    owner = (CustomerVehicle.objects.filter(vehicle_id=models.OuterRef('pk'), end_date__isnull=True)
+             .order_by('-start_date', '-pk').values('customer_id')[:1])
+    Vehicle.objects.update(current_owner_id=models.Subquery(owner))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0011_customer_regions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='current_owner',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='current_vehicles', to='customers.customer', verbose_name='현재 소유자'),
+        ),
+        migrations.AddIndex(
+            model_name='customervehicle',
+            index=models.Index(condition=models.Q(('end_date__isnull', True)), fields=['customer', '-start_date'], name='customervehicle_open_cust_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customervehicle',
+            index=models.Index(condition=models.Q(('end_date__isnull', True)), fields=['vehicle', 'start_date'], name='customervehicle_open_veh_idx'),
+        ),
+        migrations.RunPython(fill_current_owners, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0012_vehicle_current_owner'),
+        ('services', '0016_grade_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VehicleMileage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mileage', models.PositiveIntegerField(verbose_name='주행거리(km)')),
+                ('recorded_on', models.DateField(verbose_name='기록일')),
+                ('source', models.CharField(choices=[('request', '서비스 접수'), ('completion', '서비스 완료'), ('manual', '직접 입력')], default='manual', max_length=20, verbose_name='출처')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='등록일')),
+            ],
+            options={
+                'verbose_name': '차량 주행거리 기록',
+                'verbose_name_plural': '차량 주행거리 기록들',
+                'ordering': ['-recorded_on', '-pk'],
+            },
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='daily_mileage',
+            field=models.FloatField(blank=True, editable=False, null=True, verbose_name='일평균 주행거리(km)'),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='mileage',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='주행거리(km)'),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='next_inspection_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='정기검사 예정일'),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='next_oil_change_date',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='엔진오일 교환 예정일'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['next_oil_change_date'], name='customers_v_next_oi_67078f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['next_inspection_date'], name='customers_v_next_in_c3047a_idx'),
+        ),
+        migrations.AddField(
+            model_name='vehiclemileage',
+            name='service_request',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mileage_records', to='services.servicerequest', verbose_name='서비스 요청'),
+        ),
+        migrations.AddField(
+            model_name='vehiclemileage',
+            name='vehicle',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mileage_records', to='customers.vehicle', verbose_name='차량'),
+        ),
+        migrations.AddIndex(
+            model_name='vehiclemileage',
+            index=models.Index(fields=['vehicle', 'recorded_on'], name='customers_v_vehicle_eada85_idx'),
+        ),
+    ]
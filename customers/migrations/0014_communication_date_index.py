@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0013_vehicle_mileage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customercommunication',
+            index=models.Index(fields=['communication_date'], name='customers_c_communi_364d76_idx'),
+        ),
+    ]
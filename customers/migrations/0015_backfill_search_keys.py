@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:31
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+
+
+def backfill(model, source, key_fields, derive, schema_editor):
+    # pk 순서로 끊어 읽고 값이 바뀐 행만 행별 UPDATE (rebuild_search_keys 명령과 같은 방식)
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    sql = (f'UPDATE {quote(model._meta.db_table)} SET '
+           + ', '.join(f'{quote(model._meta.get_field(field).column)} = %s' for field in key_fields)
+           + f' WHERE {quote(model._meta.pk.column)} = %s')
+    last_pk = 0
+    while True:
+        rows = list(model.objects.filter(pk__gt=last_pk).order_by('pk')
+                    .values_list('pk', source, *key_fields)[:BATCH_SIZE])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        params = [(*derive(value), pk) for pk, value, *keys in rows if list(derive(value)) != keys]
+        if params:
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, params)
+
+
+def fill_search_keys(apps, schema_editor):
+    # 0010 에서 추가한 고객명/모델명 초성·자모 검색 키를 기존 행에 채운다
+    from customers.hangul import search_keys
+
+    backfill(apps.get_model('customers', 'Customer'), 'name', ['name_jamo', 'name_chosung'], search_keys,
+             schema_editor)
+    backfill(apps.get_model('customers', 'Vehicle'), 'model', ['model_jamo', 'model_chosung'], search_keys,
+             schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0014_communication_date_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_search_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-19 08:40
+
+from django.db import migrations
+
+BATCH_SIZE = 2000
+REGION_FIELDS = ['address_city', 'address_district', 'address_dong']
+
+
+def fill_regions(apps, schema_editor):
+    # 0011 에서 추가한 시/구/동 컬럼을 기존 고객의 address_main 으로 채운다 (바뀐 행만 UPDATE)
+    from customers.address import parse_region
+
+    Customer = apps.get_model('customers', 'Customer')
+    connection = schema_editor.connection
+    quote = connection.ops.quote_name
+    sql = (f'UPDATE {quote(Customer._meta.db_table)} SET '
+           + ', '.join(f'{quote(field)} = %s' for field in REGION_FIELDS)
+           + f' WHERE {quote(Customer._meta.pk.column)} = %s')
+    last_pk = 0
+    while True:
+        rows = list(Customer.objects.filter(pk__gt=last_pk).order_by('pk')
+                    .values_list('pk', 'address_main', *REGION_FIELDS)[:BATCH_SIZE])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        params = [(*parse_region(address), pk) for pk, address, *region in rows
+                  if list(parse_region(address)) != region]
+        if params:
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, params)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0015_backfill_search_keys'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_regions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,273 @@
+"""
+차량 주행거리 이력과 다음 정비 예정일
+
+방문 때 받은 주행거리는 record_mileage() 로 VehicleMileage 에 쌓고, 배치(predict_service_dates,
+manage.py predict_service_dates)가 차량별 하루 평균 주행거리를 구해 다음 엔진오일 교환일/정기검사일을
+Vehicle 에 저장한다. 해피콜 배정 화면과 4차콜 예정일은 이 날짜 컬럼(인덱스)을 범위 조건으로 읽는다.
+
+  - 하루 평균 주행거리: 차량별 (기록일, 주행거리) 최소제곱 직선의 기울기. 차량마다 루프를 돌지 않고
+    np.bincount 로 묶음 안 모든 차량의 합계를 한 번에 구한다. 기록 기간이 MIN_FIT_DAYS 보다 짧으면
+    연식 기준(그해 7월 1일 출고, 0km) 평균, 그것도 안 되면 MILEAGE_DEFAULT_DAILY_KM.
+  - 엔진오일: 마지막 오일 교환일(없으면 마지막 주행거리 기록일)부터 OIL_CHANGE_INTERVAL_KM 을 달리는 날과
+    OIL_CHANGE_INTERVAL_DAYS 뒤 중 빠른 날.
+  - 정기검사: 주행거리와 무관하게 접수 때 입력한 다음 검사일, 없으면 마지막 검사일 + INSPECTION_INTERVAL_DAYS,
+    검사 이력도 없으면 연식 기준 최초 검사(FIRST_INSPECTION_YEARS 년) 후 주기마다.
+
+예정일이 이미 지났어도 그대로 둔다 (다른 곳에서 정비했을 수 있으므로 다음 방문 기록으로 다시 맞춘다).
+"""
+from datetime import date, datetime, time, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+PREDICT_CHUNK_SIZE = 5000
+MIN_FIT_DAYS = 30  # 기록 기간이 이보다 짧으면 기울기를 믿지 않는다
+MIN_DAILY_KM, MAX_DAILY_KM = 1.0, 500.0
+FIRST_INSPECTION_YEARS = 4  # 비사업용 승용차 최초 검사 (이후 INSPECTION_INTERVAL_DAYS 마다)
+OIL_TYPE_KEYWORD, INSPECTION_TYPE_KEYWORD = '오일', '검사'  # 서비스 종류명/카테고리로 구분
+REMINDER_TIME = time(10, 0)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _service_day(service_request):
+    """서비스 요청의 기록일 (서비스일, 없으면 오늘)"""
+    if service_request is not None and service_request.service_date:
+        return timezone.localdate(service_request.service_date)
+    return timezone.localdate()
+
+
+def record_mileage(vehicle, mileage, recorded_on=None, source='manual', service_request=None):
+    """
+    주행거리 기록 저장 후 차량 최근 주행거리 갱신, 저장한 기록 반환 (값이 없거나 잘못되면 None)
+
+    서비스 요청이 있으면 요청당 한 건만 둔다 (접수 때 값은 완료 때 값으로 덮어쓴다).
+    """
+    from .models import Vehicle, VehicleMileage
+
+    if vehicle is None:
+        return None
+    try:
+        mileage = int(mileage)
+    except (TypeError, ValueError):
+        return None
+    if mileage <= 0:
+        return None
+
+    values = {
+        'vehicle': vehicle,
+        'mileage': mileage,
+        'recorded_on': recorded_on or _service_day(service_request),
+        'source': source,
+    }
+    if service_request is not None:
+        record, _ = VehicleMileage.objects.update_or_create(service_request=service_request, defaults=values)
+    else:
+        record = VehicleMileage.objects.create(**values)
+
+    # 더 큰 값일 때만 바꾼다 (지난 기록을 늦게 입력해도 최근 주행거리가 줄지 않게)
+    Vehicle.objects.filter(Q(mileage__isnull=True) | Q(mileage__lt=mileage), pk=vehicle.pk).update(
+        mileage=mileage, updated_at=timezone.now())
+    if vehicle.mileage is None or vehicle.mileage < mileage:
+        vehicle.mileage = mileage
+    return record
+
+
+def import_history_mileage():
+    """서비스 이력의 완료 시 주행거리 중 아직 기록되지 않은 것을 가져옴, 가져온 건수 반환"""
+    from services.models import ServiceHistory
+
+    histories = (ServiceHistory.objects
+                 .filter(vehicle_mileage_at_service__gt=0, service_request__vehicle__isnull=False)
+                 .exclude(service_request__mileage_records__isnull=False)
+                 .select_related('service_request__vehicle'))
+    imported = 0
+    for history in histories.iterator(chunk_size=2000):
+        service = history.service_request
+        if record_mileage(service.vehicle, history.vehicle_mileage_at_service, source='completion',
+                          service_request=service):
+            imported += 1
+    return imported
+
+
+def fit_daily_mileage(vehicle_ids, days, mileages):
+    """
+    차량별 하루 평균 주행거리 (최소제곱 기울기, km/일)
+
+    vehicle_ids/days(date.toordinal())/mileages 는 같은 길이의 배열 (순서 무관).
+    (차량 ID, 기울기, 기록 기간(일), 마지막 기록일, 마지막 주행거리) 배열을 차량 ID 순으로 반환하며,
+    기록이 한 건이거나 모두 같은 날이면 기울기는 NaN.
+    """
+    vehicle_ids = np.asarray(vehicle_ids, dtype=np.int64)
+    days = np.asarray(days, dtype=np.int64)
+    mileages = np.asarray(mileages, dtype=np.float64)
+    if not len(vehicle_ids):
+        empty = np.array([], dtype=np.float64)
+        return np.array([], dtype=np.int64), empty, empty, empty, empty
+
+    order = np.lexsort((days, vehicle_ids))
+    vehicle_ids, days, mileages = vehicle_ids[order], days[order], mileages[order]
+    starts = np.flatnonzero(np.r_[True, vehicle_ids[1:] != vehicle_ids[:-1]])
+    ends = np.r_[starts[1:], len(vehicle_ids)] - 1
+    counts = ends - starts + 1
+    group = np.repeat(np.arange(len(starts)), counts)
+
+    # 차량별 평균을 빼고 합을 구해 큰 날짜 값(서수)끼리 빼는 오차를 피한다
+    x = days.astype(np.float64)
+    dx = x - (np.bincount(group, weights=x) / counts)[group]
+    dy = mileages - (np.bincount(group, weights=mileages) / counts)[group]
+    sxx = np.bincount(group, weights=dx * dx)
+    sxy = np.bincount(group, weights=dx * dy)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+    span = (days[ends] - days[starts]).astype(np.float64)
+    return vehicle_ids[starts], slope, span, days[ends].astype(np.float64), mileages[ends]
+
+
+def _type_ids(keyword):
+    from services.models import ServiceType
+
+    return list(ServiceType.objects.filter(Q(name__contains=keyword) | Q(category__contains=keyword))
+                .values_list('pk', flat=True))
+
+
+def _ordinal(value):
+    """date/datetime → 서수 (없으면 NaN)"""
+    if value is None:
+        return np.nan
+    if isinstance(value, datetime):
+        value = timezone.localdate(value) if timezone.is_aware(value) else value.date()
+    return float(value.toordinal())
+
+
+def _to_date(ordinal):
+    return None if np.isnan(ordinal) else date.fromordinal(int(np.ceil(ordinal)))
+
+
+def _predict_chunk(vehicles, today, oil_type_ids, inspection_type_ids):
+    """(차량 ID, 연식) 묶음의 (차량 ID, 일평균 주행거리, 엔진오일 교환 예정일, 정기검사 예정일) 목록"""
+    from services.models import ServiceRequest
+    from .models import VehicleMileage
+
+    vehicle_ids = [pk for pk, _ in vehicles]
+    index = {pk: position for position, pk in enumerate(vehicle_ids)}
+    size = len(vehicle_ids)
+
+    readings = list(VehicleMileage.objects.filter(vehicle_id__in=vehicle_ids)
+                    .values_list('vehicle_id', 'recorded_on', 'mileage'))
+    fitted_ids, slope, span, last_day, last_km = fit_daily_mileage(
+        [row[0] for row in readings], [row[1].toordinal() for row in readings], [row[2] for row in readings])
+    positions = np.array([index[pk] for pk in fitted_ids], dtype=np.int64)
+
+    def aligned(values):
+        result = np.full(size, np.nan)
+        result[positions] = values
+        return result
+
+    slope, span, last_day, last_km = aligned(slope), aligned(span), aligned(last_day), aligned(last_km)
+
+    # 서비스 이력: 마지막 오일 교환/검사 완료일, 접수 때 입력한 최근/다음 검사일
+    last_oil, last_inspection, entered_next = (np.full(size, np.nan) for _ in range(3))
+    service_dates = (ServiceRequest.objects.filter(vehicle_id__in=vehicle_ids).values('vehicle_id').annotate(
+        last_oil=Max('service_date', filter=Q(status='completed', service_type_id__in=oil_type_ids)),
+        last_inspection=Max('service_date', filter=Q(status='completed', service_type_id__in=inspection_type_ids)),
+        entered_last=Max('last_inspection_date'),
+        entered_next=Max('next_inspection_date'),
+    ))
+    for row in service_dates:
+        position = index[row['vehicle_id']]
+        last_oil[position] = _ordinal(row['last_oil'])
+        last_inspection[position] = np.fmax(_ordinal(row['last_inspection']), _ordinal(row['entered_last']))
+        entered_next[position] = _ordinal(row['entered_next'])
+
+    # 연식 해 7월 1일 출고로 본다
+    released, first_inspection = np.full(size, np.nan), np.full(size, np.nan)
+    for position, (_, year) in enumerate(vehicles):
+        if year and 1900 < year <= today.year:
+            released[position] = date(year, 7, 1).toordinal()
+            first_inspection[position] = date(year + FIRST_INSPECTION_YEARS, 7, 1).toordinal()
+
+    # 하루 평균 주행거리: 기울기 → 연식 기준 평균 → 기본값
+    with np.errstate(divide='ignore', invalid='ignore'):
+        age_rate = np.where(last_day - released >= MIN_FIT_DAYS, last_km / (last_day - released), np.nan)
+    measured = np.where((span >= MIN_FIT_DAYS) & (slope > 0), slope, np.nan)
+    measured = np.where(np.isnan(measured) & (age_rate > 0), age_rate, measured)
+    measured = np.clip(measured, MIN_DAILY_KM, MAX_DAILY_KM)
+    rate = np.where(np.isnan(measured), float(_setting('MILEAGE_DEFAULT_DAILY_KM', 35)), measured)
+
+    # 엔진오일: 기준일 + min(교환 주기 km / 일평균, 교환 주기 일수)
+    oil_base = np.where(np.isnan(last_oil), last_day, last_oil)
+    oil_due = oil_base + np.minimum(_setting('OIL_CHANGE_INTERVAL_KM', 10000) / rate,
+                                    _setting('OIL_CHANGE_INTERVAL_DAYS', 365))
+
+    # 정기검사: 입력한 다음 검사일 → 마지막 검사 + 주기 → 연식 기준 최초 검사 후 오늘 이후 첫 주기
+    interval = float(_setting('INSPECTION_INTERVAL_DAYS', 730))
+    cycles = np.maximum(np.ceil((today.toordinal() - first_inspection) / interval), 0)
+    inspection_due = np.where(np.isnan(last_inspection), first_inspection + cycles * interval,
+                              last_inspection + interval)
+    use_entered = entered_next >= np.where(np.isnan(last_inspection), -np.inf, last_inspection)
+    inspection_due = np.where(use_entered, entered_next, inspection_due)
+
+    return [
+        (pk, None if np.isnan(measured[position]) else round(float(measured[position]), 1),
+         _to_date(oil_due[position]), _to_date(inspection_due[position]))
+        for position, pk in enumerate(vehicle_ids)
+    ]
+
+
+def predict_service_dates(vehicle_ids=None, today=None, chunk_size=PREDICT_CHUNK_SIZE):
+    """
+    차량의 일평균 주행거리/엔진오일 교환 예정일/정기검사 예정일 갱신 (vehicle_ids 가 None 이면 전체)
+
+    (확인한 차량 수, 값이 바뀐 차량 수) 반환. 저장은 바뀐 행만 행별 UPDATE 를 executemany 로 한다.
+    """
+    from .models import Vehicle
+
+    today = today or timezone.localdate()
+    oil_type_ids, inspection_type_ids = _type_ids(OIL_TYPE_KEYWORD), _type_ids(INSPECTION_TYPE_KEYWORD)
+    fields = ['daily_mileage', 'next_oil_change_date', 'next_inspection_date']
+    quote = connection.ops.quote_name
+    # updated_at 도 함께 (분석용 증분 내보내기가 바뀐 차량을 찾도록)
+    sql = (f'UPDATE {quote(Vehicle._meta.db_table)} SET '
+           + ', '.join(f'{quote(Vehicle._meta.get_field(field).column)} = %s' for field in [*fields, 'updated_at'])
+           + f' WHERE {quote(Vehicle._meta.pk.column)} = %s')
+    updated_at = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    queryset = Vehicle.objects.order_by('pk')
+    if vehicle_ids is not None:
+        queryset = queryset.filter(pk__in=set(vehicle_ids))
+    checked = changed = 0
+    last_pk = 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).values_list('pk', 'year', *fields)[:chunk_size])
+        if not rows:
+            return checked, changed
+        last_pk = rows[-1][0]
+        checked += len(rows)
+        current = {row[0]: tuple(row[2:]) for row in rows}
+        predicted = _predict_chunk([row[:2] for row in rows], today, oil_type_ids, inspection_type_ids)
+        params = [
+            (rate, connection.ops.adapt_datefield_value(oil_due),
+             connection.ops.adapt_datefield_value(inspection_due), updated_at, pk)
+            for pk, rate, oil_due, inspection_due in predicted
+            if (rate, oil_due, inspection_due) != current[pk]
+        ]
+        if params:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.executemany(sql, params)
+            changed += len(params)
+
+
+def reminder_datetime(due_date, lead_days, today=None):
+    """예정일 lead_days 일 전 오전 10시 (해피콜 예정일시), 예정일이 없거나 그날이 이미 지났으면 None"""
+    if due_date is None:
+        return None
+    day = due_date - timedelta(days=lead_days)
+    if day <= (today or timezone.localdate()):
+        return None
+    return timezone.make_aware(datetime.combine(day, REMINDER_TIME))
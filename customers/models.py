@@ -1,12 +1,40 @@
 from django.db import models
+from core.cache import CacheInvalidationMixin
+from core.fulltext import FullTextIndexMixin
+from customers.profile import ProfileInvalidationMixin
 from django.urls import reverse
 from django.core.validators import RegexValidator
+from django.core.exceptions import ValidationError
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
 
+# 원본 전화번호를 읽지만 화면/응답으로 내보내지 않는 저장·검증 내부 호출 (노출 감사 대상 아님)
+PHONE_INTERNAL_CALLERS = frozenset({
+    'save', 'clean', 'full_clean', 'clean_fields', 'validate_unique', '_perform_unique_checks',
+    '_save_table', 'pre_save', 'get_prep_value', 'to_python', 'refresh_from_db', 'bulk_update',
+    '_get_pk_val', '__setstate__', '__init__',
+})
 
-class Customer(models.Model):
+
+def _phone_exposure_source(caller_module, caller_function):
+    """감사 기록에 남길 노출 경로 (템플릿, 관리자 목록, 폼 초기값, 그 밖에는 호출 모듈)"""
+    if caller_module.startswith('django.template'):
+        return 'template'
+    if caller_module.startswith('django.contrib.admin'):
+        return 'admin'
+    if caller_function == 'value_from_object' or caller_module.startswith('django.forms'):
+        return 'form'
+    return caller_module
+
+
+class Customer(FullTextIndexMixin, ProfileInvalidationMixin, CacheInvalidationMixin, models.Model):
+    cache_tags = ('customers',)  # 대시보드 캐시 무효화 태그
+    # 전문 검색 (core.fulltext): 고객 메모
+    search_source = 'customer'
+    search_fields = ('notes',)
+    
     CUSTOMER_TYPE_CHOICES = [
         ('individual', '개인'),
         ('corporate', '법인'),
@@ -58,6 +86,9 @@ class Customer(models.Model):
         null=True, 
         verbose_name='고객명'
     )
+    # 초성/자모 검색 키 (customers.hangul, 저장 시 갱신)
+    name_jamo = models.CharField(max_length=255, blank=True, default='', editable=False, verbose_name='고객명 자모')
+    name_chosung = models.CharField(max_length=100, blank=True, default='', editable=False, verbose_name='고객명 초성')
     
     # 연락처 정보 (전화번호는 필수)
     phone_regex = RegexValidator(
@@ -83,6 +114,11 @@ class Customer(models.Model):
         blank=True,
         verbose_name='상세주소'
     )
+    # 주소에서 뽑은 지역 구분 (customers.address, 저장 시 갱신)
+    address_city = models.CharField(max_length=50, blank=True, default='', editable=False, verbose_name='시/도')
+    address_district = models.CharField(max_length=100, blank=True, default='', editable=False,
+                                        verbose_name='시/군/구')
+    address_dong = models.CharField(max_length=100, blank=True, default='', editable=False, verbose_name='동/읍/면')
     
     # 법인 정보
     business_number = models.CharField(
@@ -236,6 +272,14 @@ class Customer(models.Model):
             models.Index(fields=['customer_status']),
             models.Index(fields=['membership_status']),
             models.Index(fields=['created_at']),
+            # 세그먼트 증분 갱신 (수정일 기준 변경분)
+            models.Index(fields=['updated_at']),
+            # 초성/자모 앞부분 검색
+            models.Index(fields=['name_jamo']),
+            models.Index(fields=['name_chosung']),
+            # 지역 필터/지역별 집계 (시/도 → 시/군/구 → 동 순으로 좁힘)
+            models.Index(fields=['address_city', 'address_district', 'address_dong']),
+            models.Index(fields=['address_district', 'address_dong']),
         ]
     
     def __str__(self):
@@ -264,10 +308,13 @@ class Customer(models.Model):
         else:
             return "***-****"
     
-    def get_phone_for_user(self, user, show_full=False):
+    def get_phone_for_user(self, user, show_full=False, source='get_phone_for_user'):
         """사용자 권한에 따른 전화번호 반환"""
         # 관리자이고 명시적으로 전체보기 요청한 경우에만 전체 번호
         if user.is_superuser and show_full:
+            # 원본 노출은 요청 버퍼에 기록 (응답 시 감사 로그로 일괄 저장)
+            from core.phone_audit import record_phone_exposure
+            record_phone_exposure(self.pk, source)
             return self._get_raw_phone()
         # 그 외 모든 경우는 마스킹
         else:
@@ -280,6 +327,9 @@ class Customer(models.Model):
     
     def get_absolute_url(self):
         return reverse('customers:customer_detail', kwargs={'pk': self.pk})
+
+    def search_document(self):
+        return self.pk, '고객 메모', self.updated_at, self.get_absolute_url()
     
     def get_full_address(self):
         """전체 주소를 반환"""
@@ -338,7 +388,7 @@ class Customer(models.Model):
         
         # 전화번호 필드를 안전하게 처리
         if user and hasattr(user, 'is_superuser'):
-            data['phone'] = self.get_phone_for_user(user, show_full_phone)
+            data['phone'] = self.get_phone_for_user(user, show_full_phone, source='to_dict')
         else:
             data['phone'] = self.get_masked_phone()
         
@@ -368,10 +418,18 @@ class Customer(models.Model):
                     'Customer', 'CharField', 'RegexValidator', 'Model'
                 ]
                 
+                caller_module = frame.f_back.f_globals.get('__name__', '') or ''
                 if (caller_class in allowed_classes or 
                     caller_function in allowed_functions or
                     caller_function.startswith('_') or  # Django internal methods
-                    'django' in (frame.f_back.f_globals.get('__name__', '') or '')):
+                    'django' in caller_module):
+                    # 원본을 돌려주는 경우 저장/검증 내부 호출이 아니면 감사 기록 (템플릿 출력은 요청 밖에서도,
+                    # 관리자 목록/폼 초기값 등은 요청 처리 중일 때)
+                    if caller_function not in PHONE_INTERNAL_CALLERS:
+                        from core.phone_audit import in_request, record_phone_exposure
+                        source = _phone_exposure_source(caller_module, caller_function)
+                        if source == 'template' or in_request():
+                            record_phone_exposure(super().__getattribute__('pk'), source)
                     return super().__getattribute__(name)
                 
                 # 외부에서의 직접 접근은 마스킹된 값 반환
@@ -383,11 +441,59 @@ class Customer(models.Model):
         """내부용 원본 전화번호 획득 메서드"""
         return super().__getattribute__('phone')
     
+    def clean(self):
+        # 폼의 중복 검사(validate_unique)가 실제 저장될 형식으로 이루어지도록 저장 전에 정규화
+        super().clean()
+        self.normalize_phone_value()
+
+    def normalize_phone_value(self):
+        """
+        전화번호를 010-1234-5678 형식으로 맞춤
+
+        정규화 전 형식으로 저장된 기존 고객의 번호가 그대로이고 정규화한 번호를 다른 고객이
+        이미 쓰고 있으면(아직 합치지 않은 중복) normalize_phones() 처럼 바꾸지 않는다.
+        """
+        from .dedup import normalize_phone
+
+        raw_phone = self._get_raw_phone()
+        normalized = normalize_phone(raw_phone)
+        if normalized == raw_phone:
+            return
+        if self.pk and Customer.objects.filter(phone=normalized).exclude(pk=self.pk).exists() \
+                and Customer.objects.filter(pk=self.pk, phone=raw_phone).exists():
+            return
+        self.phone = normalized
+
     def save(self, *args, **kwargs):
         """저장 시 원본 전화번호 사용"""
-        # 저장 시에는 원본 phone 값을 사용해야 함
+        # 저장 시에는 원본 phone 값을 사용해야 함 (중복 검사를 위해 010-1234-5678 형식으로 맞춤)
+        self.normalize_phone_value()
+        self.refresh_search_keys()
+        self.refresh_region()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if 'name' in update_fields:
+                update_fields = {*update_fields, 'name_jamo', 'name_chosung'}
+            if 'address_main' in update_fields:
+                update_fields = {*update_fields, 'address_city', 'address_district', 'address_dong'}
+            kwargs['update_fields'] = update_fields
         return super().save(*args, **kwargs)
 
+    def refresh_search_keys(self):
+        """고객명 초성/자모 검색 키 갱신 (bulk_create 전에도 호출)"""
+        from .hangul import search_keys
+
+        self.name_jamo, self.name_chosung = search_keys(self.name)
+
+    def refresh_region(self):
+        """주소의 시/도, 시/군/구, 동 갱신 (bulk_create 전에도 호출)"""
+        from .address import parse_region
+
+        self.address_city, self.address_district, self.address_dong = parse_region(self.address_main)
+
+    def profile_customer_ids(self):
+        return [self.pk]
+
 
 class Tag(models.Model):
     """고객 태그 마스터"""
@@ -410,7 +516,7 @@ class Tag(models.Model):
         return self.name
 
 
-class CustomerTag(models.Model):
+class CustomerTag(ProfileInvalidationMixin, models.Model):
     """고객-태그 연결"""
     customer = models.ForeignKey(
         Customer,
@@ -437,12 +543,15 @@ class CustomerTag(models.Model):
         verbose_name_plural = '고객 태그들'
         unique_together = ['customer', 'tag']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
     
     def __str__(self):
         return f"{self.customer.name} - {self.tag.name}"
 
 
-class Vehicle(models.Model):
+class Vehicle(ProfileInvalidationMixin, models.Model):
     """차량 마스터"""
     vehicle_number = models.CharField(
         max_length=20,
@@ -454,11 +563,30 @@ class Vehicle(models.Model):
         blank=True,
         verbose_name='모델명'
     )
+    # 현재 소유 고객 (customers.ownership, 소유 이력 저장/삭제 시 갱신)
+    current_owner = models.ForeignKey(
+        Customer,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='current_vehicles',
+        verbose_name='현재 소유자'
+    )
+    # 초성/자모 검색 키 (customers.hangul, 저장 시 갱신)
+    model_jamo = models.CharField(max_length=255, blank=True, default='', editable=False, verbose_name='모델명 자모')
+    model_chosung = models.CharField(max_length=100, blank=True, default='', editable=False, verbose_name='모델명 초성')
     year = models.PositiveIntegerField(
         blank=True,
         null=True,
         verbose_name='연식'
     )
+    # 최근 주행거리 (주행거리 기록 저장 시 더 큰 값으로 갱신)
+    mileage = models.PositiveIntegerField(blank=True, null=True, verbose_name='주행거리(km)')
+    # 다음 정비 예정 (customers.mileage, predict_service_dates 배치로 갱신)
+    daily_mileage = models.FloatField(blank=True, null=True, editable=False, verbose_name='일평균 주행거리(km)')
+    next_oil_change_date = models.DateField(blank=True, null=True, editable=False, verbose_name='엔진오일 교환 예정일')
+    next_inspection_date = models.DateField(blank=True, null=True, editable=False, verbose_name='정기검사 예정일')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='등록일')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일')
     
@@ -466,6 +594,14 @@ class Vehicle(models.Model):
         verbose_name = '차량'
         verbose_name_plural = '차량들'
         ordering = ['vehicle_number']
+        indexes = [
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['model_jamo']),
+            models.Index(fields=['model_chosung']),
+            # 해피콜 배정/4차콜 예정일 (예정일 범위 조회)
+            models.Index(fields=['next_oil_change_date']),
+            models.Index(fields=['next_inspection_date']),
+        ]
     
     def __str__(self):
         return f"{self.vehicle_number} {self.model}".strip()
@@ -473,8 +609,26 @@ class Vehicle(models.Model):
     def get_absolute_url(self):
         return reverse('vehicles:vehicle_detail', kwargs={'pk': self.pk})
 
+    def save(self, *args, **kwargs):
+        self.refresh_search_keys()
+        if kwargs.get('update_fields') is not None and 'model' in kwargs['update_fields']:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'model_jamo', 'model_chosung'}
+        super().save(*args, **kwargs)
+
+    def refresh_search_keys(self):
+        """모델명 초성/자모 검색 키 갱신 (bulk_create 전에도 호출)"""
+        from .hangul import search_keys
 
-class CustomerVehicle(models.Model):
+        self.model_jamo, self.model_chosung = search_keys(self.model)
+
+    def profile_customer_ids(self):
+        # 현재 소유 고객의 프로필에 차량 정보가 들어 있다
+        if self.pk is None:
+            return []
+        return list(self.ownerships.filter(end_date__isnull=True).values_list('customer_id', flat=True))
+
+
+class CustomerVehicle(ProfileInvalidationMixin, models.Model):
     """고객-차량 소유 관계"""
     customer = models.ForeignKey(
         Customer,
@@ -500,9 +654,30 @@ class CustomerVehicle(models.Model):
         verbose_name = '고객 차량 소유관계'
         verbose_name_plural = '고객 차량 소유관계들'
         ordering = ['-start_date']
+        indexes = [
+            models.Index(fields=['created_at']),
+            # 현재 소유(종료일 없음)만 담는 부분 인덱스 (부분 인덱스를 못 만드는 DB 는 건너뜀)
+            models.Index(fields=['customer', '-start_date'], condition=models.Q(end_date__isnull=True),
+                         name='customervehicle_open_cust_idx'),
+            models.Index(fields=['vehicle', 'start_date'], condition=models.Q(end_date__isnull=True),
+                         name='customervehicle_open_veh_idx'),
+        ]
     
     def __str__(self):
         return f"{self.customer.name} - {self.vehicle.vehicle_number}"
+
+    def save(self, *args, **kwargs):
+        from .ownership import refresh_current_owners
+
+        super().save(*args, **kwargs)
+        refresh_current_owners([self.vehicle_id])
+
+    def delete(self, *args, **kwargs):
+        from .ownership import refresh_current_owners
+
+        result = super().delete(*args, **kwargs)
+        refresh_current_owners([self.vehicle_id])
+        return result
     
     @property
     def is_current_owner(self):
@@ -510,9 +685,53 @@ class CustomerVehicle(models.Model):
         return self.end_date is None
 
 
+class VehicleMileage(models.Model):
+    """차량 주행거리 기록 (다음 정비 예정일 예측용, customers.mileage)"""
+    SOURCE_CHOICES = [
+        ('request', '서비스 접수'),
+        ('completion', '서비스 완료'),
+        ('manual', '직접 입력'),
+    ]
+
+    vehicle = models.ForeignKey(
+        Vehicle,
+        on_delete=models.CASCADE,
+        related_name='mileage_records',
+        verbose_name='차량'
+    )
+    # 서비스 요청 하나에 기록 하나 (접수 때 값은 완료 때 값으로 덮어쓴다)
+    service_request = models.ForeignKey(
+        'services.ServiceRequest',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='mileage_records',
+        verbose_name='서비스 요청'
+    )
+    mileage = models.PositiveIntegerField(verbose_name='주행거리(km)')
+    recorded_on = models.DateField(verbose_name='기록일')
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES, default='manual', verbose_name='출처')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='등록일')
+
+    class Meta:
+        verbose_name = '차량 주행거리 기록'
+        verbose_name_plural = '차량 주행거리 기록들'
+        ordering = ['-recorded_on', '-pk']
+        indexes = [
+            # 차량별 기록 (예측 배치는 차량·기록일 순으로 읽는다)
+            models.Index(fields=['vehicle', 'recorded_on']),
+        ]
+
+    def __str__(self):
+        return f"{self.vehicle.vehicle_number} {self.mileage:,}km ({self.recorded_on})"
+
+
 # 소통 이력과 해피콜 분리
-class CustomerCommunication(models.Model):
+class CustomerCommunication(FullTextIndexMixin, models.Model):
     """고객 소통 이력 (일반 상담, 마케팅, 불만 등)"""
+    # 전문 검색 (core.fulltext): 제목과 내용
+    search_source = 'communication'
+    search_fields = ('title', 'content')
     COMMUNICATION_TYPES = [
         ('consultation', '상담'),
         ('marketing', '마케팅'),
@@ -593,11 +812,17 @@ class CustomerCommunication(models.Model):
         indexes = [
             models.Index(fields=['customer', '-communication_date']),
             models.Index(fields=['communication_type', '-communication_date']),
+            # 월별 보관 구간 (core.archive)
+            models.Index(fields=['communication_date']),
         ]
     
     def __str__(self):
         return f"{self.customer.get_display_name()} - {self.get_communication_type_display()} - {self.title}"
 
+    def search_document(self):
+        return (self.customer_id, f'{self.get_communication_type_display()} - {self.title}',
+                self.communication_date, reverse('customers:customer_detail', kwargs={'pk': self.customer_id}))
+
 
 class HappyCall(models.Model):
     """해피콜 전용 테이블"""
@@ -728,6 +953,11 @@ class MarketingCampaign(models.Model):
         blank=True,
         verbose_name='타겟 조건'
     )
+    message = models.TextField(
+        blank=True,
+        verbose_name='발송 메시지',
+        help_text='{name} 은 고객명으로 바뀝니다'
+    )
     status = models.CharField(
         max_length=20,
         choices=STATUS_CHOICES,
@@ -741,6 +971,7 @@ class MarketingCampaign(models.Model):
         verbose_name='생성자'
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일')
+    launched_at = models.DateTimeField(blank=True, null=True, verbose_name='발송 대상 생성일시')
     
     class Meta:
         verbose_name = '마케팅 캠페인'
@@ -750,10 +981,21 @@ class MarketingCampaign(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_campaign_type_display()})"
 
+    def clean(self):
+        # JSON 으로 적은 타겟 조건은 세그먼트 조건으로 검증 (그 외 문자열은 메모로 둔다)
+        if self.target_criteria.strip().startswith('{'):
+            from .segments import SegmentError, compile_criteria
+
+            try:
+                compile_criteria(self.target_criteria)
+            except SegmentError as e:
+                raise ValidationError({'target_criteria': str(e)})
+
 
 class CustomerCampaignHistory(models.Model):
     """고객별 캠페인 이력"""
     DELIVERY_STATUS_CHOICES = [
+        ('pending', '발송대기'),
         ('sent', '발송완료'),
         ('failed', '발송실패'),
         ('refused', '수신거부'),
@@ -806,12 +1048,24 @@ class CustomerCampaignHistory(models.Model):
         default=0,
         verbose_name='매출발생액'
     )
+    provider_message_id = models.CharField(
+        max_length=100,
+        blank=True,
+        verbose_name='발송 메시지 ID',
+        help_text='발송사가 돌려준 메시지 ID (전달/반응 결과 매칭용)'
+    )
     notes = models.TextField(blank=True, verbose_name='메모')
     
     class Meta:
         verbose_name = '캠페인 이력'
         verbose_name_plural = '캠페인 이력들'
         ordering = ['-sent_date']
+        indexes = [
+            models.Index(fields=['customer', '-sent_date']),
+            # 캠페인별 발송대기/상태별 집계, 전달 결과 매칭
+            models.Index(fields=['campaign', 'delivery_status']),
+            models.Index(fields=['provider_message_id']),
+        ]
         unique_together = ['customer', 'campaign']
     
     def __str__(self):
@@ -819,8 +1073,14 @@ class CustomerCampaignHistory(models.Model):
 
 
 # 멤버십 포인트 관리
-class CustomerPointHistory(models.Model):
-    """고객 포인트 적립/사용 이력"""
+class CustomerPointHistory(ProfileInvalidationMixin, models.Model):
+    """
+    고객 포인트 원장 (추가만 가능)
+
+    적립/사용/만료/조정은 customers.points 를 통해서만 기록한다.
+    적립 행의 remaining_points 는 아직 사용·만료되지 않은 잔량으로, 선입선출(FIFO) 사용과
+    만료 처리에서만 줄어든다.
+    """
     POINT_TYPES = [
         ('earned', '적립'),
         ('used', '사용'),
@@ -848,6 +1108,16 @@ class CustomerPointHistory(models.Model):
         verbose_name='연관 서비스 ID'
     )
     balance_after = models.PositiveIntegerField(verbose_name='거래 후 잔액')
+    remaining_points = models.PositiveIntegerField(
+        default=0,
+        verbose_name='미사용 잔량',
+        help_text='적립 포인트 중 아직 사용/만료되지 않은 포인트'
+    )
+    expires_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='만료일시'
+    )
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -860,6 +1130,170 @@ class CustomerPointHistory(models.Model):
         verbose_name = '포인트 이력'
         verbose_name_plural = '포인트 이력들'
         ordering = ['-transaction_date']
+        indexes = [
+            models.Index(fields=['customer', '-transaction_date']),
+            # 잔량이 남은 적립 행만: 고객별 FIFO 사용 순서, 만료 대상 추출
+            models.Index(fields=['customer', 'expires_at', 'id'], name='points_open_lot_idx',
+                         condition=models.Q(remaining_points__gt=0)),
+            models.Index(fields=['expires_at', 'id'], name='points_expiry_idx',
+                         condition=models.Q(remaining_points__gt=0)),
+        ]
+        constraints = [
+            # 서비스당 적립은 한 번만 (일괄 적립 재실행/중복 호출 방지)
+            models.UniqueConstraint(fields=['customer', 'related_service_id'], name='points_unique_service_accrual',
+                                    condition=models.Q(point_type='earned', related_service_id__isnull=False)),
+        ]
     
     def __str__(self):
         return f"{self.customer.get_display_name()} - {self.points}P ({self.get_point_type_display()})"
+
+
+class CustomerProfile(models.Model):
+    """
+    고객 360 프로필 (사전 계산 JSON)
+
+    고객 상세, 해피콜 상세, 고객 검색 API 가 매번 다시 조합하던 고객 요약
+    (현재 차량, 최근 서비스, 최근 해피콜, 포인트, 태그, 동의 여부)을 고객당 한 행에 저장한다.
+    관련 데이터가 바뀌면 is_stale 로 표시되고 백그라운드에서 다시 만든다 (customers.profile).
+    """
+    customer = models.OneToOneField(
+        Customer,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='profile',
+        verbose_name='고객'
+    )
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name='프로필')
+    version = models.PositiveSmallIntegerField(default=0, verbose_name='형식 버전')
+    revision = models.PositiveIntegerField(default=0, verbose_name='변경 횟수')
+    is_stale = models.BooleanField(default=False, verbose_name='재계산 필요')
+    built_at = models.DateTimeField(verbose_name='생성일시')
+    
+    class Meta:
+        verbose_name = '고객 프로필'
+        verbose_name_plural = '고객 프로필들'
+    
+    def __str__(self):
+        return f"{self.customer_id} 프로필 (v{self.version})"
+
+
+class CustomerGradeRun(models.Model):
+    """
+    고객 등급(RFM) 산정 실행 기록 (customers.rfm)
+
+    전체 산정에서 계산한 분위수 기준(thresholds)을 저장해 두고, 증분 산정은 마지막 실행 이후
+    서비스가 바뀐 고객만 같은 기준으로 다시 등급을 매긴다.
+    """
+    MODE_CHOICES = [
+        ('full', '전체'),
+        ('incremental', '증분'),
+    ]
+
+    mode = models.CharField(max_length=20, choices=MODE_CHOICES, verbose_name='산정 방식')
+    started_at = models.DateTimeField(verbose_name='시작일시')
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name='완료일시')
+    customer_count = models.PositiveIntegerField(default=0, verbose_name='산정 고객 수')
+    updated_count = models.PositiveIntegerField(default=0, verbose_name='등급 변경 고객 수')
+    grade_counts = models.JSONField(default=dict, blank=True, verbose_name='등급별 고객 수')
+    thresholds = models.JSONField(default=dict, blank=True, verbose_name='분위수 기준')
+
+    class Meta:
+        verbose_name = '고객 등급 산정'
+        verbose_name_plural = '고객 등급 산정 기록'
+        ordering = ['-started_at']
+
+    def __str__(self):
+        return f"{self.get_mode_display()} 등급 산정 ({self.started_at:%Y-%m-%d %H:%M})"
+
+
+class CustomerSegment(models.Model):
+    """
+    저장된 고객 세그먼트 (customers.segments)
+
+    criteria 는 캠페인 타겟 조건과 같은 JSON 조건이고, 대상 고객 ID 는 압축 비트맵으로 보관한다.
+    """
+    name = models.CharField(max_length=100, unique=True, verbose_name='세그먼트명')
+    description = models.TextField(blank=True, verbose_name='설명')
+    criteria = models.JSONField(default=dict, blank=True, verbose_name='조건')
+    bitmap = models.BinaryField(default=b'', editable=False, verbose_name='대상 고객 비트맵')
+    customer_count = models.PositiveIntegerField(default=0, verbose_name='대상 고객 수')
+    built_at = models.DateTimeField(blank=True, null=True, verbose_name='갱신일시')
+    full_built_at = models.DateTimeField(blank=True, null=True, verbose_name='전체 재계산일시')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='생성자'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='생성일')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='수정일')
+
+    class Meta:
+        verbose_name = '고객 세그먼트'
+        verbose_name_plural = '고객 세그먼트들'
+        ordering = ['name']
+
+    def __str__(self):
+        return f"{self.name} ({self.customer_count:,}명)"
+
+    def clean(self):
+        from .segments import SegmentError, compile_criteria
+
+        try:
+            compile_criteria(self.criteria)
+        except SegmentError as e:
+            raise ValidationError({'criteria': str(e)})
+
+    def save(self, *args, **kwargs):
+        # 조건이 바뀌면 저장된 비트맵은 버리고 다음 조회 때 전체 재계산
+        if self.pk and 'update_fields' not in kwargs:
+            previous = CustomerSegment.objects.filter(pk=self.pk).values_list('criteria', flat=True).first()
+            if previous != self.criteria:
+                self.bitmap, self.customer_count, self.built_at, self.full_built_at = b'', 0, None, None
+        super().save(*args, **kwargs)
+
+    def get_bitmap(self):
+        from .segments import CustomerBitmap
+        return CustomerBitmap.from_bytes(self.bitmap)
+
+    def set_bitmap(self, bitmap):
+        self.bitmap = bitmap.to_bytes()
+        self.customer_count = len(bitmap)
+
+
+class CustomerMergeLog(models.Model):
+    """
+    중복 고객 합치기 기록 (customers.dedup)
+
+    합쳐져 지워진 고객의 원래 값을 snapshot 에 남긴다.
+    """
+    survivor = models.ForeignKey(
+        Customer,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='merge_logs',
+        verbose_name='대표 고객'
+    )
+    merged_customer_id = models.PositiveIntegerField(db_index=True, verbose_name='합쳐진 고객 ID')
+    snapshot = models.JSONField(default=dict, verbose_name='합쳐진 고객 정보')
+    score = models.FloatField(blank=True, null=True, verbose_name='중복 점수')
+    reasons = models.JSONField(default=list, blank=True, verbose_name='판단 근거')
+    merged_at = models.DateTimeField(default=timezone.now, verbose_name='합친 일시')
+    merged_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='처리자'
+    )
+
+    class Meta:
+        verbose_name = '고객 합치기 기록'
+        verbose_name_plural = '고객 합치기 기록들'
+        ordering = ['-merged_at']
+
+    def __str__(self):
+        name = self.snapshot.get('name') or self.snapshot.get('phone', '')
+        return f"{name} (#{self.merged_customer_id}) → #{self.survivor_id}"
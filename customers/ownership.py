@@ -0,0 +1,57 @@
+"""
+차량 현재 소유자
+
+소유 이력(CustomerVehicle) 중 종료일이 없는 행이 현재 소유다.
+
+  - "이 차량의 현재 소유자" 는 Vehicle.current_owner 에 저장해 두고 소유 이력을 저장/삭제할 때
+    refresh_current_owners() 로 맞춘다. 화면에서는 select_related('current_owner') 로 읽는다.
+  - "이 고객의 현재 차량" 은 current_ownerships() Prefetch 로 고객 목록 전체를 쿼리 한 번에 읽는다.
+
+관계 매니저에 .filter(end_date__isnull=True) 나 .first() 를 쓰면 prefetch 캐시를 무시하고 행마다
+쿼리가 나가므로 목록 화면에서는 쓰지 않는다.
+"""
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.utils import timezone
+
+REFRESH_CHUNK_SIZE = 5000
+
+
+def current_ownerships(lookup='vehicle_ownerships', to_attr='current_ownerships', related=('vehicle',)):
+    """
+    현재 소유 이력만 읽는 Prefetch (최근 소유 시작 순)
+
+    고객 쿼리셋은 기본값 그대로 (customer.current_ownerships → 차량 포함),
+    차량 쿼리셋은 current_ownerships('ownerships', related=('customer',)) 로 쓴다.
+    """
+    from .models import CustomerVehicle
+
+    queryset = (CustomerVehicle.objects.filter(end_date__isnull=True)
+                .select_related(*related).order_by('-start_date', '-pk'))
+    return Prefetch(lookup, queryset=queryset, to_attr=to_attr)
+
+
+def current_owner_subquery():
+    """차량(OuterRef('pk'))의 현재 소유 고객 ID 서브쿼리 - 가장 최근에 시작한 현재 소유자"""
+    from .models import CustomerVehicle
+
+    return Subquery(CustomerVehicle.objects.filter(vehicle_id=OuterRef('pk'), end_date__isnull=True)
+                    .order_by('-start_date', '-pk').values('customer_id')[:1])
+
+
+def refresh_current_owners(vehicle_ids=None, chunk_size=REFRESH_CHUNK_SIZE):
+    """
+    차량의 current_owner 를 소유 이력에 맞춤 (vehicle_ids 가 None 이면 전체, 갱신한 차량 수 반환)
+
+    차량 chunk_size 대씩 UPDATE ... SET current_owner_id = (서브쿼리) 한 번으로 맞춘다.
+    """
+    from .models import Vehicle
+
+    if vehicle_ids is None:
+        vehicle_ids = Vehicle.objects.order_by('pk').values_list('pk', flat=True)
+    vehicle_ids = sorted(set(vehicle_ids))
+    updated = 0
+    for offset in range(0, len(vehicle_ids), chunk_size):
+        chunk = vehicle_ids[offset:offset + chunk_size]
+        updated += Vehicle.objects.filter(pk__in=chunk).update(current_owner_id=current_owner_subquery(),
+                                                               updated_at=timezone.now())
+    return updated
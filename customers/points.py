@@ -0,0 +1,377 @@
+"""
+멤버십 포인트 원장
+
+포인트 적립/사용/만료/조정은 이 모듈로만 처리한다. CustomerPointHistory 는 추가만 하는 원장이고
+Customer.membership_points 는 원장의 누적 잔액이다.
+
+  - 잔액은 조건부 F() UPDATE 로 바꾼다. UPDATE 가 고객 행을 먼저 잠그므로 동시에 적립/사용해도
+    잔액이 어긋나지 않고, 사용은 "잔액 >= 사용 포인트" 조건이 맞을 때만 반영된다.
+    (SQLite 는 IMMEDIATE 트랜잭션으로 쓰기가 직렬화된다.)
+  - 잠금 순서는 항상 고객 → 적립 행이다 (교착 방지).
+  - 적립 행마다 잔량(remaining_points)과 만료일시를 두고, 사용은 만료가 빠른 적립분부터(FIFO) 차감한다.
+  - 일괄 적립/만료는 고객 단위 CASE UPDATE 와 bulk_create 로 청크마다 쿼리 몇 번에 처리한다.
+  - 서비스 완료 적립은 POINTS_ACCRUAL_RATE(0 이면 끔)로 계산하고, 서비스당 한 번만 적립된다.
+
+원장 행은 bulk_create 로 쓰므로 고객 프로필은 schedule_profile_rebuild 로 따로 갱신한다.
+"""
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Customer, CustomerPointHistory
+from .profile import schedule_profile_rebuild
+
+logger = logging.getLogger(__name__)
+
+CUSTOMER_CHUNK_SIZE = 500
+EXPIRY_CHUNK_SIZE = 5000
+SERVICE_CHUNK_SIZE = 2000
+
+_pending = threading.local()
+
+
+class InsufficientPointsError(ValueError):
+    """사용/차감할 포인트가 잔액보다 많음"""
+
+
+def accrual_rate():
+    return Decimal(str(getattr(settings, 'POINTS_ACCRUAL_RATE', 0) or 0))
+
+
+def default_expiry(when=None):
+    days = getattr(settings, 'POINTS_EXPIRY_DAYS', 365)
+    if not days:
+        return None
+    return (when or timezone.now()) + timedelta(days=days)
+
+
+# ===================== 단건 처리 =====================
+
+def _apply(customer_id, delta):
+    """고객 잔액에 delta 반영 후 새 잔액 반환 (같은 트랜잭션에서 고객 행이 잠긴 상태가 된다)"""
+    customers = Customer.objects.filter(pk=customer_id)
+    if delta < 0:
+        customers = customers.filter(membership_points__gte=-delta)
+    if not customers.update(membership_points=F('membership_points') + delta):
+        if Customer.objects.filter(pk=customer_id).exists():
+            raise InsufficientPointsError(f'포인트 잔액이 부족합니다. (차감 {-delta:,}P)')
+        raise Customer.DoesNotExist(f'고객 #{customer_id} 이(가) 없습니다.')
+    return Customer.objects.filter(pk=customer_id).values_list('membership_points', flat=True).get()
+
+
+def _consume_lots(customer_id, amount):
+    """만료가 빠른 적립분부터 amount 만큼 잔량 차감 (적립분이 모자라면 남는 만큼은 무기한 잔액에서 차감된 것으로 본다)"""
+    lots = (CustomerPointHistory.objects.select_for_update()
+            .filter(customer_id=customer_id, remaining_points__gt=0)
+            .order_by(F('expires_at').asc(nulls_last=True), 'id')
+            .values_list('pk', 'remaining_points'))
+    emptied = []
+    for lot_id, remaining in lots:
+        if amount <= 0:
+            break
+        take = min(remaining, amount)
+        amount -= take
+        if take == remaining:
+            emptied.append(lot_id)
+        else:
+            CustomerPointHistory.objects.filter(pk=lot_id).update(remaining_points=remaining - take)
+    if emptied:
+        CustomerPointHistory.objects.filter(pk__in=emptied).update(remaining_points=0)
+
+
+@transaction.atomic
+def accrue(customer_id, points, reason, created_by=None, related_service_id=None, point_type='earned',
+           expires_at=None, when=None):
+    """
+    포인트 적립 (원장 행 반환)
+
+    expires_at 을 주지 않으면 적립은 POINTS_EXPIRY_DAYS 후 만료, 조정은 무기한.
+    같은 서비스로 이미 적립했으면 아무것도 하지 않고 None.
+    """
+    points = int(points)
+    if points <= 0:
+        raise ValueError('적립 포인트는 0보다 커야 합니다.')
+    when = when or timezone.now()
+    if point_type == 'earned' and related_service_id and CustomerPointHistory.objects.filter(
+            customer_id=customer_id, point_type='earned', related_service_id=related_service_id).exists():
+        return None
+    if expires_at is None and point_type == 'earned':
+        expires_at = default_expiry(when)
+
+    balance = _apply(customer_id, points)
+    return CustomerPointHistory.objects.create(
+        customer_id=customer_id,
+        transaction_date=when,
+        point_type=point_type,
+        points=points,
+        reason=reason[:200],
+        related_service_id=related_service_id,
+        balance_after=balance,
+        remaining_points=points,
+        expires_at=expires_at,
+        created_by=created_by,
+    )
+
+
+@transaction.atomic
+def redeem(customer_id, points, reason, created_by=None, related_service_id=None, point_type='used', when=None):
+    """포인트 사용 (원장 행 반환, 잔액이 모자라면 InsufficientPointsError)"""
+    points = int(points)
+    if points <= 0:
+        raise ValueError('사용 포인트는 0보다 커야 합니다.')
+
+    balance = _apply(customer_id, -points)
+    _consume_lots(customer_id, points)
+    return CustomerPointHistory.objects.create(
+        customer_id=customer_id,
+        transaction_date=when or timezone.now(),
+        point_type=point_type,
+        points=-points,
+        reason=reason[:200],
+        related_service_id=related_service_id,
+        balance_after=balance,
+        created_by=created_by,
+    )
+
+
+def adjust(customer_id, delta, reason, created_by=None):
+    """관리자 포인트 조정 (+는 무기한 적립, -는 FIFO 차감)"""
+    if delta > 0:
+        return accrue(customer_id, delta, reason, created_by=created_by, point_type='adjusted')
+    return redeem(customer_id, -delta, reason, created_by=created_by, point_type='adjusted')
+
+
+# ===================== 일괄 처리 =====================
+
+def _apply_bulk(amounts):
+    """
+    {고객 ID: 증감} 을 고객 CUSTOMER_CHUNK_SIZE 명 단위 CASE UPDATE 로 반영하고 {고객 ID: 새 잔액} 반환
+
+    잔액은 0 아래로 내려가지 않는다 (만료 시 원장과 잔액이 이미 어긋난 고객 보호).
+    """
+    customer_ids = sorted(amounts)
+    for offset in range(0, len(customer_ids), CUSTOMER_CHUNK_SIZE):
+        chunk = customer_ids[offset:offset + CUSTOMER_CHUNK_SIZE]
+        delta = Case(*[When(pk=customer_id, then=Value(amounts[customer_id])) for customer_id in chunk],
+                     default=Value(0), output_field=IntegerField())
+        Customer.objects.filter(pk__in=chunk).update(
+            membership_points=Greatest(F('membership_points') + delta, Value(0)))
+    balances = {}
+    for offset in range(0, len(customer_ids), CUSTOMER_CHUNK_SIZE):
+        chunk = customer_ids[offset:offset + CUSTOMER_CHUNK_SIZE]
+        balances.update(Customer.objects.filter(pk__in=chunk).values_list('pk', 'membership_points'))
+    return balances
+
+
+@transaction.atomic
+def bulk_accrue(entries, created_by=None, when=None):
+    """
+    여러 고객 일괄 적립 (생성한 원장 행 수 반환)
+
+    entries: [(고객 ID, 포인트, 사유, 연관 서비스 ID 또는 None)]
+    이미 적립된 서비스와 없는 고객은 건너뛴다.
+    """
+    when = when or timezone.now()
+    entries = [(customer_id, int(points), reason, service_id)
+               for customer_id, points, reason, service_id in entries if int(points) > 0]
+    service_ids = {service_id for _, _, _, service_id in entries if service_id}
+    if service_ids:
+        accrued = set(CustomerPointHistory.objects.filter(
+            point_type='earned', related_service_id__in=service_ids,
+        ).values_list('customer_id', 'related_service_id'))
+        entries = [entry for entry in entries if (entry[0], entry[3]) not in accrued]
+    if not entries:
+        return 0
+
+    amounts = defaultdict(int)
+    for customer_id, points, _, _ in entries:
+        amounts[customer_id] += points
+    balances = _apply_bulk(amounts)
+
+    # 고객별 누적으로 거래 후 잔액 계산 (일괄 반영 전 잔액 = 새 잔액 - 합계)
+    running = {customer_id: balance - amounts[customer_id] for customer_id, balance in balances.items()}
+    expires_at = default_expiry(when)
+    rows = []
+    for customer_id, points, reason, service_id in entries:
+        if customer_id not in running:
+            continue
+        running[customer_id] += points
+        rows.append(CustomerPointHistory(
+            customer_id=customer_id,
+            transaction_date=when,
+            point_type='earned',
+            points=points,
+            reason=reason[:200],
+            related_service_id=service_id,
+            balance_after=running[customer_id],
+            remaining_points=points,
+            expires_at=expires_at,
+            created_by=created_by,
+        ))
+    CustomerPointHistory.objects.bulk_create(rows, batch_size=1000)
+    schedule_profile_rebuild(*running)
+    return len(rows)
+
+
+def service_points(price, rate=None):
+    rate = accrual_rate() if rate is None else rate
+    return int(Decimal(price or 0) * rate)
+
+
+def accrue_for_services(service_ids=None, since=None, created_by=None):
+    """
+    완료된 서비스의 포인트 일괄 적립 (적립 건수 반환)
+
+    멤버십 회원(비회원 제외)의 완료 서비스 중 아직 적립되지 않은 건만, 서비스 SERVICE_CHUNK_SIZE 건씩
+    트랜잭션을 나눠 적립한다. POINTS_ACCRUAL_RATE 가 0 이면 아무것도 하지 않는다.
+    """
+    from services.models import ServiceRequest
+
+    rate = accrual_rate()
+    if rate <= 0:
+        return 0
+    services = (ServiceRequest.objects.filter(status='completed', customer__isnull=False, estimated_price__gt=0)
+                .exclude(customer__membership_status='none'))
+    if service_ids is not None:
+        services = services.filter(pk__in=list(service_ids))
+    if since is not None:
+        services = services.filter(service_date__gte=since)
+
+    created, last_id = 0, 0
+    while True:
+        chunk = list(services.filter(pk__gt=last_id).order_by('pk').values(
+            'pk', 'customer_id', 'estimated_price', 'service_type__name')[:SERVICE_CHUNK_SIZE])
+        if not chunk:
+            return created
+        last_id = chunk[-1]['pk']
+        created += bulk_accrue([
+            (row['customer_id'], service_points(row['estimated_price'], rate),
+             f"서비스 완료 적립 ({row['service_type__name'] or '서비스'} #{row['pk']})", row['pk'])
+            for row in chunk
+        ], created_by=created_by)
+
+
+def _flush_service_accruals():
+    service_ids, _pending.service_ids = getattr(_pending, 'service_ids', None), None
+    if not service_ids:
+        return
+    try:
+        accrue_for_services(service_ids)
+    except Exception as e:
+        # 적립 실패가 서비스 저장을 막지 않도록 기록만 하고, accrue_service_points 명령으로 재처리
+        logger.exception(f'서비스 완료 포인트 적립 실패 ({len(service_ids)}건): {e}')
+
+
+def schedule_service_accrual(service_id):
+    """
+    커밋 후 서비스 완료 적립 예약
+
+    같은 트랜잭션에서 완료된 서비스(예: 엑셀 업로드)는 커밋 시 bulk_accrue 한 번으로 적립된다.
+    롤백된 트랜잭션의 ID 가 다음 적립에 섞여도 완료 여부/중복을 다시 확인하므로 영향이 없다.
+    """
+    if accrual_rate() <= 0:
+        return
+    if getattr(_pending, 'service_ids', None) is None:
+        _pending.service_ids = set()
+    _pending.service_ids.add(service_id)
+    transaction.on_commit(_flush_service_accruals)
+
+
+def expire_points(as_of=None, chunk_size=EXPIRY_CHUNK_SIZE):
+    """
+    만료일이 지난 적립 잔량을 FIFO 원장에서 소멸 처리
+
+    잔량이 남은 적립 행(부분 인덱스)을 chunk_size 건씩 골라 트랜잭션마다
+    고객 잠금 → 잔량 0 처리 → 고객 잔액 CASE UPDATE → 만료 행 bulk_create 로 처리한다.
+    {'lots': 처리한 적립 행 수, 'customers': 고객 수, 'points': 소멸 포인트} 반환.
+    """
+    as_of = as_of or timezone.now()
+    totals = {'lots': 0, 'customers': 0, 'points': 0}
+    expired_lots = CustomerPointHistory.objects.filter(remaining_points__gt=0, expires_at__lte=as_of)
+
+    while True:
+        with transaction.atomic():
+            lots = list(expired_lots.order_by('expires_at', 'id').values_list('pk', 'customer_id')[:chunk_size])
+            if not lots:
+                return totals
+            lot_ids = [lot_id for lot_id, _ in lots]
+            list(Customer.objects.select_for_update().filter(pk__in={customer_id for _, customer_id in lots})
+                 .order_by('pk')
+                 .values_list('pk', flat=True))
+
+            # 잠금 후 다시 읽어 그사이 사용된 잔량은 제외
+            amounts = defaultdict(int)
+            for customer_id, remaining in (expired_lots.select_for_update().filter(pk__in=lot_ids)
+                                           .values_list('customer_id', 'remaining_points')):
+                amounts[customer_id] += remaining
+            CustomerPointHistory.objects.filter(pk__in=lot_ids).update(remaining_points=0)
+            balances = _apply_bulk({customer_id: -amount for customer_id, amount in amounts.items()})
+
+            now = timezone.now()
+            CustomerPointHistory.objects.bulk_create([
+                CustomerPointHistory(
+                    customer_id=customer_id,
+                    transaction_date=now,
+                    point_type='expired',
+                    points=-amount,
+                    reason=f'포인트 유효기간 만료 ({as_of:%Y-%m-%d} 기준)',
+                    balance_after=balances.get(customer_id, 0),
+                )
+                for customer_id, amount in amounts.items() if amount
+            ], batch_size=1000)
+            schedule_profile_rebuild(*amounts)
+
+        totals['lots'] += len(lot_ids)
+        totals['customers'] += len(amounts)
+        totals['points'] += sum(amounts.values())
+
+
+# ===================== 검증 =====================
+
+def _ledger_total():
+    return Coalesce(Subquery(
+        CustomerPointHistory.objects.filter(customer_id=OuterRef('pk')).order_by()
+        .values('customer_id').annotate(total=Sum('points')).values('total')
+    ), Value(0))
+
+
+def verify_balances(limit=100):
+    """원장 합계와 고객 잔액이 다른 고객 [(고객 ID, 원장 합계, 잔액)] (최대 limit 명)"""
+    return list(Customer.objects.annotate(ledger_total=_ledger_total())
+                .exclude(membership_points=F('ledger_total'))
+                .order_by('pk').values_list('pk', 'ledger_total', 'membership_points')[:limit])
+
+
+@transaction.atomic
+def open_balances(created_by=None):
+    """
+    원장이 없는 고객의 기존 잔액을 '기초 잔액' 조정 행으로 기록 (기록한 고객 수 반환)
+
+    원장 도입 전 잔액은 만료일 없이 이월한다.
+    """
+    customers = (Customer.objects.filter(membership_points__gt=0, point_history__isnull=True)
+                 .values_list('pk', 'membership_points'))
+    now = timezone.now()
+    rows = [
+        CustomerPointHistory(
+            customer_id=customer_id,
+            transaction_date=now,
+            point_type='adjusted',
+            points=balance,
+            reason='기초 잔액 이월',
+            balance_after=balance,
+            remaining_points=balance,
+            created_by=created_by,
+        )
+        for customer_id, balance in customers.iterator(chunk_size=2000)
+    ]
+    CustomerPointHistory.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
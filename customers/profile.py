@@ -0,0 +1,371 @@
+"""
+고객 360 프로필
+
+고객 상세, 해피콜 상세, 고객 검색 API 에서 쓰는 고객 요약을 CustomerProfile.data 에
+JSON 으로 미리 만들어 두고 기본키 조회 한 번으로 읽는다.
+
+  - 고객/차량 소유/서비스/해피콜/포인트/태그가 저장·삭제되면 save()/delete() 에서
+    schedule_profile_rebuild() 를 부른다. 커밋 후 프로필을 is_stale 로 표시하고
+    백그라운드 스레드가 묶어서 다시 만든다.
+  - 읽을 때 프로필이 없거나 is_stale 이거나 형식 버전이 다르면 그 자리에서 다시 만든다.
+    그래서 백그라운드 재계산 전에 읽어도 방금 저장한 내용이 보인다.
+  - bulk_create/update 처럼 save() 를 거치지 않는 경로는 mark_profiles_stale() 를 부르거나
+    rebuild_customer_profiles 명령으로 다시 만든다.
+
+전화번호는 마스킹된 값만 저장한다.
+"""
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Sum, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+logger = logging.getLogger(__name__)
+
+PROFILE_VERSION = 2  # 2: 주소 지역 구분(address_city/district/dong) 추가
+RECENT_SERVICES = 10
+REBUILD_BATCH_SIZE = 200
+DEBOUNCE_SECONDS = 0.5  # 같은 고객의 연속 변경을 한 번에 재계산
+
+_queue = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+# ===================== 프로필 생성 =====================
+
+def _service_entry(service, status_labels):
+    return {
+        'id': service.pk,
+        'status': service.status,
+        'status_display': status_labels.get(service.status, service.status),
+        'created_at': service.created_at,
+        'service_date': service.service_date,
+        'service_detail': service.service_detail,
+        'service_type': ({'name': service.service_type.name, 'category': service.service_type.category}
+                         if service.service_type_id else None),
+        'vehicle': ({'id': service.vehicle_id, 'vehicle_number': service.vehicle.vehicle_number,
+                     'model': service.vehicle.model} if service.vehicle_id else None),
+        'temp_vehicle_number': service.temp_vehicle_number,
+        'temp_vehicle_model': service.temp_vehicle_model,
+        'estimated_price': int(service.estimated_price) if service.estimated_price is not None else None,
+        'assigned_employee': ({'id': service.assigned_employee_id,
+                               'name': service.assigned_employee.get_full_name()
+                               or service.assigned_employee.username}
+                              if service.assigned_employee_id else None),
+    }
+
+
+def build_profiles(customer_ids):
+    """
+    고객 ID 목록의 프로필 dict 생성 ({고객 ID: 프로필})
+
+    고객 수와 관계없이 쿼리 7번으로 만든다 (최근 서비스/해피콜은 윈도 함수로 고객별 상위 N건).
+    """
+    from happycall.models import HappyCall
+    from services.models import ServiceRequest
+    from .models import Customer, CustomerPointHistory, CustomerTag, CustomerVehicle
+
+    customer_ids = list(customer_ids)
+    customers = Customer.objects.filter(pk__in=customer_ids)
+    profiles = {}
+    for customer in customers:
+        profiles[customer.pk] = {
+            'version': PROFILE_VERSION,
+            'customer': {
+                'id': customer.pk,
+                'name': customer.name or '',
+                'display_name': customer.get_display_name(),
+                'masked_phone': customer.get_masked_phone(),
+                'customer_type': customer.customer_type,
+                'customer_status': customer.customer_status,
+                'membership_status': customer.membership_status,
+                'customer_grade': customer.customer_grade,
+                'address_main': customer.address_main,
+                'address_city': customer.address_city,
+                'address_district': customer.address_district,
+                'address_dong': customer.address_dong,
+                'is_active': customer.is_active,
+            },
+            'consent': {
+                'privacy_consent': customer.privacy_consent,
+                'marketing_consent': customer.marketing_consent,
+                'do_not_contact': customer.do_not_contact,
+                'is_banned': customer.is_banned,
+                'preferred_contact_method': customer.preferred_contact_method,
+            },
+            'points': {'balance': customer.membership_points, 'last_transaction_at': None},
+            'tags': [],
+            'vehicles': [],
+            'recent_services': [],
+            'service_stats': {'count': 0, 'total_payment': 0, 'last_service_date': None},
+            'latest_happycall': None,
+            'built_at': timezone.now(),
+        }
+    if not profiles:
+        return profiles
+    ids = list(profiles)
+
+    for customer_tag in CustomerTag.objects.filter(customer_id__in=ids).select_related('tag').order_by('tag__name'):
+        profiles[customer_tag.customer_id]['tags'].append({
+            'id': customer_tag.tag_id, 'name': customer_tag.tag.name, 'color': customer_tag.tag.color,
+        })
+
+    ownerships = (CustomerVehicle.objects.filter(customer_id__in=ids, end_date__isnull=True)
+                  .select_related('vehicle').order_by('-start_date'))
+    for ownership in ownerships:
+        vehicle = ownership.vehicle
+        profiles[ownership.customer_id]['vehicles'].append({
+            'id': vehicle.pk,
+            'vehicle_number': vehicle.vehicle_number,
+            'model': vehicle.model,
+            'year': vehicle.year,
+            'start_date': ownership.start_date,
+            'url': vehicle.get_absolute_url(),
+        })
+
+    stats = (ServiceRequest.objects.filter(customer_id__in=ids).order_by().values('customer_id')
+             .annotate(count=Count('id'), total=Sum('estimated_price'), last=Max('created_at')))
+    for row in stats:
+        profiles[row['customer_id']]['service_stats'] = {
+            'count': row['count'],
+            'total_payment': int(row['total'] or 0),
+            'last_service_date': row['last'],
+        }
+
+    status_labels = dict(ServiceRequest.STATUS_CHOICES)
+    recent = (ServiceRequest.objects.filter(customer_id__in=ids)
+              .select_related('service_type', 'vehicle', 'assigned_employee')
+              .annotate(rank=Window(RowNumber(), partition_by=F('customer_id'),
+                                    order_by=[F('created_at').desc(), F('id').desc()]))
+              .filter(rank__lte=RECENT_SERVICES)
+              .order_by('customer_id', 'rank'))
+    for service in recent:
+        profiles[service.customer_id]['recent_services'].append(_service_entry(service, status_labels))
+
+    stage_labels = dict(HappyCall.CALL_STAGE_CHOICES)
+    latest_calls = (HappyCall.objects.filter(service_request__customer_id__in=ids)
+                    .annotate(customer_id=F('service_request__customer_id'),
+                              rank=Window(RowNumber(), partition_by=F('service_request__customer_id'),
+                                          order_by=[F('updated_at').desc(), F('id').desc()]))
+                    .filter(rank=1)
+                    .values('id', 'customer_id', 'call_stage', 'updated_at'))
+    for row in latest_calls:
+        profiles[row['customer_id']]['latest_happycall'] = {
+            'id': row['id'],
+            'call_stage': row['call_stage'],
+            'call_stage_display': stage_labels.get(row['call_stage'], row['call_stage']),
+            'updated_at': row['updated_at'],
+        }
+
+    point_rows = (CustomerPointHistory.objects.filter(customer_id__in=ids).order_by()
+                  .values('customer_id').annotate(last=Max('transaction_date')))
+    for row in point_rows:
+        profiles[row['customer_id']]['points']['last_transaction_at'] = row['last']
+
+    return profiles
+
+
+def rebuild_profiles(customer_ids, force=False):
+    """
+    프로필을 다시 만들어 저장하고 {고객 ID: 프로필} 반환
+
+    재계산 중에 다시 변경된 고객(revision 증가)은 덮어쓰지 않아 다음 재계산에 맡긴다.
+    force=True 이면 revision 확인 없이 일괄 갱신한다 (전체 재생성 명령용).
+    """
+    from .models import CustomerProfile
+
+    customer_ids = list(set(customer_ids))
+    if not customer_ids:
+        return {}
+    revisions = dict(CustomerProfile.objects.filter(pk__in=customer_ids).values_list('pk', 'revision'))
+    profiles = build_profiles(customer_ids)
+    now = timezone.now()
+
+    new_rows, changed_rows = [], []
+    for customer_id, data in profiles.items():
+        row = CustomerProfile(customer_id=customer_id, data=data, version=PROFILE_VERSION,
+                              is_stale=False, built_at=now)
+        if customer_id not in revisions:
+            new_rows.append(row)
+        elif force:
+            changed_rows.append(row)
+        else:
+            CustomerProfile.objects.filter(pk=customer_id, revision=revisions[customer_id]).update(
+                data=data, version=PROFILE_VERSION, is_stale=False, built_at=now)
+    CustomerProfile.objects.bulk_create(new_rows, ignore_conflicts=True)
+    if changed_rows:
+        CustomerProfile.objects.bulk_update(changed_rows, ['data', 'version', 'is_stale', 'built_at'],
+                                            batch_size=REBUILD_BATCH_SIZE)
+    return profiles
+
+
+# ===================== 조회 =====================
+
+def _hydrate(value, key=''):
+    """JSON 의 날짜 문자열을 date/datetime 으로 되돌림 (템플릿 date 필터용)"""
+    if isinstance(value, dict):
+        return {k: _hydrate(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_hydrate(item, key) for item in value]
+    if isinstance(value, str) and (key.endswith('_at') or key.endswith('_date')):
+        parsed = parse_datetime(value) if 'T' in value else parse_date(value)
+        return parsed or value
+    return value
+
+
+def get_profiles(customer_ids, rebuild=True):
+    """
+    고객 ID 목록의 프로필 ({고객 ID: 프로필}, 없는 고객은 제외)
+
+    저장된 프로필이 최신이면 기본키 조회 한 번, 아니면 해당 고객만 다시 만든다.
+    rebuild=False 이면 최신이 아닌 고객은 빼고 돌려주고 백그라운드 재계산만 예약한다
+    (쿼리 수가 일정해야 하는 검색 API 용, 빠진 고객은 호출하는 쪽에서 직접 읽는다).
+    """
+    from .models import CustomerProfile
+
+    customer_ids = [customer_id for customer_id in customer_ids if customer_id is not None]
+    if not customer_ids:
+        return {}
+    rows = CustomerProfile.objects.filter(pk__in=customer_ids).values_list('pk', 'data', 'version', 'is_stale')
+    profiles, outdated = {}, set(customer_ids)
+    for customer_id, data, version, is_stale in rows:
+        if version == PROFILE_VERSION and not is_stale:
+            profiles[customer_id] = data
+            outdated.discard(customer_id)
+    if outdated and not rebuild:
+        schedule_profile_rebuild(*outdated)
+    elif outdated:
+        rebuilt = rebuild_profiles(outdated)
+        # 저장된 JSON 을 다시 읽은 것과 같은 형태로 맞춘다
+        for customer_id, data in rebuilt.items():
+            profiles[customer_id] = json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+    return {customer_id: _hydrate(profiles[customer_id]) for customer_id in customer_ids
+            if customer_id in profiles}
+
+
+def get_profile(customer_id):
+    """고객 한 명의 프로필 (고객이 없으면 None)"""
+    return get_profiles([customer_id]).get(customer_id)
+
+
+# ===================== 변경 반영 =====================
+
+def mark_profiles_stale(customer_ids):
+    """프로필을 재계산 필요로 표시 (다음 조회 또는 백그라운드 재계산에서 다시 만듦)"""
+    from .models import CustomerProfile
+
+    customer_ids = list({customer_id for customer_id in customer_ids if customer_id is not None})
+    if customer_ids:
+        CustomerProfile.objects.filter(pk__in=customer_ids).update(is_stale=True, revision=F('revision') + 1)
+    return customer_ids
+
+
+def schedule_profile_rebuild(*customer_ids):
+    """
+    커밋 후 프로필을 재계산 필요로 표시하고 백그라운드 재계산 예약
+
+    모델 save()/delete() 에서 호출한다. 트랜잭션이 롤백되면 아무것도 하지 않는다.
+    """
+    customer_ids = {customer_id for customer_id in customer_ids if customer_id is not None}
+    if not customer_ids:
+        return
+
+    def on_commit():
+        marked = mark_profiles_stale(customer_ids)
+        if marked and getattr(settings, 'CUSTOMER_PROFILE_ASYNC_REBUILD', True):
+            _ensure_worker()
+            for customer_id in marked:
+                _queue.put(customer_id)
+
+    transaction.on_commit(on_commit)
+
+
+class ProfileInvalidationMixin:
+    """저장/삭제 시 profile_customer_ids() 고객의 프로필 재계산을 예약하는 모델 믹스인"""
+
+    def profile_customer_ids(self):
+        return [self.customer_id]
+
+    def save(self, *args, **kwargs):
+        result = super().save(*args, **kwargs)
+        schedule_profile_rebuild(*self.profile_customer_ids())
+        return result
+
+    def delete(self, *args, **kwargs):
+        customer_ids = self.profile_customer_ids()  # 삭제 전에 관계를 읽어 둔다
+        result = super().delete(*args, **kwargs)
+        schedule_profile_rebuild(*customer_ids)
+        return result
+
+
+class ProfileRebuilder(threading.Thread):
+    """재계산 요청을 모아 REBUILD_BATCH_SIZE 단위로 프로필을 다시 만드는 백그라운드 스레드"""
+
+    def __init__(self, rebuild_queue):
+        super().__init__(name='customer-profile-rebuild', daemon=True)
+        self.queue = rebuild_queue
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not (self._stop_event.is_set() and self.queue.empty()):
+            try:
+                pending = {self.queue.get(timeout=DEBOUNCE_SECONDS)}
+            except queue.Empty:
+                continue
+            # 잠깐 기다려 같은 요청/연속 저장에서 나온 변경을 한 번에 처리
+            time.sleep(DEBOUNCE_SECONDS)
+            while len(pending) < REBUILD_BATCH_SIZE:
+                try:
+                    pending.add(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._rebuild(pending)
+
+    def _rebuild(self, customer_ids):
+        try:
+            rebuild_profiles(customer_ids)
+        except Exception as e:
+            # 실패해도 is_stale 이 남아 있으므로 다음 조회에서 다시 만든다
+            logger.error(f'고객 프로필 재계산 실패 ({len(customer_ids)}명): {e}')
+        finally:
+            for _ in customer_ids:
+                self.queue.task_done()
+            connection.close()
+
+    def stop(self, timeout=5.0):
+        self._stop_event.set()
+        self.join(timeout)
+
+
+def _ensure_worker():
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _worker_lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        _worker = ProfileRebuilder(_queue)
+        _worker.start()
+
+
+def flush(timeout=10.0):
+    """예약된 재계산이 끝날 때까지 대기 (관리 명령/테스트용)"""
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+@atexit.register
+def _shutdown():
+    if _worker is not None and _worker.is_alive():
+        _worker.stop()
@@ -0,0 +1,147 @@
+"""
+고객 등급(RFM) 산정
+
+완료된 서비스 기준으로 고객별 최근성(Recency: 마지막 서비스 후 경과일), 빈도(Frequency: 서비스 횟수),
+금액(Monetary: 실제 가격, 없으면 예상 가격 합계)을 구해 Customer.customer_grade(A–D)를 매긴다.
+
+  - 집계는 고객별 GROUP BY 쿼리 한 번으로 읽고, 점수는 pandas/NumPy 로 한꺼번에 계산한다.
+  - R/F/M 은 각각 20% 분위수 경계로 1–5점, 합계 점수로 등급을 정한다. 서비스가 없는 고객은 D.
+  - 등급이 바뀐 고객만 등급별 청크 UPDATE 로 저장한다.
+  - 증분 산정은 마지막 실행 이후 서비스/서비스 이력이 바뀌었거나 새로 등록된 고객만,
+    마지막 전체 산정의 분위수 기준으로 다시 매긴다. 경과일은 시간이 지나면 모든 고객에게서
+    늘어나므로 전체 산정도 주기적으로(예: 주 1회) 돌린다.
+"""
+import numpy as np
+import pandas as pd
+
+from django.db.models import Count, DecimalField, Max, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Customer, CustomerGradeRun
+from .profile import mark_profiles_stale
+
+QUANTILES = [0.2, 0.4, 0.6, 0.8]
+# 합계 점수(3–15) 기준 등급 (높은 등급부터, 어느 기준에도 못 미치면 D)
+GRADE_THRESHOLDS = [('A', 13), ('B', 10), ('C', 7)]
+NO_SERVICE_GRADE = 'D'
+WRITE_CHUNK_SIZE = 5000
+
+
+def _aggregates(customer_ids=None):
+    """고객별 완료 서비스 집계 DataFrame (customer_id, last_service, frequency, monetary)"""
+    from services.models import ServiceRequest
+
+    services = ServiceRequest.objects.filter(status='completed', customer__isnull=False)
+    if customer_ids is not None:
+        services = services.filter(customer_id__in=customer_ids)
+    rows = (services.order_by().values('customer_id')
+            .annotate(last_service=Max(Coalesce('service_date', 'created_at')),
+                      frequency=Count('id'),
+                      monetary=Sum(Coalesce('servicehistory__actual_price', 'estimated_price',
+                                            Value(0), output_field=DecimalField())))
+            .values_list('customer_id', 'last_service', 'frequency', 'monetary'))
+    frame = pd.DataFrame.from_records(rows.iterator(chunk_size=50000),
+                                      columns=['customer_id', 'last_service', 'frequency', 'monetary'])
+    frame['monetary'] = frame['monetary'].astype(float)
+    frame['last_service'] = pd.to_datetime(frame['last_service'], utc=True)
+    return frame.set_index('customer_id')
+
+
+def compute_thresholds(frame, now):
+    """R/F/M 분위수 경계 (recency_days 는 작을수록 좋음)"""
+    if frame.empty:
+        return {}
+    recency_days = (pd.Timestamp(now) - frame['last_service']).dt.days
+    return {
+        'recency_days': np.quantile(recency_days, QUANTILES).tolist(),
+        'frequency': np.quantile(frame['frequency'], QUANTILES).tolist(),
+        'monetary': np.quantile(frame['monetary'], QUANTILES).tolist(),
+        'computed_at': now.isoformat(),
+    }
+
+
+def score(frame, thresholds, now):
+    """고객별 (R, F, M, 합계 점수, 등급) DataFrame"""
+    recency_days = (pd.Timestamp(now) - frame['last_service']).dt.days.to_numpy()
+    # 경계값과 같은 값은 낮은 구간으로 (searchsorted left): 경과일은 짧을수록 5점
+    recency = 5 - np.searchsorted(thresholds['recency_days'], recency_days, side='left')
+    frequency = 1 + np.searchsorted(thresholds['frequency'], frame['frequency'].to_numpy(), side='left')
+    monetary = 1 + np.searchsorted(thresholds['monetary'], frame['monetary'].to_numpy(), side='left')
+    total = recency + frequency + monetary
+
+    grades = np.select([total >= minimum for _, minimum in GRADE_THRESHOLDS],
+                       [grade for grade, _ in GRADE_THRESHOLDS], default='D')
+    return pd.DataFrame({'recency': recency, 'frequency': frequency, 'monetary': monetary,
+                         'score': total, 'grade': grades}, index=frame.index)
+
+
+def changed_customer_ids(since):
+    """since 이후 서비스/서비스 이력이 바뀌었거나 새로 등록된 고객 ID"""
+    from services.models import ServiceHistory, ServiceRequest
+
+    # OR 조건 하나로 묶으면 조인 때문에 인덱스를 못 타므로 수정일 인덱스별로 따로 읽는다
+    ids = set(ServiceRequest.objects.filter(updated_at__gte=since, customer__isnull=False)
+              .order_by().values_list('customer_id', flat=True))
+    ids.update(ServiceHistory.objects.filter(updated_at__gte=since, service_request__customer__isnull=False)
+               .order_by().values_list('service_request__customer_id', flat=True))
+    ids.update(Customer.objects.filter(created_at__gte=since).values_list('pk', flat=True))
+    return ids
+
+
+def _write_grades(changes):
+    """{고객 ID: 새 등급} 을 등급별 청크 UPDATE 로 저장"""
+    by_grade = {}
+    for customer_id, grade in changes.items():
+        by_grade.setdefault(grade, []).append(customer_id)
+    for grade, customer_ids in by_grade.items():
+        for offset in range(0, len(customer_ids), WRITE_CHUNK_SIZE):
+            chunk = customer_ids[offset:offset + WRITE_CHUNK_SIZE]
+            Customer.objects.filter(pk__in=chunk).update(customer_grade=grade, updated_at=timezone.now())
+            mark_profiles_stale(chunk)
+
+
+def run_grading(incremental=False, dry_run=False):
+    """
+    등급 산정 실행 (CustomerGradeRun 반환, dry_run 이면 저장하지 않은 기록)
+
+    증분 산정인데 이전 전체 산정이 없으면 전체 산정으로 바꿔 실행한다.
+    """
+    now = timezone.now()
+    last_run = CustomerGradeRun.objects.filter(finished_at__isnull=False).first()
+    last_full = CustomerGradeRun.objects.filter(finished_at__isnull=False, mode='full').exclude(
+        thresholds={}).first()
+    if incremental and (last_run is None or last_full is None):
+        incremental = False
+    run = CustomerGradeRun(mode='incremental' if incremental else 'full', started_at=now)
+
+    if incremental:
+        customer_ids = changed_customer_ids(last_run.started_at)
+        customers = Customer.objects.filter(pk__in=customer_ids)
+        frame = _aggregates(customer_ids)
+        thresholds = last_full.thresholds
+    else:
+        customers = Customer.objects.all()
+        frame = _aggregates()
+        thresholds = compute_thresholds(frame, now)
+
+    current = pd.Series(dict(customers.order_by().values_list('pk', 'customer_grade').iterator(chunk_size=50000)),
+                        dtype=object)
+    grades = pd.Series(NO_SERVICE_GRADE, index=current.index, dtype=object)
+    if not frame.empty and thresholds:
+        scored = score(frame, thresholds, now)['grade']
+        scored = scored[scored.index.isin(current.index)]
+        grades.loc[scored.index] = scored
+    changed = grades[grades != current]
+
+    run.customer_count = len(grades)
+    run.updated_count = len(changed)
+    run.grade_counts = {grade: int(count) for grade, count in grades.value_counts().sort_index().items()}
+    run.thresholds = thresholds if not incremental else {}
+    if dry_run:
+        return run
+
+    _write_grades(changed.to_dict())
+    run.finished_at = timezone.now()
+    run.save()
+    return run
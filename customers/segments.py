@@ -0,0 +1,477 @@
+"""
+고객 세그먼트 (캠페인 타겟 조건)
+
+MarketingCampaign.target_criteria / CustomerSegment.criteria 는 아래 형식의 JSON 조건이다.
+한 dict 안의 조건은 모두 만족(AND)해야 하고, all/any/not 으로 묶을 수 있다.
+
+    {
+        "membership": ["premium", "vip"],          멤버십 (Customer.membership_status)
+        "grade": ["A", "B"],                        고객등급
+        "customer_type": ["individual"],            고객구분
+        "customer_status": ["registered"],          고객상태
+        "tags": ["VIP", "법인"],                    태그 중 하나라도 있음
+        "region": {"city": "경기도",                 주소 지역 (Customer.address_city/district/dong,
+                   "district": ["평택시", "안성시"]},   각 항목은 값 하나 또는 목록)
+        "last_service": {"within_days": 90},        최근 N일 안에 완료 서비스가 있음
+                        {"older_than_days": 365},   완료 서비스가 있지만 N일 동안 없음
+                        {"never": true},            완료 서비스가 없음
+        "vehicle": {"model": ["쏘나타", "K5"],       현재 소유 차량 중 모델명(부분 일치)/연식이
+                    "year": {"min": 2015, "max": 2020}},  모두 맞는 차량이 있음
+        "marketing_consent": true,                  마케팅 동의 / 연락 금지 / 블랙리스트 / 활성 여부
+        "do_not_contact": false,
+        "is_banned": false,
+        "is_active": true,
+        "segment": "VIP 재방문",                    저장된 세그먼트
+        "all": [...], "any": [...], "not": {...}
+    }
+
+  - compile_criteria() 는 조건 전체를 Customer 에 대한 Q 하나(EXISTS 서브쿼리 포함)로 바꾼다.
+    저장된 세그먼트 참조도 그 조건을 펼쳐 넣으므로 대상 고객은 SQL 한 번으로 구한다.
+  - 저장된 세그먼트는 대상 고객 ID 를 압축 비트맵(CustomerBitmap)으로 들고 있어
+    세그먼트끼리의 교집합/합집합/차집합 미리보기는 메모리에서 바로 계산한다.
+  - 비트맵 갱신은 마지막 갱신 이후 바뀐 고객(고객/태그/차량/서비스 수정일 기준)만 다시 판정한다.
+    태그 삭제, 차량 소유 종료, 고객 삭제처럼 수정일이 남지 않는 변경과 "최근 N일" 조건의
+    날짜 이동은 전체 재계산에서 반영되므로, 하루 한 번 이상 전체 재계산을 돌린다
+    (SEGMENT_FULL_REFRESH_HOURS, refresh_segments 명령).
+"""
+import json
+import zlib
+from datetime import datetime, time, timedelta
+
+import numpy as np
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+CHOICE_CONDITIONS = {
+    'membership': 'membership_status',
+    'grade': 'customer_grade',
+    'customer_type': 'customer_type',
+    'customer_status': 'customer_status',
+}
+FLAG_CONDITIONS = ('marketing_consent', 'do_not_contact', 'is_banned', 'is_active')
+LAST_SERVICE_OPTIONS = ('within_days', 'older_than_days', 'never')
+REGION_FIELDS = {'city': 'address_city', 'district': 'address_district', 'dong': 'address_dong'}
+MAX_DAYS = 36500  # 일수 조건 상한 (100년) - 날짜 계산 범위 초과 방지
+MAX_YEAR = 9999
+
+# 조건 키별로 대상 여부가 바뀔 수 있는 변경 (증분 갱신 때 확인할 테이블)
+CONDITION_SOURCES = {
+    **{key: 'customer' for key in CHOICE_CONDITIONS},
+    **{key: 'customer' for key in FLAG_CONDITIONS},
+    'region': 'customer',
+    'tags': 'tags',
+    'last_service': 'services',
+    'vehicle': 'vehicles',
+}
+# 바뀐 고객이 이보다 많으면 증분 대신 전체 재계산
+INCREMENTAL_LIMIT = 100000
+ID_CHUNK_SIZE = 5000
+
+
+class SegmentError(ValueError):
+    """잘못된 세그먼트 조건"""
+
+
+# ===================== 비트맵 =====================
+
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+class CustomerBitmap:
+    """
+    고객 ID 비트맵 (ID i 가 있으면 i 번째 비트가 1)
+
+    고객 100만 명이면 약 125KB, 저장 시 zlib 으로 압축한다.
+    """
+    __slots__ = ('bits',)
+
+    def __init__(self, bits=None):
+        self.bits = bits if bits is not None else np.zeros(0, dtype=np.uint8)
+
+    @classmethod
+    def from_ids(cls, ids):
+        ids = np.fromiter(ids, dtype=np.int64)
+        if not len(ids):
+            return cls()
+        mask = np.zeros(int(ids.max()) + 1, dtype=bool)
+        mask[ids] = True
+        return cls(np.packbits(mask))
+
+    @classmethod
+    def from_bytes(cls, data):
+        if not data:
+            return cls()
+        return cls(np.frombuffer(zlib.decompress(bytes(data)), dtype=np.uint8).copy())
+
+    def to_bytes(self):
+        return zlib.compress(self.bits.tobytes(), 6)
+
+    def to_ids(self):
+        """ID 배열 (오름차순)"""
+        return np.flatnonzero(np.unpackbits(self.bits))
+
+    def __len__(self):
+        return int(_POPCOUNT[self.bits].sum(dtype=np.int64))
+
+    def __contains__(self, customer_id):
+        index, offset = divmod(int(customer_id), 8)
+        return index < len(self.bits) and bool(self.bits[index] & (0x80 >> offset))
+
+    def _aligned(self, other):
+        size = max(len(self.bits), len(other.bits))
+        return (np.pad(self.bits, (0, size - len(self.bits))),
+                np.pad(other.bits, (0, size - len(other.bits))))
+
+    def __and__(self, other):
+        left, right = self._aligned(other)
+        return CustomerBitmap(left & right)
+
+    def __or__(self, other):
+        left, right = self._aligned(other)
+        return CustomerBitmap(left | right)
+
+    def __sub__(self, other):
+        left, right = self._aligned(other)
+        return CustomerBitmap(left & ~right)
+
+    def __eq__(self, other):
+        if not isinstance(other, CustomerBitmap):
+            return NotImplemented
+        left, right = self._aligned(other)
+        return bool(np.array_equal(left, right))
+
+    def __repr__(self):
+        return f'<CustomerBitmap {len(self)}명>'
+
+
+# ===================== 조건 해석 =====================
+
+def parse_criteria(value):
+    """target_criteria 문자열/dict → 조건 dict (빈 값은 빈 dict = 전체 고객)"""
+    if isinstance(value, dict):
+        return value
+    if not value or not str(value).strip():
+        return {}
+    try:
+        criteria = json.loads(value)
+    except (TypeError, ValueError, RecursionError) as e:
+        raise SegmentError('타겟 조건이 JSON 형식이 아닙니다.') from e
+    if not isinstance(criteria, dict):
+        raise SegmentError('타겟 조건은 JSON 객체여야 합니다.')
+    return criteria
+
+
+def _codes(key, value):
+    from .models import Customer
+
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not value or not all(isinstance(code, str) for code in value):
+        raise SegmentError(f'{key}: 값 목록이 필요합니다.')
+    allowed = set(dict(Customer._meta.get_field(CHOICE_CONDITIONS[key]).flatchoices))
+    unknown = [code for code in value if code not in allowed]
+    if unknown:
+        raise SegmentError(f"{key}: 알 수 없는 값 {', '.join(map(str, unknown))}")
+    return value
+
+
+def _names(key, value):
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list) or not value or not all(isinstance(name, str) and name for name in value):
+        raise SegmentError(f'{key}: 문자열 목록이 필요합니다.')
+    return value
+
+
+def _days(key, value, upper=MAX_DAYS):
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= upper:
+        raise SegmentError(f'{key}: 0 이상 {upper} 이하의 정수가 필요합니다.')
+    return value
+
+
+def _last_service_q(value, today):
+    from services.models import ServiceRequest
+
+    if not isinstance(value, dict) or len(value) != 1 or next(iter(value)) not in LAST_SERVICE_OPTIONS:
+        raise SegmentError(f"last_service: {', '.join(LAST_SERVICE_OPTIONS)} 중 하나가 필요합니다.")
+    option, days = next(iter(value.items()))
+    completed = ServiceRequest.objects.filter(customer=OuterRef('pk'), status='completed')
+    if option == 'never':
+        if days is not True:
+            raise SegmentError('last_service.never: true 만 사용할 수 있습니다.')
+        return ~Exists(completed)
+    # (고객, 서비스일) 인덱스를 타도록 날짜가 아닌 그날 0시 기준 일시로 비교
+    cutoff = timezone.make_aware(datetime.combine(today - timedelta(days=_days(f'last_service.{option}', days)),
+                                                  time.min))
+    recent = Exists(completed.filter(service_date__gte=cutoff))
+    if option == 'within_days':
+        return recent
+    return Exists(completed) & ~recent
+
+
+def _vehicle_q(value):
+    from .models import CustomerVehicle
+
+    if not isinstance(value, dict) or not value or set(value) - {'model', 'year'}:
+        raise SegmentError('vehicle: model, year 중 하나 이상이 필요합니다.')
+    vehicles = CustomerVehicle.objects.filter(customer=OuterRef('pk'), end_date__isnull=True)
+    if 'model' in value:
+        models_q = Q()
+        for name in _names('vehicle.model', value['model']):
+            models_q |= Q(vehicle__model__icontains=name)
+        vehicles = vehicles.filter(models_q)
+    if 'year' in value:
+        year = value['year']
+        if not isinstance(year, dict) or not year or set(year) - {'min', 'max'}:
+            raise SegmentError('vehicle.year: min, max 중 하나 이상이 필요합니다.')
+        if 'min' in year:
+            vehicles = vehicles.filter(vehicle__year__gte=_days('vehicle.year.min', year['min'], MAX_YEAR))
+        if 'max' in year:
+            vehicles = vehicles.filter(vehicle__year__lte=_days('vehicle.year.max', year['max'], MAX_YEAR))
+    return Exists(vehicles)
+
+
+def _region_q(value):
+    if not isinstance(value, dict) or not value or set(value) - set(REGION_FIELDS):
+        raise SegmentError(f"region: {', '.join(REGION_FIELDS)} 중 하나 이상이 필요합니다.")
+    return Q(**{f'{REGION_FIELDS[part]}__in': _names(f'region.{part}', names) for part, names in value.items()})
+
+
+def _load_segment(name):
+    from .models import CustomerSegment
+
+    if not isinstance(name, str):
+        raise SegmentError('segment: 세그먼트 이름이 필요합니다.')
+    segment = CustomerSegment.objects.filter(name=name).first()
+    if segment is None:
+        raise SegmentError(f'segment: 세그먼트를 찾을 수 없습니다: {name}')
+    return segment
+
+
+def _compile(node, today, seen):
+    from .models import CustomerTag
+
+    if not isinstance(node, dict):
+        raise SegmentError('조건은 JSON 객체여야 합니다.')
+    q = Q()
+    for key, value in node.items():
+        if key in ('all', 'any'):
+            if not isinstance(value, list) or not value:
+                raise SegmentError(f'{key}: 조건 목록이 필요합니다.')
+            children = [_compile(child, today, seen) for child in value]
+            combined = children[0]
+            for child in children[1:]:
+                combined = combined & child if key == 'all' else combined | child
+            q &= combined
+        elif key == 'not':
+            q &= ~_compile(value, today, seen)
+        elif key in CHOICE_CONDITIONS:
+            q &= Q(**{f'{CHOICE_CONDITIONS[key]}__in': _codes(key, value)})
+        elif key in FLAG_CONDITIONS:
+            if not isinstance(value, bool):
+                raise SegmentError(f'{key}: true/false 가 필요합니다.')
+            q &= Q(**{key: value})
+        elif key == 'tags':
+            q &= Exists(CustomerTag.objects.filter(customer=OuterRef('pk'),
+                                                   tag__name__in=_names(key, value)))
+        elif key == 'last_service':
+            q &= _last_service_q(value, today)
+        elif key == 'vehicle':
+            q &= _vehicle_q(value)
+        elif key == 'region':
+            q &= _region_q(value)
+        elif key == 'segment':
+            if not isinstance(value, str):
+                raise SegmentError('segment: 세그먼트 이름이 필요합니다.')
+            if value in seen:
+                raise SegmentError(f'segment: 세그먼트가 자기 자신을 참조합니다: {value}')
+            q &= _compile(_load_segment(value).criteria, today, seen | {value})
+        else:
+            raise SegmentError(f'알 수 없는 조건: {key}')
+    return q
+
+
+def compile_criteria(criteria, today=None):
+    """조건 → Customer 에 대한 Q (잘못된 조건은 SegmentError)"""
+    try:
+        return _compile(parse_criteria(criteria), today or timezone.localdate(), frozenset())
+    except RecursionError as e:
+        raise SegmentError('조건이 너무 깊게 중첩되어 있습니다.') from e
+
+
+def audience_queryset(criteria, today=None):
+    """조건에 맞는 고객 쿼리셋"""
+    from .models import Customer
+
+    return Customer.objects.filter(compile_criteria(criteria, today))
+
+
+def _walk(node, seen=frozenset()):
+    """조건에 쓰인 (키, 값) 을 하위 조건/참조 세그먼트까지 모두 나열"""
+    if not isinstance(node, dict):
+        return
+    for key, value in node.items():
+        if key in ('all', 'any'):
+            for child in value:
+                yield from _walk(child, seen)
+        elif key == 'not':
+            yield from _walk(value, seen)
+        elif key == 'segment' and value not in seen:
+            yield from _walk(_load_segment(value).criteria, seen | {value})
+        else:
+            yield key, value
+
+
+def _is_date_relative(criteria):
+    return any(key == 'last_service' and 'never' not in value for key, value in _walk(criteria))
+
+
+# ===================== 저장된 세그먼트 =====================
+
+def changed_customer_ids(since, sources):
+    """since 이후 sources(customer/tags/vehicles/services) 쪽이 바뀐 고객 ID"""
+    from services.models import ServiceRequest
+    from .models import Customer, CustomerTag, CustomerVehicle
+
+    # 새로 등록된 고객은 조건과 관계없이 판정해야 한다. 기본 정렬이 있으면 수정일 인덱스를 못 탄다
+    ids = set(Customer.objects.filter(updated_at__gte=since).order_by().values_list('pk', flat=True))
+    if 'tags' in sources:
+        ids.update(CustomerTag.objects.filter(created_at__gte=since).order_by()
+                   .values_list('customer_id', flat=True))
+    if 'vehicles' in sources:
+        ids.update(CustomerVehicle.objects.filter(created_at__gte=since).order_by()
+                   .values_list('customer_id', flat=True))
+        ids.update(CustomerVehicle.objects.filter(vehicle__updated_at__gte=since).order_by()
+                   .values_list('customer_id', flat=True))
+    if 'services' in sources:
+        ids.update(ServiceRequest.objects.filter(updated_at__gte=since, customer__isnull=False)
+                   .order_by().values_list('customer_id', flat=True))
+    return ids
+
+
+def _needs_full_refresh(segment, now):
+    if not segment.bitmap or segment.full_built_at is None:
+        return True
+    max_age = timedelta(hours=getattr(settings, 'SEGMENT_FULL_REFRESH_HOURS', 24))
+    if now - segment.full_built_at >= max_age:
+        return True
+    # "최근 N일" 조건은 날짜가 바뀌면 모든 고객의 판정이 달라질 수 있다
+    return (_is_date_relative(segment.criteria)
+            and timezone.localdate(segment.built_at) != timezone.localdate(now))
+
+
+def refresh_segment(segment, full=False):
+    """
+    세그먼트 비트맵 갱신 후 'full' / 'incremental' 반환
+
+    증분 갱신은 지난 갱신 이후 바뀐 고객만 다시 판정해 비트맵에서 빼고 다시 넣는다.
+    """
+    now = timezone.now()
+    queryset = audience_queryset(segment.criteria, timezone.localdate(now))
+    mode = 'full' if full or _needs_full_refresh(segment, now) else 'incremental'
+
+    if mode == 'incremental':
+        sources = {CONDITION_SOURCES.get(key) for key, _ in _walk(segment.criteria)}
+        changed = sorted(changed_customer_ids(segment.built_at, sources))
+        if len(changed) > INCREMENTAL_LIMIT:
+            mode = 'full'
+
+    if mode == 'full':
+        bitmap = CustomerBitmap.from_ids(queryset.order_by().values_list('pk', flat=True).iterator(chunk_size=50000))
+        segment.full_built_at = now
+    else:
+        matched = []
+        for offset in range(0, len(changed), ID_CHUNK_SIZE):
+            chunk = changed[offset:offset + ID_CHUNK_SIZE]
+            matched.extend(queryset.filter(pk__in=chunk).order_by().values_list('pk', flat=True))
+        bitmap = (segment.get_bitmap() - CustomerBitmap.from_ids(changed)) | CustomerBitmap.from_ids(matched)
+
+    segment.set_bitmap(bitmap)
+    segment.built_at = now
+    segment.save(update_fields=['bitmap', 'customer_count', 'built_at', 'full_built_at', 'updated_at'])
+    return mode
+
+
+def segment_bitmap(segment):
+    """최신 비트맵 (SEGMENT_CACHE_SECONDS 보다 오래됐으면 먼저 갱신)"""
+    max_age = timedelta(seconds=getattr(settings, 'SEGMENT_CACHE_SECONDS', 300))
+    if segment.built_at is None or timezone.now() - segment.built_at >= max_age:
+        refresh_segment(segment)
+    return segment.get_bitmap()
+
+
+def _uses_segments(node):
+    if not isinstance(node, dict):
+        return False
+    return any(
+        key == 'segment'
+        or (key in ('all', 'any') and isinstance(value, list) and any(_uses_segments(child) for child in value))
+        or (key == 'not' and _uses_segments(value))
+        for key, value in node.items()
+    )
+
+
+def _evaluate(node, today):
+    """조건 → 비트맵. 세그먼트 참조는 저장된 비트맵, 나머지는 SQL 로 구해 메모리에서 합친다"""
+    from .models import Customer
+
+    if not _uses_segments(node):
+        return CustomerBitmap.from_ids(
+            Customer.objects.filter(_compile(node, today, frozenset())).order_by().values_list('pk', flat=True)
+            .iterator(chunk_size=50000))
+
+    parts, excluded, plain = [], [], {}
+    for key, value in node.items():
+        if key == 'segment':
+            parts.append(segment_bitmap(_load_segment(value)))
+        elif key in ('all', 'any') and _uses_segments({key: value}):
+            if not isinstance(value, list) or not value:
+                raise SegmentError(f'{key}: 조건 목록이 필요합니다.')
+            children = [_evaluate(child, today) for child in value]
+            combined = children[0]
+            for child in children[1:]:
+                combined = combined & child if key == 'all' else combined | child
+            parts.append(combined)
+        elif key == 'not' and _uses_segments(value):
+            excluded.append(_evaluate(value, today))
+        else:
+            plain[key] = value
+    if plain:
+        parts.append(_evaluate(plain, today))
+    if not parts:
+        # not 만 있으면 전체 고객에서 뺀다
+        parts.append(CustomerBitmap.from_ids(Customer.objects.order_by().values_list('pk', flat=True)
+                                             .iterator(chunk_size=50000)))
+    result = parts[0]
+    for part in parts[1:]:
+        result = result & part
+    for part in excluded:
+        result = result - part
+    return result
+
+
+def evaluate(criteria, today=None):
+    """조건에 맞는 고객 비트맵"""
+    return _evaluate(parse_criteria(criteria), today or timezone.localdate())
+
+
+def preview(criteria):
+    """
+    세그먼트 크기 미리보기 {'count': 고객 수, 'sample_ids': 앞쪽 고객 ID 몇 개}
+
+    저장된 세그먼트를 참조하지 않는 조건은 COUNT 쿼리 한 번,
+    참조하면 세그먼트 비트맵을 메모리에서 합쳐 센다.
+    """
+    criteria = parse_criteria(criteria)
+    if _uses_segments(criteria):
+        bitmap = evaluate(criteria)
+        return {'count': len(bitmap), 'sample_ids': bitmap.to_ids()[:10].tolist()}
+    queryset = audience_queryset(criteria)
+    return {'count': queryset.count(), 'sample_ids': list(queryset.order_by('pk').values_list('pk', flat=True)[:10])}
+
+
+def campaign_audience(campaign):
+    """캠페인 타겟 조건에 맞는 고객 쿼리셋 (조건이 없으면 전체 고객)"""
+    return audience_queryset(campaign.target_criteria)
@@ -1,3 +1,56 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.test import Client, TransactionTestCase, override_settings
 
-# Create your tests here.
+from core import phone_audit
+from core.models import PhoneAccessLog
+from customers.models import Customer
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   REQUEST_METRICS_ENABLED=False)
+class AdminPhoneExposureAuditTests(TransactionTestCase):
+    """관리자 화면에서 원본 전화번호가 출력되면 PhoneAccessLog 가 남는지 (감사 기록은 별도 스레드가 저장)"""
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser('audit-admin', 'admin@example.com', 'password')
+        self.customers = [
+            Customer.objects.create(name=f'감사{index}', phone=f'010-5555-{index:04d}', customer_type='individual')
+            for index in range(3)
+        ]
+        self.client = Client(HTTP_HOST='localhost')
+        self.client.force_login(self.admin)
+
+    def _latest_log(self, path):
+        phone_audit.flush()
+        return PhoneAccessLog.objects.filter(path=path).order_by('-pk').first()
+
+    def test_changelist_records_exposure(self):
+        path = '/admin/customers/customer/'
+        response = self.client.get(path)
+        self.assertContains(response, '010-5555-0001')
+
+        log = self._latest_log(path)
+        self.assertIsNotNone(log)
+        self.assertEqual(log.user, self.admin)
+        self.assertIn('admin', log.sources)
+        self.assertEqual(set(log.customer_ids), {customer.pk for customer in self.customers})
+
+    def test_change_form_records_exposure(self):
+        customer = self.customers[0]
+        path = f'/admin/customers/customer/{customer.pk}/change/'
+        response = self.client.get(path)
+        self.assertContains(response, '010-5555-0000')
+
+        log = self._latest_log(path)
+        self.assertIsNotNone(log)
+        self.assertEqual(log.customer_ids, [customer.pk])
+
+    def test_saving_does_not_record_exposure(self):
+        # 저장/검증 내부에서 읽는 원본 번호는 노출이 아니다
+        token = phone_audit.begin_request()
+        customer = self.customers[0]
+        customer.name = '감사변경'
+        customer.full_clean()
+        customer.save()
+        buffer = phone_audit.end_request(token)
+        self.assertEqual(buffer.count, 0)
@@ -0,0 +1,249 @@
+"""
+고객 활동 타임라인
+
+소통 이력, 해피콜(고객관리/해피콜 앱), 서비스 요청, 포인트 이력, 캠페인 이력을
+날짜 역순 한 줄로 합쳐 보여준다.
+
+  - 소스마다 (고객, 날짜) 인덱스를 타는 쿼리를 날짜 역순으로 page_size + 1 건씩만 읽고
+    heapq.merge 로 k-way 병합한다. 전체 이력을 읽지 않으므로 이력이 긴 법인 고객도
+    첫 페이지는 소스 수만큼의 쿼리로 끝난다.
+  - 페이지 이동은 커서(마지막 항목의 날짜, 소스, ID)로 한다. 같은 시각의 항목은
+    (소스 이름, ID) 역순으로 정렬되므로 페이지 경계에서 빠지거나 겹치는 항목이 없다.
+  - 소통 이력은 보관 파일(core.archive)로 옮겨진 행도 합친다. 그 고객이 들어 있는 보관 파일이 있을 때만 연다.
+
+사용 예:
+    page = get_timeline(customer_id, limit=50)
+    page = get_timeline(customer_id, cursor=page['next_cursor'])
+"""
+import base64
+import heapq
+import json
+from itertools import islice
+
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class TimelineSource:
+    """
+    타임라인 소스 하나
+
+    queryset(customer_id) 는 고객의 행을, date_field 는 정렬 기준 날짜 필드를,
+    to_event(row) 는 values() 행을 이벤트 dict 로 바꾸는 함수를 가리킨다.
+    """
+
+    def __init__(self, name, label, queryset, date_field, fields, to_event):
+        self.name = name
+        self.label = label
+        self.queryset = queryset
+        self.date_field = date_field
+        self.fields = fields
+        self.to_event = to_event
+
+    def after(self, customer_id, cursor):
+        """커서 다음(더 과거) 항목 쿼리셋, 날짜/ID 역순"""
+        queryset = self.queryset(customer_id)
+        if cursor is not None:
+            occurred_at, source, pk = cursor
+            before = Q(**{f'{self.date_field}__lt': occurred_at})
+            if self.name < source:
+                # 같은 시각이면 이 소스가 뒤에 오므로 같은 시각 항목도 포함
+                before |= Q(**{self.date_field: occurred_at})
+            elif self.name == source:
+                before |= Q(**{self.date_field: occurred_at, 'pk__lt': pk})
+            queryset = queryset.filter(before)
+        return queryset.order_by(f'-{self.date_field}', '-pk').values('pk', self.date_field, *self.fields)
+
+    def _event(self, row):
+        event = self.to_event(row)
+        event.update({
+            'source': self.name,
+            'source_display': self.label,
+            'id': row['pk'],
+            'occurred_at': row[self.date_field],
+        })
+        return event
+
+    def stream(self, customer_id, cursor, chunk_size):
+        """날짜 역순 이벤트를 chunk_size 건씩 읽어 차례로 내보내는 제너레이터"""
+        while True:
+            rows = list(self.after(customer_id, cursor)[:chunk_size])
+            for row in rows:
+                yield self._event(row)
+            if len(rows) < chunk_size:
+                return
+            cursor = (rows[-1][self.date_field], self.name, rows[-1]['pk'])
+
+
+class ArchivedTimelineSource(TimelineSource):
+    """운영 테이블과 core.archive 보관 파일을 합쳐 읽는 소스 (보관 행의 키 필드가 고객 ID)"""
+
+    def __init__(self, archive_key, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.archive_key = archive_key
+
+    def archived(self, customer_id, cursor):
+        """커서 다음(더 과거) 보관 이벤트, 날짜/ID 역순"""
+        from core.archive import archived_rows
+
+        end = cursor[0] if cursor is not None else None
+        rows = []
+        for row in archived_rows(self.archive_key, end=end, fields=['id', *self.fields], customer_id=customer_id):
+            row['pk'] = row['id']
+            if cursor is None or (row[self.date_field], self.name, row['pk']) < cursor:
+                rows.append(row)
+        rows.sort(key=lambda row: (row[self.date_field], row['pk']), reverse=True)
+        for row in rows:
+            yield self._event(row)
+
+    def stream(self, customer_id, cursor, chunk_size):
+        yield from heapq.merge(super().stream(customer_id, cursor, chunk_size), self.archived(customer_id, cursor),
+                               key=lambda event: (event['occurred_at'], event['id']), reverse=True)
+
+
+def _sort_key(event):
+    return (event['occurred_at'], event['source'], event['id'])
+
+
+def _choices(model, field_name):
+    return dict(model._meta.get_field(field_name).flatchoices)
+
+
+def _sources():
+    from happycall.models import HappyCall as ServiceHappyCall
+    from services.models import ServiceRequest
+    from .models import CustomerCampaignHistory, CustomerCommunication, CustomerPointHistory, HappyCall
+
+    communication_types = _choices(CustomerCommunication, 'communication_type')
+    methods = _choices(CustomerCommunication, 'method')
+    results = _choices(CustomerCommunication, 'result')
+    call_sequences = _choices(HappyCall, 'call_sequence')
+    contact_results = _choices(HappyCall, 'contact_result')
+    call_stages = _choices(ServiceHappyCall, 'call_stage')
+    service_statuses = _choices(ServiceRequest, 'status')
+    point_types = _choices(CustomerPointHistory, 'point_type')
+    delivery_statuses = _choices(CustomerCampaignHistory, 'delivery_status')
+
+    return [
+        ArchivedTimelineSource(
+            'communication', 'communication', '소통',
+            lambda customer_id: CustomerCommunication.objects.filter(customer_id=customer_id),
+            'communication_date', ['communication_type', 'method', 'title', 'result'],
+            lambda row: {
+                'title': row['title'],
+                'detail': f"{communication_types.get(row['communication_type'], '')} · "
+                          f"{methods.get(row['method'], '')}",
+                'status': results.get(row['result'], row['result']),
+                'url': None,
+            },
+        ),
+        TimelineSource(
+            'crm_happycall', '해피콜(고객관리)',
+            lambda customer_id: HappyCall.objects.filter(customer_id=customer_id),
+            'scheduled_date', ['call_sequence', 'contact_result', 'satisfaction_score'],
+            lambda row: {
+                'title': call_sequences.get(row['call_sequence'], ''),
+                'detail': f"만족도 {row['satisfaction_score']}점" if row['satisfaction_score'] else '',
+                'status': contact_results.get(row['contact_result'], row['contact_result']),
+                'url': None,
+            },
+        ),
+        TimelineSource(
+            'happycall', '해피콜',
+            lambda customer_id: ServiceHappyCall.objects.filter(service_request__customer_id=customer_id),
+            'created_at', ['call_stage', 'service_request__service_type__name'],
+            lambda row: {
+                'title': call_stages.get(row['call_stage'], row['call_stage']),
+                'detail': row['service_request__service_type__name'] or '',
+                'status': row['call_stage'],
+                'url': reverse('happycall:detail', args=[row['pk']]),
+            },
+        ),
+        TimelineSource(
+            'service', '서비스',
+            lambda customer_id: ServiceRequest.objects.filter(customer_id=customer_id),
+            'created_at', ['status', 'service_type__name', 'vehicle__vehicle_number', 'estimated_price'],
+            lambda row: {
+                'title': row['service_type__name'] or '',
+                'detail': ' · '.join(filter(None, [
+                    row['vehicle__vehicle_number'],
+                    f"{int(row['estimated_price']):,}원" if row['estimated_price'] else '',
+                ])),
+                'status': service_statuses.get(row['status'], row['status']),
+                'url': reverse('services:service_detail', args=[row['pk']]),
+            },
+        ),
+        TimelineSource(
+            'points', '포인트',
+            lambda customer_id: CustomerPointHistory.objects.filter(customer_id=customer_id),
+            'transaction_date', ['point_type', 'points', 'reason', 'balance_after'],
+            lambda row: {
+                'title': f"{row['points']:+,}P",
+                'detail': row['reason'],
+                'status': point_types.get(row['point_type'], row['point_type']),
+                'url': None,
+            },
+        ),
+        TimelineSource(
+            'campaign', '캠페인',
+            lambda customer_id: CustomerCampaignHistory.objects.filter(customer_id=customer_id),
+            'sent_date', ['campaign__name', 'delivery_status', 'response_type'],
+            lambda row: {
+                'title': row['campaign__name'],
+                'detail': row['response_type'] or '',
+                'status': delivery_statuses.get(row['delivery_status'], row['delivery_status']),
+                'url': None,
+            },
+        ),
+    ]
+
+
+def encode_cursor(event):
+    payload = json.dumps([event['occurred_at'].isoformat(), event['source'], event['id']])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """커서 문자열 → (날짜, 소스, ID). 잘못된 커서는 ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        occurred_at, source, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        occurred_at = parse_datetime(occurred_at)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f'잘못된 커서입니다: {cursor}') from e
+    if occurred_at is None or not isinstance(source, str) or not isinstance(pk, int):
+        raise ValueError(f'잘못된 커서입니다: {cursor}')
+    return occurred_at, source, pk
+
+
+def get_timeline(customer_id, cursor=None, limit=DEFAULT_PAGE_SIZE, sources=None):
+    """
+    고객 타임라인 한 페이지
+
+    {'events': [...], 'next_cursor': 다음 페이지 커서 또는 None} 을 돌려준다.
+    sources 로 소스 이름 목록을 주면 해당 소스만 합친다. 잘못된 커서/소스는 ValueError.
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    position = decode_cursor(cursor) if cursor else None
+
+    selected = _sources()
+    if sources:
+        unknown = set(sources) - {source.name for source in selected}
+        if unknown:
+            raise ValueError(f"알 수 없는 소스: {', '.join(sorted(unknown))}")
+        selected = [source for source in selected if source.name in sources]
+
+    # 한 페이지(limit 건)와 다음 페이지 여부(+1 건)만 필요하므로 소스마다 limit + 1 건씩 읽는다
+    streams = [source.stream(customer_id, position, limit + 1) for source in selected]
+    events = list(islice(heapq.merge(*streams, key=_sort_key, reverse=True), limit + 1))
+
+    has_more = len(events) > limit
+    events = events[:limit]
+    return {
+        'events': events,
+        'next_cursor': encode_cursor(events[-1]) if has_more else None,
+    }
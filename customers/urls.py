@@ -19,6 +19,17 @@ urlpatterns = [
     # 고객 삭제
     path('<int:pk>/delete/', views.CustomerDeleteView.as_view(), name='customer_delete'),
     
+    # 고객 활동 타임라인 (AJAX)
+    path('<int:pk>/timeline/', views.customer_timeline_api, name='customer_timeline'),
+    
+    # 세그먼트 크기 미리보기 (AJAX)
+    path('segments/preview/', views.segment_preview_api, name='segment_preview'),
+    
+    # 캠페인 발송 대상 생성/발송 현황/발송사 결과 콜백
+    path('campaigns/<int:pk>/launch/', views.campaign_launch_api, name='campaign_launch'),
+    path('campaigns/<int:pk>/status/', views.campaign_status_api, name='campaign_status'),
+    path('campaigns/delivery/', views.campaign_delivery_api, name='campaign_delivery'),
+    
     # 고객 검색 (AJAX)
     path('search/', views.customer_search, name='customer_search'),
     
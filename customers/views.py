@@ -8,13 +8,21 @@ from django.http import JsonResponse, HttpResponseRedirect, HttpResponse
 from django.db.models import Q
 from django.core.paginator import Paginator
 from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
+import json
 import openpyxl
 from openpyxl.styles import Font, PatternFill, Alignment
 from datetime import datetime
 
+from .address import CITIES
+from .ownership import current_ownerships
 from .models import Customer
+from core.dbrouting import reporting_db
+from core.querybudget import query_budget
 
 
+@query_budget(15)
 class CustomerListView(LoginRequiredMixin, ListView):
     model = Customer
     template_name = 'customers/customer_list.html'
@@ -34,7 +42,7 @@ class CustomerListView(LoginRequiredMixin, ListView):
         return super().get(request, *args, **kwargs)
     
     def get_queryset(self):
-        queryset = Customer.objects.filter(is_active=True).prefetch_related('vehicle_ownerships')
+        queryset = Customer.objects.filter(is_active=True).prefetch_related(current_ownerships())
         
         # 검색 기능
         search_query = self.request.GET.get('search')
@@ -61,6 +69,14 @@ class CustomerListView(LoginRequiredMixin, ListView):
         if customer_grade:
             queryset = queryset.filter(customer_grade=customer_grade)
         
+        # 지역 필터 (주소에서 뽑아 둔 시/도, 시/군/구 컬럼)
+        address_city = self.request.GET.get('address_city')
+        if address_city:
+            queryset = queryset.filter(address_city=address_city)
+        address_district = self.request.GET.get('address_district', '').strip()
+        if address_district:
+            queryset = queryset.filter(address_district=address_district)
+        
         # 서비스 횟수 필터
         service_count_min = self.request.GET.get('service_count_min')
         service_count_max = self.request.GET.get('service_count_max')
@@ -133,6 +149,9 @@ class CustomerListView(LoginRequiredMixin, ListView):
             'customer_type_filter': self.request.GET.get('customer_type', ''),
             'membership_status_filter': self.request.GET.get('membership_status', ''),
             'customer_grade_filter': self.request.GET.get('customer_grade', ''),
+            'address_city_filter': self.request.GET.get('address_city', ''),
+            'address_district_filter': self.request.GET.get('address_district', ''),
+            'address_cities': sorted(CITIES),
             'service_count_min': self.request.GET.get('service_count_min', ''),
             'service_count_max': self.request.GET.get('service_count_max', ''),
             'service_amount_min': self.request.GET.get('service_amount_min', ''),
@@ -145,6 +164,7 @@ class CustomerListView(LoginRequiredMixin, ListView):
         })
         return context
     
+    @reporting_db()
     def export_to_excel(self):
         """고객 목록을 엑셀로 내보내기"""
         # 동일한 필터링 로직 적용 (페이지네이션 제외)
@@ -182,7 +202,7 @@ class CustomerListView(LoginRequiredMixin, ListView):
             ws.cell(row=row_num, column=4, value=customer.get_full_address())
             ws.cell(row=row_num, column=5, value=customer.get_membership_status_display())
             ws.cell(row=row_num, column=6, value=f"{customer.customer_grade}등급" if customer.customer_grade else "")
-            ws.cell(row=row_num, column=7, value=f"{customer.vehicle_ownerships.count()}대")
+            ws.cell(row=row_num, column=7, value=f"{len(customer.current_ownerships)}대")
             ws.cell(row=row_num, column=8, value=f"{customer.total_service_count}회")
             ws.cell(row=row_num, column=9, value=f"{customer.total_service_amount:,.0f}원")
             ws.cell(row=row_num, column=10, value=customer.last_service_date.strftime("%Y.%m.%d") if customer.last_service_date else "-")
@@ -224,6 +244,12 @@ class CustomerListView(LoginRequiredMixin, ListView):
         if customer_grade:
             filename_parts.append(f"{customer_grade}등급")
         
+        # 지역 추가
+        for region_key in ('address_city', 'address_district'):
+            region = self.request.GET.get(region_key, '').strip()
+            if region:
+                filename_parts.append(region.replace(' ', ''))
+        
         # 서비스 횟수 범위 추가
         service_count_min = self.request.GET.get('service_count_min')
         service_count_max = self.request.GET.get('service_count_max')
@@ -264,39 +290,21 @@ class CustomerDetailView(LoginRequiredMixin, DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        customer = self.get_object()
-        
-        # 서비스 이력 가져오기 (최근 10개) - 차량 정보 포함
-        from services.models import ServiceRequest
-        from django.db.models import Q
-        
-        services = ServiceRequest.objects.filter(
-            Q(customer=customer) | 
-            Q(temp_customer_name=customer.name, temp_customer_phone=customer.phone)
-        ).select_related('assigned_employee', 'vehicle').order_by('-created_at')[:10]
-        
-        # 통계 계산
-        all_services = ServiceRequest.objects.filter(
-            Q(customer=customer) | 
-            Q(temp_customer_name=customer.name, temp_customer_phone=customer.phone)
-        )
-        
-        service_count = all_services.count()
-        total_payment = sum(service.estimated_price or 0 for service in all_services if service.estimated_price)
-        last_service = all_services.first()
-        last_service_date = last_service.created_at if last_service else None
-        
-        # 고객 차량 정보 가져오기
-        vehicles = customer.vehicle_ownerships.filter(end_date__isnull=True).select_related('vehicle')
-        
+
+        # 서비스 이력(최근 10개)/통계/보유 차량은 사전 계산된 고객 프로필에서 읽는다
+        from .profile import get_profile
+        profile = get_profile(self.object.pk) or {}
+        stats = profile.get('service_stats', {})
+
         context.update({
-            'services': services,
-            'service_count': service_count,
-            'total_payment': total_payment,
-            'last_service_date': last_service_date,
-            'vehicles': vehicles,
+            'profile': profile,
+            'services': profile.get('recent_services', []),
+            'service_count': stats.get('count', 0),
+            'total_payment': stats.get('total_payment', 0),
+            'last_service_date': stats.get('last_service_date'),
+            'vehicles': profile.get('vehicles', []),
         })
-        
+
         return context
 
 
@@ -360,6 +368,7 @@ class CustomerDeleteView(LoginRequiredMixin, DeleteView):
 
 
 @login_required
+@query_budget(10)
 def customer_search(request):
     """AJAX 고객 검색"""
     query = request.GET.get('q', '')
@@ -367,11 +376,19 @@ def customer_search(request):
     if len(query) < 2:
         return JsonResponse({'customers': []})
     
-    customers = Customer.objects.filter(
-        Q(name__icontains=query) |
-        Q(phone__icontains=query),
-        is_active=True
-    )[:10]
+    customers = Customer.objects.filter(is_active=True)
+    if any(char.isdigit() for char in query):
+        from .dedup import phone_search_q
+        customers = customers.filter(phone_search_q(query))
+    else:
+        # 이름은 초성("ㄱㅁㅅ")/자모 앞부분 일치로 찾는다 (인덱스 범위 조회, 키 순서로 정렬)
+        from .hangul import key_field_for, prefix_q
+
+        name_q = prefix_q(query, 'name_jamo', 'name_chosung')
+        if name_q is None:
+            return JsonResponse({'customers': []})
+        customers = customers.filter(name_q).order_by(key_field_for(query, 'name_jamo', 'name_chosung'))
+    customers = customers[:10]
     
     customer_data = []
     for customer in customers:
@@ -387,6 +404,124 @@ def customer_search(request):
     return JsonResponse({'customers': customer_data})
 
 
+@login_required
+@query_budget(12)
+def customer_timeline_api(request, pk):
+    """고객 활동 타임라인 API (커서 페이지네이션)
+
+    GET 파라미터: cursor (이전 응답의 next_cursor), limit (기본 50, 최대 200),
+    sources (쉼표 구분 소스 이름, 예: service,happycall)
+    """
+    from .timeline import DEFAULT_PAGE_SIZE, get_timeline
+
+    if not Customer.objects.filter(pk=pk).exists():
+        return JsonResponse({'success': False, 'message': '고객을 찾을 수 없습니다.'}, status=404)
+
+    sources = [name for name in request.GET.get('sources', '').split(',') if name]
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+        page = get_timeline(pk, cursor=request.GET.get('cursor') or None, limit=limit, sources=sources)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    return JsonResponse({'success': True, **page})
+
+
+@login_required
+@query_budget(8)
+def segment_preview_api(request):
+    """세그먼트 크기 미리보기 API
+
+    GET 파라미터: criteria (세그먼트 조건 JSON, customers.segments 참고)
+    """
+    from .segments import SegmentError, preview
+
+    try:
+        result = preview(request.GET.get('criteria', ''))
+    except SegmentError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    return JsonResponse({'success': True, **result})
+
+
+@login_required
+def campaign_launch_api(request, pk):
+    """캠페인 발송 대상 생성 API (POST, CAMPAIGN_ASYNC_SEND 이면 백그라운드 발송 시작)
+
+    대량 발송이 시작되므로 캠페인 수정 권한(customers.change_marketingcampaign)이 있어야 하고 CSRF 토큰을 검사한다.
+    """
+    from .campaigns import launch_campaign, start_sending
+    from .models import MarketingCampaign
+    from .segments import SegmentError
+
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'POST 메서드만 허용됩니다.'}, status=405)
+    if not request.user.has_perm('customers.change_marketingcampaign'):
+        return JsonResponse({'success': False, 'message': '권한이 없습니다.'}, status=403)
+    campaign = get_object_or_404(MarketingCampaign, pk=pk)
+    if campaign.status in ('completed', 'cancelled'):
+        return JsonResponse({'success': False, 'message': f'{campaign.get_status_display()}된 캠페인입니다.'},
+                            status=400)
+
+    try:
+        result = launch_campaign(campaign)
+    except SegmentError as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    sending = bool(getattr(settings, 'CAMPAIGN_ASYNC_SEND', True))
+    if sending:
+        start_sending(campaign.pk)
+    return JsonResponse({'success': True, 'sending': sending, **result})
+
+
+@login_required
+@query_budget(8)
+def campaign_status_api(request, pk):
+    """캠페인 발송 현황 API (상태별 건수, 반응 건수, 최근 1시간 분당 처리량)"""
+    from .campaigns import campaign_stats
+    from .models import MarketingCampaign
+
+    campaign = get_object_or_404(MarketingCampaign, pk=pk)
+    return JsonResponse({'success': True, 'status': campaign.status, **campaign_stats(campaign)})
+
+
+@csrf_exempt
+def campaign_delivery_api(request):
+    """발송사 전달/반응 결과 콜백 API
+
+    POST 본문: 결과 목록 또는 {'updates': [...]}. 각 결과는 message_id 또는 id 와
+    delivery_status, opened_date, response_date, response_type, roi_amount 중 바뀐 값.
+    X-Campaign-Token 헤더가 CAMPAIGN_WEBHOOK_TOKEN 과 같은 발송사 호출이거나, 캠페인 수정 권한이 있는
+    로그인 사용자일 때만 받는다. 로그인 세션으로 호출하면 CSRF 토큰을 검사한다.
+    """
+    import hmac
+    from django.middleware.csrf import CsrfViewMiddleware
+    from .campaigns import apply_delivery_updates
+
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'message': 'POST 메서드만 허용됩니다.'}, status=405)
+    token = getattr(settings, 'CAMPAIGN_WEBHOOK_TOKEN', '')
+    sent_token = request.headers.get('X-Campaign-Token', '')
+    if not (token and hmac.compare_digest(sent_token.encode(), token.encode())):
+        if not request.user.is_authenticated:
+            return JsonResponse({'success': False, 'message': '인증이 필요합니다.'}, status=403)
+        if not request.user.has_perm('customers.change_marketingcampaign'):
+            return JsonResponse({'success': False, 'message': '권한이 없습니다.'}, status=403)
+        rejected = CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {})
+        if rejected is not None:
+            return rejected
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'success': False, 'message': '잘못된 JSON 형식입니다.'}, status=400)
+    updates = data.get('updates') if isinstance(data, dict) else data
+    if not isinstance(updates, list):
+        return JsonResponse({'success': False, 'message': '결과 목록이 필요합니다.'}, status=400)
+
+    return JsonResponse({'success': True, **apply_delivery_updates(updates)})
+
+
 @login_required
 def toggle_customer_active(request, pk):
     """고객 활성화/비활성화 토글"""
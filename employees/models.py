@@ -1,11 +1,14 @@
 from django.db import models
+from core.cache import CacheInvalidationMixin
 from django.contrib.auth import get_user_model
 from scheduling.models import Department
 
 User = get_user_model()
 
-class Employee(models.Model):
+class Employee(CacheInvalidationMixin, models.Model):
     """직원 추가 정보 모델"""
+    cache_tags = ('employees',)  # 대시보드 캐시 무효화 태그
+    
     POSITION_CHOICES = [
         ('staff', '직원'),
         ('manager', '팀장'),
@@ -6,6 +6,7 @@ from django.db.models import Q
 from django.core.paginator import Paginator
 from .models import Employee
 from scheduling.models import Department
+from core.querybudget import query_budget
 
 User = get_user_model()
 
@@ -92,6 +93,8 @@ def employee_list(request):
     return render(request, 'employees/employee_list.html', context)
 
 @login_required
+# 월별 성과 트렌드가 최근 6개월을 월마다 집계하므로 6회 반복은 허용
+@query_budget(60, repeat_threshold=7)
 def employee_detail(request, employee_id):
     """직원 상세 - 통계 및 활동 이력 포함"""
     from django.db.models import Count, Sum, Avg
@@ -229,7 +232,7 @@ def employee_detail(request, employee_id):
         Q(second_call_caller=user) |
         Q(third_call_caller=user) |
         Q(fourth_call_caller=user)
-    ).distinct().order_by('-updated_at')[:10]
+    ).distinct().select_related('service_request__customer').order_by('-updated_at')[:10]
     
     for happycall in recent_happycalls:
         activities.append({
@@ -243,7 +246,7 @@ def employee_detail(request, employee_id):
         })
     
     # 최근 생성한 서비스
-    recent_services = created_services.order_by('-created_at')[:10]
+    recent_services = created_services.select_related('customer', 'service_type').order_by('-created_at')[:10]
     for service in recent_services:
         activities.append({
             'type': 'service',
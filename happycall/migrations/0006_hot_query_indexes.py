@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-19 05:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('happycall', '0005_alter_happycall_overall_satisfaction_and_more'),
+        ('services', '0013_servicerequest_service_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='happycall',
+            index=models.Index(fields=['call_stage'], name='happycall_h_call_st_88ca00_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='happycall',
+            index=models.Index(fields=['created_at'], name='happycall_h_created_b019a0_idx'),
+        ),
+    ]
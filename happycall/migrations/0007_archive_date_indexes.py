@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('happycall', '0006_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='callfailurerevenueloss',
+            index=models.Index(fields=['recorded_at'], name='happycall_c_recorde_6efe99_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='revenuerecoverylog',
+            index=models.Index(fields=['recovery_date'], name='happycall_r_recover_d54e24_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='smslog',
+            index=models.Index(fields=['sent_at'], name='happycall_s_sent_at_7795e7_idx'),
+        ),
+    ]
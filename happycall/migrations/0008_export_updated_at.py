@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 07:25
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_revenue_updated_at(apps, schema_editor):
+    # 기존 기록은 마지막 상태 변경 시각으로 (추가 시점 값이면 첫 증분 내보내기에 전부 다시 나옴)
+    HappyCallRevenue = apps.get_model('happycall', 'HappyCallRevenue')
+    HappyCallRevenue.objects.update(updated_at=Coalesce('completed_at', 'accepted_at', 'proposed_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0006_salesvoucher_updated_index'),
+        ('happycall', '0007_archive_date_indexes'),
+        ('services', '0016_grade_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='happycallrevenue',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='수정일'),
+        ),
+        migrations.AddIndex(
+            model_name='happycall',
+            index=models.Index(fields=['updated_at'], name='happycall_h_updated_7b54e0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='happycallrevenue',
+            index=models.Index(fields=['updated_at'], name='happycall_h_updated_3e7b8e_idx'),
+        ),
+        migrations.RunPython(fill_revenue_updated_at, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,8 @@
 from django.db import models
+from core.cache import CacheInvalidationMixin
+from core.fulltext import FullTextIndexMixin
+from customers.profile import ProfileInvalidationMixin
+from core.dbrouting import reporting_db
 from django.contrib.auth import get_user_model
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -8,8 +12,15 @@ from services.models import ServiceRequest
 
 User = get_user_model()
 
-class HappyCall(models.Model):
+class HappyCall(FullTextIndexMixin, ProfileInvalidationMixin, CacheInvalidationMixin, models.Model):
     """해피콜 - 서비스 완료 후 고객 만족도 조사"""
+    cache_tags = ('happycalls',)  # 대시보드 캐시 무효화 태그
+    # 전문 검색 (core.fulltext): 고객 의견과 단계별/관심 서비스/거부 메모
+    search_source = 'happycall'
+    search_fields = ('customer_feedback', 'first_call_notes', 'second_call_notes', 'third_call_notes',
+                     'fourth_call_notes', 'engine_oil_promotion_notes', 'long_term_customer_notes',
+                     'interested_service_notes', 'rejection_reason')
+    search_related = ('service_request',)
     
     CALL_STAGE_CHOICES = [
         # 1차콜 (1주일 후) - 만족도 + 엔진오일 프로모션
@@ -199,10 +210,26 @@ class HappyCall(models.Model):
         verbose_name = '해피콜'
         verbose_name_plural = '해피콜들'
         ordering = ['-first_call_scheduled_date', '-created_at']
+        indexes = [
+            # 단계별 현황/배정 대상, 기간별 대시보드 집계
+            models.Index(fields=['call_stage']),
+            models.Index(fields=['created_at']),
+            # 분석용 증분 내보내기 (core.parquet_export)
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return f"해피콜 - {self.service_request.customer.name} ({self.get_call_stage_display()})"
-    
+
+    def profile_customer_ids(self):
+        return list(ServiceRequest.objects.filter(pk=self.service_request_id).values_list('customer_id', flat=True))
+
+    def search_document(self):
+        from django.urls import reverse
+
+        return (self.service_request.customer_id, f'해피콜 - {self.get_call_stage_display()}',
+                self.updated_at, reverse('happycall:detail', args=[self.pk]))
+
     @property
     def customer_name(self):
         return self.service_request.customer.name
@@ -302,8 +329,19 @@ class HappyCall(models.Model):
         next_stage = stage_transitions.get(self.call_stage)
         if next_stage:
             self.call_stage = next_stage
+            if next_stage.startswith('4th') and not self.fourth_call_scheduled_date:
+                self.fourth_call_scheduled_date = self.inspection_reminder_datetime()
             self.save()
     
+    def inspection_reminder_datetime(self):
+        """4차콜(다음 검사 안내) 예정일시 - 차량 정기검사 예정일 INSPECTION_REMINDER_DAYS 일 전 (예정일이 없으면 None)"""
+        from customers.mileage import reminder_datetime
+        
+        vehicle = self.service_request.vehicle
+        if vehicle is None:
+            return None
+        return reminder_datetime(vehicle.next_inspection_date, getattr(settings, 'INSPECTION_REMINDER_DAYS', 30))
+    
     def complete_current_stage(self):
         """현재 콜 단계를 완료로 변경"""
         stage_completion_map = {
@@ -609,6 +647,7 @@ class HappyCallRevenue(models.Model):
     accepted_at = models.DateTimeField('수락일시', null=True, blank=True)
     completed_at = models.DateTimeField('완료일시', null=True, blank=True)
     notes = models.TextField('비고', blank=True)
+    updated_at = models.DateTimeField('수정일', auto_now=True)
     
     # Task 7.3: 매출 이월 관련 필드 (임시 제거)
     # deferred_reason = models.TextField('이월 사유', blank=True, help_text='콜 실패 등으로 인한 매출 이월 사유')
@@ -622,6 +661,8 @@ class HappyCallRevenue(models.Model):
             models.Index(fields=['happy_call', 'call_stage']),
             models.Index(fields=['revenue_type', 'status']),
             models.Index(fields=['proposed_at']),
+            # 분석용 증분 내보내기 (core.parquet_export)
+            models.Index(fields=['updated_at']),
         ]
     
     def __str__(self):
@@ -657,8 +698,12 @@ class HappyCallRevenue(models.Model):
         }
 
 
-class CallRejection(models.Model):
+class CallRejection(FullTextIndexMixin, models.Model):
     """Task 6.2: 고객 거부 의사 관리 (유형별 세분화)"""
+    # 전문 검색 (core.fulltext): 거부 사유와 상세 사유/검토 의견
+    search_source = 'rejection'
+    search_fields = ('customer_reason', 'customer_reason_details', 'staff_notes', 'manager_notes', 'admin_notes')
+    search_related = ('happy_call__service_request',)
     REJECTION_TYPE_CHOICES = [
         ('all_calls', '모든 해피콜 거부'),
         ('current_stage', '현재 단계만 거부'),
@@ -755,6 +800,18 @@ class CallRejection(models.Model):
     
     def __str__(self):
         return f"{self.happy_call.service_request.customer_name} - {self.get_rejection_type_display()}"
+
+    def search_text(self):
+        # 거부 사유는 코드 대신 표시 이름으로 색인
+        values = [self.get_customer_reason_display() if self.customer_reason else '']
+        values += [getattr(self, field).strip() for field in self.search_fields[1:]]
+        return '\n'.join(value for value in values if value)
+
+    def search_document(self):
+        from django.urls import reverse
+
+        return (self.happy_call.service_request.customer_id, f'해피콜 거부 - {self.get_rejection_type_display()}',
+                self.created_at, reverse('happycall:detail', args=[self.happy_call_id]))
     
     def can_be_approved_by_manager(self):
         """팀장이 승인할 수 있는지 확인"""
@@ -1315,6 +1372,8 @@ class CallFailureRevenueLoss(models.Model):
             models.Index(fields=['happy_call', 'failed_stage']),
             models.Index(fields=['failure_reason', 'recorded_at']),
             models.Index(fields=['revenue_recovered']),
+            # 기간 리포트/월별 보관 구간
+            models.Index(fields=['recorded_at']),
         ]
     
     def __str__(self):
@@ -1373,6 +1432,8 @@ class SMSLog(models.Model):
             models.Index(fields=['happy_call', 'sms_type']),
             models.Index(fields=['success', 'sent_at']),
             models.Index(fields=['phone_number']),
+            # 월별 보관 구간
+            models.Index(fields=['sent_at']),
         ]
     
     def __str__(self):
@@ -1408,6 +1469,10 @@ class RevenueRecoveryLog(models.Model):
         verbose_name = '매출 회복 로그'
         verbose_name_plural = '매출 회복 로그들'
         ordering = ['-recovery_date']
+        indexes = [
+            # 기간 리포트/월별 보관 구간
+            models.Index(fields=['recovery_date']),
+        ]
     
     def save(self, *args, **kwargs):
         # 회복률 자동 계산
@@ -1424,6 +1489,7 @@ class CallFailureAnalysisManager:
     """콜 실패율과 매출 손실 상관관계 분석 매니저"""
     
     @staticmethod
+    @reporting_db()
     def generate_failure_revenue_correlation_report(date_from=None, date_to=None):
         """Task 7.5: 콜 실패율과 매출 손실 상관관계 분석 리포트 생성"""
         from django.db.models import Count, Sum, Avg, Q
@@ -1449,10 +1515,10 @@ class CallFailureAnalysisManager:
             created_at__range=[date_from, date_to]
         )
         
-        # 4. 매출 손실 기록 통계
-        revenue_losses = CallFailureRevenueLoss.objects.filter(
-            recorded_at__range=[date_from, date_to]
-        )
+        # 4. 매출 손실 기록 통계 (보관된 기록 포함)
+        from core.archive import history_totals
+        loss_totals = history_totals('call_failure_revenue_loss', ('estimated_revenue_loss', 'recovered_amount'),
+                                     date_from, date_to)
         
         # 5. 단계별 실패율 및 매출 손실 분석
         stage_analysis = CallFailureAnalysisManager.analyze_by_call_stage(date_from, date_to)
@@ -1478,8 +1544,8 @@ class CallFailureAnalysisManager:
                 'failure_rate': (failed_calls.count() / total_happycalls.count() * 100) if total_happycalls.count() > 0 else 0,
                 'total_callbacks_created': callbacks.count(),
                 'callback_success_rate': CallFailureAnalysisManager.calculate_overall_callback_success_rate(callbacks),
-                'total_revenue_loss': revenue_losses.aggregate(total=Sum('estimated_revenue_loss'))['total'] or 0,
-                'total_revenue_recovered': revenue_losses.aggregate(total=Sum('recovered_amount'))['total'] or 0
+                'total_revenue_loss': loss_totals['estimated_revenue_loss'],
+                'total_revenue_recovered': loss_totals['recovered_amount']
             },
             'stage_analysis': stage_analysis,
             'reason_analysis': reason_analysis,
@@ -1494,9 +1560,13 @@ class CallFailureAnalysisManager:
     def analyze_by_call_stage(date_from, date_to):
         """단계별 실패율 및 매출 손실 분석"""
         from django.db.models import Count, Sum, Avg
+        from core.archive import history_totals
         
         stages = ['1st', '2nd', '3rd', '4th']
         stage_data = {}
+        # 단계별 매출 손실 (보관된 기록 포함)
+        stage_losses = history_totals('call_failure_revenue_loss', ('estimated_revenue_loss', 'revenue_recovered'),
+                                      date_from, date_to, group_by='failed_stage')
         
         for stage in stages:
             # 해당 단계의 전체 콜 수
@@ -1509,10 +1579,7 @@ class CallFailureAnalysisManager:
             failed_stage_calls = stage_calls.filter(status='failed')
             
             # 해당 단계의 매출 손실
-            stage_losses = CallFailureRevenueLoss.objects.filter(
-                recorded_at__range=[date_from, date_to],
-                failed_stage=stage
-            )
+            losses = stage_losses.get(stage, {'count': 0, 'estimated_revenue_loss': 0, 'revenue_recovered': 0})
             
             # 해당 단계의 콜백 성공률
             stage_callbacks = CallbackSchedule.objects.filter(
@@ -1526,12 +1593,12 @@ class CallFailureAnalysisManager:
                 'total_calls': stage_calls.count(),
                 'failed_calls': failed_stage_calls.count(),
                 'failure_rate': (failed_stage_calls.count() / stage_calls.count() * 100) if stage_calls.count() > 0 else 0,
-                'total_revenue_loss': stage_losses.aggregate(total=Sum('estimated_revenue_loss'))['total'] or 0,
-                'avg_loss_per_failure': stage_losses.aggregate(avg=Avg('estimated_revenue_loss'))['avg'] or 0,
+                'total_revenue_loss': losses['estimated_revenue_loss'],
+                'avg_loss_per_failure': (losses['estimated_revenue_loss'] / losses['count']) if losses['count'] else 0,
                 'callbacks_created': stage_callbacks.count(),
                 'callbacks_successful': successful_callbacks.count(),
                 'callback_success_rate': (successful_callbacks.count() / stage_callbacks.count() * 100) if stage_callbacks.count() > 0 else 0,
-                'revenue_recovery_rate': CallFailureAnalysisManager.calculate_stage_recovery_rate(stage, date_from, date_to)
+                'revenue_recovery_rate': (losses['revenue_recovered'] / losses['count'] * 100) if losses['count'] else 0
             }
         
         return stage_data
@@ -1541,31 +1608,26 @@ class CallFailureAnalysisManager:
         """실패 사유별 분석"""
         from django.db.models import Count, Sum, Avg
         
+        from core.archive import history_totals
+        
         reason_data = {}
         
-        failure_reasons = CallFailureRevenueLoss.objects.filter(
-            recorded_at__range=[date_from, date_to]
-        ).values('failure_reason').distinct()
+        # 사유별 매출 손실 (보관된 기록 포함)
+        reason_totals = history_totals('call_failure_revenue_loss', ('estimated_revenue_loss', 'revenue_recovered'),
+                                       date_from, date_to, group_by='failure_reason')
         
-        for reason_obj in failure_reasons:
-            reason = reason_obj['failure_reason']
-            
-            reason_losses = CallFailureRevenueLoss.objects.filter(
-                recorded_at__range=[date_from, date_to],
-                failure_reason=reason
-            )
-            
+        for reason, losses in reason_totals.items():
             # 해당 사유의 콜백 성공률
             related_callbacks = CallbackSchedule.objects.filter(
-                happy_call__callfailurerevenue_loss__failure_reason=reason,
+                happy_call__callfailurerevenueloss__failure_reason=reason,
                 created_at__range=[date_from, date_to]
             )
             
             reason_data[reason] = {
-                'total_occurrences': reason_losses.count(),
-                'total_revenue_loss': reason_losses.aggregate(total=Sum('estimated_revenue_loss'))['total'] or 0,
-                'avg_loss_per_occurrence': reason_losses.aggregate(avg=Avg('estimated_revenue_loss'))['avg'] or 0,
-                'recovery_rate': (reason_losses.filter(revenue_recovered=True).count() / reason_losses.count() * 100) if reason_losses.count() > 0 else 0,
+                'total_occurrences': losses['count'],
+                'total_revenue_loss': losses['estimated_revenue_loss'],
+                'avg_loss_per_occurrence': (losses['estimated_revenue_loss'] / losses['count']) if losses['count'] else 0,
+                'recovery_rate': (losses['revenue_recovered'] / losses['count'] * 100) if losses['count'] else 0,
                 'callback_effectiveness': CallFailureAnalysisManager.calculate_callback_effectiveness_by_reason(reason, date_from, date_to)
             }
         
@@ -1575,31 +1637,44 @@ class CallFailureAnalysisManager:
     def analyze_revenue_recovery(date_from, date_to):
         """매출 회복 분석"""
         from django.db.models import Sum, Avg, Count
+        from core.archive import history_totals
         
         recovery_logs = RevenueRecoveryLog.objects.filter(
             recovery_date__range=[date_from, date_to]
         )
         
-        recovery_sources = recovery_logs.values('recovery_source').annotate(
-            count=Count('id'),
-            total_recovered=Sum('recovered_amount'),
-            avg_recovery_rate=Avg('recovery_rate')
-        )
+        # 회복 경로별 합계 (보관된 로그 포함)
+        source_totals = history_totals('revenue_recovery_log', ('recovered_amount', 'recovery_rate'),
+                                       date_from, date_to, group_by='recovery_source')
+        recovery_sources = [
+            {
+                'recovery_source': source,
+                'count': totals['count'],
+                'total_recovered': totals['recovered_amount'],
+                'avg_recovery_rate': totals['recovery_rate'] / totals['count'],
+            }
+            for source, totals in source_totals.items() if totals['count']
+        ]
+        total_recoveries = sum(source['count'] for source in recovery_sources)
         
         return {
-            'total_recoveries': recovery_logs.count(),
-            'total_recovered_amount': recovery_logs.aggregate(total=Sum('recovered_amount'))['total'] or 0,
-            'avg_recovery_rate': recovery_logs.aggregate(avg=Avg('recovery_rate'))['avg'] or 0,
-            'recovery_by_source': list(recovery_sources),
+            'total_recoveries': total_recoveries,
+            'total_recovered_amount': sum(source['total_recovered'] for source in recovery_sources),
+            'avg_recovery_rate': (sum(totals['recovery_rate'] for totals in source_totals.values()) / total_recoveries
+                                  if total_recoveries else 0),
+            'recovery_by_source': recovery_sources,
             'best_recovery_method': CallFailureAnalysisManager.identify_best_recovery_method(recovery_sources),
             'recovery_timeline': CallFailureAnalysisManager.analyze_recovery_timeline(recovery_logs)
         }
     
     @staticmethod
+    @reporting_db()
     def calculate_failure_revenue_correlation():
         """실패율과 매출 손실의 상관관계 계산"""
         from django.db.models import Count, Sum
+        from datetime import timedelta
         import json
+        from core.archive import history_totals
         
         # 월별 실패율과 매출 손실 데이터 수집
         monthly_data = []
@@ -1614,13 +1689,12 @@ class CallFailureAnalysisManager:
             )
             
             month_failures = month_calls.filter(status='failed')
-            month_losses = CallFailureRevenueLoss.objects.filter(
-                recorded_at__range=[month_start, month_end]
-            )
             
             if month_calls.count() > 0:
                 failure_rate = month_failures.count() / month_calls.count() * 100
-                total_loss = month_losses.aggregate(total=Sum('estimated_revenue_loss'))['total'] or 0
+                # 1년 전까지 보므로 보관된 손실 기록도 합친다
+                total_loss = history_totals('call_failure_revenue_loss', ('estimated_revenue_loss',),
+                                            month_start, month_end)['estimated_revenue_loss']
                 
                 monthly_data.append({
                     'month': month_start.strftime('%Y-%m'),
@@ -1755,24 +1829,21 @@ class CallFailureAnalysisManager:
     
     @staticmethod
     def calculate_stage_recovery_rate(stage, date_from, date_to):
-        """단계별 매출 회복률 계산"""
-        stage_losses = CallFailureRevenueLoss.objects.filter(
-            recorded_at__range=[date_from, date_to],
-            failed_stage=stage
-        )
+        """단계별 매출 회복률 계산 (보관된 기록 포함)"""
+        from core.archive import history_totals
         
-        if stage_losses.count() == 0:
+        losses = history_totals('call_failure_revenue_loss', ('revenue_recovered',), date_from, date_to,
+                                failed_stage=stage)
+        if losses['count'] == 0:
             return 0
-            
-        recovered_losses = stage_losses.filter(revenue_recovered=True)
-        return (recovered_losses.count() / stage_losses.count()) * 100
+        return (losses['revenue_recovered'] / losses['count']) * 100
     
     @staticmethod
     def calculate_callback_effectiveness_by_reason(reason, date_from, date_to):
         """실패 사유별 콜백 효과 계산"""
         # 해당 실패 사유로 인한 콜백들의 성공률
         reason_callbacks = CallbackSchedule.objects.filter(
-            happy_call__callfailurerevenue_loss__failure_reason=reason,
+            happy_call__callfailurerevenueloss__failure_reason=reason,
             created_at__range=[date_from, date_to]
         )
         
@@ -1,7 +1,7 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Max, Prefetch
+from django.db.models import Max, OuterRef, Prefetch, Q, Subquery
 from django.utils import timezone
 from django.core.paginator import Paginator
 from django.http import JsonResponse
@@ -9,9 +9,18 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from datetime import datetime, timedelta
 from customers.models import Customer, CustomerVehicle
+from customers.ownership import current_ownerships
 from services.models import ServiceRequest
 from employees.models import Employee
 from .models import HappyCall, HappyCallRevenue
+from core.dbrouting import reporting_db
+from core.querybudget import query_budget
+
+# 정비 예정 필터 (customers.mileage 예측): filter_type → (차량 예정일 필드, 기본 조회 기간(일), 이름)
+DUE_FILTERS = {
+    'oil_due': ('next_oil_change_date', 14, '엔진오일 교환'),
+    'inspection_due': ('next_inspection_date', 30, '정기검사'),
+}
 
 @login_required
 def my_happycalls(request):
@@ -128,6 +137,8 @@ def happycall_list(request):
     })
 
 @login_required
+@query_budget(20)
+@reporting_db()
 def manager_dashboard(request):
     """팀장 대시보드 - 팀원들의 해피콜 현황"""
     # 권한 체크 (관리자 또는 팀장만)
@@ -164,52 +175,71 @@ def manager_dashboard(request):
         date_from = today - timedelta(days=30)
         date_to = today
     
-    # 기본 쿼리셋에 날짜 필터 적용
-    base_queryset = HappyCall.objects.filter(
-        created_at__date__gte=date_from,
-        created_at__date__lte=date_to
-    )
-    
-    # 전체 해피콜 통계
-    total_stats = base_queryset.aggregate(
-        total=Count('id'),
-        pending=Count('id', filter=Q(call_stage__endswith='_pending')),
-        in_progress=Count('id', filter=Q(call_stage__endswith='_in_progress')),
-        completed=Count('id', filter=Q(call_stage__endswith='_completed')),
-        failed=Count('id', filter=Q(call_stage__endswith='_failed'))
-    )
-    
-    # 담당자별 통계
-    staff_stats = []
+    def build_stats():
+        # 기본 쿼리셋에 날짜 필터 적용
+        base_queryset = HappyCall.objects.filter(
+            created_at__date__gte=date_from,
+            created_at__date__lte=date_to
+        )
     
-    # 활성 직원 목록
-    employees = Employee.objects.filter(status='active').select_related('user')
-    
-    for employee in employees:
-        user = employee.user
-        stats = base_queryset.filter(
-            Q(first_call_caller=user) |
-            Q(second_call_caller=user) |
-            Q(third_call_caller=user) |
-            Q(fourth_call_caller=user)
-        ).aggregate(
+        # 전체 해피콜 통계
+        total_stats = base_queryset.aggregate(
             total=Count('id'),
             pending=Count('id', filter=Q(call_stage__endswith='_pending')),
-            in_progress=Count('id', filter=Q(call_stage__endswith='_in_progress')), 
+            in_progress=Count('id', filter=Q(call_stage__endswith='_in_progress')),
             completed=Count('id', filter=Q(call_stage__endswith='_completed')),
             failed=Count('id', filter=Q(call_stage__endswith='_failed'))
         )
+    
+        # 담당자별 통계
+        staff_stats = []
+    
+        # 활성 직원 목록
+        employees = list(Employee.objects.filter(status='active').select_related('user', 'department'))
+    
+        # 직원별 조건부 집계를 한 번의 쿼리로 수행 (직원 수만큼 쿼리하지 않도록)
+        stage_filters = {
+            'total': Q(),
+            'pending': Q(call_stage__endswith='_pending'),
+            'in_progress': Q(call_stage__endswith='_in_progress'),
+            'completed': Q(call_stage__endswith='_completed'),
+            'failed': Q(call_stage__endswith='_failed'),
+        }
+        aggregates = {}
+        for employee in employees:
+            user = employee.user
+            caller_filter = (
+                Q(first_call_caller=user) |
+                Q(second_call_caller=user) |
+                Q(third_call_caller=user) |
+                Q(fourth_call_caller=user)
+            )
+            for key, stage_filter in stage_filters.items():
+                aggregates[f'{key}_{employee.pk}'] = Count('id', filter=caller_filter & stage_filter)
+        counts = base_queryset.aggregate(**aggregates) if aggregates else {}
+    
+        for employee in employees:
+            stats = {key: counts[f'{key}_{employee.pk}'] for key in stage_filters}
         
-        if stats['total'] > 0:
-            stats['completion_rate'] = round((stats['completed'] / stats['total']) * 100, 1)
-            staff_stats.append({
-                'employee': employee,
-                'user': user,
-                **stats
-            })
+            if stats['total'] > 0:
+                stats['completion_rate'] = round((stats['completed'] / stats['total']) * 100, 1)
+                staff_stats.append({
+                    'employee': employee,
+                    'user': employee.user,
+                    **stats
+                })
+    
+        # 완료율 기준으로 정렬
+        staff_stats.sort(key=lambda x: x['completion_rate'], reverse=True)
+        
+        return {'total_stats': total_stats, 'staff_stats': staff_stats}
     
-    # 완료율 기준으로 정렬
-    staff_stats.sort(key=lambda x: x['completion_rate'], reverse=True)
+    # 해피콜/직원 저장 시 무효화, 최대 5분 캐시
+    from core.cache import get_or_set
+    stats = get_or_set('dashboard:happycall_manager', build_stats, tags=('happycalls', 'employees'),
+                       timeout=300, params=(date_from, date_to))
+    total_stats = stats['total_stats']
+    staff_stats = stats['staff_stats']
     
     return render(request, 'happycall/manager_dashboard.html', {
         'total_stats': total_stats,
@@ -340,6 +370,7 @@ def staff_detail(request, user_id):
     })
 
 @login_required
+@query_budget(12)
 def happycall_assign(request):
     """해피콜 일괄 생성 페이지 (검사 완료 고객 대상)"""
     if request.method == 'POST':
@@ -353,8 +384,18 @@ def happycall_assign(request):
     
     # 기본 날짜 범위 설정
     today = timezone.now().date()
-    
-    if filter_type == 'inspected_today':
+    due_field = None
+    
+    if filter_type in DUE_FILTERS:
+        # 다음 정비 예정일이 기간 안인 차량 (기본: 오늘부터 N일)
+        due_field, due_days, _ = DUE_FILTERS[filter_type]
+        if start_date and end_date:
+            date_from = datetime.strptime(start_date, '%Y-%m-%d').date()
+            date_to = datetime.strptime(end_date, '%Y-%m-%d').date()
+        else:
+            date_from = today
+            date_to = today + timedelta(days=due_days)
+    elif filter_type == 'inspected_today':
         # 오늘 검사 받은 고객
         date_from = today
         date_to = today
@@ -391,7 +432,7 @@ def happycall_assign(request):
     customers_query = Customer.objects.filter(
         is_active=True
     ).select_related().prefetch_related(
-        'vehicle_ownerships__vehicle',
+        current_ownerships(),
         'happy_calls'
     )
     
@@ -404,7 +445,10 @@ def happycall_assign(request):
         )
     
     # 날짜 필터
-    if filter_type == 'no_inspection':
+    if due_field:
+        # 현재 소유 차량의 예정일 인덱스 범위 조회
+        customers_query = customers_query.filter(**{f'current_vehicles__{due_field}__range': (date_from, date_to)})
+    elif filter_type == 'no_inspection':
         # 검사 기록이 없는 고객 (여러 검사 관련 키워드 포함)
         inspection_customer_ids = ServiceRequest.objects.filter(
             Q(service_type__name__icontains='검사') |
@@ -479,15 +523,61 @@ def happycall_assign(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
-    # 로깅 설정 (먼저 정의)
-    import logging
-    logger = logging.getLogger(__name__)
-    
+    # 페이지 고객의 검사/서비스/해피콜 정보는 고객 수와 무관하게 몇 번의 조회로 모아 읽는다
+    page_customers = list(page_obj)
+    page_ids = [customer.pk for customer in page_customers]
+
+    # 기간 안의 차량별 최근 검사 일시 {(고객 ID, 차량 ID): 일시}
+    vehicle_inspections = {}
+    if not due_field and date_from and date_to:
+        vehicle_inspections = {
+            (row['customer_id'], row['vehicle_id']): row['latest']
+            for row in ServiceRequest.objects.filter(
+                customer_id__in=page_ids,
+                service_type__name__icontains='검사',
+                service_date__date__range=[date_from, date_to]
+            ).order_by().values('customer_id', 'vehicle_id').annotate(latest=Max('service_date'))
+        }
+
+    # 고객별 최근 검사일, 최근 서비스(일시, 유형), 최근 해피콜일
+    customer_requests = ServiceRequest.objects.filter(customer=OuterRef('pk')).order_by('-service_date')
+    summaries = {
+        row['pk']: row
+        for row in Customer.objects.filter(pk__in=page_ids).annotate(
+            latest_inspection_at=Subquery(customer_requests.filter(
+                service_type__name__icontains='검사').values('service_date')[:1]),
+            latest_service_at=Subquery(customer_requests.values('service_date')[:1]),
+            latest_service_type=Subquery(customer_requests.values('service_type__name')[:1]),
+            latest_happycall_at=Subquery(HappyCall.objects.filter(
+                service_request__customer=OuterRef('pk')).order_by('-created_at').values('created_at')[:1]),
+        ).values('pk', 'latest_inspection_at', 'latest_service_at', 'latest_service_type', 'latest_happycall_at')
+    }
+
+    # 배정된 고객인 경우 진행중인 해피콜 (고객별 첫 건)
+    assigned_happycalls = {}
+    if show_assigned:
+        in_progress = HappyCall.objects.filter(
+            Q(service_request__customer_id__in=page_ids) &
+            (Q(call_stage__endswith='_pending') |
+            Q(call_stage__endswith='_pending_approval') |
+            Q(call_stage__endswith='_in_progress') |
+            Q(call_stage__endswith='_failed'))
+        ).exclude(
+            Q(call_stage__endswith='_completed') |
+            Q(call_stage='rejected') |
+            Q(call_stage='skip')
+        ).select_related(
+            'service_request', 'first_call_caller', 'second_call_caller',
+            'third_call_caller', 'fourth_call_caller'
+        )
+        for happycall in in_progress:
+            assigned_happycalls.setdefault(happycall.service_request.customer_id, happycall)
+
     # 고객별 상세 정보 구성
     customer_data = []
-    for customer in page_obj:
+    for customer in page_customers:
         # 차량 정보 및 필터 매칭 차량 식별
-        vehicles = [ov.vehicle for ov in customer.vehicle_ownerships.filter(end_date__isnull=True)]
+        vehicles = [ownership.vehicle for ownership in customer.current_ownerships]
         vehicle_info = []
         matching_vehicle_numbers = []
         
@@ -495,102 +585,55 @@ def happycall_assign(request):
             vehicle_number = vehicle.vehicle_number
             
             # 이 특정 차량이 필터 조건에 맞는 검사를 받았는지 확인
-            is_matching = False
-            if date_from and date_to:
-                # 해당 특정 차량의 검사 기록 확인
-                vehicle_inspections = ServiceRequest.objects.filter(
-                    customer=customer,
-                    vehicle=vehicle,  # 특정 차량으로 제한
-                    service_type__name__icontains='검사',
-                    service_date__date__range=[date_from, date_to]
-                )
-                
-                # 디버깅용 로깅
-                logger.info(f"Customer: {customer.name}, Vehicle: {vehicle_number}")
-                logger.info(f"Date range: {date_from} ~ {date_to}")
-                logger.info(f"Vehicle inspections found: {vehicle_inspections.count()}")
-                for inspection in vehicle_inspections:
-                    logger.info(f"  - Service: {inspection.service_type.name}, Date: {inspection.service_date.date()}")
-                
-                if vehicle_inspections.exists():
-                    is_matching = True
-                    matching_vehicle_numbers.append(vehicle_number)
-                    logger.info(f"  -> MATCHING: {vehicle_number}")
-                    
-                    # 해당 차량의 가장 최근 검사일 가져오기
-                    latest_vehicle_inspection = vehicle_inspections.order_by('-service_date').first()
-                    vehicle_inspection_date = latest_vehicle_inspection.service_date.date()
-                else:
-                    logger.info(f"  -> NOT MATCHING: {vehicle_number}")
-                    vehicle_inspection_date = None
+            due_date = getattr(vehicle, due_field) if due_field else None
+            vehicle_inspection_date = None
+            if due_field:
+                # 정비 예정 필터는 차량 예정일로 바로 판단 (조회 없음)
+                is_matching = due_date is not None and date_from <= due_date <= date_to
             else:
-                vehicle_inspection_date = None
+                # 해당 특정 차량의 기간 내 최근 검사일
+                inspected_at = vehicle_inspections.get((customer.pk, vehicle.pk))
+                is_matching = inspected_at is not None
+                if is_matching:
+                    vehicle_inspection_date = inspected_at.date()
+            if is_matching:
+                matching_vehicle_numbers.append(vehicle_number)
             
             vehicle_info.append({
                 'number': vehicle_number,
                 'is_matching': is_matching,
-                'inspection_date': vehicle_inspection_date  # 검사일 추가
+                'inspection_date': vehicle_inspection_date,  # 검사일 추가
+                'due_date': due_date if is_matching else None,  # 정비 예정일
             })
         
         vehicle_numbers = [v.vehicle_number for v in vehicles]
-        
-        # 최근 검사일 
-        latest_inspection = ServiceRequest.objects.filter(
-            customer=customer,
-            service_type__name__icontains='검사'
-        ).select_related('service_type').order_by('-service_date').first()
-        
-        # 최근 서비스일
-        latest_service = ServiceRequest.objects.filter(
-            customer=customer
-        ).select_related('service_type').order_by('-service_date').first()
-        
-        # 최근 해피콜일 (happycall 앱의 HappyCall 사용)
-        latest_happycall = HappyCall.objects.filter(
-            service_request__customer=customer
-        ).order_by('-created_at').first()
-        
-        # 배정된 고객인 경우 진행중인 해피콜 정보 추가 (happycall 앱의 HappyCall 사용)
-        assigned_happycall = None
-        if show_assigned:
-            assigned_happycall = HappyCall.objects.filter(
-                Q(service_request__customer=customer) &
-                (Q(call_stage__endswith='_pending') |
-                Q(call_stage__endswith='_pending_approval') |
-                Q(call_stage__endswith='_in_progress') |
-                Q(call_stage__endswith='_failed'))
-            ).exclude(
-                Q(call_stage__endswith='_completed') |
-                Q(call_stage='rejected') |
-                Q(call_stage='skip')
-            ).select_related(
-                'first_call_caller', 'second_call_caller', 
-                'third_call_caller', 'fourth_call_caller'
-            ).first()
+        summary = summaries.get(customer.pk, {})
+        latest_inspection_at = summary.get('latest_inspection_at')
+        latest_service_at = summary.get('latest_service_at')
+        latest_happycall_at = summary.get('latest_happycall_at')
         
         customer_data.append({
             'customer': customer,
             'vehicle_numbers': vehicle_numbers,
             'vehicle_info': vehicle_info,  # 차량별 매칭 정보
             'matching_vehicle_numbers': matching_vehicle_numbers,  # 조건에 맞는 차량번호들
-            'latest_inspection_date': latest_inspection.service_date.date() if latest_inspection and latest_inspection.service_date else None,
-            'latest_service_date': latest_service.service_date.date() if latest_service and latest_service.service_date else None,
-            'latest_service_type': latest_service.service_type.name if latest_service else None,
-            'latest_happycall_date': latest_happycall.created_at.date() if latest_happycall else None,
-            'assigned_happycall': assigned_happycall,  # 배정된 해피콜 정보 추가
+            'latest_inspection_date': latest_inspection_at.date() if latest_inspection_at else None,
+            'latest_service_date': latest_service_at.date() if latest_service_at else None,
+            'latest_service_type': summary.get('latest_service_type'),
+            'latest_happycall_date': latest_happycall_at.date() if latest_happycall_at else None,
+            'assigned_happycall': assigned_happycalls.get(customer.pk),  # 배정된 해피콜 정보 추가
         })
     
     # 활성 직원 목록
-    employees = Employee.objects.filter(status='active').select_related('user')
+    employees = Employee.objects.filter(status='active').select_related('user', 'department')
     
     # 현재 필터 조건 설명 생성 (실제 적용된 날짜 기준)
     filter_description = ""
     
-    # 로깅으로 디버깅 정보 추가
-    logger.info(f"Filter debug - filter_type: {filter_type}, start_date: {start_date}, end_date: {end_date}")
-    logger.info(f"Calculated date_from: {date_from}, date_to: {date_to}")
-    
-    if filter_type == 'inspected_today':
+    if due_field:
+        filter_description = (f"{date_from.strftime('%Y년 %m월 %d일')} ~ {date_to.strftime('%Y년 %m월 %d일')} "
+                              f"{DUE_FILTERS[filter_type][2]} 예정 차량 고객")
+    elif filter_type == 'inspected_today':
         filter_description = f"오늘({today.strftime('%Y년 %m월 %d일')}) 검사 받은 고객"
     elif filter_type == 'inspected_1week':
         desc_date = today - timedelta(days=7)
@@ -693,7 +736,7 @@ def handle_assign_request(request):
             
             if not existing:
                 # 해피콜 생성
-                HappyCall.objects.create(
+                happycall = HappyCall(
                     service_request=latest_service,
                     call_stage=call_stage,
                     first_call_caller=assignee.user if call_stage.startswith('1st') else None,
@@ -701,6 +744,10 @@ def handle_assign_request(request):
                     third_call_caller=assignee.user if call_stage.startswith('3rd') else None,
                     fourth_call_caller=assignee.user if call_stage.startswith('4th') else None
                 )
+                if call_stage.startswith('4th'):
+                    # 다음 검사 안내는 차량 정기검사 예정일에 맞춘다
+                    happycall.fourth_call_scheduled_date = happycall.inspection_reminder_datetime()
+                happycall.save()
                 created_count += 1
                 
         except Customer.DoesNotExist:
@@ -797,16 +844,15 @@ def happycall_detail(request, pk):
     # 매출 기록 조회
     revenue_records = HappyCallRevenue.objects.filter(happy_call=happycall)
     
-    # 고객의 서비스 이력 조회
-    customer = happycall.service_request.customer
-    service_history = ServiceRequest.objects.filter(
-        customer=customer
-    ).select_related(
-        'service_type', 'vehicle'
-    ).order_by('-service_date')[:10]  # 최근 10건
-    
-    # 고객의 차량 정보
-    customer_vehicles = [ov.vehicle for ov in customer.vehicle_ownerships.filter(end_date__isnull=True)]
+    # 고객의 서비스 이력(최근 10건)과 차량 정보는 사전 계산된 고객 프로필에서 읽는다
+    from customers.profile import get_profile
+    profile = get_profile(happycall.service_request.customer_id) or {}
+    service_history = sorted(
+        profile.get('recent_services', []),
+        key=lambda service: (service['service_date'] is not None, service['service_date'] or 0),
+        reverse=True,
+    )
+    customer_vehicles = profile.get('vehicles', [])
     
     # 수행/수정 모드 판단
     edit_mode = request.GET.get('edit') == 'true'
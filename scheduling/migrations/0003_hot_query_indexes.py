@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 05:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0002_alter_department_options_department_description_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['assignee', 'start_datetime'], name='scheduling__assigne_15529d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['start_datetime'], name='scheduling__start_d_47fc7d_idx'),
+        ),
+    ]
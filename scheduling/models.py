@@ -1,4 +1,5 @@
 from django.db import models
+from core.cache import CacheInvalidationMixin
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
@@ -22,8 +23,10 @@ class Department(models.Model):
     def __str__(self):
         return self.display_name
 
-class Schedule(models.Model):
+class Schedule(CacheInvalidationMixin, models.Model):
     """일정 모델"""
+    cache_tags = ('schedules',)  # 대시보드 캐시 무효화 태그
+    
     STATUS_CHOICES = [
         ('pending', '대기'),
         ('confirmed', '확인됨'),
@@ -67,6 +70,11 @@ class Schedule(models.Model):
         verbose_name = '일정'
         verbose_name_plural = '일정'
         ordering = ['start_datetime']
+        indexes = [
+            # 담당자별 일정, 캘린더 기간 조회
+            models.Index(fields=['assignee', 'start_datetime']),
+            models.Index(fields=['start_datetime']),
+        ]
         
     def __str__(self):
         return f"{self.title} ({self.start_datetime.strftime('%Y-%m-%d %H:%M')})"
@@ -8,6 +8,7 @@ from django.db import models
 import json
 from datetime import datetime
 from .models import Schedule, Department
+from core.querybudget import query_budget
 
 User = get_user_model()
 
@@ -47,6 +48,7 @@ def calendar_view(request):
     })
 
 @login_required
+@query_budget(5)
 def get_events(request):
     """FullCalendar용 이벤트 데이터 API"""
     start = request.GET.get('start')
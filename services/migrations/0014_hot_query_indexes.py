@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 05:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_banned_by_customer_banned_date_and_more'),
+        ('happycall', '0006_hot_query_indexes'),
+        ('scheduling', '0003_hot_query_indexes'),
+        ('services', '0013_servicerequest_service_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['customer', 'service_date'], name='services_se_custome_7eab33_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['vehicle', 'service_date'], name='services_se_vehicle_6bff29_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['status', 'created_at'], name='services_se_status_8f0b00_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['service_date'], name='services_se_service_67b617_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['created_at'], name='services_se_created_fe46d7_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0004_timeline_indexes'),
+        ('happycall', '0006_hot_query_indexes'),
+        ('scheduling', '0003_hot_query_indexes'),
+        ('services', '0014_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['customer', 'created_at'], name='services_se_custome_8535e4_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-19 06:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0006_customer_grade_run'),
+        ('happycall', '0006_hot_query_indexes'),
+        ('scheduling', '0003_hot_query_indexes'),
+        ('services', '0015_timeline_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='servicehistory',
+            index=models.Index(fields=['updated_at'], name='services_se_updated_b3459d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='servicerequest',
+            index=models.Index(fields=['updated_at'], name='services_se_updated_aea36b_idx'),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.db import models
+from core.cache import CacheInvalidationMixin
+from customers.profile import ProfileInvalidationMixin
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
+from customers.dedup import normalize_phone, phone_variants
 from customers.models import Customer, Vehicle, CustomerVehicle
 
 User = get_user_model()
@@ -50,8 +53,10 @@ class ServiceQuickButton(models.Model):
     def __str__(self):
         return f"{self.service_type.name} - {self.button_text}"
 
-class ServiceRequest(models.Model):
+class ServiceRequest(ProfileInvalidationMixin, CacheInvalidationMixin, models.Model):
     """서비스 요청"""
+    cache_tags = ('services',)  # 대시보드 캐시 무효화 태그
+    
     STATUS_CHOICES = [
         ('pending', '접수대기'),
         ('scheduled', '일정확정'),
@@ -117,6 +122,17 @@ class ServiceRequest(models.Model):
         verbose_name = '서비스 요청'
         verbose_name_plural = '서비스 요청'
         ordering = ['-created_at']
+        indexes = [
+            # 고객/차량별 이력 (최근 서비스일 순), 고객 타임라인/프로필 (접수일 순),
+            # 상태별 접수 목록, 기간별 서비스 조회, 등급 증분 산정 (수정일 기준 변경분)
+            models.Index(fields=['customer', 'service_date']),
+            models.Index(fields=['customer', 'created_at']),
+            models.Index(fields=['vehicle', 'service_date']),
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['service_date']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         customer_name = self.customer.name if self.customer else self.temp_customer_name
@@ -130,31 +146,46 @@ class ServiceRequest(models.Model):
         is_new = self.pk is None
         old_scheduled_date = None
         old_assigned_employee = None
+        old_status = None
         
         if not is_new:
             old_instance = ServiceRequest.objects.get(pk=self.pk)
             old_scheduled_date = old_instance.scheduled_date
             old_assigned_employee = old_instance.assigned_employee
+            old_status = old_instance.status
         
         super().save(*args, **kwargs)
         
         # 일정 자동 생성/업데이트 로직
         self._sync_with_schedule(is_new, old_scheduled_date, old_assigned_employee)
+        
+        # 완료 처리된 서비스는 커밋 후 멤버십 포인트 적립
+        if self.status == 'completed' and old_status != 'completed':
+            from customers.points import schedule_service_accrual
+            schedule_service_accrual(self.pk)
+
+        # 접수 때 입력한 주행거리 기록 (임시 차량 정보로 차량을 만든 경우)
+        intake_mileage = getattr(self, '_intake_mileage', None)
+        if intake_mileage:
+            from customers.mileage import record_mileage
+            self._intake_mileage = None
+            record_mileage(self.vehicle, intake_mileage, source='request', service_request=self)
     
     def _create_customer_vehicle_if_needed(self):
         """임시 데이터가 있으면 고객과 차량을 자동 생성"""
         # 고객이 없고 임시 고객 정보가 있으면 새 고객 생성
         if not self.customer and self.temp_customer_name and self.temp_customer_phone:
-            customer, created = Customer.objects.get_or_create(
-                phone=self.temp_customer_phone,
-                defaults={
-                    'name': self.temp_customer_name,
-                    'city': self.temp_customer_city,
-                    'district': self.temp_customer_district,
-                    'dong': self.temp_customer_dong,
-                    'status': 'temporary'  # 임시 고객으로 생성
-                }
-            )
+            # 정규화 전 숫자만 저장된 기존 고객도 같은 고객으로 본다 (중복 생성 방지)
+            customer = Customer.objects.filter(phone__in=phone_variants(self.temp_customer_phone)).first()
+            if customer is None:
+                customer = Customer.objects.create(
+                    phone=normalize_phone(self.temp_customer_phone),
+                    name=self.temp_customer_name,
+                    # 지역 구분(address_city/district/dong)은 Customer.save() 에서 주소로 채운다
+                    address_main=' '.join(filter(None, [self.temp_customer_city, self.temp_customer_district,
+                                                        self.temp_customer_dong])),
+                    customer_status='temporary',  # 임시 고객으로 생성
+                )
             self.customer = customer
             
             # 임시 데이터 초기화
@@ -186,7 +217,8 @@ class ServiceRequest(models.Model):
                     }
                 )
             
-            # 임시 데이터 초기화
+            # 임시 데이터 초기화 (주행거리는 저장 후 주행거리 기록으로 남긴다)
+            self._intake_mileage = self.temp_vehicle_mileage
             self.temp_vehicle_number = ''
             self.temp_vehicle_model = ''
             self.temp_vehicle_year = None
@@ -275,6 +307,10 @@ class ServiceHistory(models.Model):
         verbose_name = '서비스 이력'
         verbose_name_plural = '서비스 이력'
         ordering = ['-created_at']
+        indexes = [
+            # 등급 증분 산정 (수정일 기준 변경분)
+            models.Index(fields=['updated_at']),
+        ]
     
     def __str__(self):
         return f"{self.service_request} - 이력"
@@ -298,11 +334,10 @@ class ServiceHistory(models.Model):
         return None
     
     def save(self, *args, **kwargs):
-        # 서비스 이력이 생성될 때 차량 주행거리 업데이트
-        if self.vehicle_mileage_at_service and self.service_request.vehicle:
-            vehicle = self.service_request.vehicle
-            if not vehicle.mileage or self.vehicle_mileage_at_service > vehicle.mileage:
-                vehicle.mileage = self.vehicle_mileage_at_service
-                vehicle.save()
-        
         super().save(*args, **kwargs)
+
+        # 완료 시 주행거리를 차량 주행거리 기록으로 남김 (차량 최근 주행거리도 갱신)
+        if self.vehicle_mileage_at_service and self.service_request.vehicle:
+            from customers.mileage import record_mileage
+            record_mileage(self.service_request.vehicle, self.vehicle_mileage_at_service, source='completion',
+                           service_request=self.service_request)
@@ -11,6 +11,7 @@ import re
 from .models import ServiceType, ServiceRequest, ServiceHistory
 from scheduling.models import Department
 from happycall.models import HappyCall
+from core.querybudget import query_budget
 from django.utils import timezone
 from datetime import timedelta
 
@@ -294,6 +295,7 @@ def get_quick_buttons_api(request):
         })
 
 @login_required
+@query_budget(10)
 def customer_search_api(request):
     """고객 검색 API"""
     print(f"DEBUG: customer_search_api 호출됨 - query: {request.GET.get('q')}, method: {request.method}")
@@ -320,46 +322,85 @@ def customer_search_api(request):
         customer_query = Q()
         vehicle_query = Q()
         
+        # 숫자가 들어간 검색어는 전화번호/차량번호, 아니면 이름/차종 (초성·자모 앞부분 일치, 인덱스 범위 조회)
+        from customers.hangul import key_field_for, prefix_q
+        has_digit = any(char.isdigit() for char in query)
+        customer_order = '-created_at'
+        vehicle_order = 'vehicle_number'
+
         # 이름으로 검색
-        if search_type in ['name', 'all']:
-            customer_query |= Q(name__icontains=query)
+        if search_type in ['name', 'all'] and not has_digit:
+            name_q = prefix_q(query, 'name_jamo', 'name_chosung')
+            if name_q is not None:
+                customer_query |= name_q
+                customer_order = key_field_for(query, 'name_jamo', 'name_chosung')
         
         # 전화번호로 검색
-        if search_type in ['phone', 'all']:
-            normalized_query = query.replace('-', '').replace(' ', '')
-            if len(normalized_query) >= 4:  # 최소 4자리
-                customer_query |= Q(phone__icontains=normalized_query)
+        if search_type in ['phone', 'all'] and has_digit:
+            from customers.dedup import phone_search_q
+            if sum(char.isdigit() for char in query) >= 4:  # 최소 4자리
+                customer_query |= phone_search_q(query)
         
-        # 차량번호로 검색
+        # 차량번호/차종으로 검색
         if search_type in ['vehicle', 'all']:
-            vehicle_query |= Q(vehicle_number__icontains=query)
-        
-        # 고객 검색 결과
+            if has_digit:
+                vehicle_query |= Q(vehicle_number__icontains=query)
+            else:
+                model_q = prefix_q(query, 'model_jamo', 'model_chosung')
+                if model_q is not None:
+                    vehicle_query |= model_q
+                    vehicle_order = key_field_for(query, 'model_jamo', 'model_chosung')
+        
+        # 고객 검색 결과 (고객/현재 차량 정보는 사전 계산된 고객 프로필에서 기본키 조회로 읽음)
+        # 프로필이 아직 없거나 오래된 고객은 재계산을 예약하고 고객/현재 차량만 직접 읽는다 (쿼리 수 고정)
         if customer_query:
-            customers = Customer.objects.filter(customer_query).prefetch_related('vehicle_ownerships__vehicle')[:10]
-            for customer in customers:
-                vehicles = [ownership.vehicle for ownership in customer.vehicle_ownerships.all()]
+            from customers.ownership import current_ownerships
+            from customers.profile import get_profiles
+            customer_ids = list(Customer.objects.filter(customer_query).order_by(customer_order)
+                                .values_list('pk', flat=True)[:10])
+            profiles = get_profiles(customer_ids, rebuild=False)
+            missing = [customer_id for customer_id in customer_ids if customer_id not in profiles]
+            if missing:
+                for customer in Customer.objects.filter(pk__in=missing).prefetch_related(current_ownerships()):
+                    profiles[customer.pk] = {
+                        'customer': {
+                            'id': customer.pk,
+                            'name': customer.name or '',
+                            'masked_phone': customer.get_masked_phone(),
+                            'address_city': customer.address_city,
+                            'address_district': customer.address_district,
+                            'address_dong': customer.address_dong,
+                        },
+                        'vehicles': [
+                            {'id': ownership.vehicle.pk, 'vehicle_number': ownership.vehicle.vehicle_number,
+                             'model': ownership.vehicle.model, 'year': ownership.vehicle.year}
+                            for ownership in customer.current_ownerships
+                        ],
+                    }
+            for customer_id in customer_ids:
+                if customer_id not in profiles:
+                    continue
+                customer = profiles[customer_id]['customer']
+                customer_row = {
+                    'customer_id': customer['id'],
+                    'customer_name': customer['name'],
+                    'customer_phone': customer['masked_phone'],
+                    'customer_city': customer['address_city'],
+                    'customer_district': customer['address_district'],
+                    'customer_dong': customer['address_dong'],
+                }
+                vehicles = profiles[customer_id]['vehicles']
                 for vehicle in vehicles[:3]:  # 고객당 최대 3대 차량
                     results.append({
-                        'customer_id': customer.id,
-                        'customer_name': customer.name,
-                        'customer_phone': customer.phone,
-                        'customer_city': customer.address_main.split()[0] if customer.address_main else '',
-                        'customer_district': customer.address_main.split()[1] if customer.address_main and len(customer.address_main.split()) > 1 else '',
-                        'customer_dong': '',
-                        'vehicle_id': vehicle.id if vehicle else None,
-                        'vehicle_number': vehicle.vehicle_number if vehicle else '',
-                        'vehicle_model': vehicle.model if vehicle else '',
-                        'vehicle_year': vehicle.year if vehicle else None,
+                        **customer_row,
+                        'vehicle_id': vehicle['id'],
+                        'vehicle_number': vehicle['vehicle_number'],
+                        'vehicle_model': vehicle['model'],
+                        'vehicle_year': vehicle['year'],
                     })
                 if not vehicles:  # 차량이 없는 고객
                     results.append({
-                        'customer_id': customer.id,
-                        'customer_name': customer.name,
-                        'customer_phone': customer.phone,
-                        'customer_city': customer.address_main.split()[0] if customer.address_main else '',
-                        'customer_district': customer.address_main.split()[1] if customer.address_main and len(customer.address_main.split()) > 1 else '',
-                        'customer_dong': '',
+                        **customer_row,
                         'vehicle_id': None,
                         'vehicle_number': '',
                         'vehicle_model': '',
@@ -368,10 +409,10 @@ def customer_search_api(request):
         
         # 차량 검색 결과 (고객 정보 포함)
         if vehicle_query:
-            vehicles = Vehicle.objects.filter(vehicle_query).prefetch_related('ownerships__customer')[:10]
+            # 현재 소유자는 Vehicle.current_owner 를 조인해 함께 읽는다 (customers.ownership)
+            vehicles = Vehicle.objects.filter(vehicle_query).order_by(vehicle_order).select_related('current_owner')[:10]
             for vehicle in vehicles:
-                current_ownership = vehicle.ownerships.filter(end_date__isnull=True).first()
-                customer = current_ownership.customer if current_ownership else None
+                customer = vehicle.current_owner
                 
                 # 이미 추가된 결과가 아닌 경우에만 추가
                 if not any(r['vehicle_id'] == vehicle.id for r in results):
@@ -379,9 +420,9 @@ def customer_search_api(request):
                         'customer_id': customer.id if customer else None,
                         'customer_name': customer.name if customer else '미확인',
                         'customer_phone': customer.phone if customer else '',
-                        'customer_city': customer.address_main.split()[0] if customer and customer.address_main else '',
-                        'customer_district': customer.address_main.split()[1] if customer and customer.address_main and len(customer.address_main.split()) > 1 else '',
-                        'customer_dong': customer.address_main.split()[2] if customer and customer.address_main and len(customer.address_main.split()) > 2 else '',
+                        'customer_city': customer.address_city if customer else '',
+                        'customer_district': customer.address_district if customer else '',
+                        'customer_dong': customer.address_dong if customer else '',
                         'vehicle_id': vehicle.id,
                         'vehicle_number': vehicle.vehicle_number,
                         'vehicle_model': vehicle.model,
@@ -446,14 +487,6 @@ def complete_service(request, service_id):
         # 서비스 상태를 완료로 변경
         service.status = 'completed'
         
-        # 새 주행거리가 있으면 차량 정보 업데이트
-        new_mileage = data.get('new_mileage')
-        if new_mileage:
-            try:
-                service.vehicle_mileage = int(new_mileage)
-            except (ValueError, TypeError):
-                pass
-        
         service.save()
         
         # ServiceHistory 생성 또는 업데이트
@@ -510,8 +543,21 @@ def complete_service(request, service_id):
         if data.get('next_service_notes'):
             history.next_service_notes = data['next_service_notes']
         
+        # 새 주행거리가 있으면 이력에 남김 (저장 시 차량 주행거리 기록/최근 주행거리 갱신)
+        new_mileage = data.get('new_mileage')
+        if new_mileage:
+            try:
+                history.vehicle_mileage_at_service = int(new_mileage)
+            except (ValueError, TypeError):
+                pass
+        
         history.save()
         
+        # 이번 방문(주행거리, 오일 교환/검사 완료)으로 다음 정비 예정일 다시 계산
+        if service.vehicle_id:
+            from customers.mileage import predict_service_dates
+            predict_service_dates([service.vehicle_id])
+        
         # Task 3.2: 서비스 완료 시 해피콜 1차 생성 → 팀장 승인 대기 상태로 생성
         try:
             # 이미 해피콜이 생성되었는지 확인
@@ -61,6 +61,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.RequestMetricsMiddleware',
+    'core.querybudget.NPlusOneDetectionMiddleware',
+    'core.dbrouting.ReportingStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -98,20 +101,58 @@ WSGI_APPLICATION = 'unsan_crm.wsgi.application'
 
 import os
 
+DB_ENGINE = os.getenv('DB_ENGINE', 'django.db.backends.sqlite3')
+IS_SQLITE = DB_ENGINE == 'django.db.backends.sqlite3'
+
+DATABASE_OPTIONS = {}
+if DB_ENGINE == 'django.db.backends.mysql':
+    DATABASE_OPTIONS = {'charset': 'utf8mb4'}
+elif IS_SQLITE:
+    # 트랜잭션 시작 시 바로 쓰기 잠금을 잡아, 읽다가 쓰기로 바뀌는 순간 busy_timeout 없이
+    # "database is locked" 로 실패하는 경우를 막는다
+    DATABASE_OPTIONS = {'transaction_mode': os.getenv('SQLITE_TRANSACTION_MODE', 'IMMEDIATE')}
+
 DATABASES = {
     'default': {
-        'ENGINE': os.getenv('DB_ENGINE', 'django.db.backends.sqlite3'),
+        'ENGINE': DB_ENGINE,
         'NAME': os.getenv('DB_NAME', BASE_DIR / 'db.sqlite3'),
         'USER': os.getenv('DB_USER', ''),
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', ''),
         'PORT': os.getenv('DB_PORT', ''),
-        'OPTIONS': {
-            'charset': 'utf8mb4',
-        } if os.getenv('DB_ENGINE') == 'django.db.backends.mysql' else {}
+        # SQLite 는 연결 비용이 거의 없으므로 요청마다 새 연결, 그 외 엔진은 연결 재사용(초)
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '0' if IS_SQLITE else '60')),
+        'CONN_HEALTH_CHECKS': not IS_SQLITE,
+        'OPTIONS': DATABASE_OPTIONS,
     }
 }
 
+# 리포트/대시보드용 읽기 복제본 (core.dbrouting). REPORTING_DB_NAME 이 있을 때만 사용
+# 로컬 SQLite 는 sync_reporting_db 명령으로 default 를 복사해 맞춘다
+if os.getenv('REPORTING_DB_NAME'):
+    DATABASES['reporting'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('REPORTING_DB_NAME'),
+        'USER': os.getenv('REPORTING_DB_USER', DATABASES['default']['USER']),
+        'PASSWORD': os.getenv('REPORTING_DB_PASSWORD', DATABASES['default']['PASSWORD']),
+        'HOST': os.getenv('REPORTING_DB_HOST', DATABASES['default']['HOST']),
+        'PORT': os.getenv('REPORTING_DB_PORT', DATABASES['default']['PORT']),
+        'OPTIONS': dict(DATABASE_OPTIONS),
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['core.dbrouting.ReportingRouter']
+# POST 후 이 시간(초) 동안은 해당 사용자의 리포트도 default 에서 읽음
+REPORTING_STICKY_SECONDS = int(os.getenv('REPORTING_STICKY_SECONDS', '10'))
+
+# SQLite 운영 프로필 (core.dbtuning 이 연결마다 PRAGMA 적용, 다른 엔진은 무시)
+SQLITE_PRAGMAS = {
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '20000')),  # ms
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))),  # 256MB
+    'cache_size': int(os.getenv('SQLITE_CACHE_SIZE', '-65536')),  # 음수 = KiB (64MB)
+    'temp_store': 'MEMORY',
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -173,15 +214,87 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10000
 
-# 캐시 설정 (진행률 저장용)
-CACHES = {
-    'default': {
+# 캐시 설정 (업로드 진행률, 대시보드/리포트 캐시)
+# 여러 워커가 같은 값을 보도록 공유 백엔드 사용: file(기본) / db / redis / locmem
+# db 사용 시 `python manage.py createcachetable` 필요
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'file')
+CACHE_BACKENDS = {
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'django_cache'),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_LOCATION', 'redis://127.0.0.1:6379/1'),
+    },
+    'locmem': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
+    },
+}
+CACHES = {
+    'default': {
+        **CACHE_BACKENDS[CACHE_BACKEND],
         'TIMEOUT': 600,  # 10분
+        'KEY_PREFIX': 'unsan_crm',
     }
 }
 
+# 요청 성능 계측 (core.middleware.RequestMetricsMiddleware)
+# 뷰별 통계를 프로세스 메모리에 누적했다가 주기적으로 core.RequestMetric 에 저장
+REQUEST_METRICS_ENABLED = os.getenv('REQUEST_METRICS_ENABLED', 'True') == 'True'
+REQUEST_METRICS_FLUSH_INTERVAL = int(os.getenv('REQUEST_METRICS_FLUSH_INTERVAL', '60'))  # 초
+
+# 쿼리 예산/N+1 탐지 (core.querybudget): off / warn / raise
+# 기본값은 DEBUG 에서 warn(경고 로그), 그 외 off. CI 는 check_query_budgets 명령으로 raise 검사
+QUERY_BUDGET_MODE = os.getenv('QUERY_BUDGET_MODE', 'warn' if DEBUG else 'off')
+
+# 고객 360 프로필 (customers.profile): 관련 데이터 변경 후 백그라운드 스레드에서 재계산
+# False 면 재계산 필요 표시만 하고 다음 조회 때 다시 만든다
+CUSTOMER_PROFILE_ASYNC_REBUILD = os.getenv('CUSTOMER_PROFILE_ASYNC_REBUILD', 'True') == 'True'
+
+# 멤버십 포인트 (customers.points)
+# 서비스 완료 시 예상 가격 대비 적립률 (예: 0.01 = 1%, 0 이면 자동 적립 안 함), 적립 포인트 유효기간(일, 0 이면 무기한)
+POINTS_ACCRUAL_RATE = os.getenv('POINTS_ACCRUAL_RATE', '0')
+POINTS_EXPIRY_DAYS = int(os.getenv('POINTS_EXPIRY_DAYS', '365'))
+
+# 고객 세그먼트 (customers.segments)
+# 저장된 비트맵을 증분 갱신 없이 그대로 쓰는 시간(초), 증분 대신 전체 재계산하는 주기(시간)
+SEGMENT_CACHE_SECONDS = int(os.getenv('SEGMENT_CACHE_SECONDS', '300'))
+SEGMENT_FULL_REFRESH_HOURS = int(os.getenv('SEGMENT_FULL_REFRESH_HOURS', '24'))
+
+# 캠페인 발송 (customers.campaigns)
+# 발송기(이력 배치를 받아 결과를 돌려주는 함수 경로), 분당 발송 건수(0 이면 제한 없음),
+# 발송 대상 생성 API 호출 시 백그라운드 발송 여부, 발송사 결과 콜백 토큰(X-Campaign-Token 헤더)
+CAMPAIGN_SENDER = os.getenv('CAMPAIGN_SENDER', 'customers.campaigns.mock_sender')
+CAMPAIGN_SEND_RATE = int(os.getenv('CAMPAIGN_SEND_RATE', '600'))
+CAMPAIGN_ASYNC_SEND = os.getenv('CAMPAIGN_ASYNC_SEND', 'True') == 'True'
+CAMPAIGN_WEBHOOK_TOKEN = os.getenv('CAMPAIGN_WEBHOOK_TOKEN', '')
+
+# 다음 정비 예정일 (customers.mileage)
+# 주행거리 기록이 부족할 때 쓰는 일평균 주행거리(km), 엔진오일 교환 주기(km, 일), 정기검사 주기(일),
+# 4차콜(다음 검사 안내)을 정기검사 예정일 며칠 전으로 잡을지
+MILEAGE_DEFAULT_DAILY_KM = float(os.getenv('MILEAGE_DEFAULT_DAILY_KM', '35'))
+OIL_CHANGE_INTERVAL_KM = int(os.getenv('OIL_CHANGE_INTERVAL_KM', '10000'))
+OIL_CHANGE_INTERVAL_DAYS = int(os.getenv('OIL_CHANGE_INTERVAL_DAYS', '365'))
+INSPECTION_INTERVAL_DAYS = int(os.getenv('INSPECTION_INTERVAL_DAYS', '730'))
+INSPECTION_REMINDER_DAYS = int(os.getenv('INSPECTION_REMINDER_DAYS', '30'))
+
+# 오래된 로그/이력 보관 (core.archive, archive_logs 명령)
+# 보관 파일(월별 gzip JSONL) 디렉터리, 운영 테이블에 남길 기간(일)
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', str(BASE_DIR / 'archive'))
+ARCHIVE_RETENTION_DAYS = int(os.getenv('ARCHIVE_RETENTION_DAYS', '365'))
+
+# 분석용 Parquet 내보내기 (core.parquet_export, export_parquet 명령)
+# 월 파티션 파일과 증분 기준 시각(_watermarks.json)을 둘 디렉터리
+EXPORT_DIR = os.getenv('EXPORT_DIR', str(BASE_DIR / 'exports'))
+
 INTERNAL_IPS = [
     "127.0.0.1",
 ]
@@ -221,5 +334,10 @@ LOGGING = {
             'level': 'INFO',
             'propagate': True,
         },
+        'core.querybudget': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
@@ -14,7 +14,7 @@ def vehicle_list(request):
     page = request.GET.get('page', 1)
     
     # 차량 기본 쿼리셋
-    vehicles = Vehicle.objects.select_related().prefetch_related('ownerships__customer').all()
+    vehicles = Vehicle.objects.select_related('current_owner')
     
     # 검색 조건 적용
     if search_query:
@@ -26,16 +26,16 @@ def vehicle_list(request):
     
     # 소유자 필터
     if owner_filter == 'with_owner':
-        vehicles = vehicles.filter(ownerships__end_date__isnull=True)
+        vehicles = vehicles.filter(current_owner__isnull=False)
     elif owner_filter == 'without_owner':
-        vehicles = vehicles.filter(ownerships__isnull=True)
+        vehicles = vehicles.filter(current_owner__isnull=True)
     
     # 정렬
     vehicles = vehicles.order_by('-created_at')
     
     # 통계 계산
     total_vehicles = Vehicle.objects.count()
-    vehicles_with_owners = Vehicle.objects.filter(ownerships__end_date__isnull=True).distinct().count()
+    vehicles_with_owners = Vehicle.objects.filter(current_owner__isnull=False).count()
     vehicles_without_owners = total_vehicles - vehicles_with_owners
     
     # 페이지네이션
@@ -66,7 +66,7 @@ def vehicle_detail(request, pk):
     vehicle = get_object_or_404(Vehicle, pk=pk)
     
     # 현재 소유자
-    current_ownership = vehicle.ownerships.filter(end_date__isnull=True).first()
+    current_ownership = vehicle.ownerships.filter(end_date__isnull=True).select_related('customer').first()
     
     # 소유 이력
     ownership_history = vehicle.ownerships.all().order_by('-start_date')